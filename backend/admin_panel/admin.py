@@ -1,3 +1,16 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import BackupRecord
+
+
+@admin.register(BackupRecord)
+class BackupRecordAdmin(admin.ModelAdmin):
+    """Admin interface for BackupRecord"""
+
+    list_display = ['filename', 'backup_type', 'status', 'size', 'created_by', 'created_at', 'completed_at']
+    list_filter = ['backup_type', 'status', 'created_at']
+    search_fields = ['filename', 'checksum']
+    readonly_fields = [field.name for field in BackupRecord._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
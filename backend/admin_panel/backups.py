@@ -0,0 +1,540 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tarfile
+import tempfile
+import threading
+import time
+import zlib
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from .chunk_store import ChunkStore, CorruptChunkError
+from .models import BackupRecord
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT = 1
+MANIFEST_NAME = 'manifest.json'
+DATABASE_NAME = 'db.sqlite3'
+MEDIA_PREFIX = 'media/'
+READ_CHUNK_SIZE = 1024 * 1024
+# Incremental chunks are rounded up to whole database pages; 64 KiB is 16 of
+# SQLite's default 4 KiB pages, so a small write re-stores little of the snapshot
+DEFAULT_CHUNK_SIZE = 64 * 1024
+ARCHIVE_SUFFIX = '.tar.gz'
+INCREMENTAL_SUFFIX = '.manifest.json'
+CHUNK_DIR = 'chunks'
+# Pending/running records older than this were left behind by a dead process
+ABANDONED_AFTER = timedelta(hours=6)
+
+
+class BackupError(Exception):
+    """A backup could not be created, verified or restored"""
+
+
+class _HashingWriter:
+    """Write-only file wrapper that hashes and counts what passes through"""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.fileobj.write(data)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(READ_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BackupService:
+    """Compressed, checksummed backups of the SQLite database and uploaded media.
+
+    The database is copied with SQLite's online backup API a few pages at a
+    time, pausing between steps, so writers are never locked out for long. The
+    snapshot and the media directories are streamed into a ``.tar.gz`` whose
+    first member is a manifest with the SHA-256 of every file; the archive's own
+    SHA-256 is kept on the ``BackupRecord``. Restores check both before
+    anything is overwritten.
+
+    Incremental backups split the snapshot and media into chunks kept once in
+    a content-addressed ``ChunkStore`` under ``BACKUP_ROOT/chunks``; the backup
+    itself is only a manifest of chunk hashes, so unchanged pages and files
+    cost nothing. Every manifest restores on its own, and ``collect_garbage``
+    removes chunks no manifest refers to any more.
+    """
+
+    _lock = threading.Lock()
+
+    @staticmethod
+    def media_root():
+        return Path(settings.MEDIA_ROOT or settings.BASE_DIR)
+
+    @staticmethod
+    def media_files(media_root=None):
+        """``(archive name, path)`` for every file in ``BACKUP_MEDIA_DIRS``"""
+        media_root = Path(media_root or BackupService.media_root())
+        files = []
+        for directory in getattr(settings, 'BACKUP_MEDIA_DIRS', []):
+            base = media_root / directory
+            if not base.is_dir():
+                continue
+            for path in sorted(base.rglob('*')):
+                if path.is_file():
+                    files.append((MEDIA_PREFIX + path.relative_to(media_root).as_posix(), path))
+        return files
+
+    @staticmethod
+    def chunk_store():
+        return ChunkStore(settings.BACKUP_ROOT / CHUNK_DIR)
+
+    @staticmethod
+    def create(user=None, backup_type='full', run_async=True):
+        """Register a backup and build it, in a background thread by default"""
+        if backup_type not in dict(BackupRecord.TYPE_CHOICES):
+            raise BackupError(f'Unknown backup type: {backup_type}')
+        in_progress = BackupRecord.objects.filter(status__in=['pending', 'running'])
+        in_progress.filter(created_at__lt=timezone.now() - ABANDONED_AFTER).update(
+            status='failed', error='Abandoned by a stopped process'
+        )
+        if in_progress.exists():
+            raise BackupError('Another backup is already in progress')
+
+        settings.BACKUP_ROOT.mkdir(parents=True, exist_ok=True)
+        record = BackupRecord.objects.create(
+            filename=f"backup_{timezone.now().strftime('%Y%m%d_%H%M%S_%f')}"
+                     f"{INCREMENTAL_SUFFIX if backup_type == 'incremental' else ARCHIVE_SUFFIX}",
+            backup_type=backup_type,
+            created_by=user if user and user.is_authenticated else None,
+        )
+        if run_async:
+            threading.Thread(target=BackupService._run_in_thread, args=(record.pk,), daemon=True).start()
+        else:
+            BackupService.run(record)
+        return record
+
+    @staticmethod
+    def _run_in_thread(record_id):
+        close_old_connections()
+        try:
+            BackupService.run(BackupRecord.objects.get(pk=record_id))
+        finally:
+            connection.close()
+
+    @staticmethod
+    def run(record):
+        """Build the archive or manifest for ``record`` and mark it completed or failed"""
+        record.status = 'running'
+        record.started_at = timezone.now()
+        record.save(update_fields=['status', 'started_at'])
+
+        with tempfile.TemporaryDirectory(dir=settings.BACKUP_ROOT) as workdir:
+            try:
+                snapshot = Path(workdir) / DATABASE_NAME
+                BackupService.snapshot_database(snapshot)
+                media = BackupService.media_files()
+                if record.backup_type == 'incremental':
+                    BackupService.write_chunks(record, snapshot, media)
+                else:
+                    record.size, record.checksum = BackupService.write_archive(record, snapshot, media)
+                    record.bytes_written = record.size
+            except Exception as e:
+                logger.error(f"Error creating backup {record.filename}: {str(e)}")
+                record.path.unlink(missing_ok=True)
+                record.status = 'failed'
+                record.error = str(e)
+                record.completed_at = timezone.now()
+                record.save(update_fields=['status', 'error', 'completed_at'])
+                return record
+
+            record.status = 'completed'
+            record.database_size = snapshot.stat().st_size
+            record.media_files = len(media)
+            record.completed_at = timezone.now()
+            record.save(update_fields=[
+                'status', 'size', 'checksum', 'database_size', 'media_files',
+                'chunk_count', 'bytes_written', 'completed_at',
+            ])
+        logger.info(f"Backup {record.filename} completed: {record.bytes_written} bytes written")
+        return record
+
+    @staticmethod
+    def _copy_database(source, target):
+        """Copy ``source`` into ``target`` in steps, yielding to other connections between them"""
+        pages = getattr(settings, 'BACKUP_PAGES_PER_STEP', 256)
+        pause = getattr(settings, 'BACKUP_STEP_PAUSE', 0.005)
+        busy_timeout = getattr(settings, 'BACKUP_BUSY_TIMEOUT', 60)
+        busy_since = []
+
+        def progress(status, remaining, total):
+            # sqlite3 retries busy/locked steps forever; give up after busy_timeout
+            if status in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED):
+                busy_since.append(time.monotonic())
+                if busy_since[-1] - busy_since[0] > busy_timeout:
+                    raise BackupError('Database stayed locked during the backup')
+                return
+            busy_since.clear()
+            if remaining and pause:
+                time.sleep(pause)
+
+        source.backup(target, pages=pages, progress=progress, sleep=pause or 0.25)
+
+    @staticmethod
+    def snapshot_database(path):
+        """Consistent copy of the live database at ``path`` via the online backup API"""
+        if connection.vendor != 'sqlite':
+            raise BackupError('Online backups require the SQLite database backend')
+        if connection.in_atomic_block:
+            # The backup cannot read past this connection's own pending writes
+            raise BackupError('Backups cannot run inside a transaction')
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        try:
+            BackupService._copy_database(connection.connection, target)
+        finally:
+            target.close()
+
+    @staticmethod
+    def page_size(path):
+        """``PRAGMA page_size`` of the SQLite file at ``path``"""
+        database = sqlite3.connect(path)
+        try:
+            return database.execute('PRAGMA page_size').fetchone()[0]
+        finally:
+            database.close()
+
+    @staticmethod
+    def write_archive(record, snapshot, media):
+        """Stream the manifest, snapshot and media into the archive; returns (size, sha256)"""
+        members = [(DATABASE_NAME, snapshot)] + media
+        manifest = {
+            'format': ARCHIVE_FORMAT,
+            'backup_type': record.backup_type,
+            'created_at': timezone.now().isoformat(),
+            'files': [
+                {'name': name, 'size': path.stat().st_size, 'sha256': file_sha256(path)}
+                for name, path in members
+            ],
+        }
+        manifest_bytes = json.dumps(manifest, indent=2).encode('utf-8')
+
+        with open(record.path, 'wb') as handle:
+            writer = _HashingWriter(handle)
+            with tarfile.open(fileobj=writer, mode='w|gz') as archive:
+                info = tarfile.TarInfo(MANIFEST_NAME)
+                info.size = len(manifest_bytes)
+                info.mtime = int(time.time())
+                archive.addfile(info, io.BytesIO(manifest_bytes))
+                for name, path in members:
+                    archive.add(path, arcname=name, recursive=False)
+        return writer.size, writer.sha256.hexdigest()
+
+    @staticmethod
+    def _previous_files():
+        """Media entries of the newest incremental manifest, by name, for reuse"""
+        previous = BackupRecord.objects.filter(backup_type='incremental', status='completed').first()
+        if previous is None:
+            return {}
+        try:
+            manifest = BackupService.read_manifest(previous.path)
+        except (BackupError, OSError, ValueError):
+            return {}
+        return {entry['name']: entry for entry in manifest['files'] if 'mtime_ns' in entry}
+
+    @staticmethod
+    def write_chunks(record, snapshot, media):
+        """Store the snapshot and media as chunks and write the manifest to ``record.path``.
+
+        Media files whose size and mtime match the previous incremental manifest
+        reuse its chunk list without being read. The snapshot is always chunked;
+        only pages that changed produce new chunks.
+        """
+        store = BackupService.chunk_store()
+        page_size = BackupService.page_size(snapshot)
+        chunk_size = getattr(settings, 'BACKUP_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+        chunk_size = max(1, -(-chunk_size // page_size)) * page_size
+        previous = BackupService._previous_files()
+        files = []
+        written = 0
+        for name, path in [(DATABASE_NAME, snapshot)] + media:
+            stat = path.stat()
+            entry = previous.get(name)
+            if (
+                entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+                and all(store.exists(digest) for digest in entry['chunks'])
+            ):
+                files.append(entry)
+                continue
+            chunks, size, checksum, stored = store.put_file(path, chunk_size)
+            written += stored
+            entry = {'name': name, 'size': size, 'sha256': checksum, 'chunks': chunks}
+            if name != DATABASE_NAME:
+                entry['mtime_ns'] = stat.st_mtime_ns
+            files.append(entry)
+
+        manifest = {
+            'format': ARCHIVE_FORMAT,
+            'backup_type': record.backup_type,
+            'created_at': timezone.now().isoformat(),
+            'chunk_size': chunk_size,
+            'files': files,
+        }
+        manifest_bytes = json.dumps(manifest, indent=2).encode('utf-8')
+        temp = record.path.with_name(record.path.name + '.tmp')
+        temp.write_bytes(manifest_bytes)
+        os.replace(temp, record.path)
+
+        record.size = len(manifest_bytes)
+        record.checksum = hashlib.sha256(manifest_bytes).hexdigest()
+        record.chunk_count = len({digest for entry in files for digest in entry['chunks']})
+        record.bytes_written = written + len(manifest_bytes)
+        return manifest
+
+    @staticmethod
+    def _materialize(manifest, workdir):
+        """Rebuild every file of an incremental manifest under ``workdir`` from the chunk store"""
+        store = BackupService.chunk_store()
+        root = workdir.resolve()
+        for entry in manifest['files']:
+            target = (workdir / entry['name']).resolve()
+            if not target.is_relative_to(root):
+                raise BackupError(f"Backup file {entry['name']} is outside the backup")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                store.write_file(entry['chunks'], target)
+            except CorruptChunkError as e:
+                raise BackupError(f"Backup file {entry['name']} cannot be rebuilt: {e}")
+
+    @staticmethod
+    def verify(record, workdir):
+        """Check the backup checksum, unpack it into ``workdir`` and check every file.
+
+        Archives are extracted; incremental backups are rebuilt from their chunks.
+        Returns the manifest. Raises ``BackupError`` on any mismatch.
+        """
+        if record.status != 'completed':
+            raise BackupError('Only completed backups can be restored')
+        if not record.path.is_file():
+            raise BackupError('Backup archive is missing')
+        if file_sha256(record.path) != record.checksum:
+            raise BackupError('Backup archive checksum does not match')
+
+        workdir = Path(workdir)
+        if record.backup_type == 'incremental':
+            try:
+                manifest = json.loads(record.path.read_text('utf-8'))
+            except (OSError, ValueError):
+                raise BackupError('Backup manifest is missing or unreadable')
+            BackupService._materialize(manifest, workdir)
+        else:
+            with tarfile.open(record.path, mode='r:gz') as archive:
+                archive.extractall(workdir, filter='data')
+            try:
+                manifest = json.loads((workdir / MANIFEST_NAME).read_text('utf-8'))
+            except (OSError, ValueError):
+                raise BackupError('Backup manifest is missing or unreadable')
+
+        for entry in manifest['files']:
+            path = workdir / entry['name']
+            if not path.is_file() or file_sha256(path) != entry['sha256']:
+                raise BackupError(f"Backup file {entry['name']} failed verification")
+
+        check = sqlite3.connect(workdir / DATABASE_NAME)
+        try:
+            result = check.execute('PRAGMA integrity_check').fetchone()[0]
+        finally:
+            check.close()
+        if result != 'ok':
+            raise BackupError(f'Database snapshot failed integrity check: {result}')
+        return manifest
+
+    @staticmethod
+    def restore(record, database=None, media_root=None):
+        """Verify ``record`` and copy its database and media back.
+
+        ``database`` is a path to restore into; by default the live database is
+        overwritten through the online backup API. Media files in the archive
+        replace the ones on disk; files added since the backup are kept.
+        """
+        media_root = Path(media_root or BackupService.media_root())
+        with BackupService._lock, tempfile.TemporaryDirectory(dir=settings.BACKUP_ROOT) as workdir:
+            manifest = BackupService.verify(record, workdir)
+            workdir = Path(workdir)
+
+            source = sqlite3.connect(workdir / DATABASE_NAME)
+            try:
+                if database is None:
+                    if connection.in_atomic_block:
+                        raise BackupError('Restores cannot run inside a transaction')
+                    connection.ensure_connection()
+                    BackupService._copy_database(source, connection.connection)
+                else:
+                    target = sqlite3.connect(database)
+                    try:
+                        BackupService._copy_database(source, target)
+                    finally:
+                        target.close()
+            finally:
+                source.close()
+
+            restored_media = 0
+            for entry in manifest['files']:
+                if not entry['name'].startswith(MEDIA_PREFIX):
+                    continue
+                destination = media_root / entry['name'][len(MEDIA_PREFIX):]
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(workdir / entry['name'], destination)
+                restored_media += 1
+
+        if database is None:
+            # The catalog itself was just rolled back to the snapshot
+            BackupService.sync_catalog()
+        BackupRecord.objects.filter(filename=record.filename).update(last_restored_at=timezone.now())
+        logger.info(f"Restored backup {record.filename} ({restored_media} media files)")
+        return {'filename': record.filename, 'media_files': restored_media}
+
+    @staticmethod
+    def stream_archive(record):
+        """Yield an incremental backup as a ``.tar.gz``, built from its chunks as it is sent.
+
+        The tar stream is written by hand so no file is ever held whole in
+        memory or staged on disk.
+        """
+        manifest_bytes = record.path.read_bytes()
+        manifest = json.loads(manifest_bytes)
+        store = BackupService.chunk_store()
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+        mtime = int(time.time())
+
+        def header(name, size):
+            info = tarfile.TarInfo(name)
+            info.size = size
+            info.mtime = mtime
+            return compressor.compress(info.tobuf(format=tarfile.PAX_FORMAT))
+
+        def padding(size):
+            return compressor.compress(b'\0' * (-size % tarfile.BLOCKSIZE))
+
+        yield header(MANIFEST_NAME, len(manifest_bytes)) + compressor.compress(manifest_bytes)
+        yield padding(len(manifest_bytes))
+        for entry in manifest['files']:
+            yield header(entry['name'], entry['size'])
+            for digest in entry['chunks']:
+                try:
+                    yield compressor.compress(store.get(digest))
+                except CorruptChunkError as e:
+                    logger.error(f"Error streaming backup {record.filename}: {str(e)}")
+                    raise BackupError(str(e))
+            yield padding(entry['size'])
+        yield compressor.compress(b'\0' * tarfile.BLOCKSIZE * 2) + compressor.flush()
+
+    @staticmethod
+    def read_manifest(path):
+        """Manifest of a backup; for archives it is the first member so only the head is read"""
+        if path.name.endswith(INCREMENTAL_SUFFIX):
+            return json.loads(path.read_text('utf-8'))
+        with tarfile.open(path, mode='r|gz') as archive:
+            for member in archive:
+                if member.name == MANIFEST_NAME:
+                    return json.load(archive.extractfile(member))
+                break
+        raise BackupError(f'{path.name} has no manifest')
+
+    @staticmethod
+    def sync_catalog():
+        """Register backups under ``BACKUP_ROOT`` that have no catalog entry; returns the count"""
+        root = settings.BACKUP_ROOT
+        if not root.is_dir():
+            return 0
+        known = set(BackupRecord.objects.values_list('filename', flat=True))
+        added = 0
+        paths = list(root.glob(f'backup_*{ARCHIVE_SUFFIX}')) + list(root.glob(f'backup_*{INCREMENTAL_SUFFIX}'))
+        for path in sorted(paths):
+            if path.name in known:
+                continue
+            try:
+                manifest = BackupService.read_manifest(path)
+            except (BackupError, OSError, tarfile.TarError, ValueError) as e:
+                logger.error(f"Error reading backup {path.name}: {str(e)}")
+                continue
+            database = next((entry for entry in manifest['files'] if entry['name'] == DATABASE_NAME), {})
+            BackupRecord.objects.create(
+                filename=path.name,
+                backup_type=manifest.get('backup_type', 'full'),
+                status='completed',
+                size=path.stat().st_size,
+                checksum=file_sha256(path),
+                database_size=database.get('size', 0),
+                media_files=sum(1 for entry in manifest['files'] if entry['name'].startswith(MEDIA_PREFIX)),
+                chunk_count=len({digest for entry in manifest['files'] for digest in entry.get('chunks', [])}),
+                completed_at=timezone.now(),
+            )
+            added += 1
+        return added
+
+    @staticmethod
+    def delete(record):
+        """Remove a backup; chunks of an incremental one stay until ``collect_garbage``"""
+        if record.status == 'running':
+            raise BackupError('A running backup cannot be deleted')
+        try:
+            os.remove(record.path)
+        except FileNotFoundError:
+            pass
+        record.delete()
+
+    @staticmethod
+    def collect_garbage(dry_run=False):
+        """Delete chunks that no manifest under ``BACKUP_ROOT`` refers to.
+
+        Manifests on disk are the source of truth, so backups missing from the
+        catalog keep their chunks. Chunks written or reused after the scan
+        started are left for the next run. Returns ``{'chunks': n, 'bytes': n}``.
+        """
+        started = time.time()
+        if BackupRecord.objects.filter(status__in=['pending', 'running']).exists():
+            raise BackupError('Chunks cannot be collected while a backup is in progress')
+
+        referenced = set()
+        root = settings.BACKUP_ROOT
+        if root.is_dir():
+            for path in root.glob(f'backup_*{INCREMENTAL_SUFFIX}'):
+                try:
+                    manifest = BackupService.read_manifest(path)
+                except (OSError, ValueError) as e:
+                    # Deleting its chunks would make that backup unrestorable
+                    raise BackupError(f'{path.name} is unreadable: {e}')
+                for entry in manifest['files']:
+                    referenced.update(entry['chunks'])
+
+        store = BackupService.chunk_store()
+        removed = freed = 0
+        for digest in list(store.digests()):
+            if digest in referenced:
+                continue
+            try:
+                stat = store.path_for(digest).stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime >= started:
+                continue
+            removed += 1
+            freed += stat.st_size if dry_run else store.delete(digest)
+        logger.info(f"Chunk garbage collection {'found' if dry_run else 'removed'} {removed} chunks ({freed} bytes)")
+        return {'chunks': removed, 'bytes': freed}
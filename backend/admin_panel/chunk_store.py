@@ -0,0 +1,113 @@
+import hashlib
+import os
+import threading
+import zlib
+from pathlib import Path
+
+
+class CorruptChunkError(Exception):
+    """A stored chunk is missing or no longer matches its hash"""
+
+
+class ChunkStore:
+    """Content-addressed chunk storage for incremental backups.
+
+    Every chunk is stored once, zlib-compressed, at ``<root>/<hash[:2]>/<hash[2:]>``
+    where ``hash`` is the SHA-256 of the uncompressed bytes. Writes go to a
+    temporary file first and are renamed into place, so a chunk that exists is
+    always complete. The store itself does not know which chunks are in use;
+    ``BackupService.collect_garbage`` works that out from the manifests.
+    """
+
+    TEMP_SUFFIX = '.tmp'
+
+    def __init__(self, root, compression_level=6):
+        self.root = Path(root)
+        self.compression_level = compression_level
+
+    def path_for(self, digest):
+        return self.root / digest[:2] / digest[2:]
+
+    def exists(self, digest):
+        return self.path_for(digest).is_file()
+
+    def put(self, data):
+        """Store ``data``; returns ``(digest, bytes written)`` with 0 bytes for known chunks"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        try:
+            # Refreshing the mtime keeps a concurrent garbage collection off the chunk
+            os.utime(path)
+            return digest, 0
+        except FileNotFoundError:
+            pass
+
+        compressed = zlib.compress(data, self.compression_level)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}{self.TEMP_SUFFIX}')
+        with open(temp, 'wb') as handle:
+            handle.write(compressed)
+        os.replace(temp, path)
+        return digest, len(compressed)
+
+    def get(self, digest):
+        """Uncompressed bytes of a chunk, checked against its hash"""
+        try:
+            data = zlib.decompress(self.path_for(digest).read_bytes())
+        except (OSError, zlib.error) as e:
+            raise CorruptChunkError(f'Chunk {digest} is unreadable: {e}')
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise CorruptChunkError(f'Chunk {digest} does not match its hash')
+        return data
+
+    def put_file(self, path, chunk_size):
+        """Split a file into fixed-size chunks and store them.
+
+        Returns ``(chunks, size, sha256, bytes written)``. SQLite changes whole
+        pages in place, so with a page-aligned ``chunk_size`` an updated row only
+        produces new chunks for the pages it touched.
+        """
+        chunks = []
+        written = 0
+        size = 0
+        file_digest = hashlib.sha256()
+        with open(path, 'rb') as handle:
+            for data in iter(lambda: handle.read(chunk_size), b''):
+                digest, stored = self.put(data)
+                chunks.append(digest)
+                written += stored
+                size += len(data)
+                file_digest.update(data)
+        return chunks, size, file_digest.hexdigest(), written
+
+    def write_file(self, chunks, path):
+        """Reassemble a file from its chunks; returns its SHA-256"""
+        file_digest = hashlib.sha256()
+        with open(path, 'wb') as handle:
+            for digest in chunks:
+                data = self.get(digest)
+                file_digest.update(data)
+                handle.write(data)
+        return file_digest.hexdigest()
+
+    def digests(self):
+        """Every stored chunk hash"""
+        if not self.root.is_dir():
+            return
+        for directory in self.root.iterdir():
+            if not directory.is_dir():
+                continue
+            for path in directory.iterdir():
+                if not path.name.endswith(self.TEMP_SUFFIX):
+                    yield directory.name + path.name
+
+    def delete(self, digest):
+        """Remove a chunk; returns the bytes freed"""
+        path = self.path_for(digest)
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return 0
+        return size
+
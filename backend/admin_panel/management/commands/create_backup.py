@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from admin_panel.backups import BackupError, BackupService
+
+
+class Command(BaseCommand):
+    help = 'Create a compressed, checksummed backup of the database and uploaded media'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Store only new chunks in the chunk store instead of writing a full archive',
+        )
+
+    def handle(self, *args, **options):
+        backup_type = 'incremental' if options['incremental'] else 'full'
+        try:
+            record = BackupService.create(backup_type=backup_type, run_async=False)
+        except BackupError as e:
+            raise CommandError(str(e))
+
+        if record.status != 'completed':
+            raise CommandError(f"Backup {record.filename} failed: {record.error}")
+
+        self.stdout.write(
+            f"{record.filename}: {record.size} bytes, {record.bytes_written} bytes written, sha256 {record.checksum}"
+        )
+        self.stdout.write(self.style.SUCCESS('Backup complete'))
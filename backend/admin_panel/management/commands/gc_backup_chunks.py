@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from admin_panel.backups import BackupError, BackupService
+
+
+class Command(BaseCommand):
+    help = 'Delete chunk store entries that no incremental backup manifest refers to'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report unreferenced chunks without deleting them')
+
+    def handle(self, *args, **options):
+        try:
+            result = BackupService.collect_garbage(dry_run=options['dry_run'])
+        except BackupError as e:
+            raise CommandError(str(e))
+
+        verb = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {result['chunks']} chunks ({result['bytes']} bytes)"))
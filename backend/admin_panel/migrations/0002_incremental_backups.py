@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0001_backup_record'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backuprecord',
+            name='bytes_written',
+            field=models.BigIntegerField(default=0, help_text='New bytes this backup added to disk'),
+        ),
+        migrations.AddField(
+            model_name='backuprecord',
+            name='chunk_count',
+            field=models.PositiveIntegerField(default=0, help_text='Chunks referenced by an incremental backup'),
+        ),
+        migrations.AlterField(
+            model_name='backuprecord',
+            name='backup_type',
+            field=models.CharField(choices=[('full', 'Full'), ('incremental', 'Incremental')], default='full', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='backuprecord',
+            name='checksum',
+            field=models.CharField(blank=True, help_text='SHA-256 of the archive or manifest', max_length=64),
+        ),
+    ]
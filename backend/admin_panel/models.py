@@ -1,3 +1,50 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class BackupRecord(models.Model):
+    """Catalog entry for a backup under ``BACKUP_ROOT``.
+
+    Full backups are self-contained ``.tar.gz`` archives; incremental backups
+    are ``.manifest.json`` files listing chunks in the shared chunk store.
+    """
+
+    TYPE_CHOICES = [
+        ('full', 'Full'),
+        ('incremental', 'Incremental'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    filename = models.CharField(max_length=255, unique=True)
+    backup_type = models.CharField(max_length=20, choices=TYPE_CHOICES, default='full')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    size = models.BigIntegerField(default=0)
+    checksum = models.CharField(max_length=64, blank=True, help_text='SHA-256 of the archive or manifest')
+    database_size = models.BigIntegerField(default=0)
+    media_files = models.PositiveIntegerField(default=0)
+    chunk_count = models.PositiveIntegerField(default=0, help_text='Chunks referenced by an incremental backup')
+    bytes_written = models.BigIntegerField(default=0, help_text='New bytes this backup added to disk')
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='backups'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    last_restored_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+
+    @property
+    def path(self):
+        return settings.BACKUP_ROOT / self.filename
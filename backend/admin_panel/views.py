@@ -1,61 +1,111 @@
+import logging
+
+from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.response import Response
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
-# In-memory store for backups (stub). In production, replace with a proper model.
-BACKUPS_STORE = []
-BACKUP_AUTO_ID = 1
+from authentication.permission_engine import PermissionEngine
+from .backups import ARCHIVE_SUFFIX, INCREMENTAL_SUFFIX, BackupError, BackupService
+from .models import BackupRecord
+
+logger = logging.getLogger(__name__)
+
+
+class CanManageBackups(BasePermission):
+    """System administrators, or roles granted ``backup_restore``"""
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated) and (
+            PermissionEngine.has(user, 'system_config') or PermissionEngine.has(user, 'backup_restore')
+        )
+
+
+def _backup_data(record):
+    return {
+        'id': record.id,
+        'filename': record.filename,
+        'size': record.size,
+        'created_at': record.created_at.isoformat(),
+        'completed_at': record.completed_at.isoformat() if record.completed_at else None,
+        'type': record.backup_type,
+        'status': record.status,
+        'checksum': record.checksum,
+        'media_files': record.media_files,
+        'chunk_count': record.chunk_count,
+        'bytes_written': record.bytes_written,
+        'error': record.error,
+        'last_restored_at': record.last_restored_at.isoformat() if record.last_restored_at else None,
+        'created_by': record.created_by.get_username() if record.created_by else 'system',
+    }
 
-def _next_backup_id():
-    global BACKUP_AUTO_ID
-    bid = BACKUP_AUTO_ID
-    BACKUP_AUTO_ID += 1
-    return bid
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([CanManageBackups])
 def backup_history(request):
-    return Response(BACKUPS_STORE)
+    records = BackupRecord.objects.select_related('created_by')
+    return Response([_backup_data(record) for record in records])
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([CanManageBackups])
 def backup_create(request):
-    new_id = _next_backup_id()
-    filename = f"backup_{timezone.now().strftime('%Y%m%d_%H%M%S')}.zip"
-    backup = {
-        'id': new_id,
-        'filename': filename,
-        'size': 1024 * 1024,  # 1MB stub
-        'created_at': timezone.now().isoformat(),
-        'type': 'full',
-        'status': 'completed',
-        'created_by': request.user.get_username() if request.user and request.user.is_authenticated else 'system',
-    }
-    BACKUPS_STORE.insert(0, backup)
-    return Response({'message': 'Backup created', 'backup': backup})
+    """Start a full or incremental backup in the background; poll the history for its status"""
+    backup_type = (request.data or {}).get('type', 'full')
+    if backup_type not in dict(BackupRecord.TYPE_CHOICES):
+        return Response({'error': f'Unknown backup type: {backup_type}'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        record = BackupService.create(user=request.user, backup_type=backup_type)
+    except BackupError as e:
+        return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+    return Response(
+        {'message': 'Backup started', 'backup': _backup_data(record)},
+        status=status.HTTP_202_ACCEPTED,
+    )
 
 @api_view(['DELETE'])
-@permission_classes([IsAuthenticated])
+@permission_classes([CanManageBackups])
 def backup_delete(request, backup_id: int):
-    global BACKUPS_STORE
-    BACKUPS_STORE = [b for b in BACKUPS_STORE if b.get('id') != backup_id]
+    record = get_object_or_404(BackupRecord, pk=backup_id)
+    try:
+        BackupService.delete(record)
+    except BackupError as e:
+        return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
     return Response(status=204)
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([CanManageBackups])
 def backup_restore(request, backup_id: int):
-    # Stub: pretend to restore
-    return Response({'message': f'Restore initiated for backup {backup_id}'})
+    """Verify a backup and restore the database and media from it"""
+    record = get_object_or_404(BackupRecord, pk=backup_id)
+    try:
+        result = BackupService.restore(record)
+    except BackupError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        logger.error(f"Error restoring backup {record.filename}: {str(e)}")
+        return Response({'error': 'Restore failed'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    return Response({'message': f'Backup {record.filename} restored', **result})
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([CanManageBackups])
 def backup_download(request, backup_id: int):
-    # Return a small text payload as a downloadable file placeholder
-    content = f"Stub backup archive for backup_id={backup_id} generated at {timezone.now().isoformat()}\n".encode('utf-8')
-    response = HttpResponse(content, content_type='application/octet-stream')
-    response['Content-Disposition'] = f'attachment; filename="backup_{backup_id}.zip"'
+    """Stream the archive from disk; incremental backups are assembled from their chunks"""
+    record = get_object_or_404(BackupRecord, pk=backup_id, status='completed')
+    if not record.path.is_file():
+        return Response({'error': 'Backup archive is missing'}, status=status.HTTP_404_NOT_FOUND)
+    if record.backup_type == 'incremental':
+        filename = record.filename[:-len(INCREMENTAL_SUFFIX)] + ARCHIVE_SUFFIX
+        response = StreamingHttpResponse(BackupService.stream_archive(record), content_type='application/gzip')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    response = FileResponse(
+        open(record.path, 'rb'), as_attachment=True, filename=record.filename, content_type='application/gzip',
+    )
+    response['X-Checksum-SHA256'] = record.checksum
     return response
 
 @api_view(['POST'])
@@ -5,7 +5,7 @@ from django.db.models import Count, Avg, Sum, Q, F
 from datetime import timedelta, datetime
 from requests_system.models import SupportRequest
 from tasks.models import Task, ITPersonnel
-from inventory.models import Equipment
+from inventory.models import Equipment, MaintenanceSchedule
 from analytics.models import WorkflowLog, PerformanceMetric
 import json
 import logging
@@ -14,13 +14,52 @@ User = get_user_model()
 logger = logging.getLogger(__name__)
 
 class ReportingService:
-    """Comprehensive reporting and analytics service"""
+    """Comprehensive reporting and analytics service.
+
+    Sections that depend on the current time are evaluated as of the end of
+    the reported period, so a past period reads the same whenever it is computed.
+    """
+    
+    @staticmethod
+    def _overdue_tasks(as_of):
+        """Tasks past their due date and not yet completed at ``as_of``"""
+        return Q(due_date__lt=as_of) & (
+            Q(status__in=['assigned', 'in_progress']) | Q(status='completed', completed_at__gt=as_of)
+        )
     
     @staticmethod
-    def generate_dashboard_report(user, date_range=30):
+    def _overdue_requests(as_of):
+        """Requests past their resolution due date and not yet resolved at ``as_of``"""
+        return Q(resolution_due__lt=as_of) & (
+            Q(status__in=['open', 'assigned', 'in_progress']) | Q(resolved_at__gt=as_of)
+        )
+    
+    @staticmethod
+    def report_scope(report_type, user, target_user_id=None):
+        """Which slice of the data a report for ``user`` covers; mirrors the permission filters below"""
+        if report_type == 'dashboard':
+            if user.role in ['user', 'technician']:
+                return f'user-{user.pk}'
+            if user.role == 'manager':
+                return f'department-{(user.department or "").lower()}'
+            return 'all'
+        if report_type == 'equipment':
+            if user.role == 'user' or (user.role in ['technician', 'manager'] and user.department != 'it'):
+                return f'department-{(user.department or "").lower()}'
+            return 'all'
+        if report_type == 'user_activity':
+            if target_user_id:
+                return f'user-{int(target_user_id)}'
+            if user.role not in ['admin', 'staff']:
+                return f'user-{user.pk}'
+            return 'all'
+        raise ValueError(f'Unknown report type: {report_type}')
+
+    @staticmethod
+    def generate_dashboard_report(user, date_range=30, start_date=None, end_date=None):
         """Generate comprehensive dashboard report"""
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=date_range)
+        end_date = end_date or timezone.now()
+        start_date = start_date or end_date - timedelta(days=date_range)
         
         # Apply user permissions
         requests_qs = SupportRequest.objects.all()
@@ -44,8 +83,8 @@ class ReportingService:
             )
         
         # Filter by date range
-        requests_qs = requests_qs.filter(created_at__gte=start_date)
-        tasks_qs = tasks_qs.filter(created_at__gte=start_date)
+        requests_qs = requests_qs.filter(created_at__gte=start_date, created_at__lte=end_date)
+        tasks_qs = tasks_qs.filter(created_at__gte=start_date, created_at__lte=end_date)
         
         report = {
             'period': {
@@ -53,20 +92,20 @@ class ReportingService:
                 'end_date': end_date.isoformat(),
                 'days': date_range
             },
-            'summary': ReportingService._get_summary_stats(requests_qs, tasks_qs, equipment_qs),
+            'summary': ReportingService._get_summary_stats(requests_qs, tasks_qs, equipment_qs, end_date),
             'trends': ReportingService._get_trend_data(requests_qs, tasks_qs, start_date, end_date),
             'performance': ReportingService._get_performance_metrics(requests_qs, tasks_qs),
             'department_breakdown': ReportingService._get_department_breakdown(requests_qs, tasks_qs),
             'priority_analysis': ReportingService._get_priority_analysis(requests_qs, tasks_qs),
-            'sla_compliance': ReportingService._get_sla_compliance(requests_qs),
+            'sla_compliance': ReportingService._get_sla_compliance(requests_qs, end_date),
             'top_issues': ReportingService._get_top_issues(requests_qs),
-            'technician_performance': ReportingService._get_technician_performance(tasks_qs)
+            'technician_performance': ReportingService._get_technician_performance(tasks_qs, end_date)
         }
         
         return report
     
     @staticmethod
-    def _get_summary_stats(requests_qs, tasks_qs, equipment_qs):
+    def _get_summary_stats(requests_qs, tasks_qs, equipment_qs, as_of):
         """Get summary statistics"""
         return {
             'total_requests': requests_qs.count(),
@@ -75,10 +114,7 @@ class ReportingService:
             'critical_requests': requests_qs.filter(priority='critical').count(),
             'total_tasks': tasks_qs.count(),
             'completed_tasks': tasks_qs.filter(status='completed').count(),
-            'overdue_tasks': tasks_qs.filter(
-                due_date__lt=timezone.now(),
-                status__in=['assigned', 'in_progress']
-            ).count(),
+            'overdue_tasks': tasks_qs.filter(ReportingService._overdue_tasks(as_of)).count(),
             'total_equipment': equipment_qs.count(),
             'active_equipment': equipment_qs.filter(status='active').count(),
             'maintenance_equipment': equipment_qs.filter(status='maintenance').count(),
@@ -220,7 +256,7 @@ class ReportingService:
         }
     
     @staticmethod
-    def _get_sla_compliance(requests_qs):
+    def _get_sla_compliance(requests_qs, as_of):
         """Get SLA compliance metrics"""
         total_requests = requests_qs.count()
         if total_requests == 0:
@@ -240,11 +276,8 @@ class ReportingService:
             resolved_at__lte=F('resolution_due')
         ).count()
         
-        # Current overdue requests
-        overdue = requests_qs.filter(
-            resolution_due__lt=timezone.now(),
-            status__in=['open', 'assigned', 'in_progress']
-        ).count()
+        # Requests overdue at the end of the period
+        overdue = requests_qs.filter(ReportingService._overdue_requests(as_of)).count()
         
         compliance_rate = ((on_time / (on_time + sla_violations)) * 100) if (on_time + sla_violations) > 0 else 100
         
@@ -281,7 +314,7 @@ class ReportingService:
         }
     
     @staticmethod
-    def _get_technician_performance(tasks_qs):
+    def _get_technician_performance(tasks_qs, as_of):
         """Get technician performance metrics"""
         technician_stats = tasks_qs.filter(
             assigned_to__isnull=False
@@ -296,19 +329,16 @@ class ReportingService:
                 F('completed_at') - F('assigned_at'),
                 filter=Q(status='completed', completed_at__isnull=False, assigned_at__isnull=False)
             ),
-            overdue_tasks=Count('id', filter=Q(
-                due_date__lt=timezone.now(),
-                status__in=['assigned', 'in_progress']
-            ))
+            overdue_tasks=Count('id', filter=ReportingService._overdue_tasks(as_of))
         ).order_by('-completed_tasks')
         
         return list(technician_stats)
     
     @staticmethod
-    def generate_equipment_report(user, date_range=30):
+    def generate_equipment_report(user, date_range=30, start_date=None, end_date=None):
         """Generate equipment-specific report"""
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=date_range)
+        end_date = end_date or timezone.now()
+        start_date = start_date or end_date - timedelta(days=date_range)
         
         equipment_qs = Equipment.objects.all()
         
@@ -343,19 +373,20 @@ class ReportingService:
             issues=Count('id', filter=Q(status__in=['maintenance', 'failed']))
         ).order_by('-count')
         
-        # Warranty expiry analysis
+        # Warranty expiry analysis, as of the end of the period
+        as_of = end_date.date()
         warranty_expiring = equipment_qs.filter(
-            warranty_expiry__gte=timezone.now().date(),
-            warranty_expiry__lte=(timezone.now() + timedelta(days=90)).date()
+            warranty_expiry__gte=as_of,
+            warranty_expiry__lte=as_of + timedelta(days=90)
         ).count()
         
         warranty_expired = equipment_qs.filter(
-            warranty_expiry__lt=timezone.now().date()
+            warranty_expiry__lt=as_of
         ).count()
         
         # Age analysis
         old_equipment = equipment_qs.filter(
-            purchase_date__lt=(timezone.now() - timedelta(days=365*5)).date()
+            purchase_date__lt=as_of - timedelta(days=365*5)
         ).count()
         
         return {
@@ -380,22 +411,28 @@ class ReportingService:
         }
     
     @staticmethod
-    def _get_maintenance_schedule(equipment_qs):
-        """Get upcoming maintenance schedule"""
-        # This would typically be based on maintenance intervals
-        # For now, we'll return equipment that might need maintenance
-        needs_maintenance = equipment_qs.filter(
-            status='active',
-            last_maintenance__lt=(timezone.now() - timedelta(days=180)).date()
-        ).values('name', 'asset_tag', 'location__name', 'last_maintenance')[:10]
-        
-        return list(needs_maintenance)
+    def _get_maintenance_schedule(equipment_qs, days_ahead=30):
+        """Get upcoming and overdue maintenance from maintenance schedules.
+
+        Schedules only hold their next date, so this always describes the
+        present and is left out of closed-period snapshots.
+        """
+        horizon = (timezone.now() + timedelta(days=days_ahead)).date()
+        upcoming = MaintenanceSchedule.objects.filter(
+            equipment__in=equipment_qs,
+            next_maintenance__lte=horizon
+        ).order_by('next_maintenance').values(
+            'equipment__name', 'equipment__asset_tag', 'maintenance_type', 'frequency',
+            'last_maintenance', 'next_maintenance'
+        )[:10]
+        
+        return list(upcoming)
     
     @staticmethod
-    def generate_user_activity_report(user, target_user_id=None, date_range=30):
+    def generate_user_activity_report(user, target_user_id=None, date_range=30, start_date=None, end_date=None):
         """Generate user activity report"""
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=date_range)
+        end_date = end_date or timezone.now()
+        start_date = start_date or end_date - timedelta(days=date_range)
         
         # Get activity logs
         activity_qs = WorkflowLog.objects.filter(
@@ -8,6 +8,8 @@ from .models import (
     LoginAttempt, UserSession
 )
 from .role_permissions_models import Permission, RolePermission
+from .authentication import TokenUserCache
+from .session_tracker import SessionActivityTracker
 
 
 @admin.register(CustomUser)
@@ -53,13 +55,17 @@ class CustomUserAdmin(UserAdmin):
     
     def approve_users(self, request, queryset):
         """Approve selected users"""
+        user_ids = list(queryset.values_list('pk', flat=True))
         count = queryset.update(is_approved=True)
+        TokenUserCache.invalidate_users(user_ids)
         self.message_user(request, f'{count} users approved successfully.')
     approve_users.short_description = "Approve selected users"
     
     def disapprove_users(self, request, queryset):
         """Disapprove selected users"""
+        user_ids = list(queryset.values_list('pk', flat=True))
         count = queryset.update(is_approved=False)
+        TokenUserCache.invalidate_users(user_ids)
         self.message_user(request, f'{count} users disapproved.')
     disapprove_users.short_description = "Disapprove selected users"
     
@@ -137,7 +143,9 @@ class UserSessionAdmin(admin.ModelAdmin):
     
     def deactivate_sessions(self, request, queryset):
         """Deactivate selected sessions"""
-        count = queryset.update(is_active=False)
+        session_keys = list(queryset.values_list('session_key', flat=True))
+        SessionActivityTracker.end(session_keys)
+        count = len(session_keys)
         self.message_user(request, f'{count} sessions deactivated.')
     deactivate_sessions.short_description = "Deactivate selected sessions"
     
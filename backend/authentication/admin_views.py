@@ -6,7 +6,9 @@ from django.contrib.auth.models import Group, Permission
 from django.db.models import Q, Count
 from django.utils import timezone
 from datetime import timedelta
+from .login_guard import LoginAttemptBuffer
 from .models import CustomUser, LoginAttempt, UserSession
+from .session_tracker import SessionActivityTracker
 from .serializers import UserProfileSerializer
 from .permissions import IsAdminOrStaff
 import logging
@@ -91,10 +93,11 @@ def get_user_details(request, user_id):
         serializer = UserProfileSerializer(user)
         
         # Get additional user statistics
+        LoginAttemptBuffer.flush()
         login_attempts = LoginAttempt.objects.filter(user=user).count()
         successful_logins = LoginAttempt.objects.filter(user=user, success=True).count()
         failed_logins = LoginAttempt.objects.filter(user=user, success=False).count()
-        active_sessions = UserSession.objects.filter(user=user, is_active=True).count()
+        active_sessions = SessionActivityTracker.active_sessions().filter(user=user).count()
         
         data = serializer.data
         data['statistics'] = {
@@ -224,7 +227,7 @@ def deactivate_user(request, user_id):
         user.save()
         
         # Deactivate all user sessions
-        UserSession.objects.filter(user=user).update(is_active=False)
+        SessionActivityTracker.end(list(UserSession.objects.filter(user=user).values_list('session_key', flat=True)))
         
         return Response({
             'message': f'User {user.email} has been deactivated'
@@ -312,7 +315,7 @@ def delete_user(request, user_id):
         user.save()
         
         # Deactivate all user sessions
-        UserSession.objects.filter(user=user).update(is_active=False)
+        SessionActivityTracker.end(list(UserSession.objects.filter(user=user).values_list('session_key', flat=True)))
         
         return Response({
             'message': f'User {user.email} has been deleted'
@@ -341,13 +344,14 @@ def get_admin_statistics(request):
         locked_accounts = CustomUser.objects.filter(account_locked_until__gt=timezone.now()).count()
         
         # Login statistics (last 30 days)
+        LoginAttemptBuffer.flush()
         thirty_days_ago = timezone.now() - timedelta(days=30)
         recent_logins = LoginAttempt.objects.filter(timestamp__gte=thirty_days_ago)
         successful_logins = recent_logins.filter(success=True).count()
         failed_logins = recent_logins.filter(success=False).count()
         
         # Active sessions
-        active_sessions = UserSession.objects.filter(is_active=True).count()
+        active_sessions = SessionActivityTracker.active_sessions().count()
         
         # User distribution by role
         role_distribution = CustomUser.objects.values('role').annotate(count=Count('role'))
@@ -386,7 +390,8 @@ def get_recent_login_attempts(request):
     """Get recent login attempts for monitoring"""
     try:
         limit = int(request.GET.get('limit', 50))
-        attempts = LoginAttempt.objects.all()[:limit]
+        LoginAttemptBuffer.flush()
+        attempts = LoginAttempt.objects.select_related('user')[:limit]
         
         data = []
         for attempt in attempts:
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .models import CustomUser
+
+# Never copied into the cache; loaded on access like any deferred field
+SNAPSHOT_EXCLUDE = {'password'}
+
+
+class TokenUserCache:
+    """Token key -> user snapshot, cached for ``AUTH_TOKEN_CACHE_TIMEOUT`` seconds.
+
+    Snapshots are dropped when the token is deleted (logout, password change)
+    and whenever the user row is saved (role change, approval, deactivation),
+    see ``authentication.signals``; bulk updates call ``invalidate_users``.
+    Drops only reach other processes through a shared cache, so without one
+    the timeout is kept short (see ``AUTH_TOKEN_CACHE_TIMEOUT``).
+    """
+
+    @staticmethod
+    def cache_key(key):
+        return f"authentication:token:{key}"
+
+    @staticmethod
+    def _timeout():
+        return getattr(settings, 'AUTH_TOKEN_CACHE_TIMEOUT', 300)
+
+    @staticmethod
+    def snapshot_fields():
+        return [
+            field.attname for field in CustomUser._meta.concrete_fields
+            if field.attname not in SNAPSHOT_EXCLUDE
+        ]
+
+    @staticmethod
+    def get(key):
+        """``(user, token)`` for a token key, or None when the key is unknown"""
+        cache_key = TokenUserCache.cache_key(key)
+        snapshot = cache.get(cache_key)
+        if snapshot is None:
+            try:
+                token = Token.objects.select_related('user').get(key=key)
+            except Token.DoesNotExist:
+                return None
+            snapshot = {
+                'created': token.created,
+                'user': {name: getattr(token.user, name) for name in TokenUserCache.snapshot_fields()},
+            }
+            cache.set(cache_key, snapshot, TokenUserCache._timeout())
+        return TokenUserCache._restore(key, snapshot)
+
+    @staticmethod
+    def _restore(key, snapshot):
+        fields = snapshot['user']
+        user = CustomUser.from_db(CustomUser.objects.db, list(fields), list(fields.values()))
+        token = Token.from_db(Token.objects.db, ['key', 'user_id', 'created'], [key, user.pk, snapshot['created']])
+        token.user = user
+        return user, token
+
+    @staticmethod
+    def invalidate(keys):
+        cache.delete_many([TokenUserCache.cache_key(key) for key in keys])
+
+    @staticmethod
+    def invalidate_users(user_ids):
+        """Drop the snapshots of every token of these users, now and after the transaction commits"""
+        keys = list(Token.objects.filter(user_id__in=list(user_ids)).values_list('key', flat=True))
+        if keys:
+            # Again after commit, in case a concurrent request cached the old row meanwhile
+            TokenUserCache.invalidate(keys)
+            transaction.on_commit(lambda: TokenUserCache.invalidate(keys))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` that resolves tokens from ``TokenUserCache``"""
+
+    def authenticate_credentials(self, key):
+        resolved = TokenUserCache.get(key)
+        if resolved is None:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+
+        user, token = resolved
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        return user, token
@@ -0,0 +1,198 @@
+import atexit
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from .models import CustomUser, LoginAttempt
+
+logger = logging.getLogger(__name__)
+
+
+class LoginRateLimiter:
+    """Sliding-window failure counters per identifier and per IP, kept in the cache.
+
+    Each scope counts failures in fixed buckets of ``ACCOUNT_LOCKOUT_DURATION``
+    minutes and weights the previous bucket by how much of it still overlaps the
+    window. Crossing a threshold sets a lock key that ``retry_after`` checks
+    before any password is hashed. An identifier lock is also written to the
+    user row once, so it survives a cache flush and shows in the admin.
+
+    Many users can share one address behind a NAT or proxy, so an IP over its
+    threshold never locks the whole address: it locks the identifier that
+    failed from it, at that address only. Users who have not failed from
+    there can still sign in, while guessing across accounts is held to one
+    attempt per account.
+    """
+
+    SCOPES = {
+        'identifier': ('ACCOUNT_LOCKOUT_ATTEMPTS', 5),
+        'ip': ('LOGIN_IP_LOCKOUT_ATTEMPTS', 100),
+    }
+
+    @staticmethod
+    def window():
+        return getattr(settings, 'ACCOUNT_LOCKOUT_DURATION', 30) * 60
+
+    @staticmethod
+    def threshold(scope):
+        setting, default = LoginRateLimiter.SCOPES[scope]
+        return getattr(settings, setting, default)
+
+    @staticmethod
+    def normalize(identifier):
+        return (identifier or '').strip().lower()
+
+    @staticmethod
+    def bucket_key(scope, value, bucket):
+        return f"authentication:login:{scope}:{value}:{bucket}"
+
+    @staticmethod
+    def lock_key(scope, value):
+        return f"authentication:login:lock:{scope}:{value}"
+
+    @staticmethod
+    def _scopes(identifier, ip):
+        """(scope, counted value, locked value) for each scope of an attempt"""
+        identifier = LoginRateLimiter.normalize(identifier)
+        scopes = []
+        if identifier:
+            scopes.append(('identifier', identifier, identifier))
+        if ip:
+            scopes.append(('ip', ip, f"{ip}:{identifier}"))
+        return scopes
+
+    @staticmethod
+    def retry_after(identifier, ip, now=None):
+        """Seconds until the identifier may try again from this IP, 0 when not locked"""
+        now = now or time.time()
+        keys = [
+            LoginRateLimiter.lock_key(scope, locked)
+            for scope, _, locked in LoginRateLimiter._scopes(identifier, ip)
+        ]
+        locked_until = max(cache.get_many(keys).values(), default=0)
+        return max(0, math.ceil(locked_until - now))
+
+    @staticmethod
+    def count(scope, value, now=None):
+        """Failures for ``value`` within the sliding window ending at ``now``"""
+        now = now or time.time()
+        window = LoginRateLimiter.window()
+        bucket = int(now // window)
+        current_key = LoginRateLimiter.bucket_key(scope, value, bucket)
+        previous_key = LoginRateLimiter.bucket_key(scope, value, bucket - 1)
+        counts = cache.get_many([current_key, previous_key])
+        overlap = 1 - (now % window) / window
+        return counts.get(current_key, 0) + counts.get(previous_key, 0) * overlap
+
+    @staticmethod
+    def record_failure(identifier, ip, now=None):
+        """Count a failed attempt; returns the scopes that became locked"""
+        now = now or time.time()
+        window = LoginRateLimiter.window()
+        bucket = int(now // window)
+        locked = []
+        for scope, value, locked_value in LoginRateLimiter._scopes(identifier, ip):
+            key = LoginRateLimiter.bucket_key(scope, value, bucket)
+            # Buckets outlive the window so the next one can weight them
+            cache.add(key, 0, window * 2)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, window * 2)
+            if LoginRateLimiter.count(scope, value, now) >= LoginRateLimiter.threshold(scope):
+                cache.set(LoginRateLimiter.lock_key(scope, locked_value), now + window, window)
+                locked.append(scope)
+
+        if 'identifier' in locked:
+            LoginRateLimiter.persist_lock(identifier, now)
+        return locked
+
+    @staticmethod
+    def persist_lock(identifier, now=None):
+        """Write the lock to the user row the identifier names, whatever its case"""
+        now = now or time.time()
+        identifier = LoginRateLimiter.normalize(identifier)
+        lookup = {'email__iexact': identifier} if '@' in identifier else {'username__iexact': identifier}
+        locked_until = datetime.fromtimestamp(now + LoginRateLimiter.window(), tz=dt_timezone.utc)
+        CustomUser.objects.filter(**lookup).update(
+            account_locked_until=locked_until,
+            failed_login_attempts=LoginRateLimiter.threshold('identifier'),
+        )
+
+    @staticmethod
+    def reset(*identifiers, now=None):
+        """Forget failures and locks for identifiers after a successful login or an unlock"""
+        now = now or time.time()
+        bucket = int(now // LoginRateLimiter.window())
+        keys = []
+        for identifier in identifiers:
+            value = LoginRateLimiter.normalize(identifier)
+            if value:
+                keys.append(LoginRateLimiter.lock_key('identifier', value))
+                keys.extend(LoginRateLimiter.bucket_key('identifier', value, b) for b in (bucket, bucket - 1))
+        cache.delete_many(keys)
+
+
+class LoginAttemptBuffer:
+    """Collects LoginAttempt rows in memory and writes them with ``bulk_create``.
+
+    A batch is written once ``LOGIN_ATTEMPT_BATCH_SIZE`` rows are pending, by a
+    timer ``LOGIN_ATTEMPT_FLUSH_INTERVAL`` seconds after the first row of a batch
+    is buffered, and on process exit. The buffer is per process: readers of
+    LoginAttempt call ``flush`` to include their own attempts, and other
+    workers' attempts land within the flush interval.
+    """
+
+    _lock = threading.Lock()
+    _pending = []
+    _timer = None
+
+    @classmethod
+    def add(cls, **fields):
+        fields.setdefault('timestamp', timezone.now())
+        with cls._lock:
+            cls._pending.append(LoginAttempt(**fields))
+            if cls._timer is None:
+                cls._timer = threading.Timer(
+                    getattr(settings, 'LOGIN_ATTEMPT_FLUSH_INTERVAL', 5), cls._flush_in_thread,
+                )
+                cls._timer.daemon = True
+                cls._timer.start()
+            due = len(cls._pending) >= getattr(settings, 'LOGIN_ATTEMPT_BATCH_SIZE', 50)
+        if due:
+            cls.flush()
+
+    @classmethod
+    def _flush_in_thread(cls):
+        close_old_connections()
+        try:
+            cls.flush()
+        finally:
+            connection.close()
+
+    @classmethod
+    def flush(cls):
+        """Write pending attempts; returns the number written"""
+        with cls._lock:
+            pending, cls._pending = cls._pending, []
+            timer, cls._timer = cls._timer, None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+        if not pending:
+            return 0
+        try:
+            LoginAttempt.objects.bulk_create(pending)
+        except Exception as e:
+            logger.error(f"Failed to log {len(pending)} login attempts: {str(e)}")
+            return 0
+        return len(pending)
+
+
+atexit.register(LoginAttemptBuffer.flush)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from authentication.session_tracker import SessionActivityTracker
+
+
+class Command(BaseCommand):
+    help = 'Deactivate user sessions idle for longer than SESSION_IDLE_TIMEOUT'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many sessions would be deactivated without changing them',
+        )
+
+    def handle(self, *args, **options):
+        count = SessionActivityTracker.reap(dry_run=options['dry_run'])
+
+        verb = 'Would deactivate' if options['dry_run'] else 'Deactivated'
+        self.stdout.write(f"{verb} {count} idle sessions")
+        self.stdout.write(self.style.SUCCESS('Session reaping complete'))
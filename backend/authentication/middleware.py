@@ -0,0 +1,44 @@
+from rest_framework.authtoken.models import Token
+
+from .permission_engine import RolePermissionCache
+from .session_tracker import SessionActivityTracker
+from .views import get_client_ip
+
+
+class RolePermissionVersionMiddleware:
+    """Check the role permission version stamp once per request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        RolePermissionCache.refresh()
+        return self.get_response(request)
+
+
+class SessionActivityMiddleware:
+    """Record authenticated activity for SessionActivityTracker; writes are batched"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        # DRF copies the authenticated user and token onto the Django request
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return response
+        auth = getattr(request, 'auth', None)
+        session = getattr(request, 'session', None)
+        if isinstance(auth, Token):
+            session_key = SessionActivityTracker.session_key_for('token', auth.key)
+        elif session is not None and session.session_key:
+            session_key = SessionActivityTracker.session_key_for('session', session.session_key)
+        else:
+            return response
+
+        SessionActivityTracker.touch(
+            session_key, user.pk, get_client_ip(request), request.META.get('HTTP_USER_AGENT', ''),
+        )
+        return response
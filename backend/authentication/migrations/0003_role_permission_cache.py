@@ -0,0 +1,83 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:18
+
+from django.db import migrations, models
+
+# Permissions enforced by the permission engine, as (id, name, category)
+ENGINE_PERMISSIONS = [
+    ('view_own', 'View Own Records', 'Access'),
+    ('view_department', 'View Department Records', 'Access'),
+    ('view_all', 'View All Records', 'Access'),
+    ('create', 'Create Records', 'Access'),
+    ('update_own', 'Update Own Records', 'Access'),
+    ('update_department', 'Update Department Records', 'Access'),
+    ('update_all', 'Update All Records', 'Access'),
+    ('delete_own', 'Delete Own Records', 'Access'),
+    ('delete_department', 'Delete Department Records', 'Access'),
+    ('delete_all', 'Delete All Records', 'Access'),
+    ('assign', 'Assign Work', 'Requests'),
+    ('escalate', 'Escalate Requests', 'Requests'),
+    ('close', 'Close Requests', 'Requests'),
+    ('manage_users', 'Manage Users', 'Administration'),
+    ('system_config', 'System Configuration', 'Administration'),
+    ('manage_equipment', 'Manage Equipment', 'Inventory'),
+    ('generate_reports', 'Generate Reports', 'Reports'),
+]
+
+# The hard-coded matrix at the time enforcement moved to RolePermission
+DEFAULT_GRANTS = {
+    'system_admin': [
+        'view_own', 'view_department', 'view_all', 'create', 'update_own', 'update_department', 'update_all',
+        'delete_own', 'delete_department', 'delete_all', 'assign', 'escalate', 'close', 'manage_users',
+        'system_config', 'manage_equipment', 'generate_reports',
+    ],
+    'it_manager': [
+        'view_own', 'view_department', 'view_all', 'create', 'update_own', 'update_department',
+        'delete_own', 'delete_department', 'assign', 'escalate', 'close', 'manage_users',
+        'manage_equipment', 'generate_reports',
+    ],
+    'senior_technician': [
+        'view_own', 'view_department', 'create', 'update_own', 'update_department', 'delete_own',
+        'assign', 'escalate', 'close', 'manage_equipment',
+    ],
+    'technician': ['view_own', 'view_department', 'create', 'update_own', 'escalate', 'close'],
+    'end_user': ['view_own', 'create', 'update_own'],
+}
+
+
+def seed_role_permissions(apps, schema_editor):
+    Permission = apps.get_model('authentication', 'Permission')
+    RolePermission = apps.get_model('authentication', 'RolePermission')
+    RolePermissionVersion = apps.get_model('authentication', 'RolePermissionVersion')
+
+    for permission_id, name, category in ENGINE_PERMISSIONS:
+        Permission.objects.get_or_create(id=permission_id, defaults={'name': name, 'category': category})
+    existing = set(RolePermission.objects.values_list('role', 'permission_id'))
+    RolePermission.objects.bulk_create([
+        RolePermission(role=role, permission_id=permission_id)
+        for role, permission_ids in DEFAULT_GRANTS.items()
+        for permission_id in permission_ids
+        if (role, permission_id) not in existing
+    ])
+    RolePermissionVersion.objects.get_or_create(pk=1, defaults={'version': 1})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_permission_rolepermission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RolePermissionVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Role Permission Version',
+            },
+        ),
+        migrations.RunPython(seed_role_permissions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:25
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_login_attempt_timestamp'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usersession',
+            name='last_activity',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(fields=['is_active', 'last_activity'], name='usersession_activity_idx'),
+        ),
+    ]
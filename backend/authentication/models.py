@@ -4,7 +4,7 @@ from django.utils import timezone
 import uuid
 
 # Import role-permission models
-from .role_permissions_models import Permission, RolePermission
+from .role_permissions_models import Permission, RolePermission, RolePermissionVersion
 
 class CustomUser(AbstractUser):
     """Extended user model with additional fields for hospital IT system"""
@@ -59,13 +59,16 @@ class CustomUser(AbstractUser):
     def lock_account(self, duration_minutes=30):
         """Lock account for specified duration"""
         self.account_locked_until = timezone.now() + timezone.timedelta(minutes=duration_minutes)
-        self.save()
+        self.save(update_fields=['account_locked_until'])
     
     def unlock_account(self):
         """Unlock account and reset failed attempts"""
+        from .login_guard import LoginRateLimiter
+
         self.account_locked_until = None
         self.failed_login_attempts = 0
-        self.save()
+        self.save(update_fields=['account_locked_until', 'failed_login_attempts'])
+        LoginRateLimiter.reset(self.email, self.username)
     
     def can_access_admin(self):
         """Check if user can access admin features"""
@@ -173,7 +176,8 @@ class LoginAttempt(models.Model):
     user_agent = models.TextField(blank=True)
     success = models.BooleanField(default=False)
     attempted_username = models.CharField(max_length=150, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the attempt happens; rows are written later in batches
+    timestamp = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-timestamp']
@@ -190,11 +194,15 @@ class UserSession(models.Model):
     ip_address = models.GenericIPAddressField()
     user_agent = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    last_activity = models.DateTimeField(auto_now=True)
+    # Maintained in bulk by SessionActivityTracker
+    last_activity = models.DateTimeField(default=timezone.now)
     is_active = models.BooleanField(default=True)
     
     class Meta:
         ordering = ['-last_activity']
+        indexes = [
+            models.Index(fields=['is_active', 'last_activity'], name='usersession_activity_idx'),
+        ]
     
     def __str__(self):
         return f"Session for {self.user.email} from {self.ip_address}"
@@ -0,0 +1,436 @@
+import logging
+import threading
+from functools import reduce
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import DatabaseError
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+ROLE_HIERARCHY = {
+    'end_user': 1,
+    'technician': 2,
+    'senior_technician': 3,
+    'it_manager': 4,
+    'system_admin': 5
+}
+
+# Default grants: seeded into RolePermission and used until any assignment exists
+PERMISSION_MATRIX = {
+    'system_admin': {
+        'view_own': True, 'view_department': True, 'view_all': True,
+        'create': True, 'update_own': True, 'update_department': True, 'update_all': True,
+        'delete_own': True, 'delete_department': True, 'delete_all': True,
+        'assign': True, 'escalate': True, 'close': True, 'manage_users': True,
+        'system_config': True, 'manage_equipment': True, 'generate_reports': True
+    },
+    'it_manager': {
+        'view_own': True, 'view_department': True, 'view_all': True,
+        'create': True, 'update_own': True, 'update_department': True, 'update_all': False,
+        'delete_own': True, 'delete_department': True, 'delete_all': False,
+        'assign': True, 'escalate': True, 'close': True, 'manage_users': True,
+        'system_config': False, 'manage_equipment': True, 'generate_reports': True
+    },
+    'senior_technician': {
+        'view_own': True, 'view_department': True, 'view_all': False,
+        'create': True, 'update_own': True, 'update_department': True, 'update_all': False,
+        'delete_own': True, 'delete_department': False, 'delete_all': False,
+        'assign': True, 'escalate': True, 'close': True, 'manage_users': False,
+        'system_config': False, 'manage_equipment': True, 'generate_reports': False
+    },
+    'technician': {
+        'view_own': True, 'view_department': True, 'view_all': False,
+        'create': True, 'update_own': True, 'update_department': False, 'update_all': False,
+        'delete_own': False, 'delete_department': False, 'delete_all': False,
+        'assign': False, 'escalate': True, 'close': True, 'manage_users': False,
+        'system_config': False, 'manage_equipment': False, 'generate_reports': False
+    },
+    'end_user': {
+        'view_own': True, 'view_department': False, 'view_all': False,
+        'create': True, 'update_own': True, 'update_department': False, 'update_all': False,
+        'delete_own': False, 'delete_department': False, 'delete_all': False,
+        'assign': False, 'escalate': False, 'close': False, 'manage_users': False,
+        'system_config': False, 'manage_equipment': False, 'generate_reports': False
+    }
+}
+
+PERMISSIONS = [
+    'view_own', 'view_department', 'view_all',
+    'create', 'update_own', 'update_department', 'update_all',
+    'delete_own', 'delete_department', 'delete_all',
+    'assign', 'escalate', 'close', 'manage_users',
+    'system_config', 'manage_equipment', 'generate_reports',
+]
+
+PERMISSION_BITS = {name: 1 << index for index, name in enumerate(PERMISSIONS)}
+
+# Departments a role may see in addition to its own
+ROLE_EXTRA_DEPARTMENTS = {
+    'technician': ('it',),
+    'senior_technician': ('it',),
+}
+
+DEFAULT_ROLE = 'end_user'
+
+
+def compile_permission_matrix(matrix):
+    """Turn ``{role: {permission: bool}}`` into ``{role: bitmask}``"""
+    return {
+        role: reduce(
+            lambda mask, name: mask | PERMISSION_BITS[name],
+            [name for name, allowed in permissions.items() if allowed],
+            0,
+        )
+        for role, permissions in matrix.items()
+    }
+
+
+ROLE_MASKS = compile_permission_matrix(PERMISSION_MATRIX)
+
+
+class RolePermissionCache:
+    """Process-local role masks compiled from ``RolePermission`` rows.
+
+    The masks are loaded once and reused until the ``RolePermissionVersion`` stamp
+    moves. ``refresh`` compares the stamp once per request (called by
+    ``RolePermissionVersionMiddleware``); the stamp is read through the cache, so
+    steady-state requests and the permission checks themselves run no queries.
+    Catalog permissions the engine does not enforce get bits after ``PERMISSIONS``.
+    While no assignments exist the compiled ``PERMISSION_MATRIX`` is used.
+    """
+
+    VERSION_CACHE_KEY = 'authentication:role_permissions:version'
+
+    _lock = threading.Lock()
+    _state = None  # (version, bits, masks)
+
+    @classmethod
+    def bits(cls):
+        return cls._get()[1]
+
+    @classmethod
+    def masks(cls):
+        return cls._get()[2]
+
+    @classmethod
+    def _get(cls):
+        state = cls._state
+        if state is None:
+            state = cls.reload()
+        return state
+
+    @classmethod
+    def _timeout(cls):
+        return getattr(settings, 'ROLE_PERMISSION_VERSION_TIMEOUT', 30)
+
+    @classmethod
+    def current_version(cls):
+        """The version stamp, from cache when available"""
+        from .role_permissions_models import RolePermissionVersion
+
+        version = cache.get(cls.VERSION_CACHE_KEY)
+        if version is None:
+            version = RolePermissionVersion.current()
+            cache.set(cls.VERSION_CACHE_KEY, version, cls._timeout())
+        return version
+
+    @classmethod
+    def reload(cls):
+        """Rebuild the masks from the database"""
+        from .role_permissions_models import Permission, RolePermission, RolePermissionVersion
+
+        with cls._lock:
+            try:
+                version = RolePermissionVersion.current()
+                catalog = list(Permission.objects.order_by('id').values_list('id', flat=True))
+                assignments = list(RolePermission.objects.values_list('role', 'permission_id'))
+            except DatabaseError as e:
+                logger.error(f"Error loading role permissions: {str(e)}")
+                version, catalog, assignments = None, [], []
+            else:
+                cache.set(cls.VERSION_CACHE_KEY, version, cls._timeout())
+
+            bits = dict(PERMISSION_BITS)
+            for permission_id in catalog:
+                bits.setdefault(permission_id, 1 << len(bits))
+
+            if assignments:
+                masks = {role: 0 for role in PERMISSION_MATRIX}
+                for role, permission_id in assignments:
+                    masks[role] = masks.get(role, 0) | bits[permission_id]
+            else:
+                masks = dict(ROLE_MASKS)
+
+            cls._state = (version, bits, masks)
+            return cls._state
+
+    @classmethod
+    def refresh(cls):
+        """Reload if the version moved since the masks were loaded"""
+        state = cls._state
+        if state is None:
+            return
+        try:
+            stale = cls.current_version() != state[0]
+        except DatabaseError as e:
+            logger.error(f"Error checking role permission version: {str(e)}")
+            return
+        if stale:
+            cls.reload()
+
+    @classmethod
+    def bumped(cls):
+        """Called after ``RolePermissionVersion.bump``: drop the local masks and the cached stamp"""
+        cls._state = None
+        cache.delete(cls.VERSION_CACHE_KEY)
+
+    @classmethod
+    def invalidate(cls):
+        """Drop this process's masks; the next check reloads them"""
+        cls._state = None
+
+
+# Per-model accessors: ORM paths to the owning user(s) and to the department name.
+# ``shared_with_department`` lets every role read rows of its own department.
+SCOPE_RULES = {
+    'requests_system.SupportRequest': {
+        'owner': ['requester', 'assigned_to'],
+        'department': ['requester__department'],
+    },
+    'tasks.Task': {
+        'owner': ['assigned_to__user'],
+        'department': ['related_request__requester__department'],
+    },
+    'inventory.Equipment': {
+        'owner': ['assigned_to'],
+        'department': ['location__department__name'],
+    },
+    'inventory.Location': {
+        'department': ['department__name'],
+        'shared_with_department': True,
+    },
+    'inventory.MaintenanceSchedule': {
+        'owner': ['assigned_technician'],
+        'department': ['equipment__location__department__name'],
+        'shared_with_department': True,
+    },
+}
+
+# Fallback accessors for models without a rule, in order of preference
+OWNER_FIELDS = ['requester', 'assigned_to', 'user', 'created_by']
+DEPARTMENT_FIELDS = ['department', 'location__department', 'requester_department', 'requester__department']
+
+MISSING = object()
+
+
+class AccessPath:
+    """A forward ORM path resolved to model fields once"""
+
+    def __init__(self, model, path):
+        self.path = path
+        self.fields = []
+        current = model
+        for name in path.split('__'):
+            if current is None:
+                raise ImproperlyConfigured(f"{model.__name__}: '{path}' continues past a non-relation field")
+            field = current._meta.get_field(name)
+            if not field.concrete or (field.is_relation and not (field.many_to_one or field.one_to_one)):
+                raise ImproperlyConfigured(f"{model.__name__}: '{path}' must follow forward foreign keys")
+            self.fields.append(field)
+            current = field.related_model if field.is_relation else None
+
+    def value(self, obj):
+        """Value at the end of the path (a pk for relations), or MISSING if a join is not loaded"""
+        for field in self.fields[:-1]:
+            if not field.is_cached(obj):
+                return MISSING
+            obj = getattr(obj, field.name)
+            if obj is None:
+                return None
+        return getattr(obj, self.fields[-1].attname)
+
+
+class ModelScope:
+    """Ownership and department accessors compiled for one model"""
+
+    def __init__(self, model, owner=(), department=(), shared_with_department=False):
+        self.model = model
+        self.owner_paths = [AccessPath(model, path) for path in owner]
+        self.department_paths = [AccessPath(model, path) for path in department]
+        self.shared_with_department = shared_with_department
+
+    @classmethod
+    def derive(cls, model):
+        """Guess accessors for a model without a rule, as the old hasattr checks did"""
+        def resolve(path):
+            try:
+                AccessPath(model, path)
+                return True
+            except (FieldDoesNotExist, ImproperlyConfigured):
+                return False
+
+        owner = []
+        for name in OWNER_FIELDS:
+            if resolve(name):
+                field = model._meta.get_field(name)
+                if field.related_model is not get_user_model() and resolve(f'{name}__user'):
+                    name = f'{name}__user'
+                owner = [name]
+                break
+
+        department = []
+        for name in DEPARTMENT_FIELDS:
+            if resolve(name):
+                last = AccessPath(model, name).fields[-1]
+                if last.is_relation:
+                    name = f'{name}__name'
+                    if not resolve(name):
+                        continue
+                department = [name]
+                break
+
+        return cls(model, owner=owner, department=department)
+
+
+class PermissionEngine:
+    """Role bitmask checks and row scoping shared by RoleBasedPermission and ViewSets.
+
+    Role grants come from ``RolePermissionCache`` as one bitmask per role, and each
+    model's owner/department accessors are resolved once. The same accessors back
+    the per-object checks and the SQL filters applied in ``get_queryset``.
+    """
+
+    _scopes = {}
+
+    @staticmethod
+    def role_mask(role):
+        masks = RolePermissionCache.masks()
+        return masks.get(role, masks.get(DEFAULT_ROLE, 0))
+
+    @staticmethod
+    def user_mask(user):
+        if not user or not user.is_authenticated:
+            return 0
+        mask = PermissionEngine.role_mask(getattr(user, 'role', DEFAULT_ROLE))
+        if user.is_staff:
+            mask |= PERMISSION_BITS['view_all']
+        return mask
+
+    @staticmethod
+    def has(user, permission):
+        bit = RolePermissionCache.bits().get(permission, 0)
+        return bool(PermissionEngine.user_mask(user) & bit)
+
+    @staticmethod
+    def permissions_for(user):
+        """``{permission: bool}`` for the user's role, in the matrix format"""
+        mask = PermissionEngine.role_mask(getattr(user, 'role', DEFAULT_ROLE)) if user and user.is_authenticated else 0
+        if not mask:
+            return {}
+        return {name: bool(mask & bit) for name, bit in RolePermissionCache.bits().items()}
+
+    @staticmethod
+    def departments_for(user):
+        """Lower-cased departments the user's department-level permissions cover"""
+        departments = [(getattr(user, 'department', '') or '').lower()]
+        departments.extend(ROLE_EXTRA_DEPARTMENTS.get(getattr(user, 'role', ''), ()))
+        return tuple(dict.fromkeys(department for department in departments if department))
+
+    @staticmethod
+    def scope_for(model):
+        """Compiled accessors for ``model``, resolved on first use"""
+        scope = PermissionEngine._scopes.get(model)
+        if scope is None:
+            rule = SCOPE_RULES.get(model._meta.label)
+            scope = ModelScope(model, **rule) if rule else ModelScope.derive(model)
+            PermissionEngine._scopes[model] = scope
+        return scope
+
+    @staticmethod
+    def owner_q(user, scope):
+        q = Q(pk__in=[])
+        for path in scope.owner_paths:
+            q |= Q(**{path.path: user.pk})
+        return q
+
+    @staticmethod
+    def department_q(departments, scope):
+        q = Q(pk__in=[])
+        for path in scope.department_paths:
+            for department in departments:
+                q |= Q(**{f'{path.path}__iexact': department})
+        return q
+
+    @staticmethod
+    def scope_q(user, scope, mask, all_bit, department_bit, own_bit):
+        """Condition for rows ``user`` may act on, or None when unrestricted"""
+        if mask & all_bit:
+            return None
+        q = Q(pk__in=[])
+        if mask & department_bit:
+            q |= PermissionEngine.department_q(PermissionEngine.departments_for(user), scope)
+        elif scope.shared_with_department and getattr(user, 'department', ''):
+            q |= PermissionEngine.department_q([user.department.lower()], scope)
+        if mask & own_bit:
+            q |= PermissionEngine.owner_q(user, scope)
+        return q
+
+    @staticmethod
+    def filter_queryset(queryset, user, action='view'):
+        """Restrict ``queryset`` to the rows the user may ``view``/``update``/``delete``"""
+        if not user or not user.is_authenticated:
+            return queryset.none()
+        scope = PermissionEngine.scope_for(queryset.model)
+        q = PermissionEngine.scope_q(
+            user, scope, PermissionEngine.user_mask(user),
+            PERMISSION_BITS[f'{action}_all'], PERMISSION_BITS[f'{action}_department'], PERMISSION_BITS[f'{action}_own'],
+        )
+        return queryset if q is None else queryset.filter(q)
+
+    @staticmethod
+    def is_owner(user, obj):
+        scope = PermissionEngine.scope_for(type(obj))
+        for path in scope.owner_paths:
+            value = path.value(obj)
+            if value is MISSING:
+                return PermissionEngine._matches(obj, PermissionEngine.owner_q(user, scope))
+            if value is not None and value == user.pk:
+                return True
+        return False
+
+    @staticmethod
+    def in_department(user, obj, departments=None):
+        scope = PermissionEngine.scope_for(type(obj))
+        departments = departments if departments is not None else PermissionEngine.departments_for(user)
+        for path in scope.department_paths:
+            value = path.value(obj)
+            if value is MISSING:
+                return PermissionEngine._matches(obj, PermissionEngine.department_q(departments, scope))
+            if isinstance(value, str) and value.lower() in departments:
+                return True
+        return False
+
+    @staticmethod
+    def can_access(user, obj, action):
+        """Object-level ``view``/``update``/``delete`` check against the compiled masks"""
+        mask = PermissionEngine.user_mask(user)
+        if mask & PERMISSION_BITS[f'{action}_all']:
+            return True
+        scope = PermissionEngine.scope_for(type(obj))
+        if mask & PERMISSION_BITS[f'{action}_department'] and PermissionEngine.in_department(user, obj):
+            return True
+        if (
+            action == 'view' and scope.shared_with_department and getattr(user, 'department', '')
+            and PermissionEngine.in_department(user, obj, (user.department.lower(),))
+        ):
+            return True
+        return bool(mask & PERMISSION_BITS[f'{action}_own']) and PermissionEngine.is_owner(user, obj)
+
+    @staticmethod
+    def _matches(obj, q):
+        """Fallback for unloaded relations: evaluate the condition in one query"""
+        return type(obj)._default_manager.filter(q, pk=obj.pk).exists()
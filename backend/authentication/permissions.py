@@ -1,6 +1,8 @@
 from rest_framework import permissions
 from rest_framework.permissions import BasePermission
 
+from .permission_engine import PERMISSION_MATRIX, ROLE_HIERARCHY, PermissionEngine
+
 
 class IsOwnerOrStaff(permissions.BasePermission):
     """
@@ -88,51 +90,9 @@ class RoleBasedPermission(BasePermission):
     - end_user: Own requests only, basic equipment viewing, self-service portal
     """
     
-    ROLE_HIERARCHY = {
-        'end_user': 1,
-        'technician': 2,
-        'senior_technician': 3,
-        'it_manager': 4,
-        'system_admin': 5
-    }
+    ROLE_HIERARCHY = ROLE_HIERARCHY
     
-    PERMISSION_MATRIX = {
-        'system_admin': {
-            'view_own': True, 'view_department': True, 'view_all': True,
-            'create': True, 'update_own': True, 'update_department': True, 'update_all': True,
-            'delete_own': True, 'delete_department': True, 'delete_all': True,
-            'assign': True, 'escalate': True, 'close': True, 'manage_users': True, 
-            'system_config': True, 'manage_equipment': True, 'generate_reports': True
-        },
-        'it_manager': {
-            'view_own': True, 'view_department': True, 'view_all': True,
-            'create': True, 'update_own': True, 'update_department': True, 'update_all': False,
-            'delete_own': True, 'delete_department': True, 'delete_all': False,
-            'assign': True, 'escalate': True, 'close': True, 'manage_users': True, 
-            'system_config': False, 'manage_equipment': True, 'generate_reports': True
-        },
-        'senior_technician': {
-            'view_own': True, 'view_department': True, 'view_all': False,
-            'create': True, 'update_own': True, 'update_department': True, 'update_all': False,
-            'delete_own': True, 'delete_department': False, 'delete_all': False,
-            'assign': True, 'escalate': True, 'close': True, 'manage_users': False, 
-            'system_config': False, 'manage_equipment': True, 'generate_reports': False
-        },
-        'technician': {
-            'view_own': True, 'view_department': True, 'view_all': False,
-            'create': True, 'update_own': True, 'update_department': False, 'update_all': False,
-            'delete_own': False, 'delete_department': False, 'delete_all': False,
-            'assign': False, 'escalate': True, 'close': True, 'manage_users': False, 
-            'system_config': False, 'manage_equipment': False, 'generate_reports': False
-        },
-        'end_user': {
-            'view_own': True, 'view_department': False, 'view_all': False,
-            'create': True, 'update_own': True, 'update_department': False, 'update_all': False,
-            'delete_own': False, 'delete_department': False, 'delete_all': False,
-            'assign': False, 'escalate': False, 'close': False, 'manage_users': False, 
-            'system_config': False, 'manage_equipment': False, 'generate_reports': False
-        }
-    }
+    PERMISSION_MATRIX = PERMISSION_MATRIX
     
     def has_permission(self, request, view):
         """Check if user has permission to access the view"""
@@ -156,66 +116,39 @@ class RoleBasedPermission(BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
         
-        permissions = self.get_user_permissions(request.user)
-        is_owner = self._is_owner(request.user, obj)
-        is_same_department = self._is_same_department(request.user, obj)
+        user = request.user
         action = getattr(view, 'action', None)
         
         # Check view permissions
         if request.method in ['GET', 'HEAD', 'OPTIONS']:
-            if permissions.get('view_all'):
-                return True
-            elif permissions.get('view_department') and is_same_department:
-                return True
-            elif permissions.get('view_own') and is_owner:
-                return True
+            return PermissionEngine.can_access(user, obj, 'view')
         
         # Check create permissions
         elif request.method in ['POST']:
             # Custom action controls (management)
             if action in ['assign', 'reassign']:
-                return permissions.get('assign', False)
+                return PermissionEngine.has(user, 'assign')
             if action in ['complete', 'close']:
-                return permissions.get('close', False)
+                return PermissionEngine.has(user, 'close')
             if action in ['start']:
                 # Start is allowed if user can update own/department or all
-                if permissions.get('update_all'):
-                    return True
-                if permissions.get('update_department') and is_same_department:
-                    return True
-                if permissions.get('update_own') and is_owner:
-                    return True
-                return False
+                return PermissionEngine.can_access(user, obj, 'update')
             # Default to create permission for non-custom actions
-            return permissions.get('create', False)
+            return PermissionEngine.has(user, 'create')
         
         # Check update permissions
         elif request.method in ['PUT', 'PATCH']:
-            if permissions.get('update_all'):
-                return True
-            elif permissions.get('update_department') and is_same_department:
-                return True
-            elif permissions.get('update_own') and is_owner:
-                return True
+            return PermissionEngine.can_access(user, obj, 'update')
         
         # Check delete permissions
         elif request.method == 'DELETE':
-            if permissions.get('delete_all'):
-                return True
-            elif permissions.get('delete_department') and is_same_department:
-                return True
-            elif permissions.get('delete_own') and is_owner:
-                return True
+            return PermissionEngine.can_access(user, obj, 'delete')
         
         return False
     
     def get_user_permissions(self, user):
         """Get permissions for a user based on their role"""
-        if not user or not user.is_authenticated:
-            return {}
-        
-        role = getattr(user, 'role', 'end_user')
-        return self.PERMISSION_MATRIX.get(role, self.PERMISSION_MATRIX['end_user'])
+        return PermissionEngine.permissions_for(user)
     
     def has_role_permission(self, user, required_role):
         """Check if user has at least the required role level"""
@@ -226,41 +159,6 @@ class RoleBasedPermission(BasePermission):
         required_level = self.ROLE_HIERARCHY.get(required_role, 999)
         
         return user_level >= required_level
-    
-    def _is_owner(self, user, obj):
-        """Check if user owns the object"""
-        if hasattr(obj, 'requester'):
-            return obj.requester == user
-        elif hasattr(obj, 'assigned_to'):
-            if hasattr(obj.assigned_to, 'user'):
-                return obj.assigned_to.user == user
-            return obj.assigned_to == user
-        elif hasattr(obj, 'user'):
-            return obj.user == user
-        elif hasattr(obj, 'created_by'):
-            return obj.created_by == user
-        return False
-    
-    def _is_same_department(self, user, obj):
-        """Check if object belongs to user's department"""
-        user_dept = user.department.lower()
-        
-        # Technicians can access IT department objects too
-        if user.role == 'technician':
-            allowed_depts = [user_dept, 'it']
-        else:
-            allowed_depts = [user_dept]
-        
-        if hasattr(obj, 'department'):
-            return obj.department.lower() in allowed_depts
-        elif hasattr(obj, 'location') and hasattr(obj.location, 'department'):
-            return obj.location.department.name.lower() in allowed_depts
-        elif hasattr(obj, 'requester_department'):
-            return obj.requester_department.lower() in allowed_depts
-        elif hasattr(obj, 'requester') and hasattr(obj.requester, 'department'):
-            return obj.requester.department.lower() in allowed_depts
-        
-        return False
 
 
 class IsApprovedUser(BasePermission):
@@ -49,3 +49,27 @@ class RolePermission(models.Model):
     
     def __str__(self):
         return f"{self.get_role_display()} - {self.permission.name}"
+
+
+class RolePermissionVersion(models.Model):
+    """Single-row stamp bumped whenever role assignments change.
+
+    Processes cache the compiled role masks and reload them when the stamp moves.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Role Permission Version'
+
+    def __str__(self):
+        return f"Role permissions v{self.version}"
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls):
+        if not cls.objects.filter(pk=1).update(version=models.F('version') + 1, updated_at=timezone.now()):
+            cls.objects.get_or_create(pk=1, defaults={'version': 1})
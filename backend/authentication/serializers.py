@@ -104,24 +104,15 @@ class UserLoginSerializer(serializers.Serializer):
             # Authenticate using the account's primary identifier (email)
             user = authenticate(username=user_obj.email, password=password)
             if not user:
-                # Increment failed login attempts
-                try:
-                    user_obj.failed_login_attempts += 1
-                    if user_obj.failed_login_attempts >= 5:
-                        user_obj.lock_account()
-                    user_obj.save()
-                except Exception:
-                    pass
-                
+                # Failures are counted by LoginRateLimiter, not on the user row
                 raise serializers.ValidationError("Invalid email/username or password.")
             
             if not user.is_active:
                 raise serializers.ValidationError("Account is disabled.")
             
-            # Reset failed login attempts on successful login
+            # Reset failed login attempts on successful login; login_user saves them
             user.failed_login_attempts = 0
             user.last_login = timezone.now()
-            user.save()
             
             attrs['user'] = user
         else:
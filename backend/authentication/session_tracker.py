@@ -0,0 +1,155 @@
+import atexit
+import hashlib
+import logging
+import math
+import threading
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Case, Q, Value, When
+from django.utils import timezone
+
+from .models import UserSession
+
+logger = logging.getLogger(__name__)
+
+FLUSH_CHUNK_SIZE = 500
+
+
+class SessionActivityTracker:
+    """Coalesces per-request session activity into periodic bulk writes.
+
+    ``touch`` only records the latest activity of a session in memory. A timer
+    started with the first pending session writes them
+    ``SESSION_ACTIVITY_FLUSH_INTERVAL`` seconds later with one ``UPDATE ... CASE``
+    per chunk, and sessions without a row (tokens issued before tracking started)
+    are created. ``reap`` deactivates sessions idle for longer than
+    ``SESSION_IDLE_TIMEOUT``; a reaped session whose activity was still pending
+    in another worker is reopened by that worker's next flush. Sessions closed on
+    purpose go through ``end`` so later flushes leave them closed.
+    """
+
+    _lock = threading.Lock()
+    _pending = {}  # session_key -> (last_activity, user_id, ip_address, user_agent)
+    _timer = None
+
+    @staticmethod
+    def session_key_for(kind, key):
+        """Stored key for a token or Django session; the credential itself is never stored"""
+        return hashlib.sha1(f'{kind}:{key}'.encode()).hexdigest()
+
+    @staticmethod
+    def idle_cutoff(now=None):
+        now = now or timezone.now()
+        return now - timedelta(minutes=getattr(settings, 'SESSION_IDLE_TIMEOUT', 30))
+
+    @staticmethod
+    def active_sessions(now=None):
+        """Sessions that are active and were seen within the idle timeout"""
+        return UserSession.objects.filter(
+            is_active=True, last_activity__gte=SessionActivityTracker.idle_cutoff(now)
+        )
+
+    @staticmethod
+    def start(session_key, user, ip_address, user_agent=''):
+        """Open (or reopen) a session at login"""
+        SessionActivityTracker.forget(session_key)
+        UserSession.objects.update_or_create(
+            session_key=session_key,
+            defaults={
+                'user': user, 'ip_address': ip_address, 'user_agent': user_agent,
+                'last_activity': timezone.now(), 'is_active': True,
+            },
+        )
+
+    @staticmethod
+    def end(session_keys):
+        """Close sessions at logout or credential changes"""
+        for session_key in session_keys:
+            SessionActivityTracker.forget(session_key)
+        UserSession.objects.filter(session_key__in=session_keys).update(
+            is_active=False, last_activity=timezone.now()
+        )
+
+    @classmethod
+    def forget(cls, session_key):
+        with cls._lock:
+            cls._pending.pop(session_key, None)
+
+    @classmethod
+    def touch(cls, session_key, user_id, ip_address, user_agent=''):
+        """Record activity in memory; the first pending session schedules a flush"""
+        interval = getattr(settings, 'SESSION_ACTIVITY_FLUSH_INTERVAL', 60)
+        with cls._lock:
+            cls._pending[session_key] = (timezone.now(), user_id, ip_address, user_agent)
+            # An infinite interval holds activity until an explicit flush or exit
+            if cls._timer is None and math.isfinite(interval):
+                cls._timer = threading.Timer(interval, cls._flush_in_thread)
+                cls._timer.daemon = True
+                cls._timer.start()
+
+    @classmethod
+    def _flush_in_thread(cls):
+        close_old_connections()
+        try:
+            cls.flush()
+        finally:
+            connection.close()
+
+    @classmethod
+    def flush(cls):
+        """Write pending activity; returns the number of sessions written"""
+        with cls._lock:
+            pending, cls._pending = cls._pending, {}
+            timer, cls._timer = cls._timer, None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+        if not pending:
+            return 0
+
+        keys = list(pending)
+        try:
+            for start in range(0, len(keys), FLUSH_CHUNK_SIZE):
+                cls._write({key: pending[key] for key in keys[start:start + FLUSH_CHUNK_SIZE]})
+        except Exception as e:
+            logger.error(f"Error flushing session activity: {str(e)}")
+            return 0
+        return len(pending)
+
+    @staticmethod
+    def _write(chunk):
+        # A session ended after this activity was recorded has a newer last_activity
+        # and is left closed
+        newer = reduce(or_, (
+            Q(session_key=key, last_activity__lt=seen) for key, (seen, _, _, _) in chunk.items()
+        ))
+        UserSession.objects.filter(newer).update(
+            last_activity=Case(*[
+                When(session_key=key, then=Value(seen)) for key, (seen, _, _, _) in chunk.items()
+            ]),
+            is_active=True,
+        )
+
+        existing = set(UserSession.objects.filter(session_key__in=list(chunk)).values_list('session_key', flat=True))
+        UserSession.objects.bulk_create([
+            UserSession(
+                session_key=key, user_id=user_id, ip_address=ip_address,
+                user_agent=user_agent, last_activity=seen,
+            )
+            for key, (seen, user_id, ip_address, user_agent) in chunk.items() if key not in existing
+        ], ignore_conflicts=True)
+
+    @staticmethod
+    def reap(now=None, dry_run=False):
+        """Deactivate idle sessions in one statement; returns the number affected"""
+        SessionActivityTracker.flush()
+        idle = UserSession.objects.filter(is_active=True, last_activity__lt=SessionActivityTracker.idle_cutoff(now))
+        if dry_run:
+            return idle.count()
+        return idle.update(is_active=False)
+
+
+atexit.register(SessionActivityTracker.flush)
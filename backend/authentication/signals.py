@@ -1,51 +1,70 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.contrib.auth.models import Group, Permission
-from .models import CustomUser
+from django.contrib.auth.models import Group
+from rest_framework.authtoken.models import Token
+from .authentication import TokenUserCache
+from .models import CustomUser, Permission, RolePermission, RolePermissionVersion
+from .permission_engine import RolePermissionCache
+from .session_tracker import SessionActivityTracker
+
+# role -> (group name, is_staff, is_superuser)
+ROLE_GROUPS = {
+    'admin': ('Administrators', True, True),
+    'manager': ('Managers', True, False),
+    'staff': ('IT Staff', False, False),
+    'technician': ('Technicians', False, False),
+}
+DEFAULT_ROLE_GROUP = ('Users', False, False)
 
 
 @receiver(post_save, sender=CustomUser)
 def assign_user_permissions(sender, instance, created, **kwargs):
     """Assign default permissions based on user role"""
-    if created or kwargs.get('update_fields') and 'role' in kwargs['update_fields']:
-        # Remove user from all groups first
-        instance.groups.clear()
-        
-        # Assign permissions based on role
-        if instance.role == 'admin':
-            # Admin gets all permissions
-            admin_group, created = Group.objects.get_or_create(name='Administrators')
-            instance.groups.add(admin_group)
-            instance.is_staff = True
-            instance.is_superuser = True
-            
-        elif instance.role == 'manager':
-            # Manager gets management permissions
-            manager_group, created = Group.objects.get_or_create(name='Managers')
-            instance.groups.add(manager_group)
-            instance.is_staff = True
-            
-        elif instance.role == 'staff':
-            # IT Staff gets operational permissions
-            staff_group, created = Group.objects.get_or_create(name='IT Staff')
-            instance.groups.add(staff_group)
-            
-        elif instance.role == 'technician':
-            # Technician gets technical permissions
-            tech_group, created = Group.objects.get_or_create(name='Technicians')
-            instance.groups.add(tech_group)
-            
-        else:
-            # Regular user gets basic permissions
-            user_group, created = Group.objects.get_or_create(name='Users')
-            instance.groups.add(user_group)
-        
-        # Save the changes
-        if created:
-            # Avoid recursion on creation
-            CustomUser.objects.filter(pk=instance.pk).update(
-                is_staff=instance.is_staff,
-                is_superuser=instance.is_superuser
-            )
-        else:
-            instance.save(update_fields=['is_staff', 'is_superuser'])
+    update_fields = kwargs.get('update_fields')
+    if not (created or update_fields and 'role' in update_fields):
+        return
+
+    group_name, is_staff, is_superuser = ROLE_GROUPS.get(instance.role, DEFAULT_ROLE_GROUP)
+    current = set() if created else set(instance.groups.values_list('name', flat=True))
+    if current != {group_name}:
+        group, _ = Group.objects.get_or_create(name=group_name)
+        if current:
+            instance.groups.clear()
+        instance.groups.add(group)
+
+    # Only ever grant flags, as before; write them back without re-entering this signal
+    flags = {}
+    if is_staff and not instance.is_staff:
+        flags['is_staff'] = instance.is_staff = True
+    if is_superuser and not instance.is_superuser:
+        flags['is_superuser'] = instance.is_superuser = True
+    if flags:
+        CustomUser.objects.filter(pk=instance.pk).update(**flags)
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    """Drop cached token snapshots so role, approval and is_active changes apply at once"""
+    if not created:
+        TokenUserCache.invalidate_users([instance.pk])
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Logout and password changes delete the token; forget its snapshot and end its session"""
+    key = instance.key
+    SessionActivityTracker.end([SessionActivityTracker.session_key_for('token', key)])
+    TokenUserCache.invalidate([key])
+    transaction.on_commit(lambda: TokenUserCache.invalidate([key]))
+
+
+@receiver(post_save, sender=RolePermission)
+@receiver(post_delete, sender=RolePermission)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def bump_role_permission_version(sender, **kwargs):
+    """Make every process reload its role masks"""
+    RolePermissionVersion.bump()
+    RolePermissionCache.bumped()
+    transaction.on_commit(RolePermissionCache.bumped)
@@ -0,0 +1,405 @@
+from datetime import timedelta
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from requests_system.models import RequestCategory, SupportRequest
+from .authentication import TokenUserCache
+from .login_guard import LoginAttemptBuffer, LoginRateLimiter
+from .models import LoginAttempt, UserSession
+from .permission_engine import PERMISSION_BITS, PERMISSION_MATRIX, ROLE_MASKS, PermissionEngine, RolePermissionCache
+from .role_permissions_models import Permission, RolePermission, RolePermissionVersion
+from .session_tracker import SessionActivityTracker
+
+User = get_user_model()
+
+
+class PermissionEngineTests(TestCase):
+    """Compiled masks and SQL scoping agree with the permission matrix and object checks"""
+
+    @classmethod
+    def setUpTestData(cls):
+        def user(username, role, department):
+            return User.objects.create_user(
+                username=username, email=f'{username}@example.com', password='pass',
+                role=role, department=department, is_approved=True,
+            )
+
+        cls.finance_user = user('engine_finance', 'end_user', 'finance')
+        cls.legal_user = user('engine_legal', 'end_user', 'legal')
+        cls.it_user = user('engine_it', 'end_user', 'it')
+        cls.technician = user('engine_tech', 'technician', 'finance')
+        cls.manager = user('engine_manager', 'it_manager', 'operations')
+
+        category = RequestCategory.objects.create(name='Access', category_type='access')
+        cls.requests = {}
+        for key, requester, assignee in [
+            ('finance', cls.finance_user, None),
+            ('legal', cls.legal_user, None),
+            ('legal_assigned', cls.legal_user, cls.technician),
+            ('it', cls.it_user, None),
+        ]:
+            cls.requests[key] = SupportRequest.objects.create(
+                title=f'{key} request', description='Needs access', category=category,
+                requester=requester, assigned_to=assignee,
+            )
+
+    def test_masks_match_matrix(self):
+        for role, permissions in PERMISSION_MATRIX.items():
+            for name, allowed in permissions.items():
+                self.assertEqual(bool(ROLE_MASKS[role] & PERMISSION_BITS[name]), allowed, (role, name))
+
+    def visible(self, user):
+        queryset = PermissionEngine.filter_queryset(SupportRequest.objects.all(), user)
+        return {key for key, request in self.requests.items() if request in set(queryset)}
+
+    def test_queryset_scoping(self):
+        self.assertEqual(self.visible(self.manager), set(self.requests))
+        self.assertEqual(self.visible(self.technician), {'finance', 'legal_assigned', 'it'})
+        self.assertEqual(self.visible(self.legal_user), {'legal', 'legal_assigned'})
+
+    def test_object_checks_agree_with_scoping(self):
+        # Instances created in setUpTestData carry their requester, so no queries are needed
+        for user in [self.finance_user, self.legal_user, self.technician, self.manager]:
+            visible = self.visible(user)
+            with self.assertNumQueries(0):
+                allowed = {
+                    key for key, request in self.requests.items()
+                    if PermissionEngine.can_access(user, request, 'view')
+                }
+            self.assertEqual(allowed, visible, user.username)
+
+        # Without the requester joined in, the department check costs a single query
+        request = SupportRequest.objects.get(pk=self.requests['it'].pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(PermissionEngine.can_access(self.technician, request, 'view'))
+
+
+class RolePermissionCacheTests(TestCase):
+    """Role masks come from RolePermission rows and follow the version stamp"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.technician = User.objects.create_user(
+            username='cache_tech', email='cache_tech@example.com', password='pass',
+            role='technician', department='it', is_approved=True,
+        )
+
+    def tearDown(self):
+        # Assignments roll back with the test; rebuild the masks from the seeded rows
+        RolePermissionCache.reload()
+
+    def test_seeded_assignments_match_matrix(self):
+        RolePermissionCache.reload()
+        for role, mask in ROLE_MASKS.items():
+            self.assertEqual(PermissionEngine.role_mask(role), mask, role)
+
+    def test_checks_are_free_once_loaded(self):
+        PermissionEngine.has(self.technician, 'close')
+        with self.assertNumQueries(0):
+            self.assertTrue(PermissionEngine.has(self.technician, 'close'))
+            self.assertFalse(PermissionEngine.has(self.technician, 'assign'))
+            RolePermissionCache.refresh()
+
+    def test_assignment_changes_apply_without_restart(self):
+        self.assertFalse(PermissionEngine.has(self.technician, 'assign'))
+        version = RolePermissionVersion.current()
+
+        RolePermission.objects.create(role='technician', permission_id='assign')
+        self.assertTrue(PermissionEngine.has(self.technician, 'assign'))
+
+        RolePermission.objects.filter(role='technician', permission_id='close').delete()
+        self.assertFalse(PermissionEngine.has(self.technician, 'close'))
+        self.assertEqual(RolePermissionVersion.current(), version + 2)
+
+    def test_catalog_permissions_get_bits(self):
+        permission = Permission.objects.create(id='view_kb_drafts', name='View KB Drafts')
+        RolePermission.objects.create(role='technician', permission=permission)
+        self.assertTrue(PermissionEngine.has(self.technician, 'view_kb_drafts'))
+        self.assertFalse(PermissionEngine.has(self.technician, 'unknown_permission'))
+
+    def test_refresh_reloads_after_bump_elsewhere(self):
+        self.assertTrue(PermissionEngine.has(self.technician, 'close'))
+        # Another process revoked the grant: rows, stamp and shared cache change, these masks do not
+        RolePermission.objects.filter(role='technician', permission_id='close')._raw_delete(RolePermission.objects.db)
+        RolePermissionVersion.objects.filter(pk=1).update(version=RolePermissionVersion.current() + 1)
+        cache.delete(RolePermissionCache.VERSION_CACHE_KEY)
+        self.assertTrue(PermissionEngine.has(self.technician, 'close'))
+
+        self.client.get('/api/auth/permissions/')
+        self.assertFalse(PermissionEngine.has(self.technician, 'close'))
+
+
+class RoleGroupSignalTests(TestCase):
+    """Role groups are only rewritten when the role's group changes"""
+
+    def test_role_change_updates_group_once(self):
+        user = User.objects.create_user(
+            username='group_user', email='group_user@example.com', password='pass', role='end_user',
+        )
+        self.assertEqual(list(user.groups.values_list('name', flat=True)), ['Users'])
+
+        user.role = 'technician'
+        user.save(update_fields=['role'])
+        self.assertEqual(list(user.groups.values_list('name', flat=True)), ['Technicians'])
+
+        # Same group: one membership lookup and the token cache lookup, no clear/add
+        with self.assertNumQueries(3):
+            user.save(update_fields=['role'])
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    """Token lookups are served from cache until the token or the user changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='token_user', email='token_user@example.com', password='pass',
+            role='end_user', department='finance', is_approved=True,
+        )
+
+    def setUp(self):
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.addCleanup(cache.clear)
+        self.addCleanup(LoginAttemptBuffer.flush)
+        self.addCleanup(SessionActivityTracker.flush)
+
+    def profile(self):
+        return self.client.get('/api/auth/profile/')
+
+    def test_repeat_requests_skip_token_lookup(self):
+        self.profile()
+        with CaptureQueriesContext(connection) as context:
+            response = self.profile()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['email'], self.user.email)
+        self.assertFalse([query for query in context.captured_queries if 'authtoken_token' in query['sql']])
+
+    def test_role_change_and_deactivation_apply_at_once(self):
+        self.assertEqual(self.profile().data['role'], 'end_user')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.role = 'technician'
+            self.user.save(update_fields=['role'])
+        self.assertEqual(self.profile().data['role'], 'technician')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.profile().status_code, 401)
+
+    def test_admin_bulk_approval_drops_cached_tokens(self):
+        self.assertTrue(TokenUserCache.get(self.token.key)[0].is_approved)
+        request = RequestFactory().post('/admin/')
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        with self.captureOnCommitCallbacks(execute=True):
+            admin.site._registry[User].disapprove_users(request, User.objects.filter(pk=self.user.pk, is_approved=True))
+        self.assertFalse(TokenUserCache.get(self.token.key)[0].is_approved)
+
+    def test_logout_drops_cached_token(self):
+        self.assertEqual(self.profile().status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post('/api/auth/logout/').status_code, 200)
+        self.assertEqual(self.profile().status_code, 401)
+
+    def test_login_only_writes_login_metadata(self):
+        self.client.credentials()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post('/api/auth/login/', {'email': self.user.email, 'password': 'pass'})
+        self.assertEqual(response.status_code, 200)
+        updates = [query['sql'] for query in context.captured_queries if query['sql'].startswith('UPDATE "authentication_customuser"')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('"password"', updates[0])
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+
+@override_settings(ACCOUNT_LOCKOUT_ATTEMPTS=3, LOGIN_IP_LOCKOUT_ATTEMPTS=5, LOGIN_ATTEMPT_BATCH_SIZE=1000)
+class LoginRateLimiterTests(APITestCase):
+    """Failed logins are counted in the cache and locked out before password checks"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='limited_user', email='limited_user@example.com', password='right-pass',
+            role='end_user', is_approved=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+        LoginAttemptBuffer.flush()
+        self.addCleanup(cache.clear)
+        self.addCleanup(LoginAttemptBuffer.flush)
+
+    def login(self, password, email=None, ip='10.0.0.1'):
+        return self.client.post(
+            '/api/auth/login/', {'email': email or self.user.email, 'password': password}, REMOTE_ADDR=ip,
+        )
+
+    def test_identifier_lockout_rejects_before_password_check(self):
+        for _ in range(3):
+            self.assertEqual(self.login('wrong').status_code, 400)
+
+        response = self.login('right-pass')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+        # Failures never touched the user row; the lock is written once
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_account_locked())
+
+        self.user.unlock_account()
+        self.assertEqual(self.login('right-pass').status_code, 200)
+
+    def test_ip_lockout_spans_identifiers(self):
+        for index in range(5):
+            self.login('wrong', email=f'nobody{index}@example.com')
+        self.assertEqual(self.login('wrong', email='nobody4@example.com').status_code, 429)
+
+        # Others sharing the address can still sign in until they fail from it
+        self.assertEqual(self.login('right-pass').status_code, 200)
+        self.assertEqual(self.login('wrong').status_code, 400)
+        self.assertEqual(self.login('right-pass').status_code, 429)
+        self.assertEqual(self.login('right-pass', ip='10.0.0.2').status_code, 200)
+
+    def test_lock_is_written_to_the_user_row_whatever_the_case(self):
+        for _ in range(3):
+            self.login('wrong', email=self.user.email.upper())
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_account_locked())
+
+    def test_success_resets_identifier_failures(self):
+        self.login('wrong')
+        self.login('wrong')
+        self.assertEqual(self.login('right-pass').status_code, 200)
+        self.assertEqual(self.login('wrong').status_code, 400)
+        self.assertEqual(self.login('right-pass').status_code, 200)
+
+    def test_previous_bucket_is_weighted_by_overlap(self):
+        window = LoginRateLimiter.window()
+        start = window * 1000
+        LoginRateLimiter.record_failure('someone', None, now=start + window - 1)
+        LoginRateLimiter.record_failure('someone', None, now=start + window - 1)
+        self.assertAlmostEqual(LoginRateLimiter.count('identifier', 'someone', now=start + window * 1.5), 1)
+        self.assertEqual(LoginRateLimiter.count('identifier', 'someone', now=start + window * 2), 0)
+
+    def test_attempts_are_written_in_batches(self):
+        before = LoginAttempt.objects.count()
+        self.login('wrong')
+        self.login('right-pass')
+        self.assertEqual(LoginAttempt.objects.count(), before)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(LoginAttemptBuffer.flush(), 2)
+        attempts = list(LoginAttempt.objects.order_by('timestamp')[before:].values_list('success', flat=True))
+        self.assertEqual(attempts, [False, True])
+
+    @override_settings(LOGIN_ATTEMPT_FLUSH_INTERVAL=7)
+    def test_lone_attempt_is_flushed_by_timer(self):
+        self.login('wrong')
+        timer = LoginAttemptBuffer._timer
+        self.assertIsNotNone(timer)
+        self.assertTrue(timer.daemon)
+        self.assertEqual(timer.interval, 7)
+        self.assertEqual(timer.function, LoginAttemptBuffer._flush_in_thread)
+
+        # Later attempts join the scheduled batch instead of starting timers
+        self.login('wrong')
+        self.assertIs(LoginAttemptBuffer._timer, timer)
+
+        self.assertEqual(LoginAttemptBuffer.flush(), 2)
+        self.assertIsNone(LoginAttemptBuffer._timer)
+        self.assertTrue(timer.finished.is_set())
+
+
+@override_settings(SESSION_ACTIVITY_FLUSH_INTERVAL=3600, SESSION_IDLE_TIMEOUT=30)
+class SessionActivityTests(APITestCase):
+    """Session activity is written in coalesced batches and idle sessions are reaped"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='session_user', email='session_user@example.com', password='pass',
+            role='end_user', is_approved=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+        SessionActivityTracker.flush()
+        self.addCleanup(cache.clear)
+        self.addCleanup(SessionActivityTracker.flush)
+        self.addCleanup(LoginAttemptBuffer.flush)
+
+        response = self.client.post('/api/auth/login/', {'email': self.user.email, 'password': 'pass'})
+        self.token = response.data['token']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+        self.session = UserSession.objects.get(user=self.user)
+
+    def test_requests_do_not_write_until_flush(self):
+        with CaptureQueriesContext(connection) as context:
+            for _ in range(3):
+                self.assertEqual(self.client.get('/api/auth/profile/').status_code, 200)
+        self.assertFalse([query for query in context.captured_queries if 'authentication_usersession' in query['sql']])
+
+        before = self.session.last_activity
+        self.assertEqual(SessionActivityTracker.flush(), 1)
+        self.session.refresh_from_db()
+        self.assertGreater(self.session.last_activity, before)
+
+    def test_logout_is_not_undone_by_pending_activity(self):
+        self.client.get('/api/auth/profile/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/auth/logout/')
+        SessionActivityTracker.flush()
+        self.session.refresh_from_db()
+        self.assertFalse(self.session.is_active)
+
+    def test_admin_deactivation_is_not_undone_by_pending_activity(self):
+        self.client.get('/api/auth/profile/')
+        request = RequestFactory().post('/admin/')
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        admin.site._registry[UserSession].deactivate_sessions(request, UserSession.objects.filter(pk=self.session.pk))
+        SessionActivityTracker.flush()
+        self.session.refresh_from_db()
+        self.assertFalse(self.session.is_active)
+
+    def test_pending_activity_is_flushed_by_timer(self):
+        self.client.get('/api/auth/profile/')
+        timer = SessionActivityTracker._timer
+        self.assertIsNotNone(timer)
+        self.assertEqual(timer.interval, 3600)
+        self.assertEqual(timer.function, SessionActivityTracker._flush_in_thread)
+        self.assertEqual(SessionActivityTracker.flush(), 1)
+        self.assertIsNone(SessionActivityTracker._timer)
+        self.assertTrue(timer.finished.is_set())
+
+    def test_reap_deactivates_idle_sessions(self):
+        UserSession.objects.filter(pk=self.session.pk).update(
+            last_activity=timezone.now() - timedelta(minutes=31)
+        )
+        self.assertEqual(SessionActivityTracker.active_sessions().count(), 0)
+        self.assertEqual(SessionActivityTracker.reap(), 1)
+        self.session.refresh_from_db()
+        self.assertFalse(self.session.is_active)
+
+        # Activity on a still-valid token reopens the session
+        self.client.get('/api/auth/profile/')
+        SessionActivityTracker.flush()
+        self.assertEqual(list(SessionActivityTracker.active_sessions()), [self.session])
+
+    def test_untracked_tokens_get_a_session(self):
+        UserSession.objects.all().delete()
+        self.client.get('/api/auth/profile/')
+        SessionActivityTracker.flush()
+        self.assertEqual(SessionActivityTracker.active_sessions().filter(user=self.user).count(), 1)
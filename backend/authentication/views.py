@@ -9,7 +9,9 @@ from django.utils import timezone
 from django.db import transaction
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
-from .models import CustomUser, EmailVerificationToken, PasswordResetToken, LoginAttempt
+from .login_guard import LoginAttemptBuffer, LoginRateLimiter
+from .models import CustomUser, EmailVerificationToken, PasswordResetToken
+from .session_tracker import SessionActivityTracker
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer,
     PasswordChangeSerializer, PasswordResetRequestSerializer, PasswordResetSerializer,
@@ -31,9 +33,9 @@ def get_client_ip(request):
 
 
 def log_login_attempt(request, user=None, success=False, attempted_username=''):
-    """Log login attempt for security monitoring"""
+    """Log login attempt for security monitoring; rows are written in batches"""
     try:
-        LoginAttempt.objects.create(
+        LoginAttemptBuffer.add(
             user=user,
             ip_address=get_client_ip(request),
             user_agent=request.META.get('HTTP_USER_AGENT', ''),
@@ -97,6 +99,18 @@ def register_user(request):
 @permission_classes([permissions.AllowAny])
 def login_user(request):
     """Login user and return token"""
+    identifier = request.data.get('email', '')
+    ip_address = get_client_ip(request)
+
+    # Reject locked identifiers and IPs before any password is hashed
+    retry_after = LoginRateLimiter.retry_after(identifier, ip_address)
+    if retry_after:
+        log_login_attempt(request, success=False, attempted_username=identifier)
+        return Response({
+            'error': 'Too many failed login attempts. Please try again later.',
+            'retry_after': retry_after,
+        }, status=status.HTTP_429_TOO_MANY_REQUESTS, headers={'Retry-After': str(retry_after)})
+
     serializer = UserLoginSerializer(data=request.data)
     
     if serializer.is_valid():
@@ -107,9 +121,14 @@ def login_user(request):
             # Create or get token
             token, created = Token.objects.get_or_create(user=user)
             
-            # Update user's last login IP
-            user.last_login_ip = get_client_ip(request)
-            user.save()
+            # Update login metadata only
+            user.last_login_ip = ip_address
+            user.save(update_fields=['failed_login_attempts', 'last_login', 'last_login_ip'])
+            LoginRateLimiter.reset(identifier)
+            SessionActivityTracker.start(
+                SessionActivityTracker.session_key_for('token', token.key), user,
+                ip_address, request.META.get('HTTP_USER_AGENT', ''),
+            )
             
             # Log successful login
             log_login_attempt(request, user=user, success=True, attempted_username=user.email)
@@ -136,8 +155,8 @@ def login_user(request):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     # Log failed login attempt
-    email = request.data.get('email', '')
-    log_login_attempt(request, success=False, attempted_username=email)
+    log_login_attempt(request, success=False, attempted_username=identifier)
+    LoginRateLimiter.record_failure(identifier, ip_address)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -94,6 +94,7 @@ class ActivityLog(models.Model):
             models.Index(fields=['action_type', 'timestamp']),
             models.Index(fields=['content_type', 'object_id']),
             models.Index(fields=['severity', 'timestamp']),
+            models.Index(fields=['timestamp', 'id']),
         ]
     
     def __str__(self):
@@ -0,0 +1,238 @@
+import gc
+import json
+import math
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+from importlib import import_module
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+
+from authentication.models import CustomUser
+from authentication.session_tracker import SessionActivityTracker
+from inventory.models import Equipment
+from requests_system.models import SupportRequest
+from tasks.models import Task
+from .synthetic_data import CLOSED_STATUSES
+from .views import ReportingViewSet
+
+BULK_SIZE = 20  # rows touched by each bulk operation
+# Timings below these never count as regressions; they are dominated by noise
+MIN_LATENCY_DELTA_MS = 2.0
+MIN_MEMORY_DELTA_KIB = 64
+# Timings and query counts only compare between runs that agree on these
+COMPARABLE_META = ('dataset', 'database', 'iterations')
+
+# name -> (method, target, payload); ``target`` is a URL or a callable view,
+# and ``payload`` builds the query string or body from the dataset's ids
+SCENARIOS = {
+    'dashboard_analytics': ('get', '/api/analytics/dashboard/', None),
+    'recent_activity': ('get', '/api/analytics/recent-activity/', None),
+    'request_analytics': ('get', '/api/analytics/requests/', None),
+    'dashboard_report': ('get', ReportingViewSet.as_view({'get': 'dashboard_report'}), lambda ids: {'days': 30}),
+    'dashboard_report_uncached': ('get', ReportingViewSet.as_view({'get': 'dashboard_report'}), lambda ids: {'days': 30}),
+    'equipment_list': ('get', '/api/inventory/equipment/', None),
+    'request_list': ('get', '/api/requests/support-requests/', None),
+    'task_list': ('get', '/api/tasks/tasks/', None),
+    'global_search': ('get', '/api/core/search/', lambda ids: {'q': 'printer'}),
+    'notifications': ('get', '/api/notifications/', None),
+    'bulk_update_priority': ('post', '/api/core/bulk-operations/bulk_update_priority/', lambda ids: {
+        'object_ids': ids['requests'], 'object_type': 'request', 'priority': 'high',
+    }),
+    'bulk_assign_requests': ('post', '/api/core/bulk-operations/bulk_assign_requests/', lambda ids: {
+        'request_ids': ids['requests'], 'assigned_to_id': ids['technician'],
+    }),
+    'bulk_close_requests': ('post', '/api/core/bulk-operations/bulk_close_requests/', lambda ids: {
+        'request_ids': ids['requests'], 'resolution_notes': 'Benchmark',
+    }),
+    'bulk_update_equipment_status': ('post', '/api/core/bulk-operations/bulk_update_equipment_status/', lambda ids: {
+        'equipment_ids': ids['equipment'], 'status': 'maintenance',
+    }),
+}
+# Scenarios run against an empty report snapshot directory, so the report is computed every time
+UNCACHED_SCENARIOS = {'dashboard_report_uncached'}
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of ``samples``"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class BenchmarkRunner:
+    """Drives the main endpoints in-process and measures latency, queries and memory.
+
+    Requests go through Django's test client with a token header, so
+    middleware, authentication and permission checks are measured along with
+    the view (``ReportingViewSet`` has no route and is called directly).
+    Every request runs in a transaction that is rolled back, so the bulk
+    operations leave the dataset as they found it; files written on the way
+    (QR codes, report snapshots) go to a temporary directory. The cached
+    report scenario is served from its snapshot after the warm-up, while
+    uncached ones get an empty snapshot directory per request. The session
+    activity flush is held off so it does not land in a timed request, and
+    the benchmark's own activity is discarded. Peak memory is taken in a
+    separate pass because tracemalloc slows requests down.
+    """
+
+    def __init__(self, user, iterations=20, warmup=2):
+        self.user = user
+        self.iterations = iterations
+        self.warmup = warmup
+        self.token = Token.objects.get_or_create(user=user)[0].key
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+        self.factory = APIRequestFactory()
+        self.ids = self.dataset_ids()
+
+    @staticmethod
+    def dataset_ids():
+        open_requests = SupportRequest.objects.exclude(status__in=CLOSED_STATUSES).order_by('-created_at')
+        technician = CustomUser.objects.filter(role='technician', is_active=True).order_by('id').first()
+        return {
+            'requests': list(open_requests.values_list('id', flat=True)[:BULK_SIZE]),
+            'equipment': list(Equipment.objects.order_by('id').values_list('id', flat=True)[:BULK_SIZE]),
+            'technician': technician.id if technician else None,
+        }
+
+    @staticmethod
+    def dataset_counts():
+        return {
+            'users': CustomUser.objects.count(),
+            'equipment': Equipment.objects.count(),
+            'requests': SupportRequest.objects.count(),
+            'tasks': Task.objects.count(),
+        }
+
+    def call(self, name):
+        method, target, payload = SCENARIOS[name]
+        data = payload(self.ids) if payload else None
+        report_root = Path(tempfile.mkdtemp(dir=settings.REPORT_ROOT)) if name in UNCACHED_SCENARIOS else settings.REPORT_ROOT
+        with transaction.atomic(), override_settings(REPORT_ROOT=report_root):
+            if callable(target):
+                request = getattr(self.factory, method)(
+                    '/', data, format='json' if method == 'post' else None,
+                    HTTP_AUTHORIZATION=f'Token {self.token}',
+                )
+                # No middleware runs for a direct view call; activity logging reads the session
+                request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+                response = target(request)
+                response.render()
+            elif method == 'post':
+                response = self.client.post(target, data, format='json')
+            else:
+                response = self.client.get(target, data)
+            transaction.set_rollback(True)
+        return response
+
+    def measure(self, name):
+        for _ in range(self.warmup):
+            self.call(name)
+
+        timings, queries = [], 0
+        for _ in range(self.iterations):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = self.call(name)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries = max(queries, len(captured))
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            self.call(name)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'p50_ms': round(percentile(timings, 0.5), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'queries': queries,
+            'peak_kib': round(peak / 1024),
+            'status': response.status_code,
+        }
+
+    def run(self, names=None, stdout=None):
+        scratch = Path(tempfile.mkdtemp(prefix='benchmarks-'))
+        try:
+            with override_settings(
+                MEDIA_ROOT=str(scratch),
+                REPORT_ROOT=scratch,
+                SESSION_ACTIVITY_FLUSH_INTERVAL=float('inf'),
+                EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+            ):
+                results = {}
+                for name in names or SCENARIOS:
+                    results[name] = self.measure(name)
+                    if stdout is not None:
+                        stdout.write(f'{name}: {results[name]}')
+        finally:
+            SessionActivityTracker.forget(SessionActivityTracker.session_key_for('token', self.token))
+            shutil.rmtree(scratch, ignore_errors=True)
+        return {
+            'meta': {
+                'iterations': self.iterations,
+                'dataset': self.dataset_counts(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'scenarios': results,
+        }
+
+
+def compare(results, baseline, threshold=0.25):
+    """Regressions of ``results`` against ``baseline`` as readable messages.
+
+    Any extra query is a regression; p95 latency and peak memory regress when
+    they exceed the baseline by more than ``threshold`` (a fraction) and by
+    more than a small absolute margin. A changed status code is reported too,
+    and so is a scenario the baseline does not have yet. Results measured on a
+    different dataset, database or iteration count than the baseline are not
+    compared at all; only those differences are reported.
+    """
+    meta, expected_meta = results.get('meta', {}), baseline.get('meta', {})
+    mismatches = [
+        f"{key}: {json.dumps(meta.get(key))}, baseline {json.dumps(expected_meta[key])}; "
+        'results are not comparable, run on a matching setup or write a new baseline with --write-baseline'
+        for key in COMPARABLE_META
+        if key in expected_meta and meta.get(key) != expected_meta[key]
+    ]
+    if mismatches:
+        return mismatches
+    regressions = []
+    for name, current in results['scenarios'].items():
+        expected = baseline.get('scenarios', {}).get(name)
+        if expected is None:
+            regressions.append(f"{name}: not in the baseline; write a new one with --write-baseline")
+            continue
+        if current['status'] != expected['status']:
+            regressions.append(f"{name}: status {current['status']}, baseline {expected['status']}")
+        if current['queries'] > expected['queries']:
+            regressions.append(f"{name}: {current['queries']} queries, baseline {expected['queries']}")
+        for key, margin, unit in (('p95_ms', MIN_LATENCY_DELTA_MS, 'ms'), ('peak_kib', MIN_MEMORY_DELTA_KIB, 'KiB')):
+            limit = max(expected[key] * (1 + threshold), expected[key] + margin)
+            if current[key] > limit:
+                regressions.append(f"{name}: {key} {current[key]}{unit}, baseline {expected[key]}{unit}")
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def write_baseline(path, results):
+    with open(path, 'w') as handle:
+        json.dump(results, handle, indent=2, sort_keys=True)
+        handle.write('\n')
@@ -1,19 +1,184 @@
+import re
+
+from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.http import FileResponse, HttpResponseNotModified
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.http import parse_etags
+
+from authentication.permission_engine import PermissionEngine
+from requests_system.models import RequestAttachment, SupportRequest
+from requests_system.serializers import RequestAttachmentSerializer
+from .models import UploadSession
+from .previews import AttachmentPreviewService
+from .uploads import ChunkedUploadService, UploadError
+
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
+# Previews are keyed by content hash, so a cached copy never goes stale
+PREVIEW_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+
+
+def _upload_data(session):
+    return {
+        'upload_id': str(session.upload_id),
+        'filename': session.filename,
+        'size': session.size,
+        'offset': session.received,
+        'status': session.status,
+        'content_hash': session.content_hash,
+    }
+
+
+def _visible_request(user, request_id):
+    """The support request ``user`` may attach files to, or None"""
+    try:
+        request_id = int(request_id)
+    except (TypeError, ValueError):
+        return None
+    return PermissionEngine.filter_queryset(SupportRequest.objects.all(), user).filter(pk=request_id).first()
+
 
 @extend_schema(request=None, responses=OpenApiResponse(description='Upload a file'))
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def file_upload(request):
+    """Store a small file in one request; large files should use the chunked upload endpoints"""
     uploaded = request.FILES.get('file')
     if not uploaded:
         return Response({'error': 'file is required'}, status=400)
-    return Response({
+
+    support_request = None
+    if request.data.get('request_id'):
+        support_request = _visible_request(request.user, request.data['request_id'])
+        if support_request is None:
+            return Response({'error': 'Support request not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    name, content_hash = ChunkedUploadService.store_file(uploaded)
+    data = {
         'filename': uploaded.name,
         'size': uploaded.size,
         'content_type': getattr(uploaded, 'content_type', 'application/octet-stream'),
+        'content_hash': content_hash,
         'uploaded_at': timezone.now().isoformat(),
-    })
+    }
+    if support_request is not None:
+        attachment, _ = support_request.attachments.get_or_create(
+            content_hash=content_hash, filename=uploaded.name,
+            defaults={'file': name, 'size': uploaded.size, 'uploaded_by': request.user},
+        )
+        data['attachment'] = RequestAttachmentSerializer(attachment).data
+    return Response(data)
+
+@extend_schema(request=None, responses=OpenApiResponse(description='Start a resumable chunked upload'))
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_start(request):
+    payload = request.data or {}
+    if not payload.get('filename'):
+        return Response({'error': 'filename is required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        size = int(payload.get('size'))
+    except (TypeError, ValueError):
+        return Response({'error': 'size must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        session = ChunkedUploadService.start(
+            request.user, payload['filename'], size,
+            content_type=payload.get('content_type') or '', sha256=payload.get('sha256') or '',
+        )
+    except UploadError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(
+        {**_upload_data(session), 'chunk_size': ChunkedUploadService.chunk_size()},
+        status=status.HTTP_201_CREATED,
+    )
+
+@extend_schema(request=None, responses=OpenApiResponse(description='Upload status, or append a chunk'))
+@api_view(['GET', 'PUT'])
+@permission_classes([IsAuthenticated])
+def upload_chunk(request, upload_id):
+    """GET returns the offset to resume from; PUT appends the raw request body.
+
+    The chunk position comes from ``Content-Range: bytes <first>-<last>/<total>``
+    or an ``offset`` query parameter. ``X-Chunk-SHA256`` makes the server keep
+    the chunk only when it arrived whole and matches.
+    """
+    session = get_object_or_404(UploadSession, upload_id=upload_id, created_by=request.user)
+    if request.method == 'GET':
+        return Response(_upload_data(session))
+
+    try:
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return Response({'error': 'Invalid Content-Length'}, status=status.HTTP_400_BAD_REQUEST)
+    content_range = request.META.get('HTTP_CONTENT_RANGE')
+    if content_range:
+        match = CONTENT_RANGE.match(content_range)
+        if not match or int(match.group(2)) - int(match.group(1)) + 1 != length:
+            return Response({'error': 'Content-Range does not match the body'}, status=status.HTTP_400_BAD_REQUEST)
+        offset = int(match.group(1))
+    else:
+        try:
+            offset = int(request.query_params.get('offset', session.received))
+        except ValueError:
+            return Response({'error': 'offset must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        ChunkedUploadService.append(
+            session, request.stream, offset, length, chunk_sha256=request.META.get('HTTP_X_CHUNK_SHA256', ''),
+        )
+    except UploadError as e:
+        return Response({'error': str(e), **_upload_data(session)}, status=status.HTTP_409_CONFLICT)
+    return Response(_upload_data(session))
+
+@extend_schema(request=None, responses=OpenApiResponse(description='Finish a chunked upload'))
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_complete(request, upload_id):
+    """Verify and store the upload; with ``request_id`` it is attached to that support request"""
+    session = get_object_or_404(UploadSession, upload_id=upload_id, created_by=request.user)
+    request_id = (request.data or {}).get('request_id')
+    support_request = _visible_request(request.user, request_id)
+    if request_id and support_request is None:
+        return Response({'error': 'Support request not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        attachment = ChunkedUploadService.complete(session, request.user, support_request)
+    except UploadError as e:
+        return Response({'error': str(e), **_upload_data(session)}, status=status.HTTP_409_CONFLICT)
+
+    data = _upload_data(session)
+    if attachment is not None:
+        data['attachment'] = RequestAttachmentSerializer(attachment).data
+    return Response(data)
+
+@extend_schema(request=None, responses=OpenApiResponse(description='Thumbnail or text preview of an attachment'))
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def attachment_preview(request, attachment_id):
+    """Serve the attachment's preview; 202 while it is still being generated"""
+    visible = PermissionEngine.filter_queryset(SupportRequest.objects.all(), request.user)
+    attachment = get_object_or_404(RequestAttachment, pk=attachment_id, request__in=visible)
+
+    preview = AttachmentPreviewService.find(attachment.content_hash)
+    if preview is None:
+        AttachmentPreviewService.schedule(attachment.pk)
+        response = Response({'status': 'pending'}, status=status.HTTP_202_ACCEPTED)
+        response['Retry-After'] = '2'
+        return response
+    path, content_type = preview
+    if content_type is None:
+        return Response({'error': 'No preview available for this attachment'}, status=status.HTTP_404_NOT_FOUND)
+
+    etag = f'"{attachment.content_hash}"'
+    if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    if '*' in if_none_match or etag in [tag.removeprefix('W/') for tag in if_none_match]:
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    response['ETag'] = etag
+    response['Cache-Control'] = PREVIEW_CACHE_CONTROL
+    return response
@@ -0,0 +1,67 @@
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.synthetic_data import SCALES, SyntheticDataGenerator, TICKET_PREFIX, USERNAME_PREFIX
+from authentication.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = 'Generate a seeded synthetic dataset (users, equipment, requests, tasks, activity logs) for load tests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), default='small', help='Preset row counts')
+        for name in ('users', 'equipment', 'requests', 'tasks', 'activity-logs'):
+            parser.add_argument(f'--{name}', type=int, help=f'Number of {name.replace("-", " ")} (overrides --scale)')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--anchor', help='Date the data ends at, YYYY-MM-DD (default: today)')
+        parser.add_argument('--days', type=int, default=365, help='Days of history before the anchor date')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert')
+        parser.add_argument('--distributions', help='JSON file overriding weights, e.g. {"priorities": {"critical": 10}}')
+        parser.add_argument('--clear', action='store_true', help='Delete previously generated data first')
+
+    def handle(self, *args, **options):
+        counts = dict(SCALES[options['scale']])
+        for name in counts:
+            if options[name] is not None:
+                if options[name] < 0:
+                    raise CommandError(f'--{name.replace("_", "-")} cannot be negative')
+                counts[name] = options[name]
+        if counts['requests'] == 0 and (counts['tasks'] or counts['activity_logs']):
+            raise CommandError('Tasks and activity logs are generated per request; --requests must be above 0')
+        if options['batch_size'] < 1 or options['days'] < 1:
+            raise CommandError('--batch-size and --days must be positive')
+
+        anchor = None
+        if options['anchor']:
+            try:
+                anchor = date.fromisoformat(options['anchor'])
+            except ValueError:
+                raise CommandError('--anchor must be a date as YYYY-MM-DD')
+
+        distributions = None
+        if options['distributions']:
+            try:
+                with open(options['distributions']) as handle:
+                    distributions = json.load(handle)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Cannot read distributions: {e}')
+
+        try:
+            generator = SyntheticDataGenerator(
+                seed=options['seed'], anchor=anchor, days=options['days'], batch_size=options['batch_size'],
+                distributions=distributions, stdout=self.stdout,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['clear']:
+            self.stdout.write('Deleting previously generated data...')
+            SyntheticDataGenerator.clear()
+        elif CustomUser.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+            raise CommandError(f'Generated data ({USERNAME_PREFIX}* users, {TICKET_PREFIX}* tickets) exists; use --clear')
+
+        created = generator.generate(**counts)
+        summary = ', '.join(f'{count} {name.replace("_", " ")}' for name, count in created.items())
+        self.stdout.write(self.style.SUCCESS(f'Generated {summary}'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.uploads import ChunkedUploadService
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked uploads that were never completed within UPLOAD_SESSION_TTL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report stale uploads without deleting them')
+
+    def handle(self, *args, **options):
+        count = ChunkedUploadService.purge_stale(dry_run=options['dry_run'])
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {count} stale uploads"))
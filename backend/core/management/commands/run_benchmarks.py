@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.models import CustomUser
+from core.benchmarks import SCENARIOS, BenchmarkRunner, compare, load_baseline, write_baseline
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the main API endpoints in-process against the current dataset (see generate_dataset) '
+        'and compare latency, query counts and memory with a committed baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per endpoint first')
+        parser.add_argument('--only', nargs='+', choices=sorted(SCENARIOS), help='Endpoints to run (default: all)')
+        parser.add_argument(
+            '--baseline', default=str(settings.BASE_DIR / 'benchmarks' / 'baseline.json'),
+            help='Baseline JSON file to compare with or write',
+        )
+        parser.add_argument('--write-baseline', action='store_true', help='Save the results as the new baseline')
+        parser.add_argument(
+            '--threshold', type=float, default=0.25,
+            help='Allowed p95 latency and peak memory growth over the baseline, as a fraction',
+        )
+        parser.add_argument('--user', help='Username to run as (default: the first active system admin)')
+        parser.add_argument('--json', dest='output', help='Also write the results to this file')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['warmup'] < 0:
+            raise CommandError('--iterations must be positive and --warmup cannot be negative')
+        if options['threshold'] < 0:
+            raise CommandError('--threshold cannot be negative')
+
+        users = CustomUser.objects.filter(is_active=True)
+        if options['user']:
+            user = users.filter(username=options['user']).first()
+        else:
+            user = users.filter(role='system_admin').order_by('id').first()
+        if user is None:
+            raise CommandError('No user to run as; generate a dataset first or pass --user')
+
+        runner = BenchmarkRunner(user, iterations=options['iterations'], warmup=options['warmup'])
+        if not runner.ids['requests'] or not runner.ids['equipment'] or runner.ids['technician'] is None:
+            raise CommandError('The dataset needs open requests, equipment and a technician; run generate_dataset')
+
+        self.stdout.write(f"Running as {user.username}, {options['iterations']} iterations per endpoint")
+        results = runner.run(options['only'], stdout=self.stdout)
+
+        if options['output']:
+            write_baseline(options['output'], results)
+        if options['write_baseline']:
+            write_baseline(options['baseline'], results)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+
+        try:
+            baseline = load_baseline(options['baseline'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read baseline: {e}')
+        regressions = compare(results, baseline, options['threshold'])
+        if regressions:
+            raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
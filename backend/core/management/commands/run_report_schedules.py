@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core.report_jobs import ReportJobService
+from core.report_snapshots import ReportSnapshotStore
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate reports for due schedules and for queued jobs no worker picked up, fail jobs whose worker died, '
+        'and drop rolling report snapshots from previous days'
+    )
+
+    def handle(self, *args, **options):
+        jobs = ReportJobService.run_due_schedules()
+        failed = sum(1 for job in jobs if job.status == 'failed')
+        stale = ReportJobService.run_stale()
+        purged = ReportSnapshotStore.purge_expired()
+
+        self.stdout.write(f"Generated {len(jobs)} scheduled reports ({failed} failed), {stale} stale jobs")
+        self.stdout.write(f"Removed {purged} expired report snapshots")
+        self.stdout.write(self.style.SUCCESS('Report schedules complete'))
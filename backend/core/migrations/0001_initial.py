@@ -0,0 +1,108 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(choices=[('dashboard', 'Dashboard'), ('equipment', 'Equipment'), ('user_activity', 'User Activity')], max_length=20)),
+                ('format', models.CharField(choices=[('json', 'JSON'), ('csv', 'CSV'), ('pdf', 'PDF')], default='pdf', max_length=10)),
+                ('parameters', models.JSONField(blank=True, default=dict)),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], max_length=10)),
+                ('next_run_at', models.DateTimeField()),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_schedules', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['next_run_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(choices=[('dashboard', 'Dashboard'), ('equipment', 'Equipment'), ('user_activity', 'User Activity')], max_length=20)),
+                ('format', models.CharField(choices=[('json', 'JSON'), ('csv', 'CSV'), ('pdf', 'PDF')], default='pdf', max_length=10)),
+                ('parameters', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('filename', models.CharField(blank=True, max_length=255)),
+                ('size', models.BigIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_jobs', to=settings.AUTH_USER_MODEL)),
+                ('schedule', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='core.reportschedule')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ActivityLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action_type', models.CharField(choices=[('create', 'Create'), ('read', 'Read/View'), ('update', 'Update'), ('delete', 'Delete'), ('assign', 'Assign'), ('reassign', 'Reassign'), ('start', 'Start'), ('pause', 'Pause'), ('resume', 'Resume'), ('complete', 'Complete'), ('cancel', 'Cancel'), ('approve', 'Approve'), ('reject', 'Reject'), ('status_change', 'Status Change'), ('priority_change', 'Priority Change'), ('category_change', 'Category Change'), ('comment', 'Comment Added'), ('notification_sent', 'Notification Sent'), ('email_sent', 'Email Sent'), ('login', 'User Login'), ('logout', 'User Logout'), ('export', 'Data Export'), ('import', 'Data Import'), ('backup', 'Backup Created'), ('equipment_failure', 'Equipment Failure'), ('maintenance_scheduled', 'Maintenance Scheduled'), ('maintenance_completed', 'Maintenance Completed'), ('escalated', 'Escalated'), ('sla_violation', 'SLA Violation'), ('overdue', 'Overdue')], max_length=30)),
+                ('severity', models.CharField(choices=[('info', 'Information'), ('warning', 'Warning'), ('error', 'Error'), ('critical', 'Critical')], default='info', max_length=10)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('object_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('description', models.TextField()),
+                ('old_values', models.JSONField(blank=True, default=dict)),
+                ('new_values', models.JSONField(blank=True, default=dict)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('user_agent', models.TextField(blank=True)),
+                ('session_key', models.CharField(blank=True, max_length=40)),
+                ('content_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-timestamp'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='reportschedule',
+            index=models.Index(fields=['is_active', 'next_run_at'], name='core_report_is_acti_131def_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reportjob',
+            index=models.Index(fields=['requested_by', 'created_at'], name='core_report_request_424bc4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['user', 'timestamp'], name='core_activi_user_id_81b1f1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['action_type', 'timestamp'], name='core_activi_action__5424a6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['content_type', 'object_id'], name='core_activi_content_1a7154_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['severity', 'timestamp'], name='core_activi_severit_3034da_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['timestamp', 'id'], name='core_activi_timesta_1e2887_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_reportdataversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportschedule',
+            name='day_of_month',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,193 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+
+REPORT_TYPE_CHOICES = [
+    ('dashboard', 'Dashboard'),
+    ('equipment', 'Equipment'),
+    ('user_activity', 'User Activity'),
+]
+
+REPORT_FORMAT_CHOICES = [
+    ('json', 'JSON'),
+    ('csv', 'CSV'),
+    ('pdf', 'PDF'),
+]
+
+
+class ReportSchedule(models.Model):
+    """Recurring report generation; due schedules are enqueued by ``run_report_schedules``"""
+
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
+
+    report_type = models.CharField(max_length=20, choices=REPORT_TYPE_CHOICES)
+    format = models.CharField(max_length=10, choices=REPORT_FORMAT_CHOICES, default='pdf')
+    parameters = models.JSONField(default=dict, blank=True)
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    next_run_at = models.DateTimeField()
+    day_of_month = models.PositiveSmallIntegerField(null=True, blank=True)  # monthly runs; taken from the first run
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='report_schedules')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['next_run_at']
+        indexes = [
+            models.Index(fields=['is_active', 'next_run_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_frequency_display()} {self.get_report_type_display()} report"
+
+    def save(self, *args, **kwargs):
+        # Shorter months run on their last day; later months return to this day
+        if self.day_of_month is None and self.next_run_at:
+            self.day_of_month = timezone.localtime(self.next_run_at).day
+        super().save(*args, **kwargs)
+
+
+class ReportJob(models.Model):
+    """A report generated off the request thread; the artifact lives under ``REPORT_ROOT``"""
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    report_type = models.CharField(max_length=20, choices=REPORT_TYPE_CHOICES)
+    format = models.CharField(max_length=10, choices=REPORT_FORMAT_CHOICES, default='pdf')
+    parameters = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    filename = models.CharField(max_length=255, blank=True)
+    size = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='report_jobs')
+    schedule = models.ForeignKey(ReportSchedule, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['requested_by', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_report_type_display()} report #{self.pk} ({self.status})"
+
+    @property
+    def path(self):
+        return settings.REPORT_ROOT / self.filename
+
+
+class UploadSession(models.Model):
+    """A resumable upload; chunks are appended to a partial file until it is complete"""
+
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('completed', 'Completed'),
+    ]
+
+    upload_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.BigIntegerField(help_text='Declared total size in bytes')
+    received = models.BigIntegerField(default=0, help_text='Bytes stored so far; the offset to resume from')
+    sha256 = models.CharField(max_length=64, blank=True, help_text='Checksum declared by the client')
+    content_hash = models.CharField(max_length=64, blank=True, help_text='SHA-256 of the stored content')
+    stored_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size} bytes)"
+
+
+class ReportDataVersion(models.Model):
+    """Write counter for one table that reports read; open-period report snapshots are keyed on it.
+
+    Kept in the database so a bump in any process is seen the same way
+    everywhere. Inside a transaction, bumps are collected and each table's
+    counter is written once after commit. The counter row is then never
+    locked for the length of a writer's transaction, and a snapshot can never
+    pair a new version with data it cannot see yet. Bulk writes send no
+    signals and bump explicitly.
+    """
+
+    label = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Report Data Version'
+
+    def __str__(self):
+        return f"{self.label} v{self.version}"
+
+    @classmethod
+    def bump(cls, *labels):
+        connection = transaction.get_connection()
+        if connection.in_atomic_block:
+            cls._pending_labels(connection).update(labels)
+        else:
+            cls._write(labels)
+
+    @classmethod
+    def _pending_labels(cls, connection):
+        """Labels waiting for the current transaction to commit; the write is registered once"""
+        pending = getattr(connection, 'report_data_versions_pending', None)
+        # A rollback drops the registered write, and with it the collected labels
+        if pending is not None and any(entry[1] is pending[1] for entry in connection.run_on_commit):
+            return pending[0]
+
+        labels = set()
+
+        def write():
+            if getattr(connection, 'report_data_versions_pending', None) is pending:
+                connection.report_data_versions_pending = None
+            cls._write(labels)
+
+        connection.report_data_versions_pending = pending = (labels, write)
+        transaction.on_commit(write)
+        return labels
+
+    @classmethod
+    def _write(cls, labels):
+        now = timezone.now()
+        # A fixed order keeps concurrent writers from locking rows in opposite orders
+        for label in sorted(set(labels)):
+            if not cls.objects.filter(label=label).update(version=models.F('version') + 1, updated_at=now):
+                cls.objects.get_or_create(label=label, defaults={'version': 1})
+
+    @classmethod
+    def current(cls, labels):
+        """One version string covering every table in ``labels``"""
+        # updated_at keeps counters rewound by a database restore from matching newer snapshots
+        versions = {
+            label: f'{version}:{updated_at.isoformat()}'
+            for label, version, updated_at in cls.objects.filter(label__in=labels).values_list(
+                'label', 'version', 'updated_at',
+            )
+        }
+        return hashlib.sha1('|'.join(versions.get(label, '0') for label in labels).encode()).hexdigest()[:16]
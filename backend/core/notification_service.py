@@ -1,9 +1,9 @@
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
 from django.conf import settings
 from notifications.models import Notification
+from notifications.delivery import NotificationDeliveryScheduler
 # from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 import logging
@@ -41,17 +41,18 @@ class NotificationService:
                 title=title,
                 message=message,
                 type=model_type,
-                related_object_type=related_object_type,
+                related_object_type=related_object_type or '',
                 related_object_id=related_object_id,
                 priority=priority
             )
             
-            # Send through requested channels
-            if 'in_app' in channels:
+            # Send through requested channels the user has not turned off
+            preferences = NotificationDeliveryScheduler.get_preferences(user.id)
+            if 'in_app' in channels and NotificationDeliveryScheduler.wants_web(preferences, model_type):
                 NotificationService._send_realtime_notification(user, notification)
             
             if 'email' in channels:
-                NotificationService._send_email_notification(user, notification)
+                NotificationDeliveryScheduler.schedule_email(user, notification, preferences)
             
             if 'sms' in channels:
                 NotificationService._send_sms_notification(user, notification)
@@ -110,34 +111,6 @@ class NotificationService:
         except Exception as e:
             logger.error(f"Error sending real-time notification: {str(e)}")
     
-    @staticmethod
-    def _send_email_notification(user, notification):
-        """Send email notification"""
-        try:
-            if user.email and hasattr(settings, 'EMAIL_HOST'):
-                subject = f"[Hospital IT] {notification.title}"
-                message_body = f"""
-                Dear {user.get_full_name()},
-                
-                {notification.message}
-                
-                Please log in to the Hospital IT system to view more details.
-                
-                Best regards,
-                Hospital IT Team
-                """
-                
-                send_mail(
-                    subject,
-                    message_body,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [user.email],
-                    fail_silently=True
-                )
-                
-        except Exception as e:
-            logger.error(f"Error sending email notification: {str(e)}")
-    
     @staticmethod
     def _send_sms_notification(user, notification):
         """Send SMS notification (placeholder for SMS service integration)"""
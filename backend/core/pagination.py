@@ -0,0 +1,238 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _truthy(value):
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def _cursor_value(value):
+    """JSON-safe form of an ordering value; decoded again with ``field.to_python``"""
+    if isinstance(value, (int, str)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+class KeysetPagination(BasePagination):
+    """Keyset pagination over an indexed ``(field, id)`` ordering.
+
+    Each page is fetched with a ``WHERE (field, id) < (value, id)`` style
+    condition and ``LIMIT page_size + 1``, so deep pages cost the same as the
+    first one. Cursors are opaque base64 tokens. A total is only computed when
+    the client passes ``include_total``, and is capped at ``count_cap`` rows.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    total_query_param = 'include_total'
+    count_cap = 10000
+    default_ordering = '-created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.order_field, self.descending = self.get_ordering(request, queryset, view)
+        self.model = queryset.model
+
+        self.count = None
+        self.count_capped = False
+        if _truthy(request.query_params.get(self.total_query_param, '')):
+            self.count, self.count_capped = self.get_capped_count(queryset)
+
+        position, reverse = self.decode_cursor(request)
+
+        # Previous-page cursors walk the keyset backwards and flip the rows afterwards
+        descending = self.descending != reverse
+        direction = '-' if descending else ''
+        queryset = queryset.order_by(f'{direction}{self.order_field}', f'{direction}pk')
+        if position is not None:
+            queryset = queryset.filter(self.keyset_q(position, descending))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        """Return ``(field, descending)`` for the keyset.
+
+        A client ordering from ``OrderingFilter`` is honoured when it names a
+        non-null column; otherwise the view's default ordering is used.
+        """
+        ordering = None
+        if view is not None:
+            for backend in getattr(view, 'filter_backends', []):
+                if issubclass(backend, OrderingFilter):
+                    ordering = backend().get_ordering(request, queryset, view)
+                    break
+            if not ordering:
+                ordering = getattr(view, 'ordering', None)
+            if isinstance(ordering, str):
+                ordering = [ordering]
+
+        for candidate in (ordering or [])[:1]:
+            field_name = candidate.lstrip('-')
+            if self.is_keyset_field(queryset.model, field_name):
+                return field_name, candidate.startswith('-')
+
+        default = getattr(view, 'keyset_ordering', None) or self.default_ordering
+        return default.lstrip('-'), default.startswith('-')
+
+    @staticmethod
+    def is_keyset_field(model, field_name):
+        try:
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            return False
+        return field.concrete and not field.null and not field.is_relation
+
+    def keyset_q(self, position, descending):
+        value, pk = position
+        lookup = 'lt' if descending else 'gt'
+        return (
+            Q(**{f'{self.order_field}__{lookup}': value}) |
+            Q(**{self.order_field: value, f'pk__{lookup}': pk})
+        )
+
+    def get_capped_count(self, queryset):
+        """Count at most ``count_cap`` rows; larger results report the cap"""
+        count = queryset.order_by()[:self.count_cap + 1].count()
+        if count > self.count_cap:
+            return self.count_cap, True
+        return count, False
+
+    def decode_cursor(self, request):
+        """Return ``(position, reverse)`` from the request's cursor, if any"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+            field = self.model._meta.get_field(self.order_field)
+            value = field.to_python(data['v'])
+            pk = self.model._meta.pk.to_python(data['k'])
+            reverse = bool(data.get('r', False))
+        except (TypeError, ValueError, KeyError, ValidationError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if data.get('o') != self.order_field:
+            raise NotFound(self.invalid_cursor_message)
+        return (value, pk), reverse
+
+    def encode_cursor(self, instance, reverse):
+        value = getattr(instance, self.order_field)
+        payload = {
+            'o': self.order_field,
+            'v': _cursor_value(value),
+            'k': instance.pk,
+        }
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def get_next_cursor(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_cursor(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_next_link(self):
+        cursor = self.get_next_cursor()
+        if cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_previous_link(self):
+        cursor = self.get_previous_cursor()
+        if cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ])
+        if self.count is not None:
+            payload['count'] = self.count
+            payload['count_capped'] = self.count_capped
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer', 'description': f'Only with ?{self.total_query_param}=true, capped at {self.count_cap}'},
+                'count_capped': {'type': 'boolean'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque pagination cursor from a previous response.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Number of results per page (max {self.max_page_size}).',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.total_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Include a total count, capped at {self.count_cap}.',
+                'schema': {'type': 'boolean'},
+            },
+        ]
+
+
+class TimestampKeysetPagination(KeysetPagination):
+    """Keyset pagination for append-only logs ordered by ``timestamp``"""
+    default_ordering = '-timestamp'
@@ -0,0 +1,184 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connection, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from requests_system.models import RequestAttachment
+from .uploads import COPY_BUFFER_SIZE
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_PREFIX = 'attachment_previews'
+TEXT_EXTENSIONS = {'.txt', '.log', '.csv', '.json', '.xml', '.ini', '.cfg', '.conf', '.md', '.yaml', '.yml'}
+TRUNCATED_MARKER = '\n[... truncated ...]\n'
+
+# Suffix of a stored preview and the content type it is served as; ``.none``
+# records content that has no preview so it is not decoded again
+PREVIEW_TYPES = [
+    ('.jpg', 'image/jpeg'),
+    ('.png', 'image/png'),
+    ('.txt', 'text/plain; charset=utf-8'),
+    ('.none', None),
+]
+
+
+def render_thumbnail(handle, size):
+    """A JPEG (or PNG, when the image has transparency) no larger than ``size`` pixels a side, or None"""
+    try:
+        with Image.open(handle) as image:
+            # JPEGs are decoded at a reduced scale, so large photos never expand to full size in memory
+            image.draft('RGB', (size, size))
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((size, size))
+            buffer = io.BytesIO()
+            if image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info):
+                image.convert('RGBA').save(buffer, 'PNG', optimize=True)
+                return buffer.getvalue(), '.png'
+            image.convert('RGB').save(buffer, 'JPEG', quality=80, optimize=True)
+            return buffer.getvalue(), '.jpg'
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError):
+        return None
+
+
+def render_text(handle, filename, limit, max_lines):
+    """The first ``max_lines`` lines (at most ``limit`` bytes) of a text file, or None for binary content"""
+    sample = handle.read(limit + 1)
+    truncated = len(sample) > limit
+    sample = sample[:limit]
+    if b'\0' in sample:
+        return None
+    try:
+        text = sample.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off by the limit is fine; anything else is not text
+        if e.start < len(sample) - 3 and Path(filename).suffix.lower() not in TEXT_EXTENSIONS:
+            return None
+        text = sample.decode('utf-8', errors='replace')
+    lines = text.splitlines()
+    if len(lines) > max_lines:
+        lines, truncated = lines[:max_lines], True
+    text = '\n'.join(lines)
+    if truncated:
+        text += TRUNCATED_MARKER
+    return text.encode('utf-8'), '.txt'
+
+
+class AttachmentPreviewService:
+    """Thumbnails for image attachments and truncated previews of text and logs.
+
+    Previews are stored once per content hash under
+    ``attachment_previews/<hash[:2]>/<hash>.<ext>`` in media storage, so the
+    same screenshot attached to many tickets is decoded once. They are
+    generated by a small worker pool when an attachment is created, or on
+    first request for attachments from before the pipeline existed.
+    """
+
+    _executor = None
+    _executor_lock = threading.Lock()
+    _inflight = set()
+    _inflight_lock = threading.Lock()
+
+    @classmethod
+    def executor(cls):
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'ATTACHMENT_PREVIEW_WORKERS', 2),
+                    thread_name_prefix='attachment-preview',
+                )
+            return cls._executor
+
+    @staticmethod
+    def base_path(content_hash):
+        return Path(default_storage.path(f'{PREVIEW_PREFIX}/{content_hash[:2]}/{content_hash}'))
+
+    @staticmethod
+    def find(content_hash):
+        """``(path, content_type)`` of the stored preview; content type is None when there is no preview"""
+        if not content_hash:
+            return None
+        base = AttachmentPreviewService.base_path(content_hash)
+        for suffix, content_type in PREVIEW_TYPES:
+            path = base.with_name(base.name + suffix)
+            if path.exists():
+                return path, content_type
+        return None
+
+    @classmethod
+    def schedule(cls, attachment_id):
+        """Generate the attachment's preview in the worker pool once the current transaction commits"""
+        transaction.on_commit(lambda: cls._submit(attachment_id))
+
+    @classmethod
+    def _submit(cls, attachment_id):
+        with cls._inflight_lock:
+            if attachment_id in cls._inflight:
+                return
+            cls._inflight.add(attachment_id)
+        cls.executor().submit(cls._generate_in_worker, attachment_id)
+
+    @classmethod
+    def _generate_in_worker(cls, attachment_id):
+        close_old_connections()
+        try:
+            attachment = RequestAttachment.objects.filter(pk=attachment_id).first()
+            if attachment is not None:
+                cls.generate(attachment)
+        except Exception as e:
+            logger.error(f"Error generating preview for attachment {attachment_id}: {str(e)}")
+        finally:
+            with cls._inflight_lock:
+                cls._inflight.discard(attachment_id)
+            connection.close()
+
+    @staticmethod
+    def content_hash(attachment):
+        """The attachment's content hash, computed and saved for files stored before uploads recorded it"""
+        if attachment.content_hash:
+            return attachment.content_hash
+        digest = hashlib.sha256()
+        size = 0
+        with attachment.file.open('rb') as handle:
+            for data in iter(lambda: handle.read(COPY_BUFFER_SIZE), b''):
+                digest.update(data)
+                size += len(data)
+        attachment.content_hash, attachment.size = digest.hexdigest(), size
+        RequestAttachment.objects.filter(pk=attachment.pk).update(content_hash=attachment.content_hash, size=size)
+        return attachment.content_hash
+
+    @staticmethod
+    def generate(attachment):
+        """Store the preview of the attachment's content unless it exists; returns ``find()``'s result"""
+        content_hash = AttachmentPreviewService.content_hash(attachment)
+        existing = AttachmentPreviewService.find(content_hash)
+        if existing:
+            return existing
+
+        size = getattr(settings, 'ATTACHMENT_PREVIEW_SIZE', 320)
+        with attachment.file.open('rb') as handle:
+            rendered = render_thumbnail(handle, size)
+            if rendered is None:
+                handle.seek(0)
+                rendered = render_text(
+                    handle, attachment.filename,
+                    getattr(settings, 'ATTACHMENT_PREVIEW_TEXT_BYTES', 4096),
+                    getattr(settings, 'ATTACHMENT_PREVIEW_TEXT_LINES', 50),
+                )
+        content, suffix = rendered or (b'', '.none')
+
+        base = AttachmentPreviewService.base_path(content_hash)
+        base.parent.mkdir(parents=True, exist_ok=True)
+        path = base.with_name(base.name + suffix)
+        temp = base.with_name(f'{base.name}.{uuid.uuid4().hex}.tmp')
+        temp.write_bytes(content)
+        os.replace(temp, path)
+        return path, dict(PREVIEW_TYPES)[suffix]
@@ -0,0 +1,290 @@
+import calendar
+import csv
+import io
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import ReportJob, ReportSchedule
+from .report_snapshots import ReportSnapshotStore
+
+logger = logging.getLogger(__name__)
+
+PDF_PAGE_WIDTH = 612  # US Letter, in points
+PDF_PAGE_HEIGHT = 792
+PDF_MARGIN = 40
+PDF_FONT_SIZE = 8
+PDF_LEADING = 10
+PDF_LINE_CHARS = int((PDF_PAGE_WIDTH - 2 * PDF_MARGIN) / (PDF_FONT_SIZE * 0.6))  # Courier is 0.6em wide
+PDF_PAGE_LINES = (PDF_PAGE_HEIGHT - 2 * PDF_MARGIN) // PDF_LEADING
+PDF_MAX_COLUMN = 30
+
+
+def format_cell(value):
+    """Text for one table cell; durations are shown in hours"""
+    if value is None:
+        return ''
+    if isinstance(value, timedelta):
+        return f'{value.total_seconds() / 3600:.2f}h'
+    if isinstance(value, float):
+        return f'{value:.2f}'
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def report_tables(report, prefix=''):
+    """Flatten a report dict into ``(title, headers, rows)`` tables.
+
+    Scalars of a section become one field/value table, lists of dicts become a
+    table each and nested dicts are flattened with dotted titles.
+    """
+    tables = []
+    scalars = []
+    for key, value in report.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            tables.extend(report_tables(value, f'{name}.'))
+        elif isinstance(value, list):
+            if value and all(isinstance(row, dict) for row in value):
+                headers = list(dict.fromkeys(column for row in value for column in row))
+                tables.append((name, headers, [[row.get(column) for column in headers] for row in value]))
+            else:
+                tables.append((name, ['value'], [[item] for item in value]))
+        else:
+            scalars.append([key, value])
+    if scalars:
+        tables.insert(0, (prefix.rstrip('.') or 'report', ['field', 'value'], scalars))
+    return tables
+
+
+def render_json(title, report):
+    return json.dumps({'title': title, 'report': report}, indent=2, cls=DjangoJSONEncoder).encode('utf-8')
+
+
+def render_csv(title, report):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([title])
+    for table_title, headers, rows in report_tables(report):
+        writer.writerow([])
+        writer.writerow([table_title])
+        writer.writerow(headers)
+        writer.writerows([format_cell(value) for value in row] for row in rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+def _pdf_text(text):
+    text = text.encode('latin-1', 'replace').decode('latin-1')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def render_pdf(title, report):
+    """Tables laid out in fixed-width text on as many pages as needed"""
+    lines = [(title, True), ('', False)]
+    for table_title, headers, rows in report_tables(report):
+        cells = [headers] + [[format_cell(value) for value in row] for row in rows]
+        widths = [
+            min(max(len(str(row[index])) for row in cells), PDF_MAX_COLUMN) for index in range(len(headers))
+        ]
+        lines.append((table_title, True))
+        for position, row in enumerate(cells):
+            text = '  '.join(str(value)[:width].ljust(width) for value, width in zip(row, widths))
+            lines.append((text.rstrip()[:PDF_LINE_CHARS], position == 0))
+        lines.append(('', False))
+
+    pages = [lines[start:start + PDF_PAGE_LINES] for start in range(0, len(lines), PDF_PAGE_LINES)]
+    # 1 catalog, 2 page tree, 3 and 4 fonts, then a page and a content stream per page
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        ('<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            ' '.join(f'{5 + 2 * index} 0 R' for index in range(len(pages))), len(pages),
+        )).encode(),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier-Bold /Encoding /WinAnsiEncoding >>',
+    ]
+    for index, page in enumerate(pages):
+        stream = [f'BT /F1 {PDF_FONT_SIZE} Tf {PDF_LEADING} TL {PDF_MARGIN} {PDF_PAGE_HEIGHT - PDF_MARGIN} Td']
+        for text, bold in page:
+            stream.append(f"/{'F2' if bold else 'F1'} {PDF_FONT_SIZE} Tf ({_pdf_text(text)}) Tj T*")
+        stream.append('ET')
+        content = '\n'.join(stream).encode('latin-1')
+        objects.append((
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PDF_PAGE_WIDTH} {PDF_PAGE_HEIGHT}] '
+            f'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {6 + 2 * index} 0 R >>'
+        ).encode())
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(content), content))
+
+    output = io.BytesIO()
+    output.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+    xref = output.tell()
+    output.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    output.writelines(b'%010d 00000 n \n' % offset for offset in offsets)
+    output.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return output.getvalue()
+
+
+RENDERERS = {
+    'json': (render_json, 'application/json'),
+    'csv': (render_csv, 'text/csv'),
+    'pdf': (render_pdf, 'application/pdf'),
+}
+
+
+class ReportJobService:
+    """Generates reports in a pool of worker threads and keeps the artifacts on disk.
+
+    ``enqueue`` only records a ``ReportJob``; once the transaction commits the
+    job is handed to the pool, which reads the report through
+    ``ReportSnapshotStore`` (computing it when needed) and writes the
+    rendered file under ``REPORT_ROOT``. Workers claim a job by moving it from
+    pending to running in one UPDATE, so a job is never generated twice.
+    ``run_report_schedules`` enqueues due schedules and picks up jobs whose
+    process died before a worker started them.
+    """
+
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    @staticmethod
+    def generate(report_type, user, parameters):
+        return ReportSnapshotStore.get(
+            report_type, user, int(parameters.get('days', 30)),
+            period=parameters.get('period'), target_user_id=parameters.get('user_id'),
+        )
+
+    @classmethod
+    def executor(cls):
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'REPORT_WORKERS', 2), thread_name_prefix='report',
+                )
+            return cls._executor
+
+    @staticmethod
+    def enqueue(user, report_type, fmt='pdf', parameters=None, schedule=None, run_async=True):
+        """Record a job and hand it to the worker pool after commit"""
+        job = ReportJob.objects.create(
+            report_type=report_type, format=fmt, parameters=parameters or {},
+            requested_by=user, schedule=schedule,
+        )
+        if run_async:
+            transaction.on_commit(lambda: ReportJobService.executor().submit(ReportJobService._run_in_worker, job.pk))
+        else:
+            ReportJobService.run(job)
+        return job
+
+    @staticmethod
+    def _run_in_worker(job_id):
+        close_old_connections()
+        try:
+            ReportJobService.run(ReportJob.objects.select_related('requested_by').get(pk=job_id))
+        except Exception as e:
+            logger.error(f"Error running report job {job_id}: {str(e)}")
+        finally:
+            connection.close()
+
+    @staticmethod
+    def run(job):
+        """Generate and render ``job`` unless another worker already claimed it"""
+        started_at = timezone.now()
+        if not ReportJob.objects.filter(pk=job.pk, status='pending').update(status='running', started_at=started_at):
+            job.refresh_from_db()
+            return job
+        job.status, job.started_at = 'running', started_at
+
+        try:
+            report = ReportJobService.generate(job.report_type, job.requested_by, job.parameters)
+            render, _ = RENDERERS[job.format]
+            period = job.parameters.get('period') or f"{job.parameters.get('days', 30)} days"
+            title = f"{job.get_report_type_display()} report ({period})"
+            content = render(title, report)
+
+            settings.REPORT_ROOT.mkdir(parents=True, exist_ok=True)
+            job.filename = f'report_{job.pk}_{job.report_type}.{job.format}'
+            temp = job.path.with_name(job.filename + '.tmp')
+            temp.write_bytes(content)
+            os.replace(temp, job.path)
+        except Exception as e:
+            logger.error(f"Error generating report job {job.pk}: {str(e)}")
+            job.status = 'failed'
+            job.error = str(e)
+            job.completed_at = timezone.now()
+            job.save(update_fields=['status', 'error', 'completed_at'])
+            return job
+
+        job.status = 'completed'
+        job.size = len(content)
+        job.completed_at = timezone.now()
+        job.save(update_fields=['status', 'filename', 'size', 'completed_at'])
+        logger.info(f"Report job {job.pk} completed: {job.size} bytes")
+        return job
+
+    @staticmethod
+    def next_run(frequency, after, day=None):
+        """The occurrence following ``after``; monthly runs fall on ``day`` (default ``after``'s day)"""
+        if frequency == 'daily':
+            return after + timedelta(days=1)
+        if frequency == 'weekly':
+            return after + timedelta(weeks=1)
+        year, month = (after.year + 1, 1) if after.month == 12 else (after.year, after.month + 1)
+        return after.replace(year=year, month=month, day=min(day or after.day, calendar.monthrange(year, month)[1]))
+
+    @staticmethod
+    def run_due_schedules(now=None, run_async=False):
+        """Enqueue one job per due schedule; returns the jobs.
+
+        Each schedule is advanced past ``now`` with a conditional UPDATE first,
+        so concurrent runners never enqueue the same occurrence twice and missed
+        occurrences are not replayed.
+        """
+        now = now or timezone.now()
+        jobs = []
+        due = ReportSchedule.objects.filter(is_active=True, next_run_at__lte=now).select_related('created_by')
+        for schedule in due:
+            next_run_at = schedule.next_run_at
+            while next_run_at <= now:
+                next_run_at = ReportJobService.next_run(schedule.frequency, next_run_at, schedule.day_of_month)
+            claimed = ReportSchedule.objects.filter(pk=schedule.pk, next_run_at=schedule.next_run_at).update(
+                next_run_at=next_run_at, last_run_at=now,
+            )
+            if claimed:
+                jobs.append(ReportJobService.enqueue(
+                    schedule.created_by, schedule.report_type, schedule.format, schedule.parameters,
+                    schedule=schedule, run_async=run_async,
+                ))
+        return jobs
+
+    @staticmethod
+    def run_stale(now=None):
+        """Recover jobs left behind by dead processes; returns the count.
+
+        Pending jobs no worker started within ``REPORT_PENDING_GRACE`` are run
+        here, and jobs still running after ``REPORT_RUNNING_TIMEOUT`` are marked
+        failed so clients stop waiting for them.
+        """
+        now = now or timezone.now()
+        cutoff = now - timedelta(seconds=getattr(settings, 'REPORT_PENDING_GRACE', 300))
+        stale = list(ReportJob.objects.filter(status='pending', created_at__lt=cutoff).select_related('requested_by'))
+        for job in stale:
+            ReportJobService.run(job)
+        timeout = getattr(settings, 'REPORT_RUNNING_TIMEOUT', 1800)
+        stuck = ReportJob.objects.filter(status='running', started_at__lt=now - timedelta(seconds=timeout)).update(
+            status='failed', error=f'Report generation did not finish within {timeout} seconds', completed_at=now,
+        )
+        if stuck:
+            logger.warning(f"Marked {stuck} stuck report jobs as failed")
+        return len(stale) + stuck
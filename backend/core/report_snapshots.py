@@ -0,0 +1,122 @@
+import json
+import logging
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from analytics.reporting import ReportingService
+from .models import ReportDataVersion
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = 'snapshots'
+ROLLING_PREFIX = 'last-'
+PERIOD_ERROR = 'period must be a month that has started, as YYYY-MM'
+
+# Tables each report reads; a write to any of them starts a new data version
+REPORT_SOURCES = {
+    'dashboard': ['requests_system.SupportRequest', 'tasks.Task', 'inventory.Equipment'],
+    'equipment': ['inventory.Equipment', 'inventory.MaintenanceSchedule', 'inventory.Location'],
+    'user_activity': ['analytics.WorkflowLog'],
+}
+
+# Sections that describe the present rather than the period; final snapshots leave them out
+LIVE_SECTIONS = {
+    'equipment': ['maintenance_schedule'],
+}
+
+
+class ReportSnapshotStore:
+    """Report results stored as JSON files keyed by (type, scope, period, data version).
+
+    A closed calendar month is computed once and served from its ``final``
+    snapshot from then on, without the sections that only describe the
+    present. Open periods (the current month and rolling "last N days"
+    windows) are keyed by the data version of the tables the report reads, so
+    they are recomputed only after one of those tables was written. Reports are returned in their JSON form whether they were just
+    computed or read from disk.
+    """
+
+    @staticmethod
+    def root():
+        return settings.REPORT_ROOT / SNAPSHOT_DIR
+
+    @staticmethod
+    def period_bounds(period, now=None):
+        """``(start, end, closed)`` for a ``YYYY-MM`` month; raises ``ValueError`` for bad or future months"""
+        now = now or timezone.now()
+        start = timezone.make_aware(datetime.strptime(period, '%Y-%m'))
+        next_start = (start + timedelta(days=32)).replace(day=1)
+        if start > now:
+            raise ValueError(f'Period {period} has not started')
+        closed = next_start <= now
+        return start, (next_start - timedelta(microseconds=1)) if closed else now, closed
+
+    @staticmethod
+    def compute(report_type, user, days, start_date=None, end_date=None, target_user_id=None):
+        if report_type == 'dashboard':
+            return ReportingService.generate_dashboard_report(user, days, start_date, end_date)
+        if report_type == 'equipment':
+            return ReportingService.generate_equipment_report(user, days, start_date, end_date)
+        if report_type == 'user_activity':
+            return ReportingService.generate_user_activity_report(user, target_user_id, days, start_date, end_date)
+        raise ValueError(f'Unknown report type: {report_type}')
+
+    @staticmethod
+    def get(report_type, user, days=30, period=None, target_user_id=None, now=None):
+        """The report from its snapshot, computing and storing it when there is none"""
+        now = now or timezone.now()
+        scope = ReportingService.report_scope(report_type, user, target_user_id)
+        if period:
+            start_date, end_date, closed = ReportSnapshotStore.period_bounds(period, now)
+            days = (end_date.date() - start_date.date()).days + 1
+        else:
+            start_date = end_date = None
+            closed = False
+            period = f'{ROLLING_PREFIX}{days}d-{timezone.localdate(now).isoformat()}'
+
+        # Read before computing: a write during the computation leaves this
+        # snapshot under the old version and the next request recomputes
+        version = 'final' if closed else ReportDataVersion.current(REPORT_SOURCES[report_type])
+        directory = ReportSnapshotStore.root() / report_type / scope / period
+        path = directory / f'{version}.json'
+        try:
+            return json.loads(path.read_bytes())
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            logger.error(f"Error reading report snapshot {path}: {str(e)}")
+
+        report = ReportSnapshotStore.compute(report_type, user, days, start_date, end_date, target_user_id)
+        if closed:
+            for section in LIVE_SECTIONS.get(report_type, []):
+                report.pop(section, None)
+        content = json.dumps(report, cls=DjangoJSONEncoder).encode('utf-8')
+        directory.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f'{path.name}.{uuid.uuid4().hex}.tmp')
+        temp.write_bytes(content)
+        os.replace(temp, path)
+        # Older versions of this period (or its versions from before it closed) are never read again
+        for stale in directory.glob('*.json'):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        return json.loads(content)
+
+    @staticmethod
+    def purge_expired(now=None):
+        """Remove rolling-window snapshots from previous days; returns the directories removed"""
+        today = timezone.localdate(now or timezone.now()).isoformat()
+        root = ReportSnapshotStore.root()
+        if not root.is_dir():
+            return 0
+        removed = 0
+        for directory in root.glob(f'*/*/{ROLLING_PREFIX}*'):
+            if directory.is_dir() and not directory.name.endswith(today):
+                shutil.rmtree(directory, ignore_errors=True)
+                removed += 1
+        return removed
@@ -1,47 +1,165 @@
+from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.http import HttpResponse
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from authentication.permission_engine import PermissionEngine
+
+from .models import REPORT_FORMAT_CHOICES, REPORT_TYPE_CHOICES, ReportJob, ReportSchedule
+from .report_jobs import RENDERERS, ReportJobService
+from .report_snapshots import PERIOD_ERROR, ReportSnapshotStore
+
+MAX_REPORT_DAYS = 365
+
+
+def _report_job_data(job):
+    return {
+        'id': job.id,
+        'report_type': job.report_type,
+        'format': job.format,
+        'parameters': job.parameters,
+        'status': job.status,
+        'size': job.size,
+        'error': job.error,
+        'schedule': job.schedule_id,
+        'created_at': job.created_at.isoformat(),
+        'completed_at': job.completed_at.isoformat() if job.completed_at else None,
+        'download_url': f'/api/reports/{job.id}/download/' if job.status == 'completed' else None,
+    }
+
+
+def _report_schedule_data(schedule):
+    return {
+        'id': schedule.id,
+        'report_type': schedule.report_type,
+        'format': schedule.format,
+        'parameters': schedule.parameters,
+        'frequency': schedule.frequency,
+        'next_run_at': schedule.next_run_at.isoformat(),
+        'last_run_at': schedule.last_run_at.isoformat() if schedule.last_run_at else None,
+        'is_active': schedule.is_active,
+    }
+
+
+def report_target_user_id(user, user_id):
+    """The user whose activity ``user`` may report on: anyone with ``generate_reports``, otherwise themselves"""
+    if user_id is None or int(user_id) == user.pk or PermissionEngine.has(user, 'generate_reports'):
+        return user_id
+    return user.pk
+
+
+def _parse_report_request(payload, user):
+    """``(report_type, format, parameters)`` from a request body, or an error message"""
+    report_type = payload.get('report_type') or payload.get('type') or 'dashboard'
+    fmt = (payload.get('format') or 'pdf').lower()
+    if report_type not in dict(REPORT_TYPE_CHOICES):
+        return None, f'Unknown report type: {report_type}'
+    if fmt not in dict(REPORT_FORMAT_CHOICES):
+        return None, f'Unsupported format: {fmt}'
+    try:
+        days = int(payload.get('days', 30))
+    except (TypeError, ValueError):
+        return None, 'days must be an integer'
+    if not 1 <= days <= MAX_REPORT_DAYS:
+        return None, f'days must be between 1 and {MAX_REPORT_DAYS}'
+
+    parameters = {'days': days}
+    if payload.get('period'):
+        try:
+            ReportSnapshotStore.period_bounds(str(payload['period']))
+        except ValueError:
+            return None, PERIOD_ERROR
+        parameters['period'] = str(payload['period'])
+    if report_type == 'user_activity' and payload.get('user_id'):
+        try:
+            parameters['user_id'] = report_target_user_id(user, int(payload['user_id']))
+        except (TypeError, ValueError):
+            return None, 'user_id must be an integer'
+    return (report_type, fmt, parameters), None
+
 
 @extend_schema(request=None, responses=OpenApiResponse(description='Start asynchronous report generation'))
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def report_generate(request):
-    payload = request.data or {}
-    fmt = (payload.get('format') or 'pdf').lower()
-    rid = int(timezone.now().strftime('%H%M%S'))
-    download_url = f"/api/reports/{rid}/download/?format={fmt}"
-    return Response({'message': 'Report generation started', 'download_url': download_url})
+    """Queue a report for the worker pool; poll the history for its status"""
+    parsed, error = _parse_report_request(request.data or {}, request.user)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    report_type, fmt, parameters = parsed
+
+    job = ReportJobService.enqueue(request.user, report_type, fmt, parameters)
+    return Response(
+        {
+            'message': 'Report generation started',
+            'job': _report_job_data(job),
+            'download_url': f'/api/reports/{job.id}/download/',
+        },
+        status=status.HTTP_202_ACCEPTED,
+    )
 
 @extend_schema(request=None, responses=OpenApiResponse(description='List generated reports'))
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def report_history(request):
-    # Return empty history stub
-    return Response({'results': []})
+    jobs = ReportJob.objects.filter(requested_by=request.user)
+    job_status = request.GET.get('status')
+    if job_status:
+        jobs = jobs.filter(status=job_status)
+    return Response({'results': [_report_job_data(job) for job in jobs[:100]]})
 
 @extend_schema(request=None, responses=OpenApiResponse(description='Download generated report'))
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def report_download(request, report_id: int):
-    fmt = (request.GET.get('format') or 'pdf').lower()
-    if fmt == 'csv':
-        content = 'section,value\nsummary,ok\n'.encode('utf-8')
-        resp = HttpResponse(content, content_type='text/csv')
-        resp['Content-Disposition'] = f'attachment; filename="report_{report_id}.csv"'
-        return resp
-    elif fmt == 'json':
-        return Response({'report_id': report_id, 'generated_at': timezone.now().isoformat(), 'data': {}})
-    # default PDF placeholder
-    content = b'%PDF-1.4\n% stub pdf content\n'
-    resp = HttpResponse(content, content_type='application/pdf')
-    resp['Content-Disposition'] = f'attachment; filename="report_{report_id}.pdf"'
-    return resp
+    """Stream a finished report; 409 while it is still being generated"""
+    job = get_object_or_404(ReportJob, pk=report_id, requested_by=request.user)
+    if job.status != 'completed':
+        return Response(
+            {'error': f'Report is {job.status}', 'job': _report_job_data(job)}, status=status.HTTP_409_CONFLICT,
+        )
+    if not job.path.is_file():
+        return Response({'error': 'Report file is missing'}, status=status.HTTP_404_NOT_FOUND)
+    return FileResponse(
+        open(job.path, 'rb'), as_attachment=True, filename=job.filename, content_type=RENDERERS[job.format][1],
+    )
 
 @extend_schema(request=None, responses=OpenApiResponse(description='Schedule periodic report generation'))
-@api_view(['POST'])
+@api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def report_schedule(request):
-    return Response({'message': 'Report scheduled successfully'})
+    """List the user's schedules, or register a recurring report"""
+    if request.method == 'GET':
+        schedules = ReportSchedule.objects.filter(created_by=request.user)
+        return Response({'results': [_report_schedule_data(schedule) for schedule in schedules]})
+
+    payload = request.data or {}
+    parsed, error = _parse_report_request(payload, request.user)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    report_type, fmt, parameters = parsed
+
+    frequency = payload.get('frequency', 'daily')
+    if frequency not in dict(ReportSchedule.FREQUENCY_CHOICES):
+        return Response({'error': f'Unknown frequency: {frequency}'}, status=status.HTTP_400_BAD_REQUEST)
+    next_run_at = timezone.now()
+    if payload.get('start_at'):
+        next_run_at = parse_datetime(str(payload['start_at']))
+        if next_run_at is None:
+            return Response({'error': 'start_at must be an ISO 8601 datetime'}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(next_run_at):
+            next_run_at = timezone.make_aware(next_run_at)
+
+    schedule = ReportSchedule.objects.create(
+        report_type=report_type, format=fmt, parameters=parameters, frequency=frequency,
+        next_run_at=next_run_at, created_by=request.user,
+    )
+    return Response(
+        {'message': 'Report scheduled successfully', 'schedule': _report_schedule_data(schedule)},
+        status=status.HTTP_201_CREATED,
+    )
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+
+from analytics.models import WorkflowLog
+from inventory.models import Equipment, Location, MaintenanceSchedule
+from requests_system.models import RequestAttachment, SupportRequest
+from tasks.models import Task
+from .previews import AttachmentPreviewService
+from .models import ReportDataVersion
+
+
+def bump_report_data_version(sender, **kwargs):
+    """Open-period report snapshots of tables that changed are recomputed on next use"""
+    ReportDataVersion.bump(sender._meta.label)
+
+
+for model in (SupportRequest, Task, Equipment, MaintenanceSchedule, Location, WorkflowLog):
+    post_save.connect(
+        bump_report_data_version, sender=model, dispatch_uid=f'report_data_version_save_{model._meta.label}',
+    )
+    post_delete.connect(
+        bump_report_data_version, sender=model, dispatch_uid=f'report_data_version_delete_{model._meta.label}',
+    )
+
+
+def schedule_attachment_preview(sender, instance, created, **kwargs):
+    """New attachments get their thumbnail or text preview generated in the background"""
+    if created:
+        AttachmentPreviewService.schedule(instance.pk)
+
+
+post_save.connect(schedule_attachment_preview, sender=RequestAttachment, dispatch_uid='attachment_preview_schedule')
@@ -0,0 +1,443 @@
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import CASCADE, SET_NULL, QuerySet
+from django.utils import timezone
+
+from analytics.models import WorkflowLog
+from authentication.models import CustomUser
+from authentication.signals import DEFAULT_ROLE_GROUP, ROLE_GROUPS
+from inventory.models import Department, Equipment, EquipmentCategory, Location
+from requests_system.models import RequestCategory, SupportRequest
+from tasks.models import ITPersonnel, Task
+from .activity_logger import ActivityLog
+from .models import ReportDataVersion
+
+# Generated rows carry these prefixes so they can be told apart and cleared
+USERNAME_PREFIX = 'syn_'
+ASSET_TAG_PREFIX = 'SYN-EQ-'
+TICKET_PREFIX = 'SYN'
+PASSWORD = 'password123'
+CLEAR_CHUNK_SIZE = 1000  # generated requests (or equipment) deleted per transaction by clear()
+# Report source tables written with bulk operations, which send no signals
+REPORT_MODELS = (SupportRequest, Task, Equipment, WorkflowLog)
+
+SCALES = {
+    'small': {'users': 50, 'equipment': 500, 'requests': 5000, 'tasks': 10000, 'activity_logs': 50000},
+    'medium': {'users': 200, 'equipment': 5000, 'requests': 100000, 'tasks': 200000, 'activity_logs': 1000000},
+    'hospital': {'users': 500, 'equipment': 50000, 'requests': 1000000, 'tasks': 2000000, 'activity_logs': 10000000},
+}
+
+# Relative weights; a JSON file passed to generate_dataset can override any of them
+DEFAULT_DISTRIBUTIONS = {
+    'roles': {'end_user': 80, 'technician': 12, 'senior_technician': 5, 'it_manager': 2, 'system_admin': 1},
+    'departments': {
+        'operations': 30, 'administration': 15, 'customer_service': 12, 'facilities': 10, 'finance': 8,
+        'human_resources': 6, 'it': 8, 'legal': 2, 'marketing': 3, 'sales': 2, 'other': 4,
+    },
+    'priorities': {'critical': 3, 'high': 17, 'medium': 55, 'low': 25},
+    'channels': {'web_portal': 55, 'phone': 20, 'email': 15, 'walk_in': 5, 'mobile_app': 3, 'chat': 2},
+    'request_statuses': {
+        'pending': 4, 'open': 6, 'assigned': 5, 'in_progress': 7, 'pending_user': 2, 'escalated': 1,
+        'resolved': 40, 'closed': 33, 'cancelled': 2,
+    },
+    'sla_outcomes': {'met': 85, 'breached': 15},
+    'task_statuses': {'pending': 5, 'assigned': 8, 'in_progress': 10, 'completed': 72, 'cancelled': 5},
+    'equipment_statuses': {
+        'active': 82, 'maintenance': 6, 'checked_out': 4, 'broken': 3, 'reserved': 2, 'retired': 2, 'lost': 1,
+    },
+    'activity_actions': {'update': 35, 'status_change': 20, 'comment': 20, 'assign': 10, 'read': 10, 'escalated': 5},
+}
+
+# Same targets as WorkflowEngine._set_sla_deadlines
+SLA_HOURS = {'critical': 2, 'high': 8, 'medium': 24, 'low': 72}
+CLOSED_STATUSES = {'resolved', 'closed', 'cancelled'}
+ALLOWED_VALUES = {
+    'roles': dict(CustomUser.ROLE_CHOICES),
+    'departments': dict(CustomUser.DEPARTMENT_CHOICES),
+    'priorities': dict(SupportRequest.PRIORITY_CHOICES),
+    'channels': dict(SupportRequest.CHANNEL_CHOICES),
+    'request_statuses': dict(SupportRequest.STATUS_CHOICES),
+    'sla_outcomes': {'met': 'Met', 'breached': 'Breached'},
+    'task_statuses': dict(Task.STATUS_CHOICES),
+    'equipment_statuses': dict(Equipment.STATUS_CHOICES),
+    'activity_actions': dict(ActivityLog.ACTION_TYPES),
+}
+
+HOSPITAL_DEPARTMENTS = [
+    'Emergency Department', 'Cardiology', 'Radiology', 'Pharmacy', 'Laboratory', 'Oncology', 'Pediatrics',
+    'Surgery', 'Intensive Care', 'Maternity', 'Nursing', 'Administration', 'IT Department',
+]
+BUILDINGS = ['Main Hospital', 'Medical Center', 'Outpatient Clinic', 'Lab Building', 'Admin Building']
+EQUIPMENT_CATEGORIES = [
+    ('Computers', 'Dell', ['OptiPlex 7090', 'Latitude 5520', 'Precision 3660']),
+    ('Network Equipment', 'Cisco', ['Catalyst 2960-X', 'Catalyst 9200', 'Meraki MR46']),
+    ('Medical Devices', 'GE Healthcare', ['CARESCAPE B850', 'Dash 4000', 'MAC 2000']),
+    ('Printers', 'HP', ['LaserJet M404dn', 'LaserJet M507', 'Color LaserJet M555']),
+    ('Servers', 'HPE', ['ProLiant DL380', 'ProLiant DL360', 'Synergy 480']),
+    ('Mobile Devices', 'Apple', ['iPad Pro', 'iPhone 14', 'iPad Air']),
+    ('Monitors', 'Philips', ['242B1', '272B8QJEB', 'Brilliance 499P']),
+]
+REQUEST_CATEGORIES = [
+    ('Hardware Issue', 'hardware', 24), ('Software Issue', 'software', 24), ('Network Issue', 'network', 8),
+    ('Account Access', 'access', 8), ('Email Issue', 'email', 24), ('Security Incident', 'security', 4),
+    ('Training Request', 'training', 72), ('Maintenance', 'maintenance', 48),
+]
+ISSUES = [
+    ('{device} will not start', 'The {device} in {place} does not power on.'),
+    ('{device} is very slow', 'Opening patient records on the {device} in {place} takes minutes.'),
+    ('Printer jam in {place}', 'The printer in {place} keeps jamming and shows an error.'),
+    ('Cannot log in to the EHR', 'Login fails with an invalid credentials message since this morning.'),
+    ('Wifi drops in {place}', 'Wireless connection drops every few minutes in {place}.'),
+    ('Email not syncing', 'New messages are not arriving on the {device}.'),
+    ('Monitor flickering', 'The monitor attached to the {device} in {place} flickers and goes black.'),
+    ('Suspicious email received', 'A staff member in {place} received an email asking for their password.'),
+    ('Software installation request', 'Please install the imaging viewer on the {device} in {place}.'),
+]
+TASK_TITLES = ['Diagnose fault', 'Replace part', 'Reinstall software', 'Update drivers', 'On-site visit',
+               'Escalate to vendor', 'Verify fix with user', 'Reconfigure network port']
+
+
+class Weighted:
+    """Seeded weighted choice over a ``{value: weight}`` mapping"""
+
+    def __init__(self, rng, weights):
+        self.rng = rng
+        self.values = list(weights)
+        self.weights = [weights[value] for value in self.values]
+
+    def pick(self):
+        return self.rng.choices(self.values, self.weights)[0]
+
+
+@contextmanager
+def keep_timestamps(*models):
+    """Let bulk inserts keep the generated ``auto_now``/``auto_now_add`` values"""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def spread(total, done, size, count):
+    """How many of ``total`` children belong to parents ``done..done+size`` of ``count``, so sums are exact"""
+    return round(total * (done + size) / count) - round(total * done / count)
+
+
+def delete_rows(model, rows):
+    """Delete ``rows`` (a queryset or primary keys of ``model``) and what cascades from them.
+
+    Applies the CASCADE and SET_NULL rules of the foreign keys pointing at
+    ``model`` with one statement per table, without loading rows or sending
+    signals; callers bump the report data versions themselves.
+    """
+    if not isinstance(rows, QuerySet):
+        rows = model._base_manager.filter(pk__in=rows)
+    for relation in model._meta.related_objects:
+        related = relation.related_model._base_manager.filter(**{f'{relation.field.name}__in': rows})
+        if relation.on_delete is CASCADE:
+            delete_rows(relation.related_model, related)
+        elif relation.on_delete is SET_NULL:
+            related.update(**{relation.field.name: None})
+    # Private ORM API (Django 4.2): a single DELETE, no collector
+    return rows._raw_delete(rows.db)
+
+
+class SyntheticDataGenerator:
+    """Deterministic, hospital-shaped datasets for load tests and benchmarks.
+
+    Rows are written with ``bulk_create`` in batches, so ``save()`` overrides
+    (equipment QR codes, ticket numbering) and signals never run; the values
+    they would compute are generated directly. The same seed, counts,
+    distributions and anchor date always produce the same rows. Support
+    requests are generated in batches together with their tasks and logs, so
+    memory stays flat however many rows are requested.
+    """
+
+    def __init__(self, seed=1, anchor=None, days=365, batch_size=5000, distributions=None, stdout=None):
+        self.rng = random.Random(seed)
+        anchor = anchor or timezone.localdate()
+        self.anchor = timezone.make_aware(datetime.combine(anchor, time()))
+        self.days = days
+        self.batch_size = batch_size
+        self.stdout = stdout
+        merged = {key: dict(value) for key, value in DEFAULT_DISTRIBUTIONS.items()}
+        for key, weights in (distributions or {}).items():
+            if key not in merged:
+                raise ValueError(f'Unknown distribution: {key}')
+            if not isinstance(weights, dict) or not weights:
+                raise ValueError(f'Distribution {key} must map values to weights')
+            unknown = sorted(set(weights) - set(ALLOWED_VALUES[key]))
+            if unknown:
+                raise ValueError(f'Distribution {key} has unknown values: {", ".join(unknown)}')
+            if any(not isinstance(weight, (int, float)) or weight < 0 for weight in weights.values()) \
+                    or not sum(weights.values()):
+                raise ValueError(f'Distribution {key} needs non-negative weights that are not all zero')
+            merged[key] = weights
+        self.pick = {key: Weighted(self.rng, value) for key, value in merged.items()}
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def moment(self, start=None, end=None):
+        """A random time between ``start`` (default: ``days`` before the anchor) and ``end`` (the anchor)"""
+        end = end or self.anchor
+        start = start or end - timedelta(days=self.days)
+        return start + timedelta(seconds=self.rng.uniform(0, max((end - start).total_seconds(), 0)))
+
+    def before_anchor(self, moment):
+        return min(moment, self.anchor)
+
+    @staticmethod
+    def clear():
+        """Delete previously generated rows, with the logs that point at them by id.
+
+        Requests and equipment go in chunks of plain DELETEs (see ``delete_rows``)
+        rather than through the ORM collector, which would load every row and
+        send its post_delete signals. The few generated users go through the ORM.
+        """
+        request_type = ContentType.objects.get_for_model(SupportRequest)
+        generated = SupportRequest.objects.filter(ticket_number__startswith=TICKET_PREFIX)
+        while ids := list(generated.values_list('pk', flat=True)[:CLEAR_CHUNK_SIZE]):
+            with transaction.atomic():
+                delete_rows(ActivityLog, ActivityLog.objects.filter(content_type=request_type, object_id__in=ids))
+                delete_rows(WorkflowLog, WorkflowLog.objects.filter(object_type='request', object_id__in=ids))
+                delete_rows(SupportRequest, ids)
+
+        equipment = Equipment.objects.filter(asset_tag__startswith=ASSET_TAG_PREFIX)
+        while ids := list(equipment.values_list('pk', flat=True)[:CLEAR_CHUNK_SIZE]):
+            with transaction.atomic():
+                delete_rows(Equipment, ids)
+
+        CustomUser.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        ReportDataVersion.bump(*(model._meta.label for model in REPORT_MODELS))
+
+    def generate(self, users, equipment, requests, tasks, activity_logs):
+        """Generate the dataset; returns the number of rows created per model"""
+        counts = {}
+        with keep_timestamps(CustomUser, Equipment, SupportRequest, Task, ITPersonnel):
+            reference = self.create_reference_data()
+            people = self.create_users(users)
+            counts['users'] = len(people['all'])
+            counts['equipment'] = self.create_equipment(equipment, reference['locations'], reference['equipment_categories'])
+            counts.update(self.create_requests(requests, tasks, activity_logs, people, reference))
+
+        # Signals were skipped; open-period report snapshots must not outlive this data
+        ReportDataVersion.bump(*(model._meta.label for model in REPORT_MODELS))
+        return counts
+
+    def create_reference_data(self):
+        departments = [
+            Department.objects.get_or_create(name=name, defaults={'description': f'{name} (synthetic)'})[0]
+            for name in HOSPITAL_DEPARTMENTS
+        ]
+        locations = []
+        for index, department in enumerate(departments):
+            for floor in range(1, 4):
+                locations.append(Location.objects.get_or_create(
+                    building=BUILDINGS[index % len(BUILDINGS)], floor=f'Floor {floor}',
+                    room=f'{department.name} {floor}{index:02d}', defaults={'department': department},
+                )[0])
+        equipment_categories = [
+            (EquipmentCategory.objects.get_or_create(name=name)[0], manufacturer, models)
+            for name, manufacturer, models in EQUIPMENT_CATEGORIES
+        ]
+        request_categories = [
+            RequestCategory.objects.get_or_create(name=name, defaults={'category_type': kind, 'sla_hours': hours})[0]
+            for name, kind, hours in REQUEST_CATEGORIES
+        ]
+        return {
+            'locations': locations,
+            'equipment_categories': equipment_categories,
+            'request_categories': request_categories,
+            'request_content_type': ContentType.objects.get_for_model(SupportRequest),
+        }
+
+    def create_users(self, count):
+        password = make_password(PASSWORD)
+        rows = []
+        for index in range(1, count + 1):
+            # The first users cover every role, so small datasets still have staff
+            role = list(DEFAULT_DISTRIBUTIONS['roles'])[index - 1] if index <= 5 else self.pick['roles'].pick()
+            group_name, is_staff, is_superuser = ROLE_GROUPS.get(role, DEFAULT_ROLE_GROUP)
+            joined = self.moment(end=self.anchor - timedelta(days=self.days))
+            rows.append(CustomUser(
+                username=f'{USERNAME_PREFIX}user_{index:05d}', email=f'{USERNAME_PREFIX}user_{index:05d}@hospital.test',
+                first_name=f'User{index}', last_name=role.replace('_', ' ').title().replace(' ', ''),
+                role=role, department='it' if role != 'end_user' else self.pick['departments'].pick(),
+                employee_id=f'SYN{index:06d}', password=password, is_active=True, is_approved=True,
+                is_email_verified=True, is_staff=is_staff, is_superuser=is_superuser,
+                date_joined=joined, created_at=joined, updated_at=joined,
+            ))
+        users = CustomUser.objects.bulk_create(rows, batch_size=self.batch_size)
+
+        # What the post_save signal would have done: one group per role
+        groups = {}
+        memberships = []
+        for user in users:
+            name = ROLE_GROUPS.get(user.role, DEFAULT_ROLE_GROUP)[0]
+            if name not in groups:
+                groups[name] = Group.objects.get_or_create(name=name)[0]
+            memberships.append(CustomUser.groups.through(customuser_id=user.pk, group_id=groups[name].pk))
+        CustomUser.groups.through.objects.bulk_create(memberships, batch_size=self.batch_size)
+
+        staff = [user for user in users if user.role != 'end_user']
+        personnel = ITPersonnel.objects.bulk_create([
+            ITPersonnel(
+                user=user, employee_id=f'SYN-T{user.pk:06d}', department='it',
+                skill_level='senior' if user.role in ('senior_technician', 'it_manager') else 'intermediate',
+                specializations='Desktop Support, Networking', phone='555-0000',
+                max_concurrent_tasks=8 if user.role == 'senior_technician' else 5, created_at=user.created_at,
+            )
+            for user in staff
+        ], batch_size=self.batch_size)
+        self.log(f'Created {len(users)} users ({len(staff)} IT staff)')
+        end_users = [user for user in users if user.role == 'end_user'] or users
+        return {'all': users, 'end_users': end_users, 'staff': staff or users, 'personnel': personnel}
+
+    def create_equipment(self, count, locations, categories):
+        created = 0
+        for start in range(0, count, self.batch_size):
+            rows = []
+            for index in range(start + 1, min(start + self.batch_size, count) + 1):
+                category, manufacturer, models = self.rng.choice(categories)
+                model = self.rng.choice(models)
+                purchased = self.moment(end=self.anchor).date() - timedelta(days=self.rng.randint(0, 5 * 365))
+                added = self.moment()
+                rows.append(Equipment(
+                    name=f'{manufacturer} {model}', asset_tag=f'{ASSET_TAG_PREFIX}{index:07d}',
+                    serial_number=f'SN{self.rng.getrandbits(40):012X}', model=model, manufacturer=manufacturer,
+                    category=category, location=self.rng.choice(locations), status=self.pick['equipment_statuses'].pick(),
+                    priority=self.pick['priorities'].pick(), purchase_date=purchased,
+                    warranty_expiry=purchased + timedelta(days=self.rng.choice([365, 730, 1095])),
+                    created_at=added, updated_at=added,
+                ))
+            with transaction.atomic():
+                Equipment.objects.bulk_create(rows, batch_size=self.batch_size)
+            created += len(rows)
+        self.log(f'Created {created} equipment items')
+        return created
+
+    def build_request(self, number, people, reference):
+        requester = self.rng.choice(people['end_users'])
+        location = self.rng.choice(reference['locations'])
+        title, description = self.rng.choice(ISSUES)
+        device = self.rng.choice(EQUIPMENT_CATEGORIES)[2][0]
+        place = location.room
+        priority = self.pick['priorities'].pick()
+        status = self.pick['request_statuses'].pick()
+        created = self.moment()
+        values = {
+            'ticket_number': f'{TICKET_PREFIX}{number:010d}',
+            'title': title.format(device=device, place=place),
+            'description': description.format(device=device, place=place),
+            'category': self.rng.choice(reference['request_categories']),
+            'priority': priority, 'urgency': priority, 'impact': priority, 'status': status,
+            'channel': self.pick['channels'].pick(),
+            'requester': requester, 'requester_department': requester.department, 'requester_location': place,
+            'created_at': created, 'updated_at': created,
+            'response_due': created + timedelta(hours=1),
+            'resolution_due': created + timedelta(hours=SLA_HOURS[priority]),
+        }
+        if status in ('resolved', 'closed'):
+            target = timedelta(hours=SLA_HOURS[priority])
+            met = self.pick['sla_outcomes'].pick() == 'met'
+            taken = target * (self.rng.uniform(0.1, 0.95) if met else self.rng.uniform(1.05, 4))
+            closed_after = timedelta(hours=self.rng.randint(1, 48)) if status == 'closed' else timedelta()
+            if created + taken + closed_after > self.anchor:
+                # Too recent to have been resolved by the anchor date
+                status = values['status'] = 'in_progress'
+            else:
+                values['sla_breached'] = not met
+                values['resolved_at'] = values['updated_at'] = created + taken
+                values['resolution_time_minutes'] = int(taken.total_seconds() // 60)
+                if status == 'closed':
+                    values['closed_at'] = values['updated_at'] = values['resolved_at'] + closed_after
+        if status not in ('pending', 'open'):
+            values['assigned_to'] = self.rng.choice(people['staff'])
+            values['assigned_at'] = values['first_response_at'] = self.before_anchor(
+                created + timedelta(minutes=self.rng.randint(5, 90))
+            )
+        if status not in CLOSED_STATUSES:
+            values['sla_breached'] = values['resolution_due'] < self.anchor
+        return SupportRequest(**values)
+
+    def build_task(self, support_request, people):
+        status = self.pick['task_statuses'].pick()
+        created = self.before_anchor(support_request.created_at + timedelta(minutes=self.rng.randint(1, 240)))
+        task = Task(
+            title=f'{self.rng.choice(TASK_TITLES)}: {support_request.title}'[:200],
+            description=support_request.description, related_request=support_request,
+            priority=support_request.priority, status=status, created_at=created,
+            estimated_hours=self.rng.choice([1, 2, 4, 8]),
+            due_date=created + timedelta(hours=SLA_HOURS[support_request.priority]),
+        )
+        if status != 'pending' and people['personnel']:
+            task.assigned_to = self.rng.choice(people['personnel'])
+            task.assigned_at = self.before_anchor(created + timedelta(minutes=self.rng.randint(5, 60)))
+            if status in ('in_progress', 'completed'):
+                task.started_at = self.before_anchor(task.assigned_at + timedelta(minutes=self.rng.randint(5, 120)))
+            if status == 'completed':
+                task.completed_at = self.before_anchor(task.started_at + timedelta(minutes=self.rng.randint(15, 600)))
+                task.actual_hours = round((task.completed_at - task.started_at).total_seconds() / 3600, 2)
+        return task
+
+    def build_activity(self, support_request, people, content_type):
+        action = self.pick['activity_actions'].pick()
+        return ActivityLog(
+            user=self.rng.choice(people['staff'] if action != 'read' else people['all']),
+            action_type=action, severity='warning' if action == 'escalated' else 'info',
+            timestamp=self.moment(start=support_request.created_at),
+            content_type=content_type, object_id=support_request.pk,
+            description=f'{action.replace("_", " ").capitalize()} on {support_request.ticket_number}',
+        )
+
+    def create_requests(self, count, task_count, activity_count, people, reference):
+        totals = {'requests': 0, 'tasks': 0, 'activity_logs': 0, 'workflow_logs': 0}
+        content_type = reference['request_content_type']
+        for start in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - start)
+            with transaction.atomic():
+                batch = SupportRequest.objects.bulk_create(
+                    [self.build_request(start + offset + 1, people, reference) for offset in range(size)],
+                    batch_size=self.batch_size,
+                )
+                tasks = [
+                    self.build_task(self.rng.choice(batch), people)
+                    for _ in range(spread(task_count, start, size, count))
+                ]
+                Task.objects.bulk_create(tasks, batch_size=self.batch_size)
+                activities = [
+                    self.build_activity(self.rng.choice(batch), people, content_type)
+                    for _ in range(spread(activity_count, start, size, count))
+                ]
+                ActivityLog.objects.bulk_create(activities, batch_size=self.batch_size)
+                workflow = [
+                    WorkflowLog(object_type='request', object_id=request.pk, step_type='request_created',
+                                timestamp=request.created_at, user=request.requester)
+                    for request in batch
+                ] + [
+                    WorkflowLog(object_type='request', object_id=request.pk, step_type='request_resolved',
+                                timestamp=request.resolved_at, user=request.assigned_to)
+                    for request in batch if request.resolved_at
+                ]
+                WorkflowLog.objects.bulk_create(workflow, batch_size=self.batch_size)
+            totals['requests'] += len(batch)
+            totals['tasks'] += len(tasks)
+            totals['activity_logs'] += len(activities)
+            totals['workflow_logs'] += len(workflow)
+            self.log(f'Created {totals["requests"]}/{count} support requests')
+        return totals
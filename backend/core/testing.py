@@ -0,0 +1,89 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from authentication.permission_engine import RolePermissionCache
+
+User = get_user_model()
+
+
+class QueryBudgetTestCase(APITestCase):
+    """Test case that fails when an endpoint exceeds its declared query budget.
+
+    ViewSets declare budgets per action, e.g. ``query_budgets = {'list': 3}``.
+    A budget is the number of queries the action may run, whatever the row count,
+    with process-wide caches warm.
+    """
+
+    def setUp(self):
+        super().setUp()
+        RolePermissionCache.reload()
+
+    def get_query_budget(self, view_class, action):
+        budgets = getattr(view_class, 'query_budgets', None) or {}
+        if action not in budgets:
+            self.fail(f"{view_class.__name__} declares no query budget for '{action}'")
+        return budgets[action]
+
+    def assertWithinQueryBudget(self, view_class, action, url, method='get', data=None, expected_status=200):
+        """Request ``url`` and assert the query count stays within the view's budget"""
+        budget = self.get_query_budget(view_class, action)
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, data, format='json')
+
+        self.assertEqual(response.status_code, expected_status, getattr(response, 'data', None))
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = '\n'.join(
+                f"{index}. {query['sql']}" for index, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(
+                f"{view_class.__name__}.{action} ran {executed} queries, budget is {budget}:\n{queries}"
+            )
+        return response
+
+
+class ScratchDirectoryTestCase(APITestCase):
+    """Test case with one authenticated user and a temporary directory per test.
+
+    Subclasses name the user with ``username`` and ``user_fields`` and return
+    the settings to point at the directory from ``scratch_settings``.
+    """
+
+    username = 'scratch_user'
+    user_fields = {'role': 'system_admin'}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_user(
+            username=cls.username, email=f'{cls.username}@example.com', password='pass',
+            is_approved=True, **cls.user_fields,
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.scratch = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.scratch, ignore_errors=True)
+        overrides = override_settings(**self.scratch_settings(self.scratch))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.client.force_authenticate(self.user)
+
+    def scratch_settings(self, root):
+        return {}
+
+    def authenticate_other_user(self, **fields):
+        """Authenticate as a new user who owns nothing; returns that user"""
+        other = User.objects.create_user(
+            username=f'{self.username}_other', email=f'{self.username}_other@example.com', password='pass',
+            is_approved=True, **fields,
+        )
+        self.client.force_authenticate(other)
+        return other
@@ -0,0 +1,596 @@
+import csv
+import hashlib
+import io
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from analytics.models import WorkflowLog
+from inventory.maintenance import MaintenancePlanningService
+from inventory.models import Department, Equipment, EquipmentCategory, Location, MaintenanceSchedule
+from requests_system.models import RequestAttachment, RequestCategory, SupportRequest
+from tasks.models import Task
+from .activity_logger import ActivityLog
+from .benchmarks import SCENARIOS, compare
+from .models import ReportDataVersion, ReportJob, ReportSchedule, UploadSession
+from .previews import TRUNCATED_MARKER, AttachmentPreviewService
+from .report_jobs import ReportJobService
+from .report_snapshots import ReportSnapshotStore
+from .synthetic_data import SyntheticDataGenerator
+from .testing import ScratchDirectoryTestCase
+from .uploads import ChunkedUploadService
+
+User = get_user_model()
+
+
+class ReportJobTests(ScratchDirectoryTestCase):
+    """Reports are generated by workers and served from files"""
+
+    username = 'report_user'
+    user_fields = {'role': 'it_manager', 'department': 'it'}
+
+    def scratch_settings(self, root):
+        return {'REPORT_ROOT': root}
+
+    def test_generate_queues_job_outside_the_request(self):
+        response = self.client.post('/api/reports/generate/', {'format': 'csv', 'days': 7}, format='json')
+        self.assertEqual(response.status_code, 202)
+        job = ReportJob.objects.get(pk=response.data['job']['id'])
+        self.assertEqual((job.status, job.parameters), ('pending', {'days': 7}))
+        self.assertEqual(self.client.get(f'/api/reports/{job.id}/download/').status_code, 409)
+
+        ReportJobService.run(job)
+        history = self.client.get('/api/reports/history/').data['results']
+        self.assertEqual([(entry['id'], entry['status']) for entry in history], [(job.id, 'completed')])
+
+        download = self.client.get(f'/api/reports/{job.id}/download/')
+        self.assertEqual(download.status_code, 200)
+        rows = list(csv.reader(io.StringIO(b''.join(download.streaming_content).decode())))
+        download.close()
+        self.assertIn(['total_requests', '0'], rows)
+
+    def test_formats_render_report_tables(self):
+        for fmt in ('json', 'pdf'):
+            job = ReportJobService.enqueue(self.user, 'equipment', fmt, {'days': 30}, run_async=False)
+            self.assertEqual(job.status, 'completed', job.error)
+            self.assertEqual(job.path.stat().st_size, job.size)
+        self.assertTrue(job.path.read_bytes().startswith(b'%PDF-1.4'))
+        report = json.loads(ReportJob.objects.get(format='json').path.read_text())
+        self.assertIn('status_breakdown', report['report'])
+
+    def test_job_runs_once(self):
+        job = ReportJobService.enqueue(self.user, 'dashboard', 'json', run_async=False)
+        ReportJob.objects.filter(pk=job.pk).update(filename='')
+        self.assertEqual(ReportJobService.run(job).filename, '')
+
+    def test_rejects_invalid_requests(self):
+        for payload in ({'report_type': 'payroll'}, {'format': 'xlsx'}, {'days': 0}):
+            self.assertEqual(self.client.post('/api/reports/generate/', payload, format='json').status_code, 400)
+
+    def test_user_activity_of_others_requires_report_permission(self):
+        other = self.authenticate_other_user(role='end_user')
+        payload = {'report_type': 'user_activity', 'format': 'json', 'user_id': self.user.pk}
+        response = self.client.post('/api/reports/generate/', payload, format='json')
+        self.assertEqual(response.data['job']['parameters']['user_id'], other.pk)
+
+        self.client.force_authenticate(self.user)
+        payload['user_id'] = other.pk
+        response = self.client.post('/api/reports/generate/', payload, format='json')
+        self.assertEqual(response.data['job']['parameters']['user_id'], other.pk)
+
+    def test_download_is_limited_to_requester(self):
+        job = ReportJobService.enqueue(self.user, 'dashboard', 'json', run_async=False)
+        self.authenticate_other_user()
+        self.assertEqual(self.client.get(f'/api/reports/{job.id}/download/').status_code, 404)
+
+    def test_due_schedules_run_once_per_occurrence(self):
+        response = self.client.post(
+            '/api/reports/schedule/', {'report_type': 'equipment', 'format': 'csv', 'frequency': 'weekly'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        schedule = ReportSchedule.objects.get()
+
+        now = timezone.now() + timedelta(days=15)
+        jobs = ReportJobService.run_due_schedules(now=now)
+        self.assertEqual([(job.status, job.schedule_id) for job in jobs], [('completed', schedule.id)])
+        schedule.refresh_from_db()
+        self.assertGreater(schedule.next_run_at, now)
+        self.assertEqual(ReportJobService.run_due_schedules(now=now), [])
+
+    def test_monthly_schedule_clamps_to_month_end(self):
+        after = datetime(2026, 1, 31, 6, tzinfo=dt_timezone.utc)
+        self.assertEqual(ReportJobService.next_run('monthly', after), datetime(2026, 2, 28, 6, tzinfo=dt_timezone.utc))
+
+    def test_monthly_schedule_returns_to_its_day_after_a_short_month(self):
+        schedule = ReportSchedule.objects.create(
+            report_type='equipment', format='csv', frequency='monthly', created_by=self.user,
+            next_run_at=datetime(2026, 1, 31, 6, tzinfo=dt_timezone.utc),
+        )
+        self.assertEqual(schedule.day_of_month, 31)
+        ReportJobService.run_due_schedules(now=datetime(2026, 2, 1, tzinfo=dt_timezone.utc))
+        ReportJobService.run_due_schedules(now=datetime(2026, 3, 1, tzinfo=dt_timezone.utc))
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.next_run_at, datetime(2026, 3, 31, 6, tzinfo=dt_timezone.utc))
+
+    def test_stale_jobs_are_run_and_stuck_jobs_fail(self):
+        pending = ReportJobService.enqueue(self.user, 'dashboard', 'json', run_async=False)
+        ReportJob.objects.filter(pk=pending.pk).update(status='pending', created_at=timezone.now() - timedelta(hours=1))
+        stuck = ReportJobService.enqueue(self.user, 'dashboard', 'json', run_async=False)
+        ReportJob.objects.filter(pk=stuck.pk).update(status='running', started_at=timezone.now() - timedelta(hours=1))
+        busy = ReportJobService.enqueue(self.user, 'dashboard', 'json', run_async=False)
+        ReportJob.objects.filter(pk=busy.pk).update(status='running', started_at=timezone.now())
+
+        self.assertEqual(ReportJobService.run_stale(), 2)
+        statuses = dict(ReportJob.objects.values_list('pk', 'status'))
+        self.assertEqual(
+            [statuses[pending.pk], statuses[stuck.pk], statuses[busy.pk]], ['completed', 'failed', 'running'],
+        )
+        response = self.client.get(f'/api/reports/{stuck.id}/download/')
+        self.assertEqual((response.status_code, response.data['job']['status']), (409, 'failed'))
+
+
+class ReportSnapshotTests(ScratchDirectoryTestCase):
+    """Repeated reports are read from snapshots until their data changes"""
+
+    username = 'snapshot_user'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.category = RequestCategory.objects.create(name='Hardware', category_type='hardware')
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def scratch_settings(self, root):
+        return {'REPORT_ROOT': root}
+
+    def create_request(self):
+        return SupportRequest.objects.create(
+            title='Monitor flickers', description='Flickers after warm-up.', category=self.category,
+            requester=self.user, requester_department='it', requester_location='Ward 3',
+        )
+
+    def test_open_period_is_recomputed_only_after_writes(self):
+        first = ReportSnapshotStore.get('dashboard', self.user, 7)
+        # Only the data version is read
+        with self.assertNumQueries(1):
+            self.assertEqual(ReportSnapshotStore.get('dashboard', self.user, 7), first)
+
+        # The version moves when the write commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_request()
+        refreshed = ReportSnapshotStore.get('dashboard', self.user, 7)
+        self.assertEqual(refreshed['summary']['total_requests'], first['summary']['total_requests'] + 1)
+
+    def test_data_version_is_bumped_once_per_table_on_commit(self):
+        label = 'requests_system.SupportRequest'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_request()
+        version = ReportDataVersion.objects.get(label=label).version
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for _ in range(3):
+                self.create_request().save()
+            self.assertEqual(ReportDataVersion.objects.get(label=label).version, version)
+        self.assertEqual(ReportDataVersion.objects.get(label=label).version, version + 1)
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.create_request()
+            raise RuntimeError
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            ReportDataVersion.bump('tasks.Task')
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(ReportDataVersion.objects.get(label=label).version, version + 1)
+
+    def test_closed_period_is_computed_once(self):
+        now = timezone.now()
+        closed = ReportSnapshotStore.get('dashboard', self.user, period='2025-01', now=now)
+        self.assertEqual(closed['period']['days'], 31)
+        self.create_request()
+        with self.assertNumQueries(0):
+            self.assertEqual(ReportSnapshotStore.get('dashboard', self.user, period='2025-01', now=now), closed)
+
+    def test_closed_period_counts_overdue_work_as_of_its_end(self):
+        due = datetime(2025, 1, 15, tzinfo=dt_timezone.utc)
+        task = Task.objects.create(title='Replace toner', description='Ward 3 printer', status='completed', due_date=due)
+        Task.objects.filter(pk=task.pk).update(
+            created_at=due - timedelta(days=5), completed_at=datetime(2025, 2, 10, tzinfo=dt_timezone.utc),
+        )
+        closed = ReportSnapshotStore.get('dashboard', self.user, period='2025-01')
+        self.assertEqual(closed['summary']['overdue_tasks'], 1)
+
+    def test_closed_equipment_snapshot_leaves_out_upcoming_maintenance(self):
+        self.assertIn('maintenance_schedule', ReportSnapshotStore.get('equipment', self.user, 7))
+        self.assertNotIn('maintenance_schedule', ReportSnapshotStore.get('equipment', self.user, period='2025-01'))
+
+    def test_maintenance_planning_bumps_data_versions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            department = Department.objects.create(name='Radiology')
+            location = Location.objects.create(building='Main', floor='1', room='101', department=department)
+            category = EquipmentCategory.objects.create(name='Imaging')
+            # bulk_create skips the QR code written by Equipment.save()
+            equipment = Equipment.objects.bulk_create([Equipment(
+                name='Scanner', asset_tag='SNAP-0001', model='X1', manufacturer='Acme',
+                category=category, location=location,
+            )])[0]
+            MaintenanceSchedule.objects.create(
+                equipment=equipment, maintenance_type='Calibration', frequency='monthly',
+                next_maintenance=timezone.localdate(),
+            )
+        labels = ['tasks.Task', 'inventory.MaintenanceSchedule']
+        before = ReportDataVersion.current(labels)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(MaintenancePlanningService.plan()['tasks_created'], 1)
+        self.assertNotEqual(ReportDataVersion.current(labels), before)
+        self.assertEqual(ReportDataVersion.objects.get(label='tasks.Task').version, 1)
+
+    def test_scopes_are_kept_apart(self):
+        other = User.objects.create_user(
+            username='snapshot_other', email='snapshot_other@example.com', password='pass', is_approved=True,
+        )
+        WorkflowLog.objects.create(object_type='user', object_id=self.user.pk, step_type='task_started', user=self.user)
+        mine = ReportSnapshotStore.get('user_activity', self.user, 7)
+        theirs = ReportSnapshotStore.get('user_activity', other, 7)
+        self.assertEqual((mine['summary']['total_activities'], theirs['summary']['total_activities']), (1, 0))
+
+    def test_rejects_future_and_malformed_periods(self):
+        for period in ('2999-01', 'January'):
+            with self.assertRaises(ValueError):
+                ReportSnapshotStore.get('dashboard', self.user, period=period)
+
+    def test_previous_days_are_purged(self):
+        ReportSnapshotStore.get('dashboard', self.user, 7, now=timezone.now() - timedelta(days=2))
+        ReportSnapshotStore.get('dashboard', self.user, 7)
+        self.assertEqual(ReportSnapshotStore.purge_expired(), 1)
+        self.assertEqual(len(list(ReportSnapshotStore.root().glob('dashboard/all/*'))), 1)
+
+
+@override_settings(UPLOAD_CHUNK_SIZE=8)
+class ChunkedUploadTests(ScratchDirectoryTestCase):
+    """Chunked uploads resume after drops and store identical content once"""
+
+    username = 'upload_user'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        category = RequestCategory.objects.create(name='Software', category_type='software')
+        cls.support_request = SupportRequest.objects.create(
+            title='Ward PC crash', description='Blue screen at login.', category=category,
+            requester=cls.user, requester_department='it', requester_location='Ward 5',
+        )
+
+    def scratch_settings(self, root):
+        return {'MEDIA_ROOT': str(root)}
+
+    def start(self, content, **extra):
+        response = self.client.post(
+            '/api/files/uploads/', {'filename': 'dump.log', 'size': len(content), **extra}, format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        return f"/api/files/uploads/{response.data['upload_id']}/"
+
+    def put(self, url, content, offset, **headers):
+        chunk = content[offset:offset + 8]
+        return self.client.put(
+            url, chunk, content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {offset}-{offset + len(chunk) - 1}/{len(content)}', **headers,
+        )
+
+    def upload(self, content, request_id=None):
+        url = self.start(content)
+        for offset in range(0, len(content), 8):
+            self.assertEqual(self.put(url, content, offset).status_code, 200)
+        response = self.client.post(f'{url}complete/', {'request_id': request_id}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response
+
+    def test_resent_chunks_are_skipped_and_gaps_rejected(self):
+        content = b'0123456789abcdefghij'
+        url = self.start(content)
+        self.assertEqual(self.put(url, content, 0).data['offset'], 8)
+        ahead = self.put(url, content, 16)
+        self.assertEqual((ahead.status_code, ahead.data['offset']), (409, 8))
+
+        # The client lost the response and sends the first chunk again
+        self.assertEqual(self.put(url, content, 0).data['offset'], 8)
+        self.assertEqual(self.put(url, content, 8).data['offset'], 16)
+        self.assertEqual(self.put(url, content, 16).data['offset'], 20)
+        self.assertEqual(self.client.get(url).data['offset'], 20)
+
+        response = self.client.post(f'{url}complete/', {'request_id': self.support_request.id}, format='json')
+        self.assertEqual(response.data['content_hash'], hashlib.sha256(content).hexdigest())
+        attachment = self.support_request.attachments.get()
+        self.assertEqual(attachment.file.read(), content)
+        attachment.file.close()
+
+    def test_identical_content_is_stored_once(self):
+        content = b'screenshot-bytes'
+        first = self.upload(content, self.support_request.id).data['attachment']
+        second = self.upload(content).data
+        self.assertEqual(first['content_hash'], second['content_hash'])
+        self.assertEqual(len(list((self.scratch / 'request_attachments' / 'cas').rglob('*'))), 2)  # dir + blob
+        self.assertFalse(any((self.scratch / 'request_attachments' / 'partial').iterdir()))
+
+    def test_checksums_are_enforced(self):
+        content = b'0123456789'
+        url = self.start(content, sha256='0' * 64)
+        rejected = self.put(url, content, 0, HTTP_X_CHUNK_SHA256='0' * 64)
+        self.assertEqual((rejected.status_code, rejected.data['offset']), (409, 0))
+
+        self.put(url, content, 0)
+        self.put(url, content, 8)
+        response = self.client.post(f'{url}complete/', format='json')
+        self.assertEqual((response.status_code, response.data['offset']), (409, 0))
+        self.assertEqual(UploadSession.objects.get().status, 'uploading')
+
+    def test_single_request_upload_attaches_file(self):
+        upload = SimpleUploadedFile('screen.png', b'png-bytes', content_type='image/png')
+        response = self.client.post(
+            '/api/files/upload/', {'file': upload, 'request_id': self.support_request.id}, format='multipart',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['attachment']['content_hash'], hashlib.sha256(b'png-bytes').hexdigest())
+
+    def test_attaching_requires_a_visible_request(self):
+        self.authenticate_other_user()
+        url = self.start(b'log')
+        self.put(url, b'log', 0)
+        response = self.client.post(f'{url}complete/', {'request_id': self.support_request.id}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(ATTACHMENT_PREVIEW_SIZE=64, ATTACHMENT_PREVIEW_TEXT_LINES=3)
+class AttachmentPreviewTests(ScratchDirectoryTestCase):
+    """Attachment previews are generated once per content and cached by clients"""
+
+    username = 'preview_user'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        category = RequestCategory.objects.create(name='Network', category_type='network')
+        cls.support_request = SupportRequest.objects.create(
+            title='Switch down', description='Ward 2 switch is unreachable.', category=category,
+            requester=cls.user, requester_department='it', requester_location='Ward 2',
+        )
+
+    def scratch_settings(self, root):
+        return {'MEDIA_ROOT': str(root)}
+
+    def attach(self, filename, content):
+        name, content_hash = ChunkedUploadService.store_file(SimpleUploadedFile(filename, content))
+        return RequestAttachment.objects.create(
+            request=self.support_request, file=name, filename=filename, content_hash=content_hash,
+            size=len(content), uploaded_by=self.user,
+        )
+
+    def image(self, size=(400, 200)):
+        buffer = io.BytesIO()
+        Image.new('RGB', size, 'navy').save(buffer, 'PNG')
+        return buffer.getvalue()
+
+    def test_new_attachments_are_queued(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.attach('screen.png', self.image())
+        self.assertEqual(len(callbacks), 1)
+
+    def test_thumbnail_is_shared_by_identical_content(self):
+        first = self.attach('screen.png', self.image())
+        path, content_type = AttachmentPreviewService.generate(first)
+        self.assertEqual(content_type, 'image/jpeg')
+        with Image.open(path) as thumbnail:
+            self.assertEqual(thumbnail.size, (64, 32))
+
+        second = self.attach('screen-copy.png', self.image())
+        self.assertEqual(AttachmentPreviewService.generate(second), (path, content_type))
+        self.assertEqual(len(list((self.scratch / 'attachment_previews').rglob('*.*'))), 1)
+
+    def test_log_preview_is_truncated(self):
+        attachment = self.attach('agent.log', b''.join(b'line %d\n' % n for n in range(10)))
+        path, content_type = AttachmentPreviewService.generate(attachment)
+        self.assertEqual(content_type, 'text/plain; charset=utf-8')
+        self.assertEqual(path.read_text(), 'line 0\nline 1\nline 2' + TRUNCATED_MARKER)
+
+    def test_binary_files_have_no_preview(self):
+        attachment = self.attach('firmware.bin', b'\x00\x01\x02' * 100)
+        self.assertIsNone(AttachmentPreviewService.generate(attachment)[1])
+        response = self.client.get(f'/api/files/attachments/{attachment.id}/preview/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_files_stored_before_hashing_are_hashed(self):
+        content = self.image()
+        name = default_storage.save('request_attachments/legacy.png', ContentFile(content))
+        attachment = RequestAttachment.objects.create(
+            request=self.support_request, file=name, filename='legacy.png', uploaded_by=self.user,
+        )
+        AttachmentPreviewService.generate(attachment)
+        attachment.refresh_from_db()
+        self.assertEqual((attachment.content_hash, attachment.size), (hashlib.sha256(content).hexdigest(), len(content)))
+
+    def test_preview_is_served_with_caching_headers(self):
+        attachment = self.attach('screen.png', self.image())
+        url = f'/api/files/attachments/{attachment.id}/preview/'
+        self.assertEqual(self.client.get(url).status_code, 202)
+
+        AttachmentPreviewService.generate(attachment)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'\xff\xd8'))
+        response.close()
+        self.assertEqual(response['ETag'], f'"{attachment.content_hash}"')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        detail = self.client.get(f'/api/requests/support-requests/{self.support_request.id}/')
+        self.assertEqual(detail.data['attachments'][0]['preview_url'], url)
+
+    def test_preview_requires_a_visible_request(self):
+        attachment = self.attach('screen.png', self.image())
+        self.authenticate_other_user()
+        self.assertEqual(self.client.get(f'/api/files/attachments/{attachment.id}/preview/').status_code, 404)
+
+
+class SyntheticDatasetTests(APITestCase):
+    """The dataset generator is reproducible and bypasses per-row side effects"""
+
+    options = {
+        'users': 12, 'equipment': 30, 'requests': 75, 'tasks': 140, 'activity_logs': 300,
+        'seed': 7, 'anchor': '2026-01-31', 'days': 90, 'batch_size': 20,
+    }
+
+    def generate(self, **extra):
+        call_command('generate_dataset', stdout=io.StringIO(), **{**self.options, **extra})
+        return list(SupportRequest.objects.order_by('ticket_number').values_list(
+            'ticket_number', 'title', 'priority', 'status', 'created_at', 'resolved_at', 'sla_breached',
+        ))
+
+    def test_counts_timestamps_and_no_qr_codes(self):
+        requests = self.generate()
+        self.assertEqual(
+            [Equipment.objects.count(), len(requests), Task.objects.count(), ActivityLog.objects.count()],
+            [30, 75, 140, 300],
+        )
+        self.assertFalse(Equipment.objects.exclude(qr_code='').exclude(qr_code__isnull=True).exists())
+        anchor = datetime(2026, 1, 31, tzinfo=dt_timezone.utc)
+        created = [row[4] for row in requests]
+        self.assertTrue(all(anchor - timedelta(days=91) < moment <= anchor for moment in created))
+        self.assertFalse(SupportRequest.objects.filter(resolved_at__gt=anchor).exists())
+
+    def test_same_seed_gives_same_data(self):
+        first = self.generate()
+        self.assertEqual(self.generate(clear=True), first)
+        self.assertNotEqual(self.generate(clear=True, seed=8), first)
+
+    def test_clear_deletes_generated_rows_in_bulk(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.generate()
+            kept = SupportRequest.objects.create(
+                title='Real ticket', description='Not generated', category=RequestCategory.objects.first(),
+                requester=User.objects.create_user(username='real_user', email='real_user@example.com', password='pass'),
+                requester_department='it', requester_location='Ward 3',
+            )
+            Task.objects.create(title='Real task', description='Not generated', related_request=kept)
+        before = ReportDataVersion.current(['requests_system.SupportRequest'])
+
+        # Bulk rows are deleted without the collector, so none of them is signalled
+        deleted = []
+
+        def record(sender, **kwargs):
+            deleted.append(sender)
+
+        post_delete.connect(record)
+        self.addCleanup(post_delete.disconnect, record)
+        with self.captureOnCommitCallbacks(execute=True):
+            SyntheticDataGenerator.clear()
+        self.assertFalse({SupportRequest, Task, Equipment, WorkflowLog, ActivityLog} & set(deleted))
+        self.assertEqual(list(SupportRequest.objects.values_list('pk', flat=True)), [kept.pk])
+        self.assertEqual(Task.objects.get().related_request, kept)
+        self.assertEqual([Equipment.objects.count(), ActivityLog.objects.count()], [0, 0])
+        self.assertFalse(WorkflowLog.objects.filter(object_type='request').exists())
+        self.assertFalse(User.objects.filter(username__startswith='syn_').exists())
+        self.assertNotEqual(ReportDataVersion.current(['requests_system.SupportRequest']), before)
+
+    def test_existing_data_and_bad_distributions_are_rejected(self):
+        self.generate()
+        with self.assertRaises(CommandError):
+            self.generate()
+        path = Path(tempfile.mkdtemp()) / 'weights.json'
+        self.addCleanup(shutil.rmtree, path.parent, ignore_errors=True)
+        path.write_text(json.dumps({'priorities': {'urgent': 1}}))
+        with self.assertRaises(CommandError):
+            self.generate(clear=True, distributions=str(path))
+
+
+class BenchmarkTests(APITestCase):
+    """The benchmark command measures every endpoint without changing the data"""
+
+    def setUp(self):
+        call_command(
+            'generate_dataset', users=12, equipment=10, requests=40, tasks=40, activity_logs=80, seed=5,
+            stdout=io.StringIO(),
+        )
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.baseline = directory / 'baseline.json'
+
+    def benchmark(self, *only, **options):
+        call_command(
+            'run_benchmarks', iterations=2, warmup=1, baseline=str(self.baseline), only=list(only) or None,
+            stdout=io.StringIO(), **options,
+        )
+
+    def test_baseline_covers_every_endpoint_and_rolls_back(self):
+        before = list(SupportRequest.objects.order_by('pk').values_list('pk', 'status', 'priority', 'assigned_to'))
+        logs = ActivityLog.objects.count()
+        self.benchmark(write_baseline=True)
+
+        results = json.loads(self.baseline.read_text())
+        self.assertEqual(set(results['scenarios']), set(SCENARIOS))
+        for name, result in results['scenarios'].items():
+            self.assertEqual(result['status'], 200, name)
+            self.assertGreater(result['queries'], 0, name)
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'], name)
+        scenarios = results['scenarios']
+        self.assertGreater(scenarios['dashboard_report_uncached']['queries'], scenarios['dashboard_report']['queries'])
+        self.assertEqual(results['meta']['dataset']['requests'], 40)
+        self.assertEqual(
+            list(SupportRequest.objects.order_by('pk').values_list('pk', 'status', 'priority', 'assigned_to')), before,
+        )
+        self.assertEqual(ActivityLog.objects.count(), logs)
+        self.assertFalse(Equipment.objects.exclude(qr_code='').exclude(qr_code__isnull=True).exists())
+
+    def test_regression_against_baseline_fails(self):
+        self.benchmark('notifications', write_baseline=True)
+        self.benchmark('notifications')
+
+        results = json.loads(self.baseline.read_text())
+        results['scenarios']['notifications']['queries'] -= 1
+        self.baseline.write_text(json.dumps(results))
+        with self.assertRaisesMessage(CommandError, 'notifications'):
+            self.benchmark('notifications')
+
+    def test_compare_thresholds(self):
+        baseline = {'scenarios': {'search': {'p95_ms': 100.0, 'queries': 10, 'peak_kib': 1000, 'status': 200}}}
+
+        def regressions(**changes):
+            return compare({'scenarios': {'search': {**baseline['scenarios']['search'], **changes}}}, baseline, 0.25)
+
+        self.assertEqual(regressions(p95_ms=120.0, peak_kib=1200, queries=9), [])
+        self.assertEqual(len(regressions(p95_ms=130.0)), 1)
+        self.assertEqual(len(regressions(queries=11, peak_kib=1300)), 2)
+        self.assertEqual(len(regressions(status=500)), 1)
+        self.assertEqual(len(compare({'scenarios': {'other': baseline['scenarios']['search']}}, baseline, 0.25)), 1)
+        # Small absolute changes on fast endpoints are noise
+        fast = {'scenarios': {'search': {'p95_ms': 1.0, 'queries': 1, 'peak_kib': 10, 'status': 200}}}
+        current = {'scenarios': {'search': {'p95_ms': 2.5, 'queries': 1, 'peak_kib': 50, 'status': 200}}}
+        self.assertEqual(compare(current, fast, 0.25), [])
+
+    def test_compare_refuses_results_from_another_setup(self):
+        meta = {'iterations': 20, 'dataset': {'requests': 5000}, 'database': 'sqlite', 'python': '3.11.7'}
+        scenarios = {'search': {'p95_ms': 100.0, 'queries': 10, 'peak_kib': 1000, 'status': 200}}
+        baseline = {'meta': meta, 'scenarios': scenarios}
+        self.assertEqual(compare({'meta': {**meta, 'python': '3.12.1'}, 'scenarios': scenarios}, baseline), [])
+
+        slower = {'search': {**scenarios['search'], 'p95_ms': 500.0}}
+        other = {**meta, 'iterations': 2, 'dataset': {'requests': 40}, 'database': 'postgresql'}
+        messages = compare({'meta': other, 'scenarios': slower}, baseline)
+        self.assertEqual([message.split(':')[0] for message in messages], ['dataset', 'database', 'iterations'])
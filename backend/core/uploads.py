@@ -0,0 +1,190 @@
+import hashlib
+import os
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from requests_system.models import RequestAttachment
+from .models import UploadSession
+
+CAS_PREFIX = 'request_attachments/cas'
+PARTIAL_PREFIX = 'request_attachments/partial'
+COPY_BUFFER_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """An upload request that cannot be applied to the session"""
+
+
+class ChunkedUploadService:
+    """Resumable uploads into content-addressed storage.
+
+    A session's chunks are streamed straight into a partial file in
+    ``COPY_BUFFER_SIZE`` pieces; ``received`` is the offset a client resumes
+    from after a dropped connection, and bytes the server already has are
+    skipped when a chunk is sent again. Completing a session hashes the file
+    from disk and moves it to ``request_attachments/cas/<hash[:2]>/<hash>``
+    unless that content is already stored, so identical files attached to
+    many tickets exist once.
+    """
+
+    @staticmethod
+    def blob_name(digest):
+        return f'{CAS_PREFIX}/{digest[:2]}/{digest}'
+
+    @staticmethod
+    def chunk_size():
+        return getattr(settings, 'UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024)
+
+    @staticmethod
+    def partial_path(session):
+        return Path(default_storage.path(f'{PARTIAL_PREFIX}/{session.upload_id.hex}'))
+
+    @staticmethod
+    def start(user, filename, size, content_type='', sha256=''):
+        max_size = getattr(settings, 'UPLOAD_MAX_SIZE', 2 * 1024 ** 3)
+        if not 0 < size <= max_size:
+            raise UploadError(f'size must be between 1 and {max_size} bytes')
+        session = UploadSession.objects.create(
+            filename=os.path.basename(filename)[:255], size=size, content_type=content_type[:100],
+            sha256=(sha256 or '').lower(), created_by=user,
+        )
+        path = ChunkedUploadService.partial_path(session)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+        return session
+
+    @staticmethod
+    def append(session, stream, offset, length, chunk_sha256=''):
+        """Store a chunk that starts at ``offset``; returns the new resume offset.
+
+        Whatever part of the chunk arrives before the connection drops is kept.
+        With ``chunk_sha256`` the chunk is only kept when it arrived whole and
+        matches.
+        """
+        if session.status != 'uploading':
+            raise UploadError('Upload is already complete')
+        if offset > session.received:
+            raise UploadError(f'Chunk starts at {offset} but only {session.received} bytes were received')
+        if length > ChunkedUploadService.chunk_size():
+            raise UploadError('Chunk is larger than UPLOAD_CHUNK_SIZE')
+        if offset + length > session.size:
+            raise UploadError('Chunk goes past the declared size')
+
+        start = session.received
+        digest = hashlib.sha256()
+        remaining = length
+        skip = start - offset
+        while skip > 0 and remaining > 0:
+            data = stream.read(min(COPY_BUFFER_SIZE, skip))
+            if not data:
+                break
+            digest.update(data)
+            skip -= len(data)
+            remaining -= len(data)
+
+        path = ChunkedUploadService.partial_path(session)
+        with open(path, 'r+b') as handle:
+            handle.seek(start)
+            while remaining > 0:
+                data = stream.read(min(COPY_BUFFER_SIZE, remaining))
+                if not data:
+                    break
+                digest.update(data)
+                handle.write(data)
+                remaining -= len(data)
+            rejected = bool(chunk_sha256) and (remaining > 0 or digest.hexdigest() != chunk_sha256.lower())
+            if rejected:
+                handle.seek(start)
+            handle.truncate()
+            received = handle.tell()
+
+        if rejected:
+            raise UploadError('Chunk checksum does not match')
+        # A concurrent retry of the same chunk may have moved the offset already
+        UploadSession.objects.filter(pk=session.pk, received__lt=received).update(
+            received=received, updated_at=timezone.now(),
+        )
+        session.received = max(session.received, received)
+        return session.received
+
+    @staticmethod
+    def _store_blob(path, digest):
+        """Move a finished file into content-addressed storage; returns the storage name"""
+        name = ChunkedUploadService.blob_name(digest)
+        target = Path(default_storage.path(name))
+        if target.exists():
+            path.unlink()
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(path, target)
+        return name
+
+    @staticmethod
+    def complete(session, user, support_request=None):
+        """Hash and store the upload, then attach it to ``support_request``; returns the attachment.
+
+        Completing twice is harmless, so clients can retry after a dropped response.
+        """
+        if session.status == 'uploading':
+            if session.received != session.size:
+                raise UploadError(f'Upload is incomplete: {session.received} of {session.size} bytes received')
+            path = ChunkedUploadService.partial_path(session)
+            digest = hashlib.sha256()
+            with open(path, 'rb') as handle:
+                for data in iter(lambda: handle.read(COPY_BUFFER_SIZE), b''):
+                    digest.update(data)
+            content_hash = digest.hexdigest()
+            if session.sha256 and content_hash != session.sha256:
+                # Start over; the content on disk is not what the client meant to send
+                open(path, 'wb').close()
+                UploadSession.objects.filter(pk=session.pk).update(received=0, updated_at=timezone.now())
+                session.received = 0
+                raise UploadError('Upload checksum does not match; upload the file again')
+
+            session.stored_name = ChunkedUploadService._store_blob(path, content_hash)
+            session.content_hash = content_hash
+            session.status = 'completed'
+            session.completed_at = timezone.now()
+            session.save(update_fields=['stored_name', 'content_hash', 'status', 'completed_at', 'updated_at'])
+
+        if support_request is None:
+            return None
+        attachment, _ = RequestAttachment.objects.get_or_create(
+            request=support_request, content_hash=session.content_hash, filename=session.filename,
+            defaults={'file': session.stored_name, 'size': session.size, 'uploaded_by': user},
+        )
+        return attachment
+
+    @staticmethod
+    def store_file(uploaded):
+        """Stream an ``UploadedFile`` into content-addressed storage; returns ``(name, sha256)``"""
+        path = Path(default_storage.path(f'{PARTIAL_PREFIX}/{uuid.uuid4().hex}'))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        try:
+            with open(path, 'wb') as handle:
+                for data in uploaded.chunks(COPY_BUFFER_SIZE):
+                    digest.update(data)
+                    handle.write(data)
+            content_hash = digest.hexdigest()
+            return ChunkedUploadService._store_blob(path, content_hash), content_hash
+        finally:
+            path.unlink(missing_ok=True)
+
+    @staticmethod
+    def purge_stale(now=None, dry_run=False):
+        """Drop unfinished sessions idle for longer than ``UPLOAD_SESSION_TTL``; returns the count"""
+        now = now or timezone.now()
+        cutoff = now - timedelta(hours=getattr(settings, 'UPLOAD_SESSION_TTL', 24))
+        stale = list(UploadSession.objects.filter(status='uploading', updated_at__lt=cutoff))
+        if dry_run:
+            return len(stale)
+        for session in stale:
+            ChunkedUploadService.partial_path(session).unlink(missing_ok=True)
+        UploadSession.objects.filter(pk__in=[session.pk for session in stale]).delete()
+        return len(stale)
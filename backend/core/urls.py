@@ -6,7 +6,7 @@ from .views import (
 )
 from .reports import report_generate, report_history, report_download, report_schedule
 from .search import global_search
-from .files import file_upload
+from .files import attachment_preview, file_upload, upload_chunk, upload_complete, upload_start
 
 router = DefaultRouter()
 router.register(r'bulk-operations', BulkOperationViewSet, basename='bulk-operations')
@@ -17,7 +17,7 @@ urlpatterns = [
     path('import/equipment/', import_equipment_data, name='import-equipment'),
     path('system/health/', system_health, name='system-health'),
 
-    # Reports stubs
+    # Reports
     path('reports/generate/', report_generate, name='reports_generate'),
     path('reports/history/', report_history, name='reports_history'),
     path('reports/<int:report_id>/download/', report_download, name='reports_download'),
@@ -26,6 +26,10 @@ urlpatterns = [
     # Search stub
     path('search/', global_search, name='global_search'),
 
-    # Files upload stub
+    # File uploads; large files go through the resumable chunked endpoints
     path('files/upload/', file_upload, name='file_upload'),
+    path('files/uploads/', upload_start, name='upload_start'),
+    path('files/uploads/<uuid:upload_id>/', upload_chunk, name='upload_chunk'),
+    path('files/uploads/<uuid:upload_id>/complete/', upload_complete, name='upload_complete'),
+    path('files/attachments/<int:attachment_id>/preview/', attachment_preview, name='attachment_preview'),
 ]
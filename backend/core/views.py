@@ -8,13 +8,15 @@ from django.contrib.auth import get_user_model
 from django.db.models import Q
 from .bulk_operations import BulkOperationService, AdvancedSearchService
 from .activity_logger import ActivityLogger, ActivityLog
-from analytics.reporting import ReportingService
+from .report_snapshots import PERIOD_ERROR, ReportSnapshotStore
+from .reports import report_target_user_id
 from analytics.models import WorkflowLog, PerformanceMetric, SystemAlert
 from requests_system.models import SupportRequest
 from tasks.models import Task
 from inventory.models import Equipment
 from authentication.permissions import RoleBasedPermission
 from .serializers import ActivityLogSerializer
+from .pagination import TimestampKeysetPagination
 import json
 import logging
 
@@ -197,7 +199,7 @@ class SearchViewSet(viewsets.ViewSet):
 
 
 class ReportingViewSet(viewsets.ViewSet):
-    """ViewSet for reporting and analytics"""
+    """ViewSet for reporting and analytics; reports are served from snapshots"""
     permission_classes = [RoleBasedPermission]
     
     @action(detail=False, methods=['get'])
@@ -205,9 +207,12 @@ class ReportingViewSet(viewsets.ViewSet):
         """Generate comprehensive dashboard report"""
         date_range = int(request.query_params.get('days', 30))
         
-        report = ReportingService.generate_dashboard_report(
-            request.user, date_range
-        )
+        try:
+            report = ReportSnapshotStore.get(
+                'dashboard', request.user, date_range, period=request.query_params.get('period')
+            )
+        except ValueError:
+            return Response({'error': PERIOD_ERROR}, status=status.HTTP_400_BAD_REQUEST)
         
         # Log report generation
         ActivityLogger.log_user_action(
@@ -228,9 +233,12 @@ class ReportingViewSet(viewsets.ViewSet):
         """Generate equipment-specific report"""
         date_range = int(request.query_params.get('days', 30))
         
-        report = ReportingService.generate_equipment_report(
-            request.user, date_range
-        )
+        try:
+            report = ReportSnapshotStore.get(
+                'equipment', request.user, date_range, period=request.query_params.get('period')
+            )
+        except ValueError:
+            return Response({'error': PERIOD_ERROR}, status=status.HTTP_400_BAD_REQUEST)
         
         # Log report generation
         ActivityLogger.log_user_action(
@@ -251,10 +259,19 @@ class ReportingViewSet(viewsets.ViewSet):
         """Generate user activity report"""
         date_range = int(request.query_params.get('days', 30))
         target_user_id = request.query_params.get('user_id')
+        if target_user_id:
+            try:
+                target_user_id = report_target_user_id(request.user, int(target_user_id))
+            except ValueError:
+                return Response({'error': 'user_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
         
-        report = ReportingService.generate_user_activity_report(
-            request.user, target_user_id, date_range
-        )
+        try:
+            report = ReportSnapshotStore.get(
+                'user_activity', request.user, date_range,
+                period=request.query_params.get('period'), target_user_id=target_user_id,
+            )
+        except ValueError:
+            return Response({'error': PERIOD_ERROR}, status=status.HTTP_400_BAD_REQUEST)
         
         # Log report generation
         ActivityLogger.log_user_action(
@@ -324,11 +341,13 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = ActivityLog.objects.all()
     serializer_class = ActivityLogSerializer
     permission_classes = [RoleBasedPermission]
+    pagination_class = TimestampKeysetPagination
+    ordering = ['-timestamp', '-id']
     
     def get_queryset(self):
         """Filter activity logs based on user permissions"""
         user = self.request.user
-        queryset = ActivityLog.objects.all()
+        queryset = ActivityLog.objects.select_related('user').prefetch_related('content_object')
         
         # Apply user-based filtering
         if user.role == 'end_user':
@@ -340,7 +359,7 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
                 Q(user__department__iexact=user.department)
             )
         
-        return queryset.order_by('-timestamp')
+        return queryset.order_by('-timestamp', '-id')
     
     @action(detail=False, methods=['get'])
     def my_activity(self, request):
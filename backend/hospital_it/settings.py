@@ -24,6 +24,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'channels',
     'rest_framework',
     'rest_framework.authtoken',
     'drf_spectacular',
@@ -46,6 +47,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'authentication.middleware.RolePermissionVersionMiddleware',
+    'authentication.middleware.SessionActivityMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -69,6 +72,78 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'hospital_it.wsgi.application'
+ASGI_APPLICATION = 'hospital_it.asgi.application'
+
+# Channel layer for real-time notifications. The in-memory layer only reaches
+# sockets served by the same process; set CHANNEL_REDIS_URL (requires
+# channels-redis) to deliver across processes and nodes.
+CHANNEL_REDIS_URL = env('CHANNEL_REDIS_URL', default='')
+if CHANNEL_REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [CHANNEL_REDIS_URL]},
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        },
+    }
+
+# Cache. The local-memory default is private to each process, so a value one
+# process changes or drops is not seen by the others; set CACHE_REDIS_URL
+# (requires the redis package) to share one cache across processes and nodes.
+# Settings below that must agree across processes depend on SHARED_CACHE.
+CACHE_REDIS_URL = env('CACHE_REDIS_URL', default='')
+SHARED_CACHE = bool(CACHE_REDIS_URL)
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
+# Clients send a heartbeat every 30 seconds; sockets silent for longer than this are closed
+WEBSOCKET_HEARTBEAT_TIMEOUT = 90  # seconds
+
+# Cached per-user unread notification counters; writes recount them. Without a
+# shared cache a process only sees its own writes, so counters are kept briefly
+# and badges catch up with other processes within that time. 0 disables caching.
+NOTIFICATION_COUNTER_TIMEOUT = 3600 if SHARED_CACHE else 15  # seconds
+
+# Notification retention (purge_notifications); read notifications are kept per type
+NOTIFICATION_RETENTION_DAYS = {
+    'default': 90,
+    'info': 30,
+    'success': 30,
+}
+NOTIFICATION_DISMISSED_RETENTION_DAYS = 30
+NOTIFICATION_PURGE_CHUNK_SIZE = 1000
+
+# Email delivery (flush_notification_emails); digests go out at this local hour
+NOTIFICATION_DIGEST_HOUR = 7
+NOTIFICATION_DIGEST_WEEKDAY = 0  # Monday
+NOTIFICATION_EMAIL_BATCH_SIZE = 100  # users per batch on the shared SMTP connection
+NOTIFICATION_PREFERENCE_CACHE_TIMEOUT = 3600  # seconds
+
+# Role permission masks are cached per process and reloaded when their version stamp moves.
+# The stamp is read through the cache; with a per-process cache other processes notice
+# a change once their cached stamp expires.
+ROLE_PERMISSION_VERSION_TIMEOUT = 30  # seconds
+
+# Token -> user snapshots for API authentication; dropped on logout and user changes.
+# Without a shared cache other processes only notice logout, password changes and
+# deactivation once their snapshot expires, so it is kept short.
+AUTH_TOKEN_CACHE_TIMEOUT = 300 if SHARED_CACHE else 15  # seconds
 
 DATABASES = {
     'default': {
@@ -105,7 +180,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'authentication.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -152,12 +227,55 @@ FRONTEND_URL = env('FRONTEND_URL', default='http://localhost:3000')
 
 
 
+# Backups (admin_panel); archives are written under BACKUP_ROOT
+BACKUP_ROOT = Path(env('BACKUP_ROOT', default=str(BASE_DIR / 'backups')))
+BACKUP_MEDIA_DIRS = ['qr_codes', 'request_attachments']  # relative to MEDIA_ROOT (or BASE_DIR)
+BACKUP_PAGES_PER_STEP = 256  # SQLite pages copied per online backup step
+BACKUP_STEP_PAUSE = 0.005  # seconds between steps so writers can take the lock
+BACKUP_BUSY_TIMEOUT = 60  # seconds a step may keep hitting a locked database before the backup fails
+BACKUP_CHUNK_SIZE = 64 * 1024  # bytes per chunk in the incremental chunk store; rounded up to whole database pages
+
+# Report jobs (core.reports); artifacts are written under REPORT_ROOT
+REPORT_ROOT = Path(env('REPORT_ROOT', default=str(BASE_DIR / 'reports')))
+REPORT_WORKERS = 2  # worker threads generating reports outside the request threads
+REPORT_PENDING_GRACE = 300  # seconds before run_report_schedules picks up a job no worker started
+REPORT_RUNNING_TIMEOUT = 1800  # seconds before run_report_schedules marks a job whose worker died as failed
+
+# Chunked uploads (core.files); content is stored once per SHA-256 under request_attachments/cas
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # largest chunk accepted per request
+UPLOAD_MAX_SIZE = 2 * 1024 ** 3  # bytes per file
+UPLOAD_SESSION_TTL = 24  # hours an unfinished upload can be resumed before purge_uploads drops it
+
+# Attachment previews (core.previews); stored once per content hash under attachment_previews in media storage
+ATTACHMENT_PREVIEW_SIZE = 320  # longest side of image thumbnails, in pixels
+ATTACHMENT_PREVIEW_TEXT_BYTES = 4096  # bytes read from the start of text and log files
+ATTACHMENT_PREVIEW_TEXT_LINES = 50  # lines kept in a text preview
+ATTACHMENT_PREVIEW_WORKERS = 2  # worker threads generating previews outside the request threads
+
+# Duplicate ticket detection (requests_system.duplicates)
+DUPLICATE_WINDOW_HOURS = 24  # open requests created this recently are compared with new ones
+DUPLICATE_THRESHOLD = 0.5  # word overlap (70% title, 30% description) that flags a likely duplicate
+
+# Knowledge base search index (knowledge_base.search)
+KNOWLEDGE_BASE_SYNC_OVERLAP = 60  # seconds of writes re-read after the newest one, for commits landing out of order
+
 # Security settings
-ACCOUNT_LOCKOUT_ATTEMPTS = 5
-ACCOUNT_LOCKOUT_DURATION = 30  # minutes
+ACCOUNT_LOCKOUT_ATTEMPTS = 5  # failed logins per email/username within the lockout window
+ACCOUNT_LOCKOUT_DURATION = 30  # minutes; sliding window length and lock duration
+LOGIN_IP_LOCKOUT_ATTEMPTS = 100  # failed logins per client IP before identifiers failing from it are locked there
+LOGIN_ATTEMPT_BATCH_SIZE = 50  # LoginAttempt rows buffered before a bulk insert
+LOGIN_ATTEMPT_FLUSH_INTERVAL = 5  # seconds a buffered LoginAttempt may wait
+SESSION_ACTIVITY_FLUSH_INTERVAL = 60  # seconds between bulk last_activity writes per process
+SESSION_IDLE_TIMEOUT = 30  # minutes without activity before a session counts as ended
 PASSWORD_RESET_TIMEOUT = 3600  # 1 hour in seconds
 EMAIL_VERIFICATION_TIMEOUT = 86400  # 24 hours in seconds
 
+# Preventive maintenance planning
+MAINTENANCE_PLANNING_HORIZON_DAYS = 14
+MAINTENANCE_TASK_HOURS = 2  # default estimate for a preventive maintenance task
+MAINTENANCE_TECHNICIAN_HOURS_PER_DAY = 4  # hours per technician reserved for planned work
+CHECKOUT_REMINDER_INTERVAL_HOURS = 24  # minimum time between overdue checkout reminders
+
 # Ensure logs directory exists
 LOGS_DIR = BASE_DIR / 'logs'
 LOGS_DIR.mkdir(exist_ok=True)
@@ -231,6 +349,8 @@ if 'VERCEL' in os.environ:
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': '/tmp/db.sqlite3',
     }
+    BACKUP_ROOT = Path('/tmp/backups')
+    REPORT_ROOT = Path('/tmp/reports')
     LOGGING['handlers']['file']['class'] = 'logging.NullHandler'
     for logger in ['django', 'authentication', 'inventory', 'requests_system', 'tasks']:
         LOGGING['loggers'][logger]['handlers'] = ['console']
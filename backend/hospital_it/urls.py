@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 from core.reports import report_generate, report_history, report_download, report_schedule
-from core.files import file_upload
+from core.files import attachment_preview, file_upload, upload_chunk, upload_complete, upload_start
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -22,6 +22,10 @@ urlpatterns = [
     path('api/reports/<int:report_id>/download/', report_download, name='reports_download'),
     path('api/reports/schedule/', report_schedule, name='reports_schedule'),
     path('api/files/upload/', file_upload, name='file_upload'),
+    path('api/files/uploads/', upload_start, name='upload_start'),
+    path('api/files/uploads/<uuid:upload_id>/', upload_chunk, name='upload_chunk'),
+    path('api/files/uploads/<uuid:upload_id>/complete/', upload_complete, name='upload_complete'),
+    path('api/files/attachments/<int:attachment_id>/preview/', attachment_preview, name='attachment_preview'),
 
     # API Schema
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
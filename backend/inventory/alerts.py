@@ -0,0 +1,312 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import AssetAlert, AssetAlertWatermark, AssetCheckout, Equipment, MaintenanceSchedule
+
+logger = logging.getLogger(__name__)
+
+INACTIVE_EQUIPMENT_STATUSES = ['retired', 'disposed']
+
+WARRANTY_EXPIRING_DAYS = 30
+
+
+class AlertRule:
+    """A condition evaluated as one set-based query over equipment or checkouts.
+
+    ``matching`` returns rows of (equipment_id, period, name, asset_tag) for every
+    record currently in alert, ``touched`` returns the equipment ids whose state may
+    have changed since the previous evaluation.
+    """
+    alert_type = None
+    equipment_lookup = 'id'
+
+    def matching(self, today, now):
+        raise NotImplementedError
+
+    def touched(self, since, today, now):
+        raise NotImplementedError
+
+    def format_period(self, value):
+        return value.isoformat()
+
+    def build_alert(self, equipment_id, period, name, asset_tag):
+        raise NotImplementedError
+
+
+class EquipmentDateRule(AlertRule):
+    """Alert on equipment whose date field meets a condition relative to today"""
+    date_field = None
+    lookahead_days = 0
+
+    def condition(self, today):
+        raise NotImplementedError
+
+    def matching(self, today, now):
+        return Equipment.objects.filter(
+            self.condition(today)
+        ).exclude(
+            status__in=INACTIVE_EQUIPMENT_STATUSES
+        ).values_list('id', self.date_field, 'name', 'asset_tag')
+
+    def touched(self, since, today, now):
+        # Rows edited since the last run, plus rows whose date crossed a boundary
+        # while time moved on from the previous evaluation date.
+        window_start = timezone.localdate(since) - timedelta(days=1)
+        window_end = today + timedelta(days=self.lookahead_days)
+        return Equipment.objects.filter(
+            Q(updated_at__gt=since) |
+            Q(**{f'{self.date_field}__range': (window_start, window_end)})
+        ).values('id')
+
+
+class WarrantyExpiringRule(EquipmentDateRule):
+    alert_type = 'warranty_expiring'
+    date_field = 'warranty_expiry'
+    lookahead_days = WARRANTY_EXPIRING_DAYS
+
+    def condition(self, today):
+        return Q(warranty_expiry__gte=today, warranty_expiry__lte=today + timedelta(days=WARRANTY_EXPIRING_DAYS))
+
+    def build_alert(self, equipment_id, period, name, asset_tag):
+        return AssetAlert(
+            equipment_id=equipment_id,
+            alert_type=self.alert_type,
+            severity='medium',
+            title=f"Warranty expiring: {name}",
+            message=f"Warranty for {asset_tag} expires on {period}.",
+            period=period,
+        )
+
+
+class WarrantyExpiredRule(EquipmentDateRule):
+    alert_type = 'warranty_expired'
+    date_field = 'warranty_expiry'
+
+    def condition(self, today):
+        return Q(warranty_expiry__lt=today)
+
+    def build_alert(self, equipment_id, period, name, asset_tag):
+        return AssetAlert(
+            equipment_id=equipment_id,
+            alert_type=self.alert_type,
+            severity='low',
+            title=f"Warranty expired: {name}",
+            message=f"Warranty for {asset_tag} expired on {period}.",
+            period=period,
+        )
+
+
+class MaintenanceScheduleRule(AlertRule):
+    """Alert on equipment whose maintenance schedule occurrence meets a condition.
+
+    Schedules are what the planner advances, so an alert for an occurrence
+    resolves once the planner has turned it into a task and moved the schedule
+    on. The period is the occurrence date, as in the planner's own alerts.
+    """
+    equipment_lookup = 'equipment_id'
+    lookahead_days = 0
+
+    def condition(self, today):
+        raise NotImplementedError
+
+    def matching(self, today, now):
+        return MaintenanceSchedule.objects.filter(
+            self.condition(today)
+        ).exclude(
+            equipment__status__in=INACTIVE_EQUIPMENT_STATUSES
+        ).values_list('equipment_id', 'next_maintenance', 'equipment__name', 'equipment__asset_tag')
+
+    def touched(self, since, today, now):
+        window_start = timezone.localdate(since) - timedelta(days=1)
+        window_end = today + timedelta(days=self.lookahead_days)
+        return MaintenanceSchedule.objects.filter(
+            Q(updated_at__gt=since) |
+            Q(equipment__updated_at__gt=since) |
+            Q(next_maintenance__range=(window_start, window_end))
+        ).values('equipment_id')
+
+
+class MaintenanceDueRule(MaintenanceScheduleRule):
+    alert_type = 'maintenance_due'
+
+    @property
+    def lookahead_days(self):
+        return getattr(settings, 'MAINTENANCE_PLANNING_HORIZON_DAYS', 14)
+
+    def condition(self, today):
+        return Q(next_maintenance__gte=today, next_maintenance__lte=today + timedelta(days=self.lookahead_days))
+
+    def build_alert(self, equipment_id, period, name, asset_tag):
+        return AssetAlert(
+            equipment_id=equipment_id,
+            alert_type=self.alert_type,
+            severity='medium',
+            title=f"Maintenance due: {name}",
+            message=f"Maintenance for {asset_tag} is due on {period}.",
+            period=period,
+        )
+
+
+class MaintenanceOverdueRule(MaintenanceScheduleRule):
+    alert_type = 'maintenance_overdue'
+
+    def condition(self, today):
+        return Q(next_maintenance__lt=today)
+
+    def build_alert(self, equipment_id, period, name, asset_tag):
+        return AssetAlert(
+            equipment_id=equipment_id,
+            alert_type=self.alert_type,
+            severity='high',
+            title=f"Maintenance overdue: {name}",
+            message=f"Maintenance for {asset_tag} was due on {period}.",
+            period=period,
+        )
+
+
+class EndOfLifeRule(EquipmentDateRule):
+    alert_type = 'end_of_life'
+    date_field = 'end_of_life_date'
+
+    def condition(self, today):
+        return Q(end_of_life_date__lte=today)
+
+    def build_alert(self, equipment_id, period, name, asset_tag):
+        return AssetAlert(
+            equipment_id=equipment_id,
+            alert_type=self.alert_type,
+            severity='medium',
+            title=f"End of life reached: {name}",
+            message=f"{asset_tag} reached its end of life on {period}.",
+            period=period,
+        )
+
+
+class CheckoutOverdueRule(AlertRule):
+    alert_type = 'checkout_overdue'
+    equipment_lookup = 'equipment_id'
+
+    def matching(self, today, now):
+        return AssetCheckout.objects.filter(
+            actual_return_date__isnull=True,
+            expected_return_date__lt=now,
+        ).values_list('equipment_id', 'id', 'equipment__name', 'equipment__asset_tag')
+
+    def touched(self, since, today, now):
+        # A pushed-back return date leaves no trace, so checkouts of equipment
+        # with an active alert are always looked at again
+        return AssetCheckout.objects.filter(
+            Q(checkout_date__gt=since) |
+            Q(actual_return_date__gt=since) |
+            Q(expected_return_date__gt=since, expected_return_date__lte=now) |
+            Q(equipment__alerts__alert_type=self.alert_type, equipment__alerts__is_active=True)
+        ).values('equipment_id')
+
+    def build_alert(self, equipment_id, period, name, asset_tag):
+        return AssetAlert(
+            equipment_id=equipment_id,
+            alert_type=self.alert_type,
+            severity='medium',
+            title=f"Checkout overdue: {name}",
+            message=f"{asset_tag} has not been returned by its expected return date.",
+            period=period,
+        )
+
+    def format_period(self, value):
+        return f"checkout-{value}"
+
+
+RULES = [
+    WarrantyExpiringRule(),
+    WarrantyExpiredRule(),
+    MaintenanceDueRule(),
+    MaintenanceOverdueRule(),
+    EndOfLifeRule(),
+    CheckoutOverdueRule(),
+]
+
+
+class AssetAlertEngine:
+    """Generate and auto-resolve AssetAlert rows from the alert rules"""
+
+    @staticmethod
+    def get_rules(alert_types=None):
+        if not alert_types:
+            return list(RULES)
+        return [rule for rule in RULES if rule.alert_type in alert_types]
+
+    @staticmethod
+    def evaluate(alert_types=None, full=False, now=None):
+        """Evaluate rules, incrementally from each rule's watermark unless ``full``"""
+        now = now or timezone.now()
+        today = timezone.localdate(now)
+        watermarks = {
+            mark.rule: mark.evaluated_at
+            for mark in AssetAlertWatermark.objects.all()
+        }
+
+        results = {}
+        for rule in AssetAlertEngine.get_rules(alert_types):
+            since = None if full else watermarks.get(rule.alert_type)
+            try:
+                with transaction.atomic():
+                    results[rule.alert_type] = AssetAlertEngine._evaluate_rule(rule, today, now, since)
+                    AssetAlertWatermark.objects.update_or_create(
+                        rule=rule.alert_type, defaults={'evaluated_at': now}
+                    )
+            except Exception as e:
+                logger.error(f"Error evaluating alert rule {rule.alert_type}: {str(e)}")
+                results[rule.alert_type] = {'created': 0, 'resolved': 0, 'incremental': since is not None, 'error': str(e)}
+
+        return results
+
+    @staticmethod
+    def _evaluate_rule(rule, today, now, since):
+        matching = rule.matching(today, now)
+        alerts = AssetAlert.objects.filter(alert_type=rule.alert_type).exclude(period='')
+        if since is not None:
+            touched = rule.touched(since, today, now)
+            matching = matching.filter(**{f'{rule.equipment_lookup}__in': touched})
+            alerts = alerts.filter(equipment_id__in=touched)
+
+        current = {}
+        for equipment_id, period_value, name, asset_tag in matching.iterator(chunk_size=2000):
+            period = rule.format_period(period_value)
+            current[(equipment_id, period)] = (name, asset_tag)
+
+        existing = {}
+        for alert_id, equipment_id, period, is_active in alerts.values_list('id', 'equipment_id', 'period', 'is_active'):
+            existing[(equipment_id, period)] = (alert_id, is_active)
+
+        new_alerts = [
+            rule.build_alert(equipment_id, period, name, asset_tag)
+            for (equipment_id, period), (name, asset_tag) in current.items()
+            if (equipment_id, period) not in existing
+        ]
+        AssetAlert.objects.bulk_create(new_alerts, batch_size=500, ignore_conflicts=True)
+
+        cleared = [
+            alert_id for key, (alert_id, is_active) in existing.items()
+            if is_active and key not in current
+        ]
+        resolved = 0
+        for start in range(0, len(cleared), 500):
+            resolved += AssetAlert.objects.filter(
+                id__in=cleared[start:start + 500]
+            ).update(is_active=False, resolved_at=now)
+
+        return {'created': len(new_alerts), 'resolved': resolved, 'incremental': since is not None}
+
+    @staticmethod
+    def active_counts(equipment_qs):
+        """Active alert counts per alert type for the given equipment"""
+        counts = AssetAlert.objects.filter(
+            is_active=True, equipment__in=equipment_qs
+        ).values('alert_type').annotate(total=Count('id')).order_by()
+        return {row['alert_type']: row['total'] for row in counts}
+
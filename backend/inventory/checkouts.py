@@ -0,0 +1,96 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.utils import timezone
+
+from .models import AssetCheckout
+
+logger = logging.getLogger(__name__)
+
+
+class CheckoutTrackingService:
+    """Overdue state for asset checkouts, computed from return dates"""
+
+    @staticmethod
+    def overdue_q(now=None):
+        """Condition for checkouts still out past their expected return date"""
+        now = now or timezone.now()
+        return Q(
+            actual_return_date__isnull=True,
+            expected_return_date__isnull=False,
+            expected_return_date__lt=now,
+        )
+
+    @staticmethod
+    def annotate_overdue(queryset, now=None):
+        """Annotate ``overdue_now`` so overdue state never depends on the stored flag"""
+        return queryset.annotate(
+            overdue_now=ExpressionWrapper(
+                CheckoutTrackingService.overdue_q(now),
+                output_field=BooleanField(),
+            )
+        )
+
+    @staticmethod
+    def refresh_overdue_flags(now=None):
+        """Bring the stored ``is_overdue`` flag in line with the return dates"""
+        now = now or timezone.now()
+        overdue = CheckoutTrackingService.overdue_q(now)
+
+        flagged = AssetCheckout.objects.filter(overdue, is_overdue=False).update(is_overdue=True)
+        cleared = AssetCheckout.objects.filter(~overdue, is_overdue=True).update(is_overdue=False)
+
+        return {'flagged': flagged, 'cleared': cleared}
+
+    @staticmethod
+    def send_overdue_reminders(now=None, interval_hours=None):
+        """Send each borrower one notification covering all of their overdue items"""
+        from notifications.counters import NotificationCounterService
+        from notifications.models import Notification
+
+        now = now or timezone.now()
+        if interval_hours is None:
+            interval_hours = getattr(settings, 'CHECKOUT_REMINDER_INTERVAL_HOURS', 24)
+        remind_before = now - timedelta(hours=interval_hours)
+
+        due = AssetCheckout.objects.filter(
+            CheckoutTrackingService.overdue_q(now)
+        ).filter(
+            Q(last_reminded_at__isnull=True) | Q(last_reminded_at__lt=remind_before)
+        ).order_by('checked_out_to_id', 'expected_return_date').values_list(
+            'id', 'checked_out_to_id', 'equipment__name', 'equipment__asset_tag', 'expected_return_date'
+        )
+
+        by_user = {}
+        checkout_ids = []
+        for checkout_id, user_id, name, asset_tag, expected in due.iterator(chunk_size=2000):
+            by_user.setdefault(user_id, []).append((name, asset_tag, expected))
+            checkout_ids.append(checkout_id)
+
+        notifications = []
+        for user_id, items in by_user.items():
+            lines = [
+                f"- {name} ({asset_tag}), due {timezone.localtime(expected).strftime('%Y-%m-%d %H:%M')}"
+                for name, asset_tag, expected in items
+            ]
+            count = len(items)
+            notifications.append(Notification(
+                recipient_id=user_id,
+                title=f"{count} overdue equipment checkout{'s' if count != 1 else ''}",
+                message="Please return the following equipment:\n" + "\n".join(lines),
+                type='warning',
+                priority='high' if count > 1 else 'medium',
+                related_object_type='asset_checkout',
+            ))
+        Notification.objects.bulk_create(notifications, batch_size=500)
+        NotificationCounterService.invalidate(by_user.keys())
+
+        for start in range(0, len(checkout_ids), 500):
+            AssetCheckout.objects.filter(
+                id__in=checkout_ids[start:start + 500]
+            ).update(last_reminded_at=now)
+
+        logger.info(f"Sent {len(notifications)} overdue checkout reminders covering {len(checkout_ids)} checkouts")
+        return {'users_notified': len(notifications), 'checkouts_reminded': len(checkout_ids)}
@@ -0,0 +1,328 @@
+import calendar
+import logging
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import ReportDataVersion
+from .models import AssetAlert, Equipment, MaintenanceSchedule
+
+logger = logging.getLogger(__name__)
+
+FREQUENCY_MONTHS = {
+    'monthly': 1,
+    'quarterly': 3,
+    'annually': 12,
+}
+
+PRIORITY_ORDER = ['critical', 'high', 'medium', 'low']
+
+OPEN_TASK_STATUSES = ['assigned', 'in_progress']
+PLANNED_TASK_STATUSES = ['pending', *OPEN_TASK_STATUSES]
+
+INACTIVE_EQUIPMENT_STATUSES = ['retired', 'disposed', 'lost', 'stolen']
+
+
+def add_months(value, months):
+    """Add calendar months to a date, clamping to the last day of the month"""
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def advance_by_frequency(value, frequency):
+    """Return the occurrence following ``value`` for a schedule frequency"""
+    if frequency == 'weekly':
+        return value + timedelta(weeks=1)
+    return add_months(value, FREQUENCY_MONTHS.get(frequency, 1))
+
+
+class MaintenancePlanningService:
+    """Turn due maintenance schedules into tasks, alerts and technician assignments"""
+
+    @staticmethod
+    def get_due_schedules(as_of, horizon_days):
+        """Schedules whose next occurrence falls on or before the end of the horizon"""
+        horizon_end = as_of + timedelta(days=horizon_days)
+        return MaintenanceSchedule.objects.filter(
+            next_maintenance__lte=horizon_end
+        ).exclude(
+            equipment__status__in=INACTIVE_EQUIPMENT_STATUSES
+        ).select_related(
+            'equipment', 'equipment__location__department', 'assigned_technician'
+        ).order_by('next_maintenance', 'id')
+
+    @staticmethod
+    def next_occurrence(schedule, as_of):
+        """Advance a schedule past the current occurrence, skipping missed periods"""
+        upcoming = advance_by_frequency(schedule.next_maintenance, schedule.frequency)
+        while upcoming <= as_of:
+            upcoming = advance_by_frequency(upcoming, schedule.frequency)
+        return upcoming
+
+    @staticmethod
+    def plan(as_of=None, horizon_days=None, dry_run=False):
+        """Generate maintenance work for every schedule due within the horizon, one task per occurrence"""
+        as_of = as_of or timezone.localdate()
+        if horizon_days is None:
+            horizon_days = getattr(settings, 'MAINTENANCE_PLANNING_HORIZON_DAYS', 14)
+
+        with transaction.atomic():
+            schedules = list(
+                MaintenancePlanningService.get_due_schedules(as_of, horizon_days).select_for_update(of=('self',))
+            )
+            # Occurrences that already have an unfinished task are not planned again
+            planned = MaintenancePlanningService._planned_occurrences(schedules)
+            unplanned = [
+                schedule for schedule in schedules
+                if (schedule.id, MaintenancePlanningService.due_at(schedule)) not in planned
+            ]
+            technicians = MaintenancePlanningService._load_technician_capacity(horizon_days)
+            assignments = MaintenancePlanningService._balance_assignments(unplanned, technicians)
+
+            summary = {
+                'as_of': as_of.isoformat(),
+                'horizon_days': horizon_days,
+                'schedules_due': len(schedules),
+                'overdue': sum(1 for schedule in schedules if schedule.next_maintenance < as_of),
+                'tasks_created': 0,
+                'tasks_assigned': sum(1 for tech in assignments.values() if tech is not None),
+                'alerts_created': 0,
+                'technicians_notified': 0,
+            }
+
+            if dry_run or not schedules:
+                return summary
+
+            summary['tasks_created'] = MaintenancePlanningService._create_tasks(unplanned, assignments, as_of)
+            summary['alerts_created'] = MaintenancePlanningService._create_alerts(schedules, as_of)
+            summary['technicians_notified'] = MaintenancePlanningService._notify_technicians(assignments)
+
+            # bulk_update skips auto_now; the alert rules find advanced schedules by updated_at
+            now = timezone.now()
+            for schedule in schedules:
+                schedule.next_maintenance = MaintenancePlanningService.next_occurrence(schedule, as_of)
+                schedule.updated_at = now
+            MaintenanceSchedule.objects.bulk_update(schedules, ['next_maintenance', 'updated_at'], batch_size=500)
+            MaintenancePlanningService._sync_equipment_dates({schedule.equipment_id for schedule in schedules})
+            # Bulk writes send no signals
+            ReportDataVersion.bump(MaintenanceSchedule._meta.label, Equipment._meta.label)
+
+        logger.info(
+            f"Maintenance planning created {summary['tasks_created']} tasks and "
+            f"{summary['alerts_created']} alerts for {summary['schedules_due']} due schedules"
+        )
+        return summary
+
+    @staticmethod
+    def due_at(schedule):
+        """Due date of the task planned for a schedule's next occurrence"""
+        return timezone.make_aware(datetime.combine(schedule.next_maintenance, time(hour=17)))
+
+    @staticmethod
+    def _planned_occurrences(schedules):
+        """``(schedule_id, due_date)`` of unfinished tasks already planned for these schedules"""
+        from tasks.models import Task
+
+        schedule_ids = [schedule.id for schedule in schedules]
+        planned = set()
+        for start in range(0, len(schedule_ids), 500):
+            planned.update(Task.objects.filter(
+                maintenance_schedule_id__in=schedule_ids[start:start + 500], status__in=PLANNED_TASK_STATUSES,
+            ).values_list('maintenance_schedule_id', 'due_date'))
+        return planned
+
+    @staticmethod
+    def _sync_equipment_dates(equipment_ids):
+        """Set each equipment's next maintenance date to its earliest schedule occurrence"""
+        earliest = MaintenanceSchedule.objects.filter(
+            equipment=OuterRef('pk')
+        ).order_by('next_maintenance').values('next_maintenance')[:1]
+        equipment_ids = list(equipment_ids)
+        for start in range(0, len(equipment_ids), 500):
+            Equipment.objects.filter(
+                id__in=equipment_ids[start:start + 500]
+            ).update(next_maintenance_date=Subquery(earliest))
+
+    @staticmethod
+    def _task_hours():
+        return Decimal(str(getattr(settings, 'MAINTENANCE_TASK_HOURS', 2)))
+
+    @staticmethod
+    def _load_technician_capacity(horizon_days):
+        """Available technicians with their remaining planned-work hours over the horizon"""
+        from tasks.models import ITPersonnel
+
+        task_hours = MaintenancePlanningService._task_hours()
+        hours_per_day = Decimal(str(getattr(settings, 'MAINTENANCE_TECHNICIAN_HOURS_PER_DAY', 4)))
+        open_tasks = Q(assigned_tasks__status__in=OPEN_TASK_STATUSES)
+
+        technicians = ITPersonnel.objects.filter(
+            is_available=True, user__is_active=True
+        ).select_related('user').annotate(
+            open_hours=Coalesce(
+                Sum(
+                    Coalesce('assigned_tasks__estimated_hours', Value(task_hours)),
+                    filter=open_tasks,
+                    output_field=DecimalField(max_digits=9, decimal_places=2),
+                ),
+                Value(Decimal('0')),
+                output_field=DecimalField(max_digits=9, decimal_places=2),
+            )
+        )
+
+        total = hours_per_day * max(horizon_days, 1)
+        return [
+            {
+                'technician': tech,
+                'department': (tech.department or '').strip().lower(),
+                'capacity': total,
+                'planned': Decimal(tech.open_hours),
+            }
+            for tech in technicians
+        ]
+
+    @staticmethod
+    def _balance_assignments(schedules, technicians):
+        """Assign each due schedule to the least utilised eligible technician"""
+        task_hours = MaintenancePlanningService._task_hours()
+        by_department = {}
+        by_user = {}
+        for entry in technicians:
+            by_department.setdefault(entry['department'], []).append(entry)
+            by_user[entry['technician'].user_id] = entry
+
+        assignments = {}
+        ordered = sorted(
+            schedules,
+            key=lambda s: (
+                s.next_maintenance,
+                PRIORITY_ORDER.index(s.equipment.priority) if s.equipment.priority in PRIORITY_ORDER else len(PRIORITY_ORDER),
+            ),
+        )
+        for schedule in ordered:
+            chosen = None
+
+            preferred = by_user.get(schedule.assigned_technician_id)
+            if preferred and preferred['planned'] + task_hours <= preferred['capacity']:
+                chosen = preferred
+            else:
+                department = schedule.equipment.location.department.name.strip().lower()
+                candidates = by_department.get(department, []) + (
+                    by_department.get('it', []) if department != 'it' else []
+                )
+                candidates = [c for c in candidates if c['planned'] + task_hours <= c['capacity']]
+                if candidates:
+                    chosen = min(candidates, key=lambda c: c['planned'] / c['capacity'])
+
+            if chosen:
+                chosen['planned'] += task_hours
+                assignments[schedule.id] = chosen['technician']
+            else:
+                assignments[schedule.id] = None
+
+        return assignments
+
+    @staticmethod
+    def _create_tasks(schedules, assignments, as_of):
+        from tasks.models import Task
+
+        now = timezone.now()
+        task_hours = MaintenancePlanningService._task_hours()
+        tasks = []
+        for schedule in schedules:
+            equipment = schedule.equipment
+            technician = assignments.get(schedule.id)
+            priority = equipment.priority
+            if schedule.next_maintenance < as_of and priority in ('medium', 'low'):
+                priority = 'high'
+
+            tasks.append(Task(
+                maintenance_schedule=schedule,
+                title=f"Preventive maintenance: {equipment.name} ({equipment.asset_tag})",
+                description=(
+                    f"{schedule.maintenance_type} ({schedule.get_frequency_display().lower()}) "
+                    f"due {schedule.next_maintenance.isoformat()} at {equipment.location}."
+                    + (f"\n\n{schedule.notes}" if schedule.notes else "")
+                ),
+                priority=priority,
+                status='assigned' if technician else 'pending',
+                assigned_to=technician,
+                assigned_at=now if technician else None,
+                estimated_hours=task_hours,
+                due_date=MaintenancePlanningService.due_at(schedule),
+            ))
+
+        Task.objects.bulk_create(tasks, batch_size=500)
+        ReportDataVersion.bump(Task._meta.label)
+        return len(tasks)
+
+    @staticmethod
+    def _create_alerts(schedules, as_of):
+        """Create one due or overdue alert per equipment and occurrence date.
+
+        These are the alerts ``MaintenanceDueRule`` and ``MaintenanceOverdueRule``
+        own, so they resolve once the schedule has moved past the occurrence.
+        """
+        alerts = {}
+        for schedule in schedules:
+            period = schedule.next_maintenance.isoformat()
+            key = (schedule.equipment_id, period)
+            if key in alerts:
+                continue
+
+            overdue = schedule.next_maintenance < as_of
+            equipment = schedule.equipment
+            alerts[key] = AssetAlert(
+                equipment=equipment,
+                alert_type='maintenance_overdue' if overdue else 'maintenance_due',
+                severity='high' if overdue else 'medium',
+                title=f"Maintenance {'overdue' if overdue else 'due'}: {equipment.name}",
+                message=(
+                    f"{schedule.maintenance_type} for {equipment.asset_tag} "
+                    f"{'was due' if overdue else 'is due'} on {period}."
+                ),
+                period=period,
+            )
+
+        existing = set(
+            AssetAlert.objects.filter(
+                alert_type__in=['maintenance_due', 'maintenance_overdue'],
+                period__in={period for _, period in alerts},
+            ).values_list('equipment_id', 'period')
+        )
+        new_alerts = [alert for key, alert in alerts.items() if key not in existing]
+        AssetAlert.objects.bulk_create(new_alerts, batch_size=500, ignore_conflicts=True)
+        return len(new_alerts)
+
+    @staticmethod
+    def _notify_technicians(assignments):
+        """Send each technician one summary notification for their new work"""
+        from notifications.counters import NotificationCounterService
+        from notifications.models import Notification
+
+        counts = {}
+        for technician in assignments.values():
+            if technician is not None:
+                counts.setdefault(technician.user_id, [technician, 0])[1] += 1
+
+        notifications = [
+            Notification(
+                recipient=technician.user,
+                title="Preventive maintenance scheduled",
+                message=f"You have been assigned {count} new preventive maintenance task{'s' if count != 1 else ''}.",
+                type='maintenance',
+                related_object_type='task',
+            )
+            for technician, count in counts.values()
+        ]
+        Notification.objects.bulk_create(notifications, batch_size=500)
+        NotificationCounterService.invalidate(counts.keys())
+        return len(notifications)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.alerts import AssetAlertEngine, RULES
+
+
+class Command(BaseCommand):
+    help = 'Generate and auto-resolve equipment alerts from the alert rules'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rule',
+            action='append',
+            dest='rules',
+            choices=[rule.alert_type for rule in RULES],
+            help='Only evaluate this alert type (may be given more than once)',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Re-evaluate every record instead of only changes since the last run',
+        )
+
+    def handle(self, *args, **options):
+        results = AssetAlertEngine.evaluate(alert_types=options['rules'], full=options['full'])
+
+        failed = False
+        for alert_type, result in results.items():
+            mode = 'incremental' if result['incremental'] else 'full'
+            if result.get('error'):
+                failed = True
+                self.stdout.write(self.style.ERROR(f"{alert_type}: failed ({result['error']})"))
+                continue
+            self.stdout.write(
+                f"{alert_type}: {result['created']} created, {result['resolved']} resolved ({mode})"
+            )
+
+        if failed:
+            raise CommandError('One or more alert rules failed to evaluate')
+        self.stdout.write(self.style.SUCCESS('Alert evaluation complete'))
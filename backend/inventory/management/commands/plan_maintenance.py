@@ -0,0 +1,60 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.maintenance import MaintenancePlanningService
+
+
+class Command(BaseCommand):
+    help = 'Generate preventive maintenance tasks and alerts for due maintenance schedules'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horizon-days',
+            type=int,
+            default=None,
+            help='Plan schedules due within this many days (default: MAINTENANCE_PLANNING_HORIZON_DAYS)',
+        )
+        parser.add_argument(
+            '--as-of',
+            type=str,
+            default=None,
+            help='Planning date in YYYY-MM-DD format (default: today)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be generated without writing anything',
+        )
+
+    def handle(self, *args, **options):
+        horizon_days = options['horizon_days']
+        if horizon_days is not None and horizon_days < 0:
+            raise CommandError('--horizon-days must not be negative')
+
+        as_of = None
+        if options['as_of']:
+            try:
+                as_of = date.fromisoformat(options['as_of'])
+            except ValueError:
+                raise CommandError('--as-of must be a date in YYYY-MM-DD format')
+
+        summary = MaintenancePlanningService.plan(
+            as_of=as_of,
+            horizon_days=horizon_days,
+            dry_run=options['dry_run'],
+        )
+
+        prefix = '[dry run] ' if options['dry_run'] else ''
+        self.stdout.write(
+            f"{prefix}{summary['schedules_due']} schedules due by {summary['as_of']} "
+            f"+ {summary['horizon_days']} days ({summary['overdue']} overdue)"
+        )
+        self.stdout.write(
+            f"{prefix}{summary['tasks_assigned']} tasks assigned within technician capacity, "
+            f"{summary['schedules_due'] - summary['tasks_assigned']} left pending"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Created {summary['tasks_created']} tasks, {summary['alerts_created']} alerts, "
+            f"notified {summary['technicians_notified']} technicians"
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.checkouts import CheckoutTrackingService
+
+
+class Command(BaseCommand):
+    help = 'Refresh overdue flags on asset checkouts and send batched overdue reminders'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-reminders',
+            action='store_true',
+            help='Only refresh overdue flags, do not notify borrowers',
+        )
+        parser.add_argument(
+            '--reminder-interval-hours',
+            type=int,
+            default=None,
+            help='Minimum hours between reminders for the same checkout (default: CHECKOUT_REMINDER_INTERVAL_HOURS)',
+        )
+
+    def handle(self, *args, **options):
+        interval = options['reminder_interval_hours']
+        if interval is not None and interval < 0:
+            raise CommandError('--reminder-interval-hours must not be negative')
+
+        flags = CheckoutTrackingService.refresh_overdue_flags()
+        self.stdout.write(f"Flagged {flags['flagged']} checkouts as overdue, cleared {flags['cleared']}")
+
+        if not options['no_reminders']:
+            reminders = CheckoutTrackingService.send_overdue_reminders(interval_hours=interval)
+            self.stdout.write(
+                f"Reminded {reminders['users_notified']} users about {reminders['checkouts_reminded']} overdue checkouts"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Checkout tracking complete'))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_equipment_barcode_equipment_checked_out_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='maintenanceschedule',
+            index=models.Index(fields=['next_maintenance'], name='inventory_m_next_ma_ef18b3_idx'),
+        ),
+    ]
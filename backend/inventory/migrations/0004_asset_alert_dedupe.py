@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_maintenanceschedule_next_maintenance_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetAlertWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rule', models.CharField(max_length=30, unique=True)),
+                ('evaluated_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='assetalert',
+            name='period',
+            field=models.CharField(blank=True, default='', help_text='Occurrence the alert refers to, used to de-duplicate generated alerts', max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='assetalert',
+            index=models.Index(fields=['alert_type', 'is_active'], name='inventory_a_alert_t_58afbe_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='assetalert',
+            constraint=models.UniqueConstraint(condition=models.Q(('period', ''), _negated=True), fields=('equipment', 'alert_type', 'period'), name='unique_asset_alert_period'),
+        ),
+    ]
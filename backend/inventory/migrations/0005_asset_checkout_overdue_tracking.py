@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_asset_alert_dedupe'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assetcheckout',
+            name='last_reminded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='assetcheckout',
+            index=models.Index(fields=['actual_return_date', 'expected_return_date'], name='inventory_a_actual__d28f5c_idx'),
+        ),
+    ]
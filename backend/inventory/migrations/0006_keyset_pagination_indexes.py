@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_asset_checkout_overdue_tracking'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assethistory',
+            index=models.Index(fields=['timestamp', 'id'], name='inventory_a_timesta_00ea00_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['created_at', 'id'], name='inventory_e_created_de4714_idx'),
+        ),
+    ]
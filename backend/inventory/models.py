@@ -125,6 +125,11 @@ class Equipment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.asset_tag})"
     
@@ -278,6 +283,12 @@ class MaintenanceSchedule(models.Model):
     assigned_technician = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_maintenance']),
+        ]
 
     def __str__(self):
         return f"{self.equipment.name} - {self.maintenance_type}"
@@ -316,6 +327,9 @@ class AssetHistory(models.Model):
     class Meta:
         ordering = ['-timestamp']
         verbose_name_plural = "Asset Histories"
+        indexes = [
+            models.Index(fields=['timestamp', 'id']),
+        ]
     
     def __str__(self):
         return f"{self.equipment.asset_tag} - {self.action} - {self.timestamp}"
@@ -334,17 +348,23 @@ class AssetCheckout(models.Model):
     condition_at_checkout = models.CharField(max_length=20, choices=Equipment.CONDITION_CHOICES, default='good')
     condition_at_checkin = models.CharField(max_length=20, choices=Equipment.CONDITION_CHOICES, blank=True)
     is_overdue = models.BooleanField(default=False)
+    last_reminded_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         ordering = ['-checkout_date']
+        indexes = [
+            models.Index(fields=['actual_return_date', 'expected_return_date']),
+        ]
     
     def __str__(self):
         return f"{self.equipment.asset_tag} - {self.checked_out_to.get_full_name()}"
     
     def save(self, *args, **kwargs):
-        # Check if overdue
-        if self.expected_return_date and not self.actual_return_date:
-            self.is_overdue = timezone.now() > self.expected_return_date
+        # Overdue only while the item is still out past its expected return date
+        self.is_overdue = bool(
+            self.expected_return_date and not self.actual_return_date
+            and timezone.now() > self.expected_return_date
+        )
         super().save(*args, **kwargs)
 
 class AssetAudit(models.Model):
@@ -435,6 +455,7 @@ class AssetAlert(models.Model):
     severity = models.CharField(max_length=10, choices=SEVERITY_CHOICES)
     title = models.CharField(max_length=200)
     message = models.TextField()
+    period = models.CharField(max_length=50, blank=True, default='', help_text="Occurrence the alert refers to, used to de-duplicate generated alerts")
     is_active = models.BooleanField(default=True)
     acknowledged_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     acknowledged_at = models.DateTimeField(null=True, blank=True)
@@ -444,6 +465,16 @@ class AssetAlert(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['alert_type', 'is_active']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['equipment', 'alert_type', 'period'],
+                condition=~models.Q(period=''),
+                name='unique_asset_alert_period',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.equipment.asset_tag} - {self.alert_type}"
@@ -461,6 +492,14 @@ class AssetAlert(models.Model):
         self.is_active = False
         self.save()
 
+class AssetAlertWatermark(models.Model):
+    """Point up to which an alert rule has been evaluated"""
+    rule = models.CharField(max_length=30, unique=True)
+    evaluated_at = models.DateTimeField()
+    
+    def __str__(self):
+        return f"{self.rule} @ {self.evaluated_at}"
+
 class AssetTag(models.Model):
     """Manage different types of asset tags"""
     TAG_TYPE_CHOICES = [
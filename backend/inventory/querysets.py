@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.db.models import BooleanField, Case, DateField, DurationField, ExpressionWrapper, F, Value, When
+from django.utils import timezone
+
+WARRANTY_EXPIRING_SOON_DAYS = 30
+
+EQUIPMENT_RELATIONS = ['category', 'location', 'vendor', 'assigned_to', 'checked_out_to']
+
+EQUIPMENT_LIST_FIELDS = [
+    'id', 'name', 'asset_tag', 'serial_number', 'model', 'manufacturer', 'description',
+    'status', 'condition', 'priority',
+    'purchase_date', 'purchase_cost', 'warranty_expiry', 'next_maintenance_date',
+    'expected_return_date', 'created_at', 'updated_at',
+    'category', 'category__name',
+    'location', 'location__building', 'location__floor', 'location__room',
+    'vendor', 'vendor__name',
+    'assigned_to', 'assigned_to__first_name', 'assigned_to__last_name',
+    'checked_out_to', 'checked_out_to__first_name', 'checked_out_to__last_name',
+]
+
+
+class EquipmentQuerySetBuilder:
+    """Build equipment querysets that serialize without per-row queries"""
+
+    @staticmethod
+    def annotate_flags(queryset, today=None):
+        """Annotate maintenance/warranty flags and durations computed by the database"""
+        today = today or timezone.localdate()
+        today_value = Value(today, output_field=DateField())
+        return queryset.annotate(
+            maintenance_overdue=Case(
+                When(next_maintenance_date__lt=today, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+            warranty_expired=Case(
+                When(warranty_expiry__lt=today, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+            warranty_expiring_soon=Case(
+                When(warranty_expiry__lte=today + timedelta(days=WARRANTY_EXPIRING_SOON_DAYS), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+            warranty_remaining=ExpressionWrapper(
+                F('warranty_expiry') - today_value, output_field=DurationField()
+            ),
+            age=ExpressionWrapper(
+                today_value - F('purchase_date'), output_field=DurationField()
+            ),
+        )
+
+    @staticmethod
+    def for_detail(queryset, today=None):
+        """Full rows with related objects joined in, including the department object checks read"""
+        return EquipmentQuerySetBuilder.annotate_flags(
+            queryset.select_related(*EQUIPMENT_RELATIONS, 'location__department'), today
+        )
+
+    @staticmethod
+    def for_list(queryset, today=None):
+        """Only the columns the list serializer reads, with related names joined in"""
+        return EquipmentQuerySetBuilder.annotate_flags(
+            queryset.select_related(*EQUIPMENT_RELATIONS).only(*EQUIPMENT_LIST_FIELDS), today
+        )
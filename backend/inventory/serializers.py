@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.utils import timezone
 from .models import (
     Equipment, Software, Department, Location, Vendor, EquipmentCategory, 
     MaintenanceSchedule, AssetHistory, AssetCheckout, AssetAudit, 
@@ -27,46 +28,83 @@ class EquipmentCategorySerializer(serializers.ModelSerializer):
         model = EquipmentCategory
         fields = '__all__'
 
-class EquipmentSerializer(serializers.ModelSerializer):
-    category_name = serializers.CharField(source='category.name', read_only=True)
-    location_name = serializers.CharField(source='location.__str__', read_only=True)
-    vendor_name = serializers.CharField(source='vendor.name', read_only=True)
-    assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
-    checked_out_to_name = serializers.CharField(source='checked_out_to.get_full_name', read_only=True)
-    
-    # Computed fields
+class EquipmentComputedFieldsMixin(serializers.Serializer):
+    """Computed equipment flags, read from queryset annotations when available"""
     is_overdue_maintenance = serializers.SerializerMethodField()
     is_warranty_expired = serializers.SerializerMethodField()
     is_warranty_expiring_soon = serializers.SerializerMethodField()
     days_until_warranty_expiry = serializers.SerializerMethodField()
     age_in_years = serializers.SerializerMethodField()
     
-    class Meta:
-        model = Equipment
-        fields = '__all__'
-        read_only_fields = ('id',)
+    def _today(self):
+        # Computed once per serializer instead of once per row
+        if not hasattr(self, '_today_cache'):
+            self._today_cache = timezone.now().date()
+        return self._today_cache
     
     def get_is_overdue_maintenance(self, obj):
+        if hasattr(obj, 'maintenance_overdue'):
+            return obj.maintenance_overdue
         return obj.is_overdue_maintenance()
     
     def get_is_warranty_expired(self, obj):
+        if hasattr(obj, 'warranty_expired'):
+            return obj.warranty_expired
         return obj.is_warranty_expired()
     
     def get_is_warranty_expiring_soon(self, obj):
+        if hasattr(obj, 'warranty_expiring_soon'):
+            return obj.warranty_expiring_soon
         return obj.is_warranty_expiring_soon()
     
     def get_days_until_warranty_expiry(self, obj):
+        if hasattr(obj, 'warranty_remaining'):
+            return obj.warranty_remaining.days if obj.warranty_remaining is not None else None
         if obj.warranty_expiry:
-            from django.utils import timezone
-            return (obj.warranty_expiry - timezone.now().date()).days
+            return (obj.warranty_expiry - self._today()).days
         return None
     
     def get_age_in_years(self, obj):
+        if hasattr(obj, 'age'):
+            return round(obj.age.days / 365.25, 1) if obj.age is not None else None
         if obj.purchase_date:
-            from django.utils import timezone
-            return round((timezone.now().date() - obj.purchase_date).days / 365.25, 1)
+            return round((self._today() - obj.purchase_date).days / 365.25, 1)
         return None
 
+class EquipmentSerializer(EquipmentComputedFieldsMixin, serializers.ModelSerializer):
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    location_name = serializers.CharField(source='location.__str__', read_only=True)
+    vendor_name = serializers.CharField(source='vendor.name', read_only=True)
+    assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
+    checked_out_to_name = serializers.CharField(source='checked_out_to.get_full_name', read_only=True)
+    
+    class Meta:
+        model = Equipment
+        fields = '__all__'
+        read_only_fields = ('id',)
+
+class EquipmentListSerializer(EquipmentComputedFieldsMixin, serializers.ModelSerializer):
+    """Compact read-only representation for equipment lists"""
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    location_name = serializers.CharField(source='location.__str__', read_only=True)
+    vendor_name = serializers.CharField(source='vendor.name', read_only=True)
+    assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
+    checked_out_to_name = serializers.CharField(source='checked_out_to.get_full_name', read_only=True)
+    
+    class Meta:
+        model = Equipment
+        fields = [
+            'id', 'name', 'asset_tag', 'serial_number', 'model', 'manufacturer', 'description',
+            'category', 'category_name', 'location', 'location_name', 'vendor', 'vendor_name',
+            'status', 'condition', 'priority',
+            'assigned_to', 'assigned_to_name', 'checked_out_to', 'checked_out_to_name', 'expected_return_date',
+            'purchase_date', 'purchase_cost', 'warranty_expiry', 'next_maintenance_date',
+            'created_at', 'updated_at',
+            'is_overdue_maintenance', 'is_warranty_expired', 'is_warranty_expiring_soon',
+            'days_until_warranty_expiry', 'age_in_years',
+        ]
+        read_only_fields = fields
+
 class SoftwareSerializer(serializers.ModelSerializer):
     vendor_name = serializers.CharField(source='vendor.name', read_only=True)
     
@@ -97,10 +135,15 @@ class AssetCheckoutSerializer(serializers.ModelSerializer):
     checked_out_to_name = serializers.CharField(source='checked_out_to.get_full_name', read_only=True)
     checked_out_by_name = serializers.CharField(source='checked_out_by.get_full_name', read_only=True)
     checked_in_by_name = serializers.CharField(source='checked_in_by.get_full_name', read_only=True)
+    is_overdue = serializers.SerializerMethodField()
     
     class Meta:
         model = AssetCheckout
         fields = '__all__'
+    
+    def get_is_overdue(self, obj):
+        # Prefer the query-time annotation over the stored flag
+        return getattr(obj, 'overdue_now', obj.is_overdue)
 
 class AssetAuditSerializer(serializers.ModelSerializer):
     auditor_name = serializers.CharField(source='auditor.get_full_name', read_only=True)
@@ -0,0 +1,440 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.models import ReportDataVersion
+from core.testing import QueryBudgetTestCase
+from notifications.counters import NotificationCounterService
+from notifications.models import Notification
+from tasks.models import ITPersonnel, Task
+from .alerts import AssetAlertEngine
+from .checkouts import CheckoutTrackingService
+from .maintenance import MaintenancePlanningService
+from .models import (
+    AssetAlert, AssetAlertWatermark, AssetCheckout, Department, Equipment, EquipmentCategory, Location,
+    MaintenanceSchedule, Vendor,
+)
+from .views import EquipmentViewSet
+
+User = get_user_model()
+
+AS_OF = date(2025, 3, 3)
+
+
+class InventoryTestCase(APITestCase):
+    """Departments, locations and a category for equipment created in bulk"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = EquipmentCategory.objects.create(name='Imaging')
+        cls.locations = {}
+        for name in ('Radiology', 'Cardiology', 'IT'):
+            department = Department.objects.create(name=name)
+            cls.locations[name] = Location.objects.create(
+                building='Main', floor='1', room=name[:3], department=department,
+            )
+
+    @classmethod
+    def create_equipment(cls, count, department='Radiology', **fields):
+        start = Equipment.objects.count()
+        # bulk_create skips the QR code written by Equipment.save()
+        return Equipment.objects.bulk_create([
+            Equipment(
+                name=f'Scanner {start + index}', asset_tag=f'INV-{start + index:04d}', model='X1',
+                manufacturer='Acme', category=cls.category, location=cls.locations[department], **fields,
+            )
+            for index in range(count)
+        ])
+
+    @classmethod
+    def create_technician(cls, username, department):
+        user = User.objects.create_user(
+            username=username, email=f'{username}@example.com', password='pass',
+            first_name=username.title(), last_name='Tech', role='technician', is_approved=True,
+        )
+        return ITPersonnel.objects.create(
+            user=user, employee_id=f'E-{username}', department=department,
+            specializations='hardware', phone='555-0100',
+        )
+
+
+class MaintenancePlanningTests(InventoryTestCase):
+    """Due schedules are spread over technicians and written in bulk"""
+
+    def schedule(self, equipment, due=AS_OF, maintenance_type='Calibration', **fields):
+        return MaintenanceSchedule.objects.create(
+            equipment=equipment, maintenance_type=maintenance_type, frequency='monthly',
+            next_maintenance=due, **fields,
+        )
+
+    def assigned(self):
+        return {
+            technician.user.username: technician.assigned_tasks.count()
+            for technician in ITPersonnel.objects.select_related('user')
+        }
+
+    def test_balances_work_to_the_least_utilised_technician(self):
+        busy = self.create_technician('busy', 'Radiology')
+        self.create_technician('idle', 'Radiology')
+        Task.objects.create(
+            title='Existing work', description='Open task', assigned_to=busy,
+            status='in_progress', estimated_hours=3,
+        )
+        for equipment in self.create_equipment(3):
+            self.schedule(equipment)
+
+        summary = MaintenancePlanningService.plan(as_of=AS_OF)
+
+        self.assertEqual((summary['tasks_created'], summary['tasks_assigned']), (3, 3))
+        # idle takes two tasks (0h, then 2h) before busy's 3h becomes the lowest load
+        self.assertEqual(self.assigned(), {'busy': 2, 'idle': 2})
+
+    def test_preferred_technician_is_used_within_capacity(self):
+        busy = self.create_technician('busy', 'Radiology')
+        self.create_technician('idle', 'Radiology')
+        Task.objects.create(
+            title='Existing work', description='Open task', assigned_to=busy,
+            status='assigned', estimated_hours=53,
+        )
+        first, second = self.create_equipment(2)
+        self.schedule(first, assigned_technician=busy.user)
+        self.schedule(second, assigned_technician=busy.user)
+
+        # 56h over 14 days leaves busy room for one more 2h task
+        MaintenancePlanningService.plan(as_of=AS_OF)
+
+        self.assertEqual(self.assigned(), {'busy': 2, 'idle': 1})
+
+    def test_falls_back_to_it_technicians(self):
+        self.create_technician('radiology', 'Radiology')
+        self.create_technician('helpdesk', 'IT')
+        self.schedule(self.create_equipment(1, department='Cardiology')[0])
+
+        MaintenancePlanningService.plan(as_of=AS_OF)
+
+        self.assertEqual(self.assigned(), {'radiology': 0, 'helpdesk': 1})
+
+    @override_settings(MAINTENANCE_TECHNICIAN_HOURS_PER_DAY=1)
+    def test_nobody_is_planned_over_capacity(self):
+        self.create_technician('helpdesk', 'IT')
+        for equipment in self.create_equipment(3, department='IT'):
+            self.schedule(equipment)
+
+        summary = MaintenancePlanningService.plan(as_of=AS_OF, horizon_days=4)
+
+        self.assertEqual((summary['tasks_created'], summary['tasks_assigned']), (3, 2))
+        self.assertEqual(Task.objects.filter(assigned_to__isnull=True, status='pending').count(), 1)
+
+    def test_writes_tasks_alerts_and_notifications_in_bulk(self):
+        self.create_technician('helpdesk', 'IT')
+        first, second = self.create_equipment(2, priority='low')
+        overdue = self.schedule(first, due=AS_OF - timedelta(days=5))
+        self.schedule(first, due=AS_OF - timedelta(days=5), maintenance_type='Cleaning')
+        upcoming = self.schedule(second, due=AS_OF + timedelta(days=3))
+        AssetAlert.objects.create(
+            equipment=second, alert_type='maintenance_due', severity='medium',
+            title='Maintenance due', message='Already raised', period=upcoming.next_maintenance.isoformat(),
+        )
+
+        summary = MaintenancePlanningService.plan(as_of=AS_OF)
+
+        self.assertEqual(summary['schedules_due'], 3)
+        self.assertEqual(summary['overdue'], 2)
+        self.assertEqual(summary['tasks_created'], 3)
+        # Both schedules of the first scanner share one alert, the second scanner already had one
+        self.assertEqual(summary['alerts_created'], 1)
+        self.assertEqual(AssetAlert.objects.filter(equipment=first, severity='high').count(), 1)
+        self.assertEqual(Task.objects.filter(priority='high').count(), 2)
+
+        self.assertEqual(summary['technicians_notified'], 1)
+        notification = Notification.objects.get(type='maintenance')
+        self.assertIn('3 new preventive maintenance tasks', notification.message)
+
+        overdue.refresh_from_db()
+        upcoming.refresh_from_db()
+        self.assertEqual(overdue.next_maintenance, date(2025, 3, 26))
+        self.assertEqual(upcoming.next_maintenance, date(2025, 4, 6))
+        self.assertEqual(MaintenancePlanningService.plan(as_of=AS_OF)['schedules_due'], 0)
+
+    def test_query_count_does_not_grow_with_due_schedules(self):
+        self.create_technician('helpdesk', 'IT')
+        first, *rest = self.create_equipment(6)
+        self.schedule(first)
+        later = AS_OF + timedelta(days=60)
+        for equipment in rest:
+            self.schedule(equipment, due=later)
+        # Create the version rows up front so both runs only update them
+        ReportDataVersion.bump(Task._meta.label, MaintenanceSchedule._meta.label, Equipment._meta.label)
+
+        with CaptureQueriesContext(connection) as one:
+            self.assertEqual(MaintenancePlanningService.plan(as_of=AS_OF, horizon_days=0)['tasks_created'], 1)
+        with CaptureQueriesContext(connection) as many:
+            self.assertEqual(MaintenancePlanningService.plan(as_of=later, horizon_days=0)['tasks_created'], 6)
+
+        self.assertEqual(len(many), len(one))
+
+    def test_tasks_link_their_schedule_and_are_planned_once_per_occurrence(self):
+        self.create_technician('helpdesk', 'IT')
+        schedule = self.schedule(self.create_equipment(1)[0])
+        MaintenancePlanningService.plan(as_of=AS_OF)
+        task = Task.objects.get()
+        self.assertEqual(task.maintenance_schedule, schedule)
+
+        # A schedule set back to an occurrence that still has an open task gets no second one
+        MaintenanceSchedule.objects.filter(pk=schedule.pk).update(next_maintenance=AS_OF)
+        summary = MaintenancePlanningService.plan(as_of=AS_OF)
+        self.assertEqual((summary['schedules_due'], summary['tasks_created'], summary['tasks_assigned']), (1, 0, 0))
+
+        Task.objects.filter(pk=task.pk).update(status='completed')
+        MaintenanceSchedule.objects.filter(pk=schedule.pk).update(next_maintenance=AS_OF)
+        self.assertEqual(MaintenancePlanningService.plan(as_of=AS_OF)['tasks_created'], 1)
+
+    def test_dry_run_writes_nothing(self):
+        self.create_technician('helpdesk', 'IT')
+        schedule = self.schedule(self.create_equipment(1)[0])
+
+        summary = MaintenancePlanningService.plan(as_of=AS_OF, dry_run=True)
+
+        self.assertEqual((summary['schedules_due'], summary['tasks_assigned'], summary['tasks_created']), (1, 1, 0))
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(AssetAlert.objects.exists())
+        self.assertFalse(Notification.objects.exists())
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.next_maintenance, AS_OF)
+
+
+class AssetAlertEngineTests(InventoryTestCase):
+    """Alert rules create each alert once, evaluate incrementally and resolve cleared alerts"""
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.today = timezone.localdate(self.now)
+
+    def evaluate(self, *alert_types, full=False, days=0, hours=0):
+        return AssetAlertEngine.evaluate(
+            alert_types=list(alert_types), full=full, now=self.now + timedelta(days=days, hours=hours),
+        )
+
+    def test_re_evaluating_does_not_duplicate_alerts(self):
+        self.create_equipment(2, warranty_expiry=self.today - timedelta(days=10))
+
+        self.assertEqual(self.evaluate('warranty_expired', full=True)['warranty_expired']['created'], 2)
+        self.assertEqual(self.evaluate('warranty_expired', full=True)['warranty_expired']['created'], 0)
+        self.assertEqual(self.evaluate('warranty_expired')['warranty_expired']['created'], 0)
+        self.assertEqual(AssetAlert.objects.filter(alert_type='warranty_expired', is_active=True).count(), 2)
+
+    def test_incremental_runs_only_look_at_changes_since_the_watermark(self):
+        old = self.create_equipment(1, warranty_expiry=date(2024, 1, 1))[0]
+        Equipment.objects.filter(pk=old.pk).update(updated_at=self.now - timedelta(days=1))
+        self.assertFalse(self.evaluate('warranty_expired')['warranty_expired']['incremental'])
+        self.assertEqual(AssetAlertWatermark.objects.get(rule='warranty_expired').evaluated_at, self.now)
+
+        # A lost alert for untouched equipment is only restored by a full run
+        AssetAlert.objects.filter(equipment=old).delete()
+        new = self.create_equipment(1, warranty_expiry=date(2024, 1, 1))[0]
+
+        result = self.evaluate('warranty_expired', hours=1)['warranty_expired']
+        self.assertEqual((result['incremental'], result['created']), (True, 1))
+        self.assertEqual(list(AssetAlert.objects.values_list('equipment', flat=True)), [new.pk])
+
+        self.assertEqual(self.evaluate('warranty_expired', full=True, hours=2)['warranty_expired']['created'], 1)
+
+    def schedule(self, due, **fields):
+        equipment = self.create_equipment(1, **fields)[0]
+        schedule = MaintenanceSchedule.objects.create(
+            equipment=equipment, maintenance_type='Calibration', frequency='monthly', next_maintenance=due,
+        )
+        # Last edited before the first run
+        Equipment.objects.filter(pk=equipment.pk).update(updated_at=self.now - timedelta(days=1))
+        MaintenanceSchedule.objects.filter(pk=schedule.pk).update(updated_at=self.now - timedelta(days=1))
+        return schedule
+
+    def test_incremental_runs_catch_dates_that_pass_without_edits(self):
+        self.schedule(self.today)
+        self.assertEqual(self.evaluate('maintenance_overdue')['maintenance_overdue']['created'], 0)
+
+        result = self.evaluate('maintenance_overdue', days=1)['maintenance_overdue']
+        self.assertEqual((result['incremental'], result['created']), (True, 1))
+
+    def test_maintenance_alerts_resolve_once_the_planner_moves_the_schedule_on(self):
+        schedule = self.schedule(self.today + timedelta(days=3))
+        self.assertEqual(self.evaluate('maintenance_due')['maintenance_due']['created'], 1)
+
+        summary = MaintenancePlanningService.plan(as_of=self.today)
+        self.assertEqual((summary['tasks_created'], summary['alerts_created']), (1, 0))
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.equipment.next_maintenance_date, schedule.next_maintenance)
+
+        result = self.evaluate('maintenance_due', 'maintenance_overdue', hours=1)
+        self.assertEqual((result['maintenance_due']['resolved'], result['maintenance_due']['created']), (1, 0))
+        self.assertEqual(result['maintenance_overdue']['created'], 0)
+        self.assertFalse(AssetAlert.objects.filter(is_active=True).exists())
+
+    def test_missed_maintenance_turns_from_due_to_overdue(self):
+        self.schedule(self.today + timedelta(days=1))
+        self.evaluate('maintenance_due', 'maintenance_overdue')
+
+        result = self.evaluate('maintenance_due', 'maintenance_overdue', days=2)
+
+        self.assertEqual(result['maintenance_due']['resolved'], 1)
+        self.assertEqual(result['maintenance_overdue']['created'], 1)
+        self.assertEqual(
+            list(AssetAlert.objects.filter(is_active=True).values_list('alert_type', 'period')),
+            [('maintenance_overdue', (self.today + timedelta(days=1)).isoformat())],
+        )
+
+    def test_alerts_resolve_when_the_condition_clears(self):
+        user = User.objects.create_user(username='borrower', email='borrower@example.com', password='pass')
+        returned, kept = [
+            AssetCheckout.objects.create(
+                equipment=equipment, checked_out_to=user, expected_return_date=self.now - timedelta(days=1),
+            )
+            for equipment in self.create_equipment(2)
+        ]
+        self.assertEqual(self.evaluate('checkout_overdue')['checkout_overdue']['created'], 2)
+
+        AssetCheckout.objects.filter(pk=returned.pk).update(actual_return_date=self.now + timedelta(hours=1))
+        result = self.evaluate('checkout_overdue', hours=2)['checkout_overdue']
+
+        self.assertEqual((result['incremental'], result['resolved'], result['created']), (True, 1, 0))
+        resolved = AssetAlert.objects.get(equipment=returned.equipment)
+        self.assertFalse(resolved.is_active)
+        self.assertEqual(resolved.resolved_at, self.now + timedelta(hours=2))
+        self.assertTrue(AssetAlert.objects.get(equipment=kept.equipment).is_active)
+
+        # A return date pushed into the future leaves no other trace
+        AssetCheckout.objects.filter(pk=kept.pk).update(expected_return_date=self.now + timedelta(days=7))
+        result = self.evaluate('checkout_overdue', hours=3)['checkout_overdue']
+        self.assertEqual((result['resolved'], result['created']), (1, 0))
+        self.assertFalse(AssetAlert.objects.filter(is_active=True).exists())
+
+
+class CheckoutTrackingTests(InventoryTestCase):
+    """Overdue state comes from return dates and borrowers get throttled reminders"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin = User.objects.create_user(
+            username='checkout_admin', email='checkout_admin@example.com', password='pass',
+            role='system_admin', is_approved=True,
+        )
+        cls.borrower = User.objects.create_user(
+            username='borrower', email='borrower@example.com', password='pass', is_approved=True,
+        )
+        cls.other_borrower = User.objects.create_user(
+            username='other_borrower', email='other_borrower@example.com', password='pass', is_approved=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+
+    def checkout(self, equipment, user=None, due_in=None, returned=False):
+        return AssetCheckout.objects.create(
+            equipment=equipment, checked_out_to=user or self.borrower,
+            expected_return_date=self.now + due_in if due_in is not None else None,
+            actual_return_date=self.now if returned else None,
+        )
+
+    def test_overdue_state_is_computed_from_return_dates(self):
+        late, returned, due, open_ended = self.create_equipment(4)
+        overdue = self.checkout(late, due_in=-timedelta(days=2))
+        self.checkout(returned, due_in=-timedelta(days=2), returned=True)
+        self.checkout(due, due_in=timedelta(days=2))
+        self.checkout(open_ended)
+        # Flags go stale as time passes; only the dates count
+        AssetCheckout.objects.update(is_overdue=True)
+        AssetCheckout.objects.filter(pk=overdue.pk).update(is_overdue=False)
+
+        annotated = CheckoutTrackingService.annotate_overdue(AssetCheckout.objects.all())
+        self.assertEqual([c.pk for c in annotated if c.overdue_now], [overdue.pk])
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get('/api/inventory/asset-checkouts/', {'overdue': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(row['id'], row['is_overdue']) for row in response.data], [(overdue.pk, True)])
+        response = self.client.get('/api/inventory/asset-checkouts/', {'overdue': 'false'})
+        self.assertEqual(len(response.data), 3)
+        self.assertFalse(any(row['is_overdue'] for row in response.data))
+
+        self.assertEqual(CheckoutTrackingService.refresh_overdue_flags(), {'flagged': 1, 'cleared': 3})
+        self.assertEqual(list(AssetCheckout.objects.filter(is_overdue=True).values_list('pk', flat=True)), [overdue.pk])
+
+    def test_reminders_are_grouped_per_borrower_and_throttled(self):
+        first, second, third, returned = self.create_equipment(4)
+        self.checkout(first, due_in=-timedelta(days=1))
+        self.checkout(second, due_in=-timedelta(days=3))
+        self.checkout(third, user=self.other_borrower, due_in=-timedelta(hours=2))
+        self.checkout(returned, user=self.other_borrower, due_in=-timedelta(days=1), returned=True)
+        self.assertEqual(NotificationCounterService.get_unread_count(self.borrower.id), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = CheckoutTrackingService.send_overdue_reminders(now=self.now, interval_hours=24)
+
+        self.assertEqual(result, {'users_notified': 2, 'checkouts_reminded': 3})
+        reminder = Notification.objects.get(recipient=self.borrower)
+        self.assertEqual((reminder.title, reminder.priority), ('2 overdue equipment checkouts', 'high'))
+        self.assertLess(reminder.message.index(second.asset_tag), reminder.message.index(first.asset_tag))
+        self.assertEqual(Notification.objects.get(recipient=self.other_borrower).priority, 'medium')
+        self.assertEqual(NotificationCounterService.get_unread_count(self.borrower.id), 1)
+
+        later = self.now + timedelta(hours=23)
+        self.assertEqual(CheckoutTrackingService.send_overdue_reminders(now=later, interval_hours=24)['users_notified'], 0)
+
+        later = self.now + timedelta(hours=25)
+        self.assertEqual(
+            CheckoutTrackingService.send_overdue_reminders(now=later, interval_hours=24),
+            {'users_notified': 2, 'checkouts_reminded': 3},
+        )
+        self.assertEqual(Notification.objects.filter(recipient=self.borrower).count(), 2)
+        self.assertEqual(AssetCheckout.objects.filter(last_reminded_at=later).count(), 3)
+
+
+class EquipmentQueryBudgetTests(QueryBudgetTestCase, InventoryTestCase):
+    """Equipment endpoints must not issue per-row queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin = User.objects.create_user(
+            username='budget_admin', email='budget_admin@example.com', password='pass',
+            role='system_admin', is_approved=True,
+        )
+        cls.technician = User.objects.create_user(
+            username='budget_tech', email='budget_tech@example.com', password='pass',
+            first_name='Budget', last_name='Tech', role='technician', department='Radiology', is_approved=True,
+        )
+        cls.vendor = Vendor.objects.create(name='Acme', contact_email='sales@acme.example', contact_phone='555-0100')
+
+    def create_rows(self, count):
+        return self.create_equipment(
+            count, vendor=self.vendor, assigned_to=self.technician, checked_out_to=self.admin,
+            purchase_date=date(2022, 1, 1), warranty_expiry=date(2030, 1, 1),
+            next_maintenance_date=date(2024, 1, 1),
+        )
+
+    def test_list_within_budget(self):
+        for user in (self.admin, self.technician):
+            with self.subTest(role=user.role):
+                self.client.force_authenticate(user)
+                self.create_rows(2)
+                self.assertWithinQueryBudget(EquipmentViewSet, 'list', '/api/inventory/equipment/')
+
+                self.create_rows(20)
+                response = self.assertWithinQueryBudget(EquipmentViewSet, 'list', '/api/inventory/equipment/')
+                row = response.data['results'][0]
+                self.assertEqual((row['vendor_name'], row['assigned_to_name']), ('Acme', 'Budget Tech'))
+                self.assertTrue(row['is_overdue_maintenance'])
+
+    def test_retrieve_within_budget(self):
+        self.client.force_authenticate(self.technician)
+        equipment = self.create_rows(1)[0]
+        response = self.assertWithinQueryBudget(EquipmentViewSet, 'retrieve', f'/api/inventory/equipment/{equipment.pk}/')
+        self.assertEqual(response.data['category_name'], 'Imaging')
@@ -11,13 +11,18 @@ from .models import (
     MaintenanceSchedule, AssetHistory, AssetCheckout, AssetAudit, 
     AssetAuditItem, AssetAlert, AssetTag
 )
+from .querysets import EquipmentQuerySetBuilder
 from .serializers import (
-    EquipmentSerializer, SoftwareSerializer, DepartmentSerializer,
+    EquipmentSerializer, EquipmentListSerializer, SoftwareSerializer, DepartmentSerializer,
     LocationSerializer, VendorSerializer, EquipmentCategorySerializer,
     MaintenanceScheduleSerializer, AssetHistorySerializer, AssetCheckoutSerializer,
     AssetAuditSerializer, AssetAuditItemSerializer, AssetAlertSerializer, AssetTagSerializer
 )
+from .alerts import AssetAlertEngine
+from .checkouts import CheckoutTrackingService
+from core.pagination import KeysetPagination, TimestampKeysetPagination
 from authentication.permissions import IsStaffOrReadOnly, IsAdminOrStaff, DepartmentBasedPermission, RoleBasedPermission
+from authentication.permission_engine import PermissionEngine
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework import permissions
 from rest_framework.response import Response
@@ -30,11 +35,22 @@ class EquipmentViewSet(viewsets.ModelViewSet):
     filterset_fields = ['status', 'category', 'location', 'priority']
     search_fields = ['name', 'asset_tag', 'serial_number', 'model', 'manufacturer']
     ordering_fields = ['name', 'created_at', 'warranty_expiry']
-    ordering = ['-created_at']
+    ordering = ['-created_at', '-id']
+    pagination_class = KeysetPagination
+    query_budgets = {'list': 1, 'retrieve': 1}
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return EquipmentListSerializer
+        return EquipmentSerializer
     
     def get_queryset(self):
         """Filter equipment based on user role and department with strict access control."""
         queryset = Equipment.objects.all()
+        if self.action == 'list':
+            queryset = EquipmentQuerySetBuilder.for_list(queryset)
+        elif self.action == 'retrieve':
+            queryset = EquipmentQuerySetBuilder.for_detail(queryset)
         user = self.request.user
         
         if not user or not user.is_authenticated:
@@ -44,49 +60,33 @@ class EquipmentViewSet(viewsets.ModelViewSet):
         if not getattr(user, 'is_approved', False) and getattr(user, 'role', '') != 'system_admin':
             return Equipment.objects.none()
         
-        # System admin and IT manager can see all equipment
-        if getattr(user, 'role', '') in ['system_admin', 'it_manager'] or user.is_staff:
-            return queryset
-        
-        # Senior technicians and technicians can see department + IT equipment
-        if getattr(user, 'role', '') in ['technician', 'senior_technician']:
-            return queryset.filter(
-                models.Q(location__department__name__iexact=getattr(user, 'department', '')) |
-                models.Q(location__department__name__iexact='it')
-            )
-        
         # End users have no access to inventory (removed basic access)
-        return Equipment.objects.none()
+        if not user.is_staff and not PermissionEngine.has(user, 'view_department'):
+            return Equipment.objects.none()
+        
+        # All for admins/managers, department + IT + assigned for technicians
+        return PermissionEngine.filter_queryset(queryset, user)
 
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
         queryset = self.get_queryset()
-        total_equipment = queryset.count()
-        active_equipment = queryset.filter(status='active').count()
-        maintenance_equipment = queryset.filter(status='maintenance').count()
-        critical_equipment = queryset.filter(priority='critical').count()
-        checked_out_equipment = queryset.filter(status='checked_out').count()
-        overdue_maintenance = queryset.filter(
-            next_maintenance_date__lt=timezone.now().date()
-        ).count()
-        warranty_expiring = queryset.filter(
-            warranty_expiry__lte=timezone.now().date() + timezone.timedelta(days=30),
-            warranty_expiry__gte=timezone.now().date()
-        ).count()
-        warranty_expired = queryset.filter(
-            warranty_expiry__lt=timezone.now().date()
-        ).count()
+        stats = queryset.aggregate(
+            total_equipment=models.Count('id'),
+            active_equipment=models.Count('id', filter=models.Q(status='active')),
+            maintenance_equipment=models.Count('id', filter=models.Q(status='maintenance')),
+            critical_equipment=models.Count('id', filter=models.Q(priority='critical')),
+            checked_out_equipment=models.Count('id', filter=models.Q(status='checked_out')),
+        )
         
-        return Response({
-            'total_equipment': total_equipment,
-            'active_equipment': active_equipment,
-            'maintenance_equipment': maintenance_equipment,
-            'critical_equipment': critical_equipment,
-            'checked_out_equipment': checked_out_equipment,
-            'overdue_maintenance': overdue_maintenance,
-            'warranty_expiring': warranty_expiring,
-            'warranty_expired': warranty_expired,
+        # Condition-based counts come from alerts maintained by the alert engine
+        alert_counts = AssetAlertEngine.active_counts(queryset)
+        stats.update({
+            'overdue_maintenance': alert_counts.get('maintenance_overdue', 0),
+            'warranty_expiring': alert_counts.get('warranty_expiring', 0),
+            'warranty_expired': alert_counts.get('warranty_expired', 0),
         })
+        
+        return Response(stats)
     
     @action(detail=True, methods=['post'])
     def check_out(self, request, pk=None):
@@ -229,7 +229,7 @@ class EquipmentViewSet(viewsets.ModelViewSet):
         alerts = AssetAlert.objects.filter(
             equipment__in=queryset,
             is_active=True
-        ).order_by('-created_at')
+        ).select_related('equipment', 'acknowledged_by', 'resolved_by').order_by('-created_at')
         
         serializer = AssetAlertSerializer(alerts, many=True)
         return Response(serializer.data)
@@ -340,28 +340,8 @@ class LocationViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter locations based on user role and department (aligned roles)."""
-        queryset = Location.objects.all()
-        user = self.request.user
-        
-        if not user or not user.is_authenticated:
-            return Location.objects.none()
-        
-        # System admin and IT manager can see all locations
-        if getattr(user, 'role', '') in ['system_admin', 'it_manager'] or user.is_staff:
-            return queryset
-        
-        # Technicians (incl. senior technicians) can see their department + IT
-        if getattr(user, 'role', '') in ['technician', 'senior_technician']:
-            return queryset.filter(
-                models.Q(department__name__iexact=getattr(user, 'department', '')) |
-                models.Q(department__name__iexact='it')
-            )
-        
-        # End users can only see locations in their department
-        if hasattr(user, 'department') and user.department:
-            return queryset.filter(department__name__iexact=user.department)
-        
-        return Location.objects.none()
+        # All for admins/managers, department + IT for technicians, own department for end users
+        return PermissionEngine.filter_queryset(Location.objects.all(), self.request.user)
 
 class VendorViewSet(viewsets.ModelViewSet):
     queryset = Vendor.objects.all()
@@ -383,54 +363,41 @@ class MaintenanceScheduleViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter maintenance schedules based on user role and department (aligned roles)."""
-        queryset = MaintenanceSchedule.objects.all()
-        user = self.request.user
-        
-        if not user or not user.is_authenticated:
-            return MaintenanceSchedule.objects.none()
-        
-        # System admin and IT manager can see all schedules
-        if getattr(user, 'role', '') in ['system_admin', 'it_manager'] or user.is_staff:
-            return queryset
-        
-        # Technicians (incl. senior technicians) can see department + IT
-        if getattr(user, 'role', '') in ['technician', 'senior_technician']:
-            return queryset.filter(
-                models.Q(equipment__location__department__name__iexact=getattr(user, 'department', '')) |
-                models.Q(equipment__location__department__name__iexact='it')
-            )
-        
-        # End users can only see schedules in their department
-        if hasattr(user, 'department') and user.department:
-            return queryset.filter(equipment__location__department__name__iexact=user.department)
-        
-        return MaintenanceSchedule.objects.none()
+        # All for admins/managers, department + IT for technicians, own department for end users
+        return PermissionEngine.filter_queryset(MaintenanceSchedule.objects.all(), self.request.user)
 
 class AssetHistoryViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = AssetHistory.objects.all()
+    queryset = AssetHistory.objects.select_related('equipment', 'user')
     serializer_class = AssetHistorySerializer
     permission_classes = [RoleBasedPermission]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['equipment', 'action', 'user']
-    ordering = ['-timestamp']
+    ordering = ['-timestamp', '-id']
+    pagination_class = TimestampKeysetPagination
 
 class AssetCheckoutViewSet(viewsets.ModelViewSet):
     queryset = AssetCheckout.objects.all()
     serializer_class = AssetCheckoutSerializer
     permission_classes = [RoleBasedPermission]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ['equipment', 'checked_out_to', 'is_overdue']
+    filterset_fields = ['equipment', 'checked_out_to']
     ordering = ['-checkout_date']
 
     def get_queryset(self):
-        """Support frontend query params like overdue=true by mapping to is_overdue.
+        """Support frontend query params like overdue=true, computing overdue state at query time.
         Also optionally respect status=checked_out for compatibility (filters out returned items).
         """
-        qs = super().get_queryset()
+        qs = CheckoutTrackingService.annotate_overdue(
+            super().get_queryset().select_related(
+                'equipment', 'checked_out_to', 'checked_out_by', 'checked_in_by'
+            )
+        )
         params = getattr(self.request, 'query_params', {})
-        overdue_param = str(params.get('overdue', '')).lower()
+        overdue_param = str(params.get('overdue', params.get('is_overdue', ''))).lower()
         if overdue_param in ('true', '1', 'yes'):
-            qs = qs.filter(is_overdue=True)
+            qs = qs.filter(CheckoutTrackingService.overdue_q())
+        elif overdue_param in ('false', '0', 'no'):
+            qs = qs.exclude(CheckoutTrackingService.overdue_q())
         status_param = str(params.get('status', '')).lower()
         if status_param == 'checked_out':
             qs = qs.filter(actual_return_date__isnull=True)
@@ -439,10 +406,7 @@ class AssetCheckoutViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get overdue checkouts"""
-        overdue_checkouts = self.get_queryset().filter(
-            actual_return_date__isnull=True,
-            expected_return_date__lt=timezone.now()
-        )
+        overdue_checkouts = self.get_queryset().filter(CheckoutTrackingService.overdue_q())
         serializer = self.get_serializer(overdue_checkouts, many=True)
         return Response(serializer.data)
 
@@ -0,0 +1,244 @@
+import math
+import re
+import threading
+from bisect import bisect_left
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Article
+
+TOKEN = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset(
+    'a an and are as at be but by can do does for from has have how i if in into is it its my no not of on or '
+    'our so that the their then there this to was we were what when where which while who why will with you your'.split()
+)
+# Title matches count three times, summary matches twice
+FIELD_WEIGHTS = (('title', 3.0), ('summary', 2.0), ('content', 1.0))
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_QUERY_TERMS = 32  # a long description keeps its last words, the ones being typed
+MAX_PREFIX_EXPANSIONS = 20
+SNIPPET_LENGTH = 200
+
+
+def stem(token):
+    """Fold common English inflections so "printers"/"printing" match "printer"/"print" """
+    if len(token) > 5 and token.endswith('ing'):
+        return token[:-3]
+    if len(token) > 4 and token.endswith('ed'):
+        return token[:-2]
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def _settling(updated, now, overlap):
+    """Whether a write this recent may still be followed by commits stamped before it"""
+    return updated is not None and now - updated < overlap
+
+
+def tokenize(text):
+    return [stem(token) for token in TOKEN.findall((text or '').lower()) if token not in STOPWORDS]
+
+
+class ArticleSearchIndex:
+    """In-memory inverted index over knowledge base articles, ranked with BM25.
+
+    Each field's term frequencies are weighted by ``FIELD_WEIGHTS`` before
+    scoring, so a word in a title outranks the same word deep in the content.
+    Saves and deletes in this process update the index through signals; at
+    query time one aggregate query over ``updated_at`` catches writes made by
+    other processes, and only the articles changed since the last check are
+    re-read, together with a ``KNOWLEDGE_BASE_SYNC_OVERLAP`` window before it
+    for commits that land out of order. The last word of a query also matches as a prefix, so results
+    follow a user while they type.
+    """
+
+    _lock = threading.RLock()
+    _loaded = False
+    _stamp = None
+    _docs = {}
+    _postings = {}
+    _total_length = 0.0
+    _terms = None
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._loaded, cls._stamp = False, None
+            cls._docs, cls._postings, cls._total_length, cls._terms = {}, {}, 0.0, None
+
+    @classmethod
+    def _add(cls, article):
+        cls._remove(article.pk)
+        frequencies = {}
+        length = 0.0
+        for field, weight in FIELD_WEIGHTS:
+            tokens = tokenize(getattr(article, field))
+            length += weight * len(tokens)
+            for token in tokens:
+                frequencies[token] = frequencies.get(token, 0.0) + weight
+        for token, frequency in frequencies.items():
+            cls._postings.setdefault(token, {})[article.pk] = frequency
+        cls._docs[article.pk] = {
+            'title': article.title,
+            'summary': article.summary or article.content[:SNIPPET_LENGTH],
+            'category_id': article.category_id,
+            'category_name': article.category.name if article.category_id else None,
+            'length': length,
+            'terms': tuple(frequencies),
+        }
+        cls._total_length += length
+        cls._terms = None
+
+    @classmethod
+    def _remove(cls, article_id):
+        doc = cls._docs.pop(article_id, None)
+        if doc is None:
+            return
+        for token in doc['terms']:
+            postings = cls._postings.get(token)
+            if postings is not None:
+                postings.pop(article_id, None)
+                if not postings:
+                    del cls._postings[token]
+        cls._total_length -= doc['length']
+        cls._terms = None
+
+    @classmethod
+    def update(cls, article):
+        with cls._lock:
+            if cls._loaded:
+                cls._add(article)
+
+    @classmethod
+    def remove(cls, article_id):
+        with cls._lock:
+            cls._remove(article_id)
+
+    @classmethod
+    def rename_category(cls, category_id, name):
+        with cls._lock:
+            for doc in cls._docs.values():
+                if doc['category_id'] == category_id:
+                    doc['category_name'] = name
+                    if name is None:
+                        doc['category_id'] = None
+
+    @classmethod
+    def sync(cls):
+        """Bring the index up to date with the database; one query when nothing changed lately"""
+        stamp = Article.objects.aggregate(
+            updated=Max('updated_at'), count=Count('id'),
+            category_updated=Max('category__updated_at'), categorized=Count('category'),
+        )
+        overlap = timedelta(seconds=settings.KNOWLEDGE_BASE_SYNC_OVERLAP)
+        now = timezone.now()
+        with cls._lock:
+            previous = cls._stamp if cls._loaded else None
+            if previous == stamp and not _settling(stamp['updated'], now, overlap) and not _settling(
+                stamp['category_updated'], now, overlap
+            ):
+                return
+            articles = Article.objects.select_related('category')
+            if not cls._loaded:
+                cls._docs, cls._postings, cls._total_length, cls._terms = {}, {}, 0.0, None
+                changed = articles
+            elif previous['updated'] is None:
+                changed = articles
+            else:
+                # A write committed after the stamp was taken can carry an older
+                # updated_at, so the overlap before the stamp is read again
+                changed = articles.filter(updated_at__gte=previous['updated'] - overlap)
+            for article in changed:
+                cls._add(article)
+            if previous is not None and (
+                (stamp['category_updated'], stamp['categorized'])
+                != (previous['category_updated'], previous['categorized'])
+                or _settling(stamp['category_updated'], now, overlap)
+            ):
+                # Category renames and deletes in other processes leave the articles untouched
+                for article_id, category_id, name in Article.objects.values_list('id', 'category_id', 'category__name'):
+                    doc = cls._docs.get(article_id)
+                    if doc is not None:
+                        doc['category_id'], doc['category_name'] = category_id, name
+            cls._loaded, cls._stamp = True, stamp
+
+    @classmethod
+    def _expand(cls, prefix):
+        """Indexed terms starting with ``prefix``, most common first"""
+        if cls._terms is None:
+            cls._terms = sorted(cls._postings)
+        start = bisect_left(cls._terms, prefix)
+        matches = []
+        for term in cls._terms[start:]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        matches.sort(key=lambda term: len(cls._postings[term]), reverse=True)
+        return matches[:MAX_PREFIX_EXPANSIONS]
+
+    @classmethod
+    def search(cls, query, limit=10, prefix=True):
+        """``[(article_id, score)]`` best first; with ``prefix`` the last word may be incomplete"""
+        raw = TOKEN.findall((query or '').lower())[-MAX_QUERY_TERMS:]
+        if not raw:
+            return []
+        cls.sync()
+        with cls._lock:
+            groups = [[term] for term in dict.fromkeys(stem(token) for token in raw[:-1] if token not in STOPWORDS)]
+            last = raw[-1]
+            if prefix and len(last) >= 2:
+                expansions = cls._expand(last)
+                if stem(last) not in expansions and last not in STOPWORDS:
+                    expansions.append(stem(last))
+                groups.append(expansions)
+            elif last not in STOPWORDS:
+                groups.append([stem(last)])
+
+            count = len(cls._docs)
+            if not count:
+                return []
+            average = cls._total_length / count or 1.0
+            scores = {}
+            for group in groups:
+                # Alternatives for one typed word (its prefix expansions) do not add up
+                best = {}
+                for term in group:
+                    postings = cls._postings.get(term)
+                    if not postings:
+                        continue
+                    idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for article_id, frequency in postings.items():
+                        length = cls._docs[article_id]['length']
+                        score = idf * frequency * (BM25_K1 + 1) / (
+                            frequency + BM25_K1 * (1 - BM25_B + BM25_B * length / average)
+                        )
+                        if score > best.get(article_id, 0.0):
+                            best[article_id] = score
+                for article_id, score in best.items():
+                    scores[article_id] = scores.get(article_id, 0.0) + score
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            return [(article_id, round(score, 4)) for article_id, score in ranked[:limit]]
+
+    @classmethod
+    def suggest(cls, query, limit=5):
+        """Ranked suggestions served from the index alone, without loading articles"""
+        results = cls.search(query, limit)
+        with cls._lock:
+            return [
+                {
+                    'id': article_id,
+                    'title': cls._docs[article_id]['title'],
+                    'summary': cls._docs[article_id]['summary'],
+                    'category_name': cls._docs[article_id]['category_name'],
+                    'score': score,
+                }
+                for article_id, score in results
+                if article_id in cls._docs
+            ]
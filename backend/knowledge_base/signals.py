@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Article, Category
+from .search import ArticleSearchIndex
+
+
+@receiver(post_save, sender=Article)
+def index_article(sender, instance, **kwargs):
+    """Saved articles are searchable straight away in this process"""
+    ArticleSearchIndex.update(instance)
+
+
+@receiver(post_delete, sender=Article)
+def unindex_article(sender, instance, **kwargs):
+    ArticleSearchIndex.remove(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def rename_indexed_category(sender, instance, **kwargs):
+    ArticleSearchIndex.rename_category(instance.pk, instance.name)
+
+
+@receiver(post_delete, sender=Category)
+def drop_indexed_category(sender, instance, **kwargs):
+    """Articles of a deleted category are set to no category with an update, which sends no signals"""
+    ArticleSearchIndex.rename_category(instance.pk, None)
@@ -1,3 +1,104 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import Article, Category
+from .search import ArticleSearchIndex
+
+User = get_user_model()
+
+
+class ArticleSearchTests(APITestCase):
+    """Knowledge base search ranks articles with BM25 from an incrementally updated index"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='kb_user', email='kb_user@example.com', password='pass', is_approved=True,
+        )
+        cls.category = Category.objects.create(name='Printing')
+        cls.printer = Article.objects.create(
+            title='Printer shows offline', summary='Reconnect a ward printer.', category=cls.category,
+            content='Check the network cable, then restart the print spooler service.',
+        )
+        cls.vpn = Article.objects.create(
+            title='VPN will not connect', summary='Remote access troubleshooting.',
+            content='Make sure the printer is not mentioned here more than once. Reset the VPN client profile.',
+        )
+
+    def setUp(self):
+        ArticleSearchIndex.reset()
+        self.client.force_authenticate(self.user)
+
+    def test_title_matches_rank_first(self):
+        ranked = ArticleSearchIndex.search('printer', prefix=False)
+        self.assertEqual([article_id for article_id, _ in ranked], [self.printer.id, self.vpn.id])
+        self.assertGreater(ranked[0][1], ranked[1][1])
+
+    def test_inflected_words_and_typed_prefixes_match(self):
+        self.assertEqual(ArticleSearchIndex.search('printers offline', prefix=False)[0][0], self.printer.id)
+        self.assertEqual([article_id for article_id, _ in ArticleSearchIndex.search('spoo')], [self.printer.id])
+
+    def test_saves_and_deletes_update_the_index(self):
+        ArticleSearchIndex.sync()
+        scanner = Article.objects.create(title='Scanner jams', content='Clear the feeder tray.')
+        self.assertEqual(ArticleSearchIndex.search('feeder', prefix=False)[0][0], scanner.id)
+        scanner.delete()
+        self.assertEqual(ArticleSearchIndex.search('feeder', prefix=False), [])
+
+    def settle(self):
+        """Date every row well before the sync overlap, as if the last edits were long ago"""
+        long_ago = timezone.now() - timedelta(hours=1)
+        Article.objects.update(updated_at=long_ago)
+        Category.objects.update(updated_at=long_ago)
+        ArticleSearchIndex.sync()
+
+    def test_writes_from_other_processes_are_picked_up(self):
+        self.settle()
+        # A queryset update sends no signals, like a save in another worker process
+        Article.objects.filter(pk=self.vpn.pk).update(
+            title='Badge reader offline', updated_at=timezone.now() - timedelta(minutes=5),
+        )
+        self.assertEqual([article_id for article_id, _ in ArticleSearchIndex.search('badge')], [self.vpn.id])
+        with self.assertNumQueries(1):
+            ArticleSearchIndex.search('badge')
+
+    def test_commits_landing_out_of_order_are_picked_up(self):
+        self.settle()
+        Article.objects.filter(pk=self.printer.pk).update(updated_at=timezone.now())
+        ArticleSearchIndex.sync()
+        # Stamped before the printer edit but committed after the index saw it
+        Article.objects.filter(pk=self.vpn.pk).update(
+            title='Badge reader offline', updated_at=timezone.now() - timedelta(seconds=10),
+        )
+        self.assertEqual([article_id for article_id, _ in ArticleSearchIndex.search('badge')], [self.vpn.id])
+
+    def test_category_renames_from_other_processes_show(self):
+        self.settle()
+        Category.objects.filter(pk=self.category.pk).update(
+            name='Printers and scanners', updated_at=timezone.now() - timedelta(minutes=5),
+        )
+        self.assertEqual(ArticleSearchIndex.suggest('printer')[0]['category_name'], 'Printers and scanners')
+        with self.assertNumQueries(1):
+            ArticleSearchIndex.suggest('printer')
+
+    def test_long_descriptions_keep_the_words_being_typed(self):
+        description = ' '.join(f'word{number}' for number in range(40)) + ' spoo'
+        self.assertEqual([article_id for article_id, _ in ArticleSearchIndex.search(description)], [self.printer.id])
+
+    def test_suggest_while_typing_a_request(self):
+        response = self.client.get(
+            '/api/knowledge-base/articles/suggest/',
+            {'title': 'Ward printer offline', 'description': 'It stopped after the network chan'},
+        )
+        self.assertEqual(response.status_code, 200)
+        first = response.data['results'][0]
+        self.assertEqual((first['id'], first['category_name']), (self.printer.id, 'Printing'))
+
+    def test_search_endpoint_returns_ranked_articles(self):
+        response = self.client.get('/api/knowledge-base/articles/search/', {'q': 'vpn client'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([article['id'] for article in response.data['results']], [self.vpn.id])
+        self.assertEqual(self.client.get('/api/knowledge-base/articles/search/', {'limit': 'x'}).status_code, 400)
@@ -1,13 +1,48 @@
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from .models import Article, Category
+from .search import ArticleSearchIndex
 from .serializers import ArticleSerializer, CategorySerializer
 
+
+def _limit(request, default, maximum):
+    try:
+        return max(1, min(int(request.query_params.get('limit', default)), maximum))
+    except ValueError:
+        return None
+
+
 class ArticleViewSet(viewsets.ModelViewSet):
     queryset = Article.objects.all()
     serializer_class = ArticleSerializer
     permission_classes = [IsAuthenticated]
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Articles ranked by relevance to ``q``"""
+        limit = _limit(request, 20, 50)
+        if limit is None:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        ranked = ArticleSearchIndex.search(request.query_params.get('q', ''), limit, prefix=False)
+        articles = Article.objects.select_related('category', 'author').in_bulk([article_id for article_id, _ in ranked])
+        results = []
+        for article_id, score in ranked:
+            if article_id in articles:
+                results.append({**self.get_serializer(articles[article_id]).data, 'score': score})
+        return Response({'count': len(results), 'results': results})
+
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        """Articles matching a support request as it is typed (``title`` and ``description``, or ``q``)"""
+        limit = _limit(request, 5, 20)
+        if limit is None:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        params = request.query_params
+        query = params.get('q') or ' '.join(filter(None, [params.get('title'), params.get('description')]))
+        return Response({'results': ArticleSearchIndex.suggest(query, limit)})
+
 class CategoryViewSet(viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
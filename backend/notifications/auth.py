@@ -0,0 +1,26 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+
+from authentication.authentication import TokenUserCache
+
+
+@database_sync_to_async
+def get_token_user(key):
+    """Resolve a DRF token key to an active user"""
+    resolved = TokenUserCache.get(key)
+    if resolved is None or not resolved[0].is_active:
+        return AnonymousUser()
+    return resolved[0]
+
+
+class TokenAuthMiddleware(BaseMiddleware):
+    """Authenticate WebSocket connections from a ``?token=`` query parameter"""
+
+    async def __call__(self, scope, receive, send):
+        query = parse_qs(scope.get('query_string', b'').decode())
+        key = (query.get('token') or [''])[0]
+        scope['user'] = await get_token_user(key) if key else AnonymousUser()
+        return await super().__call__(scope, receive, send)
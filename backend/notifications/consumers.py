@@ -0,0 +1,97 @@
+import asyncio
+import json
+import logging
+import time
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+from django.utils import timezone
+
+from .counters import NotificationCounterService
+
+logger = logging.getLogger(__name__)
+
+
+def user_group_name(user_id):
+    """Channel layer group that reaches every open socket of a user"""
+    return f"user_{user_id}"
+
+
+class NotificationConsumer(AsyncJsonWebsocketConsumer):
+    """Push notifications to a user's open browser tabs"""
+
+    group_name = None
+    heartbeat_task = None
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if not user or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+
+        self.group_name = user_group_name(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+        self.last_seen = time.monotonic()
+        self.heartbeat_task = asyncio.ensure_future(self._watch_heartbeat())
+
+        # Seed the unread badge once; later changes are pushed
+        await self.send_json({
+            'type': 'unread_count',
+            'payload': {'count': await self._get_unread_count(user)},
+        })
+
+    async def disconnect(self, code):
+        if self.heartbeat_task:
+            self.heartbeat_task.cancel()
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        self.last_seen = time.monotonic()
+        if not isinstance(content, dict):
+            return
+
+        message_type = content.get('type')
+        payload = content.get('payload') or {}
+        if message_type == 'heartbeat':
+            await self.send_json({
+                'type': 'heartbeat_ack',
+                'payload': {
+                    'timestamp': payload.get('timestamp') if isinstance(payload, dict) else None,
+                    'server_time': timezone.now().isoformat(),
+                },
+            })
+        else:
+            logger.debug(f"Ignoring unsupported WebSocket message type: {message_type}")
+
+    @classmethod
+    async def decode_json(cls, text_data):
+        try:
+            return json.loads(text_data)
+        except (TypeError, ValueError):
+            return None
+
+    async def notification_message(self, event):
+        """Handler for ``notification_message`` events sent to the user's group"""
+        await self.send_json({'type': 'notification', 'payload': event['notification']})
+        if event.get('unread_count') is not None:
+            await self.send_json({'type': 'unread_count', 'payload': {'count': event['unread_count']}})
+
+    async def unread_count_message(self, event):
+        """Handler for ``unread_count_message`` events sent to the user's group"""
+        await self.send_json({'type': 'unread_count', 'payload': {'count': event['count']}})
+
+    async def _watch_heartbeat(self):
+        timeout = getattr(settings, 'WEBSOCKET_HEARTBEAT_TIMEOUT', 90)
+        while True:
+            await asyncio.sleep(timeout / 3)
+            if time.monotonic() - self.last_seen > timeout:
+                await self.close(code=4408)
+                return
+
+    @database_sync_to_async
+    def _get_unread_count(self, user):
+        return NotificationCounterService.get_unread_count(user.id)
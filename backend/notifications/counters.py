@@ -0,0 +1,142 @@
+import logging
+import math
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+RECENT_DAYS = 7
+
+UNREAD_Q = Q(is_read=False, is_dismissed=False)
+
+
+def unread_q(now):
+    """Unread notifications the list still shows; expired ones are hidden there"""
+    return UNREAD_Q & (Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+
+
+class NotificationCounterService:
+    """Notification counts from one aggregate query, with cached unread badges.
+
+    A user's unread counter is cached under ``unread_cache_key`` until the next
+    of their unread notifications expires. Writes recount it once the
+    surrounding transaction commits, so every process reading a shared cache
+    sees the same badge. Without a shared cache ``NOTIFICATION_COUNTER_TIMEOUT``
+    is a few seconds, so writes made by other processes show up once the
+    local counter expires; a timeout of 0 counts from the database on every read.
+    """
+
+    @staticmethod
+    def unread_cache_key(user_id):
+        return f"notifications:unread:{user_id}"
+
+    @staticmethod
+    def _timeout():
+        return getattr(settings, 'NOTIFICATION_COUNTER_TIMEOUT', 3600)
+
+    @staticmethod
+    def _store(user_id, count, next_expiry, now):
+        timeout = NotificationCounterService._timeout()
+        if timeout <= 0:
+            return
+        if next_expiry is not None:
+            timeout = min(timeout, max(1, math.ceil((next_expiry - now).total_seconds())))
+        cache.set(NotificationCounterService.unread_cache_key(user_id), count, timeout)
+
+    @staticmethod
+    def count_unread(user_id, now=None):
+        """Count unread notifications in the database and refresh the cache"""
+        now = now or timezone.now()
+        row = Notification.objects.filter(unread_q(now), recipient_id=user_id).aggregate(
+            count=Count('id'), next_expiry=Min('expires_at'),
+        )
+        NotificationCounterService._store(user_id, row['count'], row['next_expiry'], now)
+        return row['count']
+
+    @staticmethod
+    def get_unread_count(user_id):
+        """Unread badge count, from cache when available"""
+        if NotificationCounterService._timeout() > 0:
+            count = cache.get(NotificationCounterService.unread_cache_key(user_id))
+            if count is not None:
+                return count
+        return NotificationCounterService.count_unread(user_id)
+
+    @staticmethod
+    def get_stats(user_id, now=None):
+        """Totals, unread, recent and per type/priority counts in a single query"""
+        now = now or timezone.now()
+        visible_unread = unread_q(now)
+        aggregates = {
+            'total': Count('id'),
+            'unread': Count('id', filter=visible_unread),
+            'next_expiry': Min('expires_at', filter=visible_unread),
+            'recent_count': Count('id', filter=Q(created_at__gte=now - timedelta(days=RECENT_DAYS))),
+        }
+        for value, _ in Notification.TYPE_CHOICES:
+            aggregates[f'type__{value}'] = Count('id', filter=Q(type=value))
+        for value, _ in Notification.PRIORITY_CHOICES:
+            aggregates[f'priority__{value}'] = Count('id', filter=Q(priority=value))
+
+        row = Notification.objects.filter(recipient_id=user_id).aggregate(**aggregates)
+        NotificationCounterService._store(user_id, row['unread'], row['next_expiry'], now)
+
+        return {
+            'total': row['total'],
+            'unread': row['unread'],
+            'by_type': {
+                value: row[f'type__{value}']
+                for value, _ in Notification.TYPE_CHOICES if row[f'type__{value}']
+            },
+            'by_priority': {
+                value: row[f'priority__{value}']
+                for value, _ in Notification.PRIORITY_CHOICES if row[f'priority__{value}']
+            },
+            'recent_count': row['recent_count'],
+        }
+
+    @staticmethod
+    def refresh_unread(user_id):
+        """Recount a user's unread notifications and push the badge after the transaction commits"""
+        def apply():
+            NotificationCounterService.push_unread(user_id, NotificationCounterService.count_unread(user_id))
+        transaction.on_commit(apply)
+
+    @staticmethod
+    def reset_unread(user_id, count=0):
+        """Set a user's unread counter to a known value after the transaction commits"""
+        def apply():
+            NotificationCounterService._store(user_id, count, None, timezone.now())
+            NotificationCounterService.push_unread(user_id, count)
+        transaction.on_commit(apply)
+
+    @staticmethod
+    def invalidate(user_ids):
+        """Drop cached counters for users touched by bulk writes"""
+        keys = [NotificationCounterService.unread_cache_key(user_id) for user_id in set(user_ids)]
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
+
+    @staticmethod
+    def push_unread(user_id, count):
+        """Send the new badge count to the user's open WebSockets"""
+        try:
+            from channels.layers import get_channel_layer
+            from .consumers import user_group_name
+
+            channel_layer = get_channel_layer()
+            if channel_layer:
+                async_to_sync(channel_layer.group_send)(
+                    user_group_name(user_id),
+                    {'type': 'unread_count_message', 'count': count},
+                )
+        except Exception as e:
+            logger.error(f"Error pushing unread count: {str(e)}")
@@ -0,0 +1,216 @@
+import logging
+from datetime import datetime, time, timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import NotificationDelivery, NotificationPreference
+
+logger = logging.getLogger(__name__)
+
+# Notification.type -> NotificationPreference field holding its delivery channel
+TYPE_PREFERENCE_FIELDS = {
+    'request': 'request_notifications',
+    'task': 'task_notifications',
+    'maintenance': 'maintenance_notifications',
+}
+DEFAULT_PREFERENCE_FIELD = 'system_notifications'
+
+# Sent at the next flush whatever the digest frequency or quiet hours
+URGENT_PRIORITIES = ['critical']
+
+PREFERENCE_FIELDS = [
+    'system_notifications', 'request_notifications', 'task_notifications',
+    'maintenance_notifications', 'quiet_hours_start', 'quiet_hours_end',
+    'email_digest_frequency',
+]
+
+DEFAULT_PREFERENCES = {
+    'system_notifications': 'web',
+    'request_notifications': 'both',
+    'task_notifications': 'both',
+    'maintenance_notifications': 'web',
+    'quiet_hours_start': None,
+    'quiet_hours_end': None,
+    'email_digest_frequency': 'daily',
+}
+
+
+class NotificationDeliveryScheduler:
+    """Route notifications by user preference and batch their emails into digests"""
+
+    @staticmethod
+    def preference_cache_key(user_id):
+        return f"notifications:preferences:{user_id}"
+
+    @staticmethod
+    def get_preferences(user_id):
+        """Delivery preferences for a user, cached until the preferences change"""
+        key = NotificationDeliveryScheduler.preference_cache_key(user_id)
+        preferences = cache.get(key)
+        if preferences is None:
+            row = NotificationPreference.objects.filter(user_id=user_id).values(*PREFERENCE_FIELDS).first()
+            preferences = row or dict(DEFAULT_PREFERENCES)
+            cache.set(key, preferences, getattr(settings, 'NOTIFICATION_PREFERENCE_CACHE_TIMEOUT', 3600))
+        return preferences
+
+    @staticmethod
+    def invalidate_preferences(user_id):
+        cache.delete(NotificationDeliveryScheduler.preference_cache_key(user_id))
+
+    @staticmethod
+    def channel_for(preferences, notification_type):
+        field = TYPE_PREFERENCE_FIELDS.get(notification_type, DEFAULT_PREFERENCE_FIELD)
+        return preferences.get(field) or DEFAULT_PREFERENCES[field]
+
+    @staticmethod
+    def wants_web(preferences, notification_type):
+        return NotificationDeliveryScheduler.channel_for(preferences, notification_type) in ('web', 'both')
+
+    @staticmethod
+    def wants_email(preferences, notification_type):
+        return NotificationDeliveryScheduler.channel_for(preferences, notification_type) in ('email', 'both')
+
+    @staticmethod
+    def quiet_hours_end(preferences, moment):
+        """End of the quiet period containing ``moment``, or None outside quiet hours"""
+        start, end = preferences.get('quiet_hours_start'), preferences.get('quiet_hours_end')
+        if start is None or end is None or start == end:
+            return None
+
+        local = timezone.localtime(moment)
+        current = local.time()
+        if start < end:
+            in_quiet = start <= current < end
+            end_date = local.date()
+        else:
+            # Quiet hours wrap past midnight, e.g. 22:00-07:00
+            in_quiet = current >= start or current < end
+            end_date = local.date() + timedelta(days=1) if current >= start else local.date()
+        if not in_quiet:
+            return None
+        return timezone.make_aware(datetime.combine(end_date, end), local.tzinfo)
+
+    @staticmethod
+    def next_digest_time(frequency, now):
+        """Next daily or weekly digest slot after ``now``"""
+        local = timezone.localtime(now)
+        digest_time = time(hour=getattr(settings, 'NOTIFICATION_DIGEST_HOUR', 7))
+        slot = timezone.make_aware(datetime.combine(local.date(), digest_time), local.tzinfo)
+
+        if frequency == 'weekly':
+            weekday = getattr(settings, 'NOTIFICATION_DIGEST_WEEKDAY', 0)
+            slot += timedelta(days=(weekday - local.weekday()) % 7)
+            if slot <= local:
+                slot += timedelta(weeks=1)
+        elif slot <= local:
+            slot += timedelta(days=1)
+        return slot
+
+    @staticmethod
+    def schedule_email(user, notification, preferences=None, now=None):
+        """Queue an email for ``notification`` into the user's digest bucket.
+
+        Returns the queued delivery, or None when the user has email turned off
+        for this notification type.
+        """
+        now = now or timezone.now()
+        if not user.email:
+            return None
+        preferences = preferences or NotificationDeliveryScheduler.get_preferences(user.id)
+        if not NotificationDeliveryScheduler.wants_email(preferences, notification.type):
+            return None
+
+        frequency = preferences.get('email_digest_frequency') or 'never'
+        if notification.priority in URGENT_PRIORITIES:
+            digest, deliver_after = 'immediate', now
+        elif frequency in ('daily', 'weekly'):
+            digest = frequency
+            deliver_after = NotificationDeliveryScheduler.next_digest_time(frequency, now)
+        else:
+            digest, deliver_after = 'immediate', now
+
+        if notification.priority not in URGENT_PRIORITIES:
+            deliver_after = NotificationDeliveryScheduler.quiet_hours_end(preferences, deliver_after) or deliver_after
+
+        return NotificationDelivery.objects.create(
+            recipient=user,
+            title=notification.title,
+            message=notification.message,
+            type=notification.type,
+            priority=notification.priority,
+            digest=digest,
+            deliver_after=deliver_after,
+        )
+
+    @staticmethod
+    def flush(now=None, dry_run=False):
+        """Send every due delivery as one email per user over a single SMTP connection"""
+        now = now or timezone.now()
+        batch_size = getattr(settings, 'NOTIFICATION_EMAIL_BATCH_SIZE', 100)
+        due = NotificationDelivery.objects.filter(sent_at__isnull=True, deliver_after__lte=now)
+        recipient_ids = list(due.order_by('recipient_id').values_list('recipient_id', flat=True).distinct())
+
+        summary = {'users': len(recipient_ids), 'deliveries': 0, 'emails_sent': 0, 'dry_run': dry_run}
+        if dry_run:
+            summary['deliveries'] = due.count()
+            return summary
+        if not recipient_ids:
+            return summary
+
+        connection = get_connection()
+        connection.open()
+        try:
+            for start in range(0, len(recipient_ids), batch_size):
+                deliveries = due.filter(
+                    recipient_id__in=recipient_ids[start:start + batch_size]
+                ).select_related('recipient').order_by('recipient_id', 'created_at', 'id')
+
+                batch = [
+                    list(group) for _, group in groupby(deliveries, key=lambda delivery: delivery.recipient_id)
+                ]
+                summary['deliveries'] += sum(len(group) for group in batch)
+                summary['emails_sent'] += NotificationDeliveryScheduler._send(connection, batch, now)
+        finally:
+            connection.close()
+
+        logger.info(
+            f"Sent {summary['emails_sent']} notification emails covering {summary['deliveries']} notifications"
+        )
+        return summary
+
+    @staticmethod
+    def build_message(user, deliveries):
+        if len(deliveries) == 1:
+            subject = f"[Hospital IT] {deliveries[0].title}"
+        else:
+            subject = f"[Hospital IT] {len(deliveries)} new notifications"
+        body = render_to_string('notifications/email/digest.txt', {
+            'user': user,
+            'deliveries': deliveries,
+            'is_digest': len(deliveries) > 1,
+        })
+        return EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [user.email])
+
+    @staticmethod
+    def _send(connection, batch, now):
+        """Send one email per delivery group and mark the delivered groups as sent"""
+        sent_ids = []
+        emails_sent = 0
+        for deliveries in batch:
+            recipient = deliveries[0].recipient
+            try:
+                message = NotificationDeliveryScheduler.build_message(recipient, deliveries)
+                if connection.send_messages([message]):
+                    emails_sent += 1
+                    sent_ids.extend(delivery.id for delivery in deliveries)
+            except Exception as e:
+                logger.error(f"Error sending notification email to {recipient.email}: {str(e)}")
+
+        for start in range(0, len(sent_ids), 500):
+            NotificationDelivery.objects.filter(id__in=sent_ids[start:start + 500]).update(sent_at=now)
+        return emails_sent
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from notifications.delivery import NotificationDeliveryScheduler
+
+
+class Command(BaseCommand):
+    help = 'Send queued notification emails and due digests, one email per user over a single SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what is due without sending anything',
+        )
+
+    def handle(self, *args, **options):
+        summary = NotificationDeliveryScheduler.flush(dry_run=options['dry_run'])
+
+        if summary['dry_run']:
+            self.stdout.write(f"{summary['deliveries']} notifications due for {summary['users']} users")
+        else:
+            self.stdout.write(
+                f"Sent {summary['emails_sent']} emails covering {summary['deliveries']} notifications"
+            )
+        self.stdout.write(self.style.SUCCESS('Notification email flush complete'))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications.retention import NotificationRetentionService
+
+
+class Command(BaseCommand):
+    help = 'Delete expired, old read and dismissed notifications in chunks and archive the purge counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be purged without deleting anything',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=None,
+            help='Rows deleted per transaction (default: NOTIFICATION_PURGE_CHUNK_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size is not None and chunk_size <= 0:
+            raise CommandError('--chunk-size must be positive')
+
+        summary = NotificationRetentionService.purge(dry_run=options['dry_run'], chunk_size=chunk_size)
+
+        verb = 'Would purge' if summary['dry_run'] else 'Purged'
+        self.stdout.write(f"{verb} {summary['total']} notifications")
+        for reason, count in sorted(summary['by_reason'].items()):
+            self.stdout.write(f"  {reason}: {count}")
+
+        self.stdout.write(self.style.SUCCESS('Notification purge complete'))
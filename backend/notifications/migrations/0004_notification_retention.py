@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationPurgeStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('type', models.CharField(choices=[('info', 'Information'), ('warning', 'Warning'), ('error', 'Error'), ('success', 'Success'), ('system', 'System'), ('request', 'Request'), ('task', 'Task'), ('maintenance', 'Maintenance')], max_length=20)),
+                ('reason', models.CharField(choices=[('expired', 'Expired'), ('read', 'Read'), ('dismissed', 'Dismissed')], max_length=20)),
+                ('purged_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-date', 'type', 'reason'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notificatio_recipie_f17213_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'is_dismissed', 'created_at', 'id'], name='notificatio_recipie_bd8bfa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_dismissed', False), ('is_read', False)), fields=['recipient', 'created_at', 'id'], name='notification_unread_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('expires_at__isnull', False)), fields=['expires_at'], name='notification_expiry_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='notificationpurgestat',
+            unique_together={('date', 'type', 'reason')},
+        ),
+    ]
@@ -53,7 +53,20 @@ class Notification(models.Model):
         indexes = [
             models.Index(fields=['recipient', 'is_read']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['recipient', 'is_dismissed', 'created_at', 'id']),
             models.Index(fields=['priority']),
+            # Unread feed and badge recounts touch only live unread rows
+            models.Index(
+                fields=['recipient', 'created_at', 'id'],
+                condition=models.Q(is_read=False, is_dismissed=False),
+                name='notification_unread_feed_idx',
+            ),
+            # Expiry filter and retention sweep skip the rows that never expire
+            models.Index(
+                fields=['expires_at'],
+                condition=models.Q(expires_at__isnull=False),
+                name='notification_expiry_idx',
+            ),
         ]
     
     def __str__(self):
@@ -62,9 +75,23 @@ class Notification(models.Model):
     def mark_as_read(self):
         """Mark notification as read"""
         if not self.is_read:
+            from .counters import NotificationCounterService
+
             self.is_read = True
             self.read_at = timezone.now()
             self.save(update_fields=['is_read', 'read_at'])
+            if not self.is_dismissed:
+                NotificationCounterService.refresh_unread(self.recipient_id)
+    
+    def dismiss(self):
+        """Dismiss notification"""
+        if not self.is_dismissed:
+            from .counters import NotificationCounterService
+
+            self.is_dismissed = True
+            self.save(update_fields=['is_dismissed'])
+            if not self.is_read:
+                NotificationCounterService.refresh_unread(self.recipient_id)
     
     def is_expired(self):
         """Check if notification has expired"""
@@ -72,6 +99,27 @@ class Notification(models.Model):
             return timezone.now() > self.expires_at
         return False
 
+class NotificationPurgeStat(models.Model):
+    """Daily totals of notifications removed by the retention purge"""
+    REASON_CHOICES = [
+        ('expired', 'Expired'),
+        ('read', 'Read'),
+        ('dismissed', 'Dismissed'),
+    ]
+    
+    date = models.DateField()
+    type = models.CharField(max_length=20, choices=Notification.TYPE_CHOICES)
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    purged_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-date', 'type', 'reason']
+        unique_together = ['date', 'type', 'reason']
+    
+    def __str__(self):
+        return f"{self.date} {self.type}/{self.reason}: {self.purged_count}"
+
 class NotificationPreference(models.Model):
     """User preferences for notifications"""
     DELIVERY_CHOICES = [
@@ -110,3 +158,36 @@ class NotificationPreference(models.Model):
     
     def __str__(self):
         return f"Notification preferences for {self.user.email}"
+
+class NotificationDelivery(models.Model):
+    """An email waiting to go out, either on its own or as part of a digest"""
+    DIGEST_CHOICES = [
+        ('immediate', 'Immediate'),
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+    ]
+    
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_deliveries')
+    # Copied from the notification so retention purges never have to touch the queue
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    type = models.CharField(max_length=20, choices=Notification.TYPE_CHOICES, default='info')
+    priority = models.CharField(max_length=20, choices=Notification.PRIORITY_CHOICES, default='medium')
+    
+    digest = models.CharField(max_length=20, choices=DIGEST_CHOICES, default='immediate')
+    deliver_after = models.DateTimeField()
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['deliver_after']
+        indexes = [
+            models.Index(
+                fields=['deliver_after', 'recipient'],
+                condition=models.Q(sent_at__isnull=True),
+                name='notification_delivery_due_idx',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_digest_display()} email to {self.recipient.email}: {self.title}"
@@ -0,0 +1,109 @@
+import logging
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .counters import NotificationCounterService
+from .models import Notification, NotificationPurgeStat
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class NotificationRetentionService:
+    """Delete expired, old read and dismissed notifications in bounded chunks"""
+
+    @staticmethod
+    def read_retention_days(notification_type):
+        """Days a read notification of ``notification_type`` is kept"""
+        retention = getattr(settings, 'NOTIFICATION_RETENTION_DAYS', {})
+        return retention.get(notification_type, retention.get('default', 90))
+
+    @staticmethod
+    def purge_targets(now=None):
+        """(reason, queryset) pairs for every row the purge should remove"""
+        now = now or timezone.now()
+        dismissed_days = getattr(settings, 'NOTIFICATION_DISMISSED_RETENTION_DAYS', 30)
+
+        # Each row falls under exactly one reason: expired, then dismissed, then read
+        expired = Q(expires_at__lt=now)
+        dismissed = Q(is_dismissed=True, created_at__lt=now - timedelta(days=dismissed_days))
+
+        targets = [
+            ('expired', Notification.objects.filter(expired)),
+            ('dismissed', Notification.objects.filter(dismissed).exclude(expired)),
+        ]
+        for notification_type, _ in Notification.TYPE_CHOICES:
+            cutoff = now - timedelta(days=NotificationRetentionService.read_retention_days(notification_type))
+            targets.append(('read', Notification.objects.filter(
+                type=notification_type, is_read=True, created_at__lt=cutoff
+            ).exclude(expired | dismissed)))
+        return targets
+
+    @staticmethod
+    def purge(now=None, dry_run=False, chunk_size=None):
+        """Purge notifications past retention and archive the counts per day, type and reason"""
+        now = now or timezone.now()
+        chunk_size = chunk_size or getattr(settings, 'NOTIFICATION_PURGE_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+        totals = Counter()
+        for reason, queryset in NotificationRetentionService.purge_targets(now):
+            if dry_run:
+                for row in queryset.values('type').annotate(total=Count('id')).order_by():
+                    totals[(reason, row['type'])] += row['total']
+                continue
+
+            while True:
+                deleted = NotificationRetentionService._purge_chunk(queryset, reason, now, chunk_size)
+                totals.update(deleted)
+                if sum(deleted.values()) < chunk_size:
+                    break
+
+        summary = {
+            'dry_run': dry_run,
+            'total': sum(totals.values()),
+            'by_reason': {},
+        }
+        for (reason, _), count in totals.items():
+            summary['by_reason'][reason] = summary['by_reason'].get(reason, 0) + count
+
+        if not dry_run:
+            logger.info(f"Purged {summary['total']} notifications: {summary['by_reason']}")
+        return summary
+
+    @staticmethod
+    def _purge_chunk(queryset, reason, now, chunk_size):
+        """Delete one chunk of rows and record it; returns a Counter keyed by (reason, type)"""
+        with transaction.atomic():
+            rows = list(queryset.order_by('id').values_list('id', 'recipient_id', 'type', 'is_read', 'is_dismissed')[:chunk_size])
+            if not rows:
+                return Counter()
+
+            # Notifications have no dependent rows, so skip the collector and its
+            # per-row post_delete signals, each of which would recount a badge;
+            # instead recount each recipient who lost an unread row once per chunk
+            Notification.objects.filter(id__in=[row[0] for row in rows])._raw_delete(Notification.objects.db)
+            for recipient_id in {
+                recipient_id for _, recipient_id, _, is_read, is_dismissed in rows
+                if not is_read and not is_dismissed
+            }:
+                NotificationCounterService.refresh_unread(recipient_id)
+
+            counts = Counter((reason, notification_type) for _, _, notification_type, _, _ in rows)
+            NotificationRetentionService._archive(counts, timezone.localdate(now))
+        return counts
+
+    @staticmethod
+    def _archive(counts, day):
+        for (reason, notification_type), count in counts.items():
+            stat, created = NotificationPurgeStat.objects.get_or_create(
+                date=day, type=notification_type, reason=reason,
+                defaults={'purged_count': count},
+            )
+            if not created:
+                NotificationPurgeStat.objects.filter(pk=stat.pk).update(purged_count=F('purged_count') + count)
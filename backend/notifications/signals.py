@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .counters import NotificationCounterService
+from .delivery import NotificationDeliveryScheduler
+from .models import Notification, NotificationPreference
+
+
+def _is_unread(notification):
+    return not notification.is_read and not notification.is_dismissed
+
+
+@receiver(post_save, sender=Notification)
+def count_created_notification(sender, instance, created, **kwargs):
+    """Recount the recipient's unread counter for new notifications"""
+    if created and _is_unread(instance):
+        NotificationCounterService.refresh_unread(instance.recipient_id)
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    if _is_unread(instance):
+        NotificationCounterService.refresh_unread(instance.recipient_id)
+
+
+@receiver(post_save, sender=NotificationPreference)
+@receiver(post_delete, sender=NotificationPreference)
+def drop_cached_preferences(sender, instance, **kwargs):
+    NotificationDeliveryScheduler.invalidate_preferences(instance.user_id)
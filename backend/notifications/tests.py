@@ -0,0 +1,320 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.db.models.signals import post_delete
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from core.notification_service import NotificationService
+from .auth import TokenAuthMiddleware
+from .counters import NotificationCounterService
+from .delivery import NotificationDeliveryScheduler
+from .models import Notification, NotificationDelivery, NotificationPreference, NotificationPurgeStat
+from .retention import NotificationRetentionService
+from .routing import websocket_urlpatterns
+
+User = get_user_model()
+
+
+class NotificationCounterTests(APITestCase):
+    """Unread counters stay in step with writes and stats come from one query"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='counter_user', email='counter_user@example.com', password='pass', is_approved=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    def notify(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Notification.objects.create(recipient=self.user, title='Disk full', message='Clean up', **kwargs)
+
+    def badge(self):
+        response = self.client.get('/api/notifications/unread-count/')
+        self.assertEqual(response.status_code, 200)
+        return response.data['unread_count']
+
+    @override_settings(NOTIFICATION_COUNTER_TIMEOUT=3600)
+    def test_badge_follows_writes(self):
+        first = self.notify()
+        second = self.notify(type='task')
+        self.notify(type='task', priority='high')
+        self.assertEqual(self.badge(), 3)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(NotificationCounterService.get_unread_count(self.user.id), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/notifications/{first.id}/read/')
+        self.assertEqual(self.badge(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/notifications/{second.id}/dismiss/')
+        self.assertEqual(self.badge(), 1)
+
+        self.notify()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/notifications/mark-all-read/')
+        self.assertEqual(self.badge(), 0)
+        self.assertEqual(NotificationCounterService.count_unread(self.user.id), 0)
+
+    def test_expired_notifications_are_not_counted(self):
+        self.notify()
+        self.notify(expires_at=timezone.now() - timedelta(minutes=1))
+        soon = self.notify(expires_at=timezone.now() + timedelta(seconds=30))
+        self.assertEqual(self.badge(), 2)
+        self.assertEqual(NotificationCounterService.get_stats(self.user.id)['unread'], 2)
+        listed = self.client.get('/api/notifications/').data['notifications']
+        self.assertEqual(len(listed), 2)
+        self.assertIn(soon.id, [entry['id'] for entry in listed])
+
+        later = timezone.now() + timedelta(minutes=5)
+        self.assertEqual(NotificationCounterService.count_unread(self.user.id, now=later), 1)
+
+    def test_without_shared_cache_counters_expire_quickly(self):
+        self.notify()
+        self.assertEqual(NotificationCounterService.get_unread_count(self.user.id), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(NotificationCounterService.get_unread_count(self.user.id), 1)
+
+        # Another process marking it read shows up here once the short-lived counter expires
+        Notification.objects.filter(recipient=self.user).update(is_read=True)
+        cache.delete(NotificationCounterService.unread_cache_key(self.user.id))
+        with self.assertNumQueries(1):
+            self.assertEqual(NotificationCounterService.get_unread_count(self.user.id), 0)
+
+    @override_settings(NOTIFICATION_COUNTER_TIMEOUT=0)
+    def test_zero_timeout_reads_count_from_database(self):
+        self.notify()
+        Notification.objects.filter(recipient=self.user).update(is_read=True)
+        with self.assertNumQueries(1):
+            self.assertEqual(NotificationCounterService.get_unread_count(self.user.id), 0)
+
+    def test_stats_use_one_query(self):
+        self.notify(type='task', priority='high')
+        self.notify(type='task')
+        self.notify(type='warning', is_read=True)
+
+        with self.assertNumQueries(1):
+            stats = NotificationCounterService.get_stats(self.user.id)
+
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual(stats['unread'], 2)
+        self.assertEqual(stats['recent_count'], 3)
+        self.assertEqual(stats['by_type'], {'warning': 1, 'task': 2})
+        self.assertEqual(stats['by_priority'], {'medium': 2, 'high': 1})
+
+        response = self.client.get('/api/notifications/stats/')
+        self.assertEqual(response.data['by_type'], {'warning': 1, 'task': 2})
+
+
+class NotificationRetentionTests(APITestCase):
+    """The purge removes rows past retention in chunks and archives the counts"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='retention_user', email='retention_user@example.com', password='pass', is_approved=True,
+        )
+
+    def make(self, days_old, **kwargs):
+        notification = Notification.objects.create(recipient=self.user, title='Patch window', message='Tonight', **kwargs)
+        Notification.objects.filter(pk=notification.pk).update(created_at=timezone.now() - timedelta(days=days_old))
+        return notification
+
+    def test_purge_by_reason_and_type(self):
+        now = timezone.now()
+        expired = self.make(1, expires_at=now - timedelta(hours=1))
+        dismissed = self.make(40, is_dismissed=True)
+        old_info = self.make(40, type='info', is_read=True)
+        kept_task = self.make(40, type='task', is_read=True)
+        kept_unread = self.make(400)
+
+        dry = NotificationRetentionService.purge(now=now, dry_run=True)
+        self.assertEqual(dry['by_reason'], {'expired': 1, 'dismissed': 1, 'read': 1})
+        self.assertEqual(Notification.objects.count(), 5)
+
+        summary = NotificationRetentionService.purge(now=now, chunk_size=1)
+        self.assertEqual(summary['total'], 3)
+        self.assertEqual(
+            set(Notification.objects.values_list('id', flat=True)), {kept_task.id, kept_unread.id}
+        )
+        self.assertFalse(Notification.objects.filter(id__in=[expired.id, dismissed.id, old_info.id]).exists())
+
+        stats = {
+            (stat.reason, stat.type): stat.purged_count
+            for stat in NotificationPurgeStat.objects.filter(date=timezone.localdate(now))
+        }
+        self.assertEqual(stats, {('expired', 'info'): 1, ('dismissed', 'info'): 1, ('read', 'info'): 1})
+
+        NotificationRetentionService.purge(now=now)
+        self.assertEqual(NotificationPurgeStat.objects.count(), 3)
+
+    def test_purge_recounts_each_recipient_once_per_chunk(self):
+        now = timezone.now()
+        for _ in range(5):
+            self.make(1, expires_at=now - timedelta(hours=1))
+        self.make(40, type='info', is_read=True)
+        deleted = []
+
+        def record(sender, **kwargs):
+            deleted.append(sender)
+
+        post_delete.connect(record, sender=Notification)
+        self.addCleanup(post_delete.disconnect, record, sender=Notification)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(NotificationRetentionService.purge(now=now, chunk_size=10)['total'], 6)
+
+        self.assertEqual(deleted, [])
+        self.assertEqual(len(callbacks), 1)
+
+
+@override_settings(NOTIFICATION_DIGEST_HOUR=7, TIME_ZONE='UTC')
+class NotificationDeliveryTests(APITestCase):
+    """Emails follow the user's channel, digest and quiet-hour preferences"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='digest_user', email='digest_user@example.com', password='pass', is_approved=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def set_preferences(self, **kwargs):
+        NotificationPreference.objects.update_or_create(user=self.user, defaults=kwargs)
+
+    def send(self, title, notification_type='request_update', priority='medium'):
+        return NotificationService.send_notification(
+            self.user, title, 'Details', notification_type=notification_type,
+            priority=priority, channels=['in_app', 'email'],
+        )
+
+    def test_daily_digest_is_one_email(self):
+        self.set_preferences(request_notifications='both', email_digest_frequency='daily')
+        for index in range(5):
+            self.send(f'Request updated {index}')
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(NotificationDelivery.objects.filter(digest='daily').count(), 5)
+
+        deliver_after = NotificationDelivery.objects.first().deliver_after
+        self.assertEqual(NotificationDeliveryScheduler.flush(now=deliver_after - timedelta(minutes=1))['emails_sent'], 0)
+
+        summary = NotificationDeliveryScheduler.flush(now=deliver_after)
+        self.assertEqual(summary, {'users': 1, 'deliveries': 5, 'emails_sent': 1, 'dry_run': False})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('5 new notifications', mail.outbox[0].subject)
+        self.assertIn('Request updated 4', mail.outbox[0].body)
+        self.assertFalse(NotificationDelivery.objects.filter(sent_at__isnull=True).exists())
+
+    def test_channel_preference_and_urgent_bypass(self):
+        self.set_preferences(
+            request_notifications='web', system_notifications='email', email_digest_frequency='weekly',
+            quiet_hours_start=time(22, 0), quiet_hours_end=time(7, 0),
+        )
+        self.send('Web only')
+        self.assertFalse(NotificationDelivery.objects.exists())
+
+        self.send('Outage', notification_type='system_alert', priority='critical')
+        delivery = NotificationDelivery.objects.get()
+        self.assertEqual(delivery.digest, 'immediate')
+
+        NotificationDeliveryScheduler.flush()
+        self.assertEqual(mail.outbox[0].subject, '[Hospital IT] Outage')
+
+    def test_quiet_hours_defer_delivery(self):
+        preferences = {
+            'system_notifications': 'email', 'email_digest_frequency': 'never',
+            'quiet_hours_start': time(22, 0), 'quiet_hours_end': time(7, 0),
+        }
+        notification = Notification(recipient=self.user, title='Backup finished', message='OK', type='system')
+        night = datetime(2026, 3, 2, 23, 30, tzinfo=dt_timezone.utc)
+
+        delivery = NotificationDeliveryScheduler.schedule_email(self.user, notification, preferences, now=night)
+        self.assertEqual(delivery.deliver_after, datetime(2026, 3, 3, 7, 0, tzinfo=dt_timezone.utc))
+
+        morning = datetime(2026, 3, 3, 9, 0, tzinfo=dt_timezone.utc)
+        delivery = NotificationDeliveryScheduler.schedule_email(self.user, notification, preferences, now=morning)
+        self.assertEqual(delivery.deliver_after, morning)
+
+
+class NotificationConsumerTests(APITestCase):
+    """WebSocket connections need a token, seed the unread badge and answer heartbeats"""
+
+    application = TokenAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='socket_user', email='socket_user@example.com', password='pass', is_approved=True,
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        Notification.objects.create(recipient=cls.user, title='Disk full', message='Clean up')
+        Notification.objects.create(recipient=cls.user, title='Printer jam', message='Tray 2', is_read=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def communicator(self, query=''):
+        return WebsocketCommunicator(self.application, f'/ws/notifications/{query}')
+
+    async def connect(self):
+        communicator = self.communicator(f'?token={self.token.key}')
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_connections_without_a_valid_token_are_rejected(self):
+        for query in ('', '?token=not-a-token'):
+            with self.subTest(query=query):
+                communicator = self.communicator(query)
+                connected, code = await communicator.connect()
+                self.assertEqual((connected, code), (False, 4401))
+
+        self.user.is_active = False
+        await sync_to_async(self.user.save)()
+        communicator = self.communicator(f'?token={self.token.key}')
+        self.assertEqual(await communicator.connect(), (False, 4401))
+
+    async def test_unread_count_is_sent_on_connect_and_pushed(self):
+        communicator = await self.connect()
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'unread_count', 'payload': {'count': 1}})
+
+        await sync_to_async(NotificationCounterService.push_unread)(self.user.id, 4)
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'unread_count', 'payload': {'count': 4}})
+        await communicator.disconnect()
+
+    async def test_heartbeat_is_acknowledged(self):
+        communicator = await self.connect()
+        await communicator.receive_json_from()
+
+        await communicator.send_json_to({'type': 'heartbeat', 'payload': {'timestamp': 1700000000}})
+        reply = await communicator.receive_json_from()
+        self.assertEqual(reply['type'], 'heartbeat_ack')
+        self.assertEqual(reply['payload']['timestamp'], 1700000000)
+        self.assertIn('server_time', reply['payload'])
+
+        # Unknown messages and malformed JSON are ignored
+        await communicator.send_json_to({'type': 'subscribe'})
+        await communicator.send_to(text_data='not json')
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    @override_settings(WEBSOCKET_HEARTBEAT_TIMEOUT=0.3)
+    async def test_silent_connections_are_closed(self):
+        communicator = await self.connect()
+        await communicator.receive_json_from()
+
+        self.assertEqual(await communicator.receive_output(timeout=2), {'type': 'websocket.close', 'code': 4408})
@@ -5,6 +5,7 @@ urlpatterns = [
     # Notification endpoints
     path('', views.get_notifications, name='get_notifications'),
     path('stats/', views.get_notification_stats, name='notification_stats'),
+    path('unread-count/', views.get_unread_count, name='notification_unread_count'),
     path('create/', views.create_notification, name='create_notification'),
     path('mark-all-read/', views.mark_all_read, name='mark_all_read'),
     path('<int:notification_id>/read/', views.mark_notification_read, name='mark_notification_read'),
@@ -1,21 +1,23 @@
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.db.models import Q
 from .models import Notification, NotificationPreference
+from .counters import NotificationCounterService
 from .serializers import (
     NotificationSerializer,
     NotificationPreferenceSerializer,
     NotificationCreateSerializer
 )
+from core.pagination import KeysetPagination
 import logging
 
 logger = logging.getLogger(__name__)
 
-class NotificationPagination(PageNumberPagination):
+class NotificationPagination(KeysetPagination):
     page_size = 20
     page_size_query_param = 'limit'
     max_page_size = 100
@@ -23,7 +25,7 @@ class NotificationPagination(PageNumberPagination):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def get_notifications(request):
-    """Get user's notifications with pagination and filtering"""
+    """Get user's notifications with cursor pagination and filtering"""
     try:
         user = request.user
         
@@ -31,10 +33,9 @@ def get_notifications(request):
         unread_only = request.GET.get('unread_only', 'false').lower() == 'true'
         notification_type = request.GET.get('type')
         priority = request.GET.get('priority')
-        limit = int(request.GET.get('limit', 20))
         
         # Build query
-        queryset = Notification.objects.filter(recipient=user)
+        queryset = Notification.objects.filter(recipient=user, is_dismissed=False)
         
         # Apply filters
         if unread_only:
@@ -51,21 +52,23 @@ def get_notifications(request):
             Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
         )
         
-        # Limit results
-        notifications = queryset[:limit]
-        
+        # One LIMIT limit+1 query per page; totals only on request
+        paginator = NotificationPagination()
+        notifications = paginator.paginate_queryset(queryset, request)
         serializer = NotificationSerializer(notifications, many=True)
         
-        # Get counts
-        total_count = queryset.count()
-        unread_count = queryset.filter(is_read=False).count()
-        
-        return Response({
+        data = {
             'notifications': serializer.data,
-            'total_count': total_count,
-            'unread_count': unread_count,
-            'has_more': total_count > limit
-        })
+            'has_more': paginator.has_next,
+            'next_cursor': paginator.get_next_cursor(),
+            'unread_count': NotificationCounterService.get_unread_count(user.id),
+        }
+        if paginator.count is not None:
+            data['total_count'] = paginator.count
+        return Response(data)
+        
+    except NotFound as e:
+        return Response({'error': str(e.detail)}, status=status.HTTP_400_BAD_REQUEST)
         
     except Exception as e:
         logger.error(f"Error fetching notifications: {e}")
@@ -111,6 +114,7 @@ def mark_all_read(request):
             is_read=True,
             read_at=timezone.now()
         )
+        NotificationCounterService.reset_unread(user.id, 0)
         
         return Response({
             'message': f'Marked {updated_count} notifications as read'
@@ -133,8 +137,7 @@ def dismiss_notification(request, notification_id):
             recipient=request.user
         )
         
-        notification.is_dismissed = True
-        notification.save(update_fields=['is_dismissed'])
+        notification.dismiss()
         
         return Response({
             'message': 'Notification dismissed'
@@ -225,40 +228,27 @@ def create_notification(request):
             'error': 'Failed to create notification'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def get_unread_count(request):
+    """Unread badge count for the user, served from the counter cache"""
+    try:
+        return Response({
+            'unread_count': NotificationCounterService.get_unread_count(request.user.id)
+        })
+        
+    except Exception as e:
+        logger.error(f"Error getting unread notification count: {e}")
+        return Response({
+            'error': 'Failed to get unread notification count'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def get_notification_stats(request):
     """Get notification statistics for the user"""
     try:
-        user = request.user
-        
-        # Get counts by type and priority
-        notifications = Notification.objects.filter(recipient=user)
-        
-        stats = {
-            'total': notifications.count(),
-            'unread': notifications.filter(is_read=False).count(),
-            'by_type': {},
-            'by_priority': {},
-            'recent_count': notifications.filter(
-                created_at__gte=timezone.now() - timezone.timedelta(days=7)
-            ).count()
-        }
-        
-        # Count by type
-        for choice in Notification.TYPE_CHOICES:
-            type_name = choice[0]
-            count = notifications.filter(type=type_name).count()
-            if count > 0:
-                stats['by_type'][type_name] = count
-        
-        # Count by priority
-        for choice in Notification.PRIORITY_CHOICES:
-            priority_name = choice[0]
-            count = notifications.filter(priority=priority_name).count()
-            if count > 0:
-                stats['by_priority'][priority_name] = count
-        
+        stats = NotificationCounterService.get_stats(request.user.id)
         return Response(stats)
         
     except Exception as e:
@@ -0,0 +1,188 @@
+import hashlib
+import random
+import re
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import SupportRequest
+
+OPEN_STATUSES = ['pending', 'open', 'assigned', 'in_progress', 'pending_user', 'pending_approval', 'escalated']
+TOKEN = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset(
+    'a an and are at be but by can cannot do does for from has have i in is it its me my no not of on or our '
+    'please the this to was we were will with'.split()
+)
+MAX_DESCRIPTION_TOKENS = 32  # leading description words compared; the rest rarely tells reports apart
+TITLE_WEIGHT = 0.7
+NUM_PERMUTATIONS = 64
+BANDS = 32  # 32 bands of 2 rows: titles at 0.4 similarity share a band over 99% of the time
+ROWS = NUM_PERMUTATIONS // BANDS
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+def _permutations():
+    """Fixed hash functions ``(a * x + b) mod p``, the same in every process"""
+    generator = random.Random(NUM_PERMUTATIONS)
+    return [
+        (generator.randrange(1, MERSENNE_PRIME), generator.randrange(0, MERSENNE_PRIME))
+        for _ in range(NUM_PERMUTATIONS)
+    ]
+
+
+PERMUTATIONS = _permutations()
+
+
+def normalize(token):
+    return token[:-1] if len(token) > 3 and token.endswith('s') and not token.endswith('ss') else token
+
+
+def shingles(text, limit=None):
+    """The distinct words of ``text`` (the first ``limit`` of them), hashed to 64-bit integers"""
+    tokens = [normalize(token) for token in TOKEN.findall((text or '').lower()) if token not in STOPWORDS][:limit]
+    return frozenset(int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'big') for token in tokens)
+
+
+def features(title, description=''):
+    return shingles(title), shingles(description, MAX_DESCRIPTION_TOKENS)
+
+
+def signature(shingle_set):
+    return tuple(
+        min((a * value + b) % MERSENNE_PRIME for value in shingle_set)
+        for a, b in PERMUTATIONS
+    ) if shingle_set else ()
+
+
+def band_keys(minhash):
+    return [(band, minhash[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)] if minhash else []
+
+
+def jaccard(first, second):
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def similarity(first, second):
+    """Weighted word overlap of two ``features()`` results; reports of one outage mostly share a title"""
+    return TITLE_WEIGHT * jaccard(first[0], second[0]) + (1 - TITLE_WEIGHT) * jaccard(first[1], second[1])
+
+
+def same_scope(first, second):
+    """Tickets only count as duplicates when they are about the same equipment or place"""
+    if first.related_equipment_id and first.related_equipment_id == second.related_equipment_id:
+        return True
+    for field in ('requester_location', 'requester_department'):
+        value = (getattr(first, field) or '').strip().lower()
+        if value and value == (getattr(second, field) or '').strip().lower():
+            return True
+    return False
+
+
+class DuplicateDetector:
+    """MinHash/LSH index of recent open support requests, held in process memory.
+
+    The words of a request's title are reduced to a 64-value MinHash
+    signature and filed under 32 band keys; requests sharing a band key are
+    candidates, which are then scored on the exact word sets of their titles
+    and of the start of their descriptions. Each
+    check first reads requests created since the last one (another process
+    may have created them), and candidates are re-read so closed or merged
+    requests and scope changes are never reported.
+    """
+
+    _lock = threading.Lock()
+    _entries = {}
+    _buckets = {}
+    _last_id = 0
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._entries, cls._buckets, cls._last_id = {}, {}, 0
+
+    @staticmethod
+    def window_start(now=None):
+        return (now or timezone.now()) - timedelta(hours=getattr(settings, 'DUPLICATE_WINDOW_HOURS', 24))
+
+    @classmethod
+    def _add(cls, request_id, created_at, title, description):
+        words = features(title, description)
+        keys = band_keys(signature(words[0]))
+        cls._entries[request_id] = (created_at, words, keys)
+        for key in keys:
+            cls._buckets.setdefault(key, set()).add(request_id)
+
+    @classmethod
+    def _evict(cls, cutoff):
+        for request_id in [request_id for request_id, entry in cls._entries.items() if entry[0] < cutoff]:
+            _, _, keys = cls._entries.pop(request_id)
+            for key in keys:
+                bucket = cls._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(request_id)
+                    if not bucket:
+                        del cls._buckets[key]
+
+    @classmethod
+    def _sync(cls, cutoff):
+        """Index requests created since the last check and drop those older than the window"""
+        recent = SupportRequest.objects.filter(
+            pk__gt=cls._last_id, created_at__gte=cutoff, status__in=OPEN_STATUSES,
+        ).values_list('pk', 'created_at', 'title', 'description')
+        for request_id, created_at, title, description in recent:
+            cls._add(request_id, created_at, title, description)
+            cls._last_id = max(cls._last_id, request_id)
+        cls._evict(cutoff)
+
+    @classmethod
+    def find(cls, support_request, limit=5, earlier_only=False):
+        """``[(request, score)]`` of open requests in the same scope that look like duplicates, best first"""
+        threshold = getattr(settings, 'DUPLICATE_THRESHOLD', 0.5)
+        with cls._lock:
+            cls._sync(cls.window_start())
+            entry = cls._entries.get(support_request.pk)
+            if entry is not None:
+                words, keys = entry[1], entry[2]
+            else:
+                words = features(support_request.title, support_request.description)
+                keys = band_keys(signature(words[0]))
+            candidates = set()
+            for key in keys:
+                candidates |= cls._buckets.get(key, set())
+            candidates.discard(support_request.pk)
+            if earlier_only:
+                candidates = {request_id for request_id in candidates if request_id < support_request.pk}
+            scores = {}
+            for request_id in candidates:
+                score = similarity(words, cls._entries[request_id][1])
+                if score >= threshold:
+                    scores[request_id] = score
+        if not scores:
+            return []
+
+        matches = []
+        current = SupportRequest.objects.filter(pk__in=scores, status__in=OPEN_STATUSES, merged_into__isnull=True)
+        for candidate in current:
+            if same_scope(support_request, candidate):
+                matches.append((candidate, round(scores[candidate.pk], 3)))
+        # Oldest first among equals, so every duplicate points at the same first report
+        matches.sort(key=lambda match: (-match[1], match[0].created_at, match[0].pk))
+        return matches[:limit]
+
+    @classmethod
+    def flag(cls, support_request):
+        """Mark a new request with the open request it most likely duplicates; returns that request or None"""
+        matches = cls.find(support_request, limit=1, earlier_only=True)
+        if not matches:
+            return None
+        original = matches[0][0]
+        # Point at the incident's first report rather than at another duplicate of it
+        if original.suspected_duplicate_of_id:
+            original = SupportRequest.objects.filter(pk=original.suspected_duplicate_of_id).first() or original
+        support_request.suspected_duplicate_of = original
+        SupportRequest.objects.filter(pk=support_request.pk).update(suspected_duplicate_of=original)
+        return original
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests_system', '0002_alter_supportrequest_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='supportrequest',
+            index=models.Index(fields=['created_at', 'id'], name='requests_sy_created_9ba40e_idx'),
+        ),
+    ]
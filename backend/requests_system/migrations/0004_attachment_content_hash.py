@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests_system', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requestattachment',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 of the file', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='requestattachment',
+            name='size',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='requestattachment',
+            name='file',
+            field=models.FileField(max_length=255, upload_to='request_attachments/'),
+        ),
+    ]
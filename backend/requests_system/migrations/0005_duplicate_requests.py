@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests_system', '0004_attachment_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supportrequest',
+            name='merged_into',
+            field=models.ForeignKey(blank=True, help_text='Parent request this duplicate was merged into', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='merged_requests', to='requests_system.supportrequest'),
+        ),
+        migrations.AddField(
+            model_name='supportrequest',
+            name='suspected_duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='Open request this one most likely repeats, flagged on creation', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='suspected_duplicates', to='requests_system.supportrequest'),
+        ),
+    ]
@@ -112,9 +112,22 @@ class SupportRequest(models.Model):
     # Resolution details
     resolution_notes = models.TextField(blank=True)
     resolution_time_minutes = models.IntegerField(null=True, blank=True)
+
+    # Duplicate handling
+    suspected_duplicate_of = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='suspected_duplicates',
+        help_text="Open request this one most likely repeats, flagged on creation",
+    )
+    merged_into = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='merged_requests',
+        help_text="Parent request this duplicate was merged into",
+    )
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.ticket_number} - {self.title}"
@@ -174,8 +187,10 @@ class RequestComment(models.Model):
 
 class RequestAttachment(models.Model):
     request = models.ForeignKey(SupportRequest, on_delete=models.CASCADE, related_name='attachments')
-    file = models.FileField(upload_to='request_attachments/')
+    file = models.FileField(upload_to='request_attachments/', max_length=255)
     filename = models.CharField(max_length=255)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, help_text='SHA-256 of the file')
+    size = models.BigIntegerField(default=0)
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
@@ -1,3 +1,4 @@
+from django.urls import reverse
 from rest_framework import serializers
 from .models import SupportRequest, RequestCategory, RequestComment, RequestAttachment, Alert
 
@@ -15,11 +16,26 @@ class RequestCommentSerializer(serializers.ModelSerializer):
 
 class RequestAttachmentSerializer(serializers.ModelSerializer):
     uploaded_by_name = serializers.CharField(source='uploaded_by.get_full_name', read_only=True)
+    preview_url = serializers.SerializerMethodField()
     
     class Meta:
         model = RequestAttachment
         fields = '__all__'
 
+    def get_preview_url(self, obj):
+        return reverse('attachment_preview', args=[obj.pk])
+
+class SupportRequestListSerializer(serializers.ModelSerializer):
+    """Support request without nested comments and attachments, for list views"""
+    requester_name = serializers.CharField(source='requester.get_full_name', read_only=True)
+    assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    equipment_name = serializers.CharField(source='related_equipment.name', read_only=True)
+    
+    class Meta:
+        model = SupportRequest
+        fields = '__all__'
+
 class SupportRequestSerializer(serializers.ModelSerializer):
     requester_name = serializers.CharField(source='requester.get_full_name', read_only=True)
     assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
@@ -31,6 +47,7 @@ class SupportRequestSerializer(serializers.ModelSerializer):
     class Meta:
         model = SupportRequest
         fields = '__all__'
+        read_only_fields = ['suspected_duplicate_of', 'merged_into']
 
 class AlertSerializer(serializers.ModelSerializer):
     acknowledged_by_name = serializers.CharField(source='acknowledged_by.get_full_name', read_only=True)
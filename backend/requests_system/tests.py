@@ -0,0 +1,213 @@
+from django.contrib.auth import get_user_model
+
+from core.testing import QueryBudgetTestCase
+from tasks.models import Task
+from .duplicates import DuplicateDetector
+from .models import RequestAttachment, RequestCategory, RequestComment, SupportRequest
+from .views import SupportRequestViewSet
+
+User = get_user_model()
+
+
+class SupportRequestQueryBudgetTests(QueryBudgetTestCase):
+    """Support request endpoints must not issue per-row queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='budget_admin', email='budget_admin@example.com', password='pass',
+            first_name='Budget', last_name='Admin', role='system_admin', is_approved=True,
+        )
+        cls.technician = User.objects.create_user(
+            username='budget_tech', email='budget_tech@example.com', password='pass',
+            first_name='Budget', last_name='Tech', role='technician', department='IT', is_approved=True,
+        )
+        cls.category = RequestCategory.objects.create(name='Hardware', category_type='hardware')
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.admin)
+
+    def create_requests(self, count):
+        requests = []
+        for index in range(count):
+            support_request = SupportRequest.objects.create(
+                title=f'Printer offline {index}',
+                description='The ward printer does not respond.',
+                category=self.category,
+                requester=self.admin,
+                assigned_to=self.technician,
+            )
+            RequestComment.objects.create(request=support_request, author=self.technician, comment='Looking into it')
+            RequestAttachment.objects.create(
+                request=support_request, file='request_attachments/log.txt',
+                filename='log.txt', uploaded_by=self.admin,
+            )
+            requests.append(support_request)
+        return requests
+
+    def test_list_within_budget(self):
+        self.create_requests(3)
+        self.assertWithinQueryBudget(SupportRequestViewSet, 'list', '/api/requests/support-requests/')
+
+        self.create_requests(20)
+        response = self.assertWithinQueryBudget(SupportRequestViewSet, 'list', '/api/requests/support-requests/')
+        self.assertNotIn('comments', response.data['results'][0])
+
+    def test_retrieve_within_budget(self):
+        support_request = self.create_requests(1)[0]
+        RequestComment.objects.create(request=support_request, author=self.admin, comment='Any update?')
+
+        response = self.assertWithinQueryBudget(
+            SupportRequestViewSet, 'retrieve', f'/api/requests/support-requests/{support_request.id}/'
+        )
+        self.assertEqual(len(response.data['comments']), 2)
+        self.assertEqual(response.data['comments'][0]['author_name'], 'Budget Tech')
+        self.assertEqual(response.data['attachments'][0]['uploaded_by_name'], 'Budget Admin')
+
+
+class SupportRequestPaginationTests(QueryBudgetTestCase):
+    """Support request lists are served in keyset pages"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='page_admin', email='page_admin@example.com', password='pass',
+            role='system_admin', is_approved=True,
+        )
+        category = RequestCategory.objects.create(name='Network', category_type='network')
+        SupportRequest.objects.bulk_create([
+            SupportRequest(
+                ticket_number=f'REQ-PAGE-{index:03d}', title=f'Switch port {index}',
+                description='Port is down.', category=category, requester=cls.admin,
+            )
+            for index in range(7)
+        ])
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.admin)
+
+    def test_pages_walk_forward_and_back(self):
+        url = '/api/requests/support-requests/?page_size=3'
+        seen = []
+        pages = []
+        while url:
+            response = self.assertWithinQueryBudget(SupportRequestViewSet, 'list', url)
+            pages.append(response.data)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+
+        expected = list(SupportRequest.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+        self.assertEqual([len(page['results']) for page in pages], [3, 3, 1])
+        self.assertIsNone(pages[0]['previous'])
+        self.assertNotIn('count', pages[0])
+
+        response = self.client.get(pages[-1]['previous'])
+        self.assertEqual([item['id'] for item in response.data['results']], expected[3:6])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_capped_total_on_request(self):
+        response = self.client.get('/api/requests/support-requests/?page_size=2&include_total=true')
+        self.assertEqual(response.data['count'], 7)
+        self.assertFalse(response.data['count_capped'])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/requests/support-requests/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+
+class DuplicateRequestTests(QueryBudgetTestCase):
+    """Repeated reports of one incident are flagged on creation and merged into one request"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.technician = User.objects.create_user(
+            username='dup_tech', email='dup_tech@example.com', password='pass',
+            role='system_admin', is_approved=True,
+        )
+        cls.requester = User.objects.create_user(
+            username='dup_user', email='dup_user@example.com', password='pass', is_approved=True,
+        )
+        cls.category = RequestCategory.objects.create(name='Printing', category_type='hardware')
+
+    def setUp(self):
+        super().setUp()
+        DuplicateDetector.reset()
+        self.client.force_authenticate(self.technician)
+
+    def report(self, title, description='', location='Floor 3', department='radiology'):
+        return SupportRequest.objects.create(
+            title=title, description=description, category=self.category, requester=self.requester,
+            requester_department=department, requester_location=location,
+        )
+
+    def test_repeated_reports_are_flagged_against_the_first(self):
+        first = self.report('Printer on 3rd floor down', 'Nothing prints since this morning.')
+        second = self.report('3rd floor printer down', 'Printer is down, jobs stuck in the queue.')
+        third = self.report('Printer down on the 3rd floor', 'Cannot print anything.')
+        self.assertIsNone(DuplicateDetector.flag(first))
+        self.assertEqual(DuplicateDetector.flag(second), first)
+        self.assertEqual(DuplicateDetector.flag(third), first)
+        self.assertEqual(set(first.suspected_duplicates.all()), {second, third})
+
+    def test_other_places_and_topics_are_not_flagged(self):
+        self.report('Printer on 3rd floor down')
+        elsewhere = self.report('Printer on 3rd floor down', location='Annex', department='pharmacy')
+        unrelated = self.report('Email password reset needed')
+        self.assertIsNone(DuplicateDetector.flag(elsewhere))
+        self.assertIsNone(DuplicateDetector.flag(unrelated))
+
+    def test_duplicates_endpoint_lists_matches(self):
+        first = self.report('Wifi down in ward 5', 'No connection on any laptop.')
+        second = self.report('Ward 5 wifi down')
+        response = self.client.get(f'/api/requests/support-requests/{second.id}/duplicates/')
+        self.assertEqual([match['id'] for match in response.data['results']], [first.id])
+
+    def test_merge_closes_children_into_parent(self):
+        parent = self.report('Printer on 3rd floor down')
+        children = [self.report('3rd floor printer down') for _ in range(5)]
+        earlier = self.report('Printer down again')
+        SupportRequest.objects.filter(pk=earlier.pk).update(merged_into=children[0], status='closed')
+
+        url = f'/api/requests/support-requests/{parent.id}/merge/'
+        self.assertWithinQueryBudget(
+            SupportRequestViewSet, 'merge', url, method='post',
+            data={'request_ids': [child.id for child in children]},
+        )
+        self.assertEqual(
+            set(SupportRequest.objects.filter(merged_into=parent).values_list('pk', flat=True)),
+            {child.id for child in children} | {earlier.id},
+        )
+        self.assertFalse(SupportRequest.objects.filter(merged_into=parent).exclude(status='closed').exists())
+        self.assertEqual(RequestComment.objects.filter(request__in=children).count(), 5)
+        self.assertEqual(DuplicateDetector.find(parent), [])
+
+        again = self.client.post(url, {'request_ids': [children[0].id]}, format='json')
+        self.assertEqual((again.status_code, again.data['request_ids']), (400, [children[0].id]))
+
+    def test_merge_moves_open_child_tasks_to_parent(self):
+        parent = self.report('Printer on 3rd floor down')
+        child = self.report('3rd floor printer down')
+        open_task = Task.objects.create(title='Check printer', description='Jammed', related_request=child, status='in_progress')
+        done_task = Task.objects.create(title='Reset queue', description='Stuck jobs', related_request=child, status='completed')
+
+        response = self.client.post(
+            f'/api/requests/support-requests/{parent.id}/merge/', {'request_ids': [child.id]}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        open_task.refresh_from_db()
+        done_task.refresh_from_db()
+        self.assertEqual(open_task.related_request_id, parent.id)
+        self.assertEqual(done_task.related_request_id, child.id)
+
+    def test_merge_requires_a_technician(self):
+        parent = self.report('Printer on 3rd floor down')
+        child = self.report('3rd floor printer down')
+        SupportRequest.objects.filter(pk__in=[parent.pk, child.pk]).update(requester=self.requester)
+        self.client.force_authenticate(self.requester)
+        response = self.client.post(
+            f'/api/requests/support-requests/{parent.id}/merge/', {'request_ids': [child.id]}, format='json',
+        )
+        self.assertEqual(response.status_code, 403)
@@ -1,14 +1,24 @@
+import logging
+
 from rest_framework import viewsets, filters, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
+from django.db.models import Prefetch
 from django.utils import timezone
-from .models import SupportRequest, RequestCategory, RequestComment, Alert
-from .serializers import SupportRequestSerializer, RequestCategorySerializer, RequestCommentSerializer, AlertSerializer
+from .models import SupportRequest, RequestCategory, RequestComment, RequestAttachment, Alert
+from .serializers import SupportRequestSerializer, SupportRequestListSerializer, RequestCategorySerializer, RequestCommentSerializer, AlertSerializer
 from authentication.permissions import IsOwnerOrStaff, IsStaffOrReadOnly, RoleBasedPermission
+from authentication.permission_engine import PermissionEngine
 from core.workflow_engine import WorkflowEngine
 from core.notification_service import WorkflowNotifications
+from core.pagination import KeysetPagination
+from core.models import ReportDataVersion
+from .duplicates import OPEN_STATUSES, DuplicateDetector
+
+logger = logging.getLogger(__name__)
 
 class SupportRequestViewSet(viewsets.ModelViewSet):
     queryset = SupportRequest.objects.all()
@@ -18,36 +28,37 @@ class SupportRequestViewSet(viewsets.ModelViewSet):
     filterset_fields = ['status', 'priority', 'category', 'assigned_to', 'requester_department']
     search_fields = ['ticket_number', 'title', 'description', 'requester__first_name', 'requester__last_name']
     ordering_fields = ['created_at', 'priority', 'status', 'resolution_due']
-    ordering = ['-created_at']
+    ordering = ['-created_at', '-id']
+    pagination_class = KeysetPagination
+    query_budgets = {'list': 1, 'retrieve': 3, 'merge': 12}
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return SupportRequestListSerializer
+        return SupportRequestSerializer
     
     def get_queryset(self):
         """Filter requests based on user role (aligned with RoleBasedPermission roles)."""
-        queryset = SupportRequest.objects.all()
-        user = self.request.user
-        
-        if not user or not user.is_authenticated:
-            return SupportRequest.objects.none()
-        
-        # System admin and IT manager can see all requests
-        if getattr(user, 'role', '') in ['system_admin', 'it_manager'] or user.is_staff:
-            return queryset
-        
-        from django.db import models
-        # Technicians (including senior technicians) can see department + IT + own
-        if getattr(user, 'role', '') in ['technician', 'senior_technician']:
-            return queryset.filter(
-                models.Q(requester=user) |
-                models.Q(assigned_to=user) |
-                models.Q(requester__department__iexact=getattr(user, 'department', '')) |
-                models.Q(requester__department__iexact='it')
+        queryset = SupportRequest.objects.select_related(
+            'requester', 'assigned_to', 'category', 'related_equipment'
+        )
+        if self.action != 'list':
+            queryset = queryset.prefetch_related(
+                Prefetch('comments', queryset=RequestComment.objects.select_related('author')),
+                Prefetch('attachments', queryset=RequestAttachment.objects.select_related('uploaded_by')),
             )
-        
-        # Regular end users: only their own requests
-        return queryset.filter(requester=user)
+        # All for admins/managers, department + IT + own for technicians, own for end users
+        return PermissionEngine.filter_queryset(queryset, self.request.user)
     
     def perform_create(self, serializer):
         """Set the requester to the current user when creating a request."""
         request = serializer.save(requester=self.request.user)
+
+        # Flag likely duplicates (e.g. the same outage reported again) for merging
+        try:
+            DuplicateDetector.flag(request)
+        except Exception as e:
+            logger.error(f"Error checking request {request.id} for duplicates: {str(e)}")
         
         # Process through workflow engine
         WorkflowEngine.process_new_request(request)
@@ -128,6 +139,97 @@ class SupportRequestViewSet(viewsets.ModelViewSet):
         
         return Response({'error': 'comment is required'}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=['get'])
+    def duplicates(self, request, pk=None):
+        """Open requests in the same department, location or equipment that look like this one"""
+        support_request = self.get_object()
+        matches = DuplicateDetector.find(support_request, limit=20)
+        visible = set(
+            PermissionEngine.filter_queryset(SupportRequest.objects.all(), request.user)
+            .filter(pk__in=[match.pk for match, _ in matches]).values_list('pk', flat=True)
+        )
+        return Response({
+            'results': [
+                {
+                    'id': match.id,
+                    'ticket_number': match.ticket_number,
+                    'title': match.title,
+                    'status': match.status,
+                    'requester_location': match.requester_location,
+                    'created_at': match.created_at,
+                    'score': score,
+                }
+                for match, score in matches
+                if match.pk in visible
+            ]
+        })
+
+    @action(detail=True, methods=['post'])
+    def merge(self, request, pk=None):
+        """Close the requests in ``request_ids`` as duplicates of this one; their open tasks move here"""
+        from tasks.models import Task
+
+        parent = self.get_object()
+        if not request.user.can_close_tickets():
+            return Response({'error': 'You do not have permission to merge requests'}, status=status.HTTP_403_FORBIDDEN)
+        if parent.merged_into_id or parent.status not in OPEN_STATUSES:
+            return Response({'error': 'Requests can only be merged into an open request'}, status=status.HTTP_400_BAD_REQUEST)
+
+        request_ids = request.data.get('request_ids')
+        if not isinstance(request_ids, list) or not request_ids:
+            return Response({'error': 'request_ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            request_ids = {int(request_id) for request_id in request_ids} - {parent.pk}
+        except (TypeError, ValueError):
+            return Response({'error': 'request_ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        children = list(
+            PermissionEngine.filter_queryset(SupportRequest.objects.all(), request.user)
+            .filter(pk__in=request_ids, status__in=OPEN_STATUSES, merged_into__isnull=True)
+            .only('id', 'ticket_number')
+        )
+        missing = sorted(request_ids - {child.pk for child in children})
+        if missing:
+            return Response(
+                {'error': 'Some requests cannot be merged; they are not open or not visible to you', 'request_ids': missing},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        now = timezone.now()
+        child_ids = [child.pk for child in children]
+        with transaction.atomic():
+            SupportRequest.objects.filter(pk__in=child_ids).update(
+                merged_into=parent, status='closed', closed_at=now, updated_at=now,
+                resolution_notes=f'Merged into {parent.ticket_number}',
+            )
+            # Duplicates merged into a child earlier follow it to the new parent
+            SupportRequest.objects.filter(merged_into__in=child_ids).update(merged_into=parent, updated_at=now)
+            # Open work on the children carries on under the parent
+            moved_tasks = Task.objects.filter(related_request__in=child_ids).exclude(
+                status__in=['completed', 'cancelled']
+            ).update(related_request=parent)
+            RequestComment.objects.bulk_create(
+                [
+                    RequestComment(
+                        request_id=child.pk, author=request.user,
+                        comment=f'Merged into {parent.ticket_number}; updates continue there.',
+                    )
+                    for child in children
+                ] + [
+                    RequestComment(
+                        request=parent, author=request.user, is_internal=True,
+                        comment='Merged duplicates: ' + ', '.join(child.ticket_number for child in children),
+                    )
+                ]
+            )
+            # Bulk updates send no signals
+            ReportDataVersion.bump(SupportRequest._meta.label, *([Task._meta.label] if moved_tasks else []))
+
+        return Response({
+            'message': f'Merged {len(children)} requests into {parent.ticket_number}',
+            'merged': child_ids,
+        })
+
 class RequestCategoryViewSet(viewsets.ModelViewSet):
     queryset = RequestCategory.objects.all()
     serializer_class = RequestCategorySerializer
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_maintenanceschedule_updated_at'),
+        ('tasks', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='maintenance_schedule',
+            field=models.ForeignKey(blank=True, help_text='Schedule this preventive maintenance task was planned from', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tasks', to='inventory.maintenanceschedule'),
+        ),
+    ]
@@ -51,7 +51,11 @@ class Task(models.Model):
 
     title = models.CharField(max_length=200)
     description = models.TextField()
-    related_request = models.ForeignKey(SupportRequest, on_delete=models.CASCADE, related_name='tasks')
+    related_request = models.ForeignKey(SupportRequest, on_delete=models.CASCADE, null=True, blank=True, related_name='tasks')
+    maintenance_schedule = models.ForeignKey(
+        'inventory.MaintenanceSchedule', on_delete=models.SET_NULL, null=True, blank=True, related_name='tasks',
+        help_text='Schedule this preventive maintenance task was planned from',
+    )
     assigned_to = models.ForeignKey(ITPersonnel, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_tasks')
     priority = models.CharField(max_length=20, choices=PRIORITY_CHOICES, default='medium')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
@@ -70,9 +74,14 @@ class Task(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
 
     def __str__(self):
-        return f"{self.title} - {self.related_request.ticket_number}"
+        if self.related_request_id:
+            return f"{self.title} - {self.related_request.ticket_number}"
+        return self.title
 
 class TaskComment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='comments')
@@ -18,6 +18,16 @@ class TaskCommentSerializer(serializers.ModelSerializer):
         model = TaskComment
         fields = '__all__'
 
+class TaskListSerializer(serializers.ModelSerializer):
+    """Task without nested comments, for list views"""
+    assigned_to_name = serializers.CharField(source='assigned_to.user.get_full_name', read_only=True)
+    request_ticket = serializers.CharField(source='related_request.ticket_number', read_only=True)
+    request_title = serializers.CharField(source='related_request.title', read_only=True)
+    
+    class Meta:
+        model = Task
+        fields = '__all__'
+
 class TaskSerializer(serializers.ModelSerializer):
     assigned_to_name = serializers.CharField(source='assigned_to.user.get_full_name', read_only=True)
     request_ticket = serializers.CharField(source='related_request.ticket_number', read_only=True)
@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+
+from core.testing import QueryBudgetTestCase
+from requests_system.models import RequestCategory, SupportRequest
+from .models import ITPersonnel, Task, TaskComment
+from .views import TaskViewSet
+
+User = get_user_model()
+
+
+class TaskQueryBudgetTests(QueryBudgetTestCase):
+    """Task endpoints must not issue per-row queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='budget_admin', email='budget_admin@example.com', password='pass',
+            first_name='Budget', last_name='Admin', role='system_admin', is_approved=True,
+        )
+        technician_user = User.objects.create_user(
+            username='budget_tech', email='budget_tech@example.com', password='pass',
+            first_name='Budget', last_name='Tech', role='technician', department='IT', is_approved=True,
+        )
+        cls.technician = ITPersonnel.objects.create(
+            user=technician_user, employee_id='T-001', department='IT',
+            specializations='hardware', phone='555-0100',
+        )
+        cls.support_request = SupportRequest.objects.create(
+            title='Monitor flickering',
+            description='Monitor in ward 3 flickers.',
+            category=RequestCategory.objects.create(name='Hardware', category_type='hardware'),
+            requester=cls.admin,
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.admin)
+
+    def create_tasks(self, count):
+        tasks = []
+        for index in range(count):
+            task = Task.objects.create(
+                title=f'Replace cable {index}',
+                description='Swap the display cable.',
+                related_request=self.support_request,
+                assigned_to=self.technician,
+                status='assigned',
+            )
+            TaskComment.objects.create(task=task, author=self.technician.user, comment='On it')
+            tasks.append(task)
+        return tasks
+
+    def test_list_within_budget(self):
+        self.create_tasks(3)
+        self.assertWithinQueryBudget(TaskViewSet, 'list', '/api/tasks/tasks/')
+
+        self.create_tasks(20)
+        response = self.assertWithinQueryBudget(TaskViewSet, 'list', '/api/tasks/tasks/')
+        self.assertNotIn('comments', response.data['results'][0])
+        self.assertEqual(response.data['results'][0]['assigned_to_name'], 'Budget Tech')
+
+    def test_retrieve_within_budget(self):
+        task = self.create_tasks(1)[0]
+
+        response = self.assertWithinQueryBudget(TaskViewSet, 'retrieve', f'/api/tasks/tasks/{task.id}/')
+        self.assertEqual(response.data['comments'][0]['author_name'], 'Budget Tech')
+        self.assertEqual(response.data['request_ticket'], self.support_request.ticket_number)
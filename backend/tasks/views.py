@@ -4,17 +4,20 @@ from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
 from django.db import models
+from django.db.models import Prefetch
 from .models import Task, ITPersonnel, TaskComment, WorkflowTemplate, TaskAssignmentRule
 from .serializers import (
-    TaskSerializer, ITPersonnelSerializer, TaskCommentSerializer,
+    TaskSerializer, TaskListSerializer, ITPersonnelSerializer, TaskCommentSerializer,
     WorkflowTemplateSerializer, TaskAssignmentRuleSerializer
 )
 from .services import TaskAssignmentService, TechnicianDashboardService
 from requests_system.models import SupportRequest
 from authentication.permissions import IsOwnerOrStaff, IsStaffOrReadOnly, RoleBasedPermission
 from authentication.admin_views import IsAdminUser
+from authentication.permission_engine import PermissionEngine
 from core.workflow_engine import WorkflowEngine
 from core.notification_service import WorkflowNotifications
+from core.pagination import KeysetPagination
 
 class TaskViewSet(viewsets.ModelViewSet):
     queryset = Task.objects.all()
@@ -25,31 +28,29 @@ class TaskViewSet(viewsets.ModelViewSet):
     filterset_fields = ['status', 'priority', 'assigned_to', 'related_request']
     search_fields = ['title', 'description', 'related_request__ticket_number']
     ordering_fields = ['created_at', 'priority', 'due_date']
-    ordering = ['-created_at']
+    ordering = ['-created_at', '-id']
+    pagination_class = KeysetPagination
+    query_budgets = {'list': 1, 'retrieve': 2}
+    
+    def get_serializer_class(self):
+        if self.action in ('list', 'my_tasks', 'my_dashboard'):
+            return TaskListSerializer
+        return TaskSerializer
+    
+    @staticmethod
+    def with_list_relations(queryset):
+        """Join the relations TaskListSerializer reads"""
+        return queryset.select_related('assigned_to__user', 'related_request')
     
     def get_queryset(self):
         """Filter tasks based on user role (aligned with RoleBasedPermission roles)."""
-        queryset = Task.objects.all()
-        user = self.request.user
-        
-        if not user or not user.is_authenticated:
-            return Task.objects.none()
-        
-        # System admin and IT manager can see all tasks
-        if getattr(user, 'role', '') in ['system_admin', 'it_manager'] or user.is_staff:
-            return queryset
-        
-        # Technicians (including senior technicians) can see assigned + department + IT
-        if getattr(user, 'role', '') in ['technician', 'senior_technician']:
-            from django.db import models
-            return queryset.filter(
-                models.Q(assigned_to__user=user) |
-                models.Q(related_request__requester__department__iexact=getattr(user, 'department', '')) |
-                models.Q(related_request__requester__department__iexact='it')
+        queryset = self.with_list_relations(Task.objects.all())
+        if self.action != 'list':
+            queryset = queryset.prefetch_related(
+                Prefetch('comments', queryset=TaskComment.objects.select_related('author'))
             )
-        
-        # End users can only see tasks assigned to them
-        return queryset.filter(assigned_to__user=user)
+        # All for admins/managers, assigned + department + IT for technicians, assigned for end users
+        return PermissionEngine.filter_queryset(queryset, self.request.user)
 
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
@@ -225,13 +226,11 @@ class TaskViewSet(viewsets.ModelViewSet):
         if status_filter:
             status_filter = status_filter.split(',')
         
-        tasks = TechnicianDashboardService.get_technician_tasks(request.user, status_filter)
-        
-        page = self.paginate_queryset(tasks)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        tasks = self.with_list_relations(
+            TechnicianDashboardService.get_technician_tasks(request.user, status_filter)
+        )
         
+        # Returned whole: keyset pages would replace the priority/due-date ordering
         serializer = self.get_serializer(tasks, many=True)
         return Response(serializer.data)
     
@@ -239,7 +238,9 @@ class TaskViewSet(viewsets.ModelViewSet):
     def my_dashboard(self, request):
         """Get dashboard statistics for the current technician"""
         stats = TechnicianDashboardService.get_technician_dashboard_stats(request.user)
-        upcoming_tasks = TechnicianDashboardService.get_upcoming_tasks(request.user)
+        upcoming_tasks = self.with_list_relations(
+            TechnicianDashboardService.get_upcoming_tasks(request.user)
+        )
         
         upcoming_serializer = self.get_serializer(upcoming_tasks, many=True)
         
@@ -0,0 +1,87 @@
+import { useState, useEffect } from "react"
+import { DocumentIcon } from "@heroicons/react/24/outline"
+import { apiService } from "../../services/api"
+
+// Previews are generated in the background; poll a few times while the API answers 202
+const MAX_PENDING_POLLS = 5
+
+const formatSize = (bytes) => {
+  if (bytes >= 1024 * 1024) return `${(bytes / (1024 * 1024)).toFixed(1)} MB`
+  if (bytes >= 1024) return `${Math.round(bytes / 1024)} KB`
+  return `${bytes} B`
+}
+
+const AttachmentPreview = ({ attachment }) => {
+  const [preview, setPreview] = useState({ status: "loading" })
+
+  useEffect(() => {
+    let cancelled = false
+    let objectUrl = null
+    let timer = null
+
+    const load = async (polls) => {
+      try {
+        const response = await apiService.getAttachmentPreview(attachment.id)
+        if (cancelled) return
+        if (response.status === 202) {
+          if (polls >= MAX_PENDING_POLLS) {
+            setPreview({ status: "pending" })
+            return
+          }
+          const retryAfter = Number(response.headers?.["retry-after"]) || 2
+          timer = setTimeout(() => load(polls + 1), retryAfter * 1000)
+          return
+        }
+        const blob = response.data
+        if (blob.type.startsWith("image/")) {
+          objectUrl = URL.createObjectURL(blob)
+          setPreview({ status: "image", url: objectUrl })
+        } else {
+          const text = await blob.text()
+          if (!cancelled) setPreview({ status: "text", text })
+        }
+      } catch (error) {
+        // 404 means the file type has no preview
+        if (error.response?.status !== 404) {
+          console.error("Error loading attachment preview:", error)
+        }
+        if (!cancelled) setPreview({ status: "none" })
+      }
+    }
+
+    load(0)
+    return () => {
+      cancelled = true
+      clearTimeout(timer)
+      if (objectUrl) URL.revokeObjectURL(objectUrl)
+    }
+  }, [attachment.id])
+
+  return (
+    <div className="border border-gray-200 rounded-lg overflow-hidden">
+      <div className="bg-muted flex items-center justify-center min-h-24">
+        {preview.status === "image" && (
+          <img src={preview.url} alt={attachment.filename} className="max-h-64 object-contain" />
+        )}
+        {preview.status === "text" && (
+          <pre className="w-full max-h-64 overflow-auto p-3 text-xs text-gray-900 whitespace-pre-wrap">
+            {preview.text}
+          </pre>
+        )}
+        {preview.status === "loading" && <span className="text-sm text-muted-foreground">Loading preview...</span>}
+        {preview.status === "pending" && (
+          <span className="text-sm text-muted-foreground">Preview is still being generated</span>
+        )}
+        {preview.status === "none" && <DocumentIcon className="w-10 h-10 text-muted-foreground" />}
+      </div>
+      <div className="px-3 py-2 flex items-center justify-between text-sm">
+        <span className="text-gray-900 truncate" title={attachment.filename}>
+          {attachment.filename}
+        </span>
+        <span className="text-muted-foreground ml-2 shrink-0">{formatSize(attachment.size)}</span>
+      </div>
+    </div>
+  )
+}
+
+export default AttachmentPreview
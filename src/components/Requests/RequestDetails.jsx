@@ -8,12 +8,15 @@ import {
   UserIcon,
   ClockIcon,
   ChatBubbleLeftIcon,
+  PaperClipIcon,
 } from "@heroicons/react/24/outline"
 import { apiService } from "../../services/api"
+import AttachmentPreview from "./AttachmentPreview"
 import { usePermissions } from "../../contexts/PermissionsContext"
 
 const RequestDetails = ({ request, onClose, onUpdate, onAssign }) => {
   const [comments, setComments] = useState([])
+  const [attachments, setAttachments] = useState([])
   const [newComment, setNewComment] = useState("")
   const [isInternal, setIsInternal] = useState(false)
   const [loading, setLoading] = useState(false)
@@ -27,6 +30,7 @@ const RequestDetails = ({ request, onClose, onUpdate, onAssign }) => {
     try {
       const response = await apiService.get(`/requests/support-requests/${request.id}/`)
       setComments(response.data?.comments || [])
+      setAttachments(response.data?.attachments || [])
     } catch (error) {
       console.error("Error fetching comments:", error)
     }
@@ -270,6 +274,23 @@ const RequestDetails = ({ request, onClose, onUpdate, onAssign }) => {
             </CardContent>
           </Card>
 
+          {/* Attachments */}
+          {attachments.length > 0 && (
+            <Card className="bg-white border border-gray-200">
+              <CardHeader>
+                <CardTitle className="text-lg flex items-center space-x-2">
+                  <PaperClipIcon className="w-5 h-5" />
+                  <span>Attachments ({attachments.length})</span>
+                </CardTitle>
+              </CardHeader>
+              <CardContent className="grid grid-cols-1 md:grid-cols-2 gap-4">
+                {attachments.map((attachment) => (
+                  <AttachmentPreview key={attachment.id} attachment={attachment} />
+                ))}
+              </CardContent>
+            </Card>
+          )}
+
           {/* Comments */}
           <Card className="bg-white border border-gray-200">
             <CardHeader>
@@ -65,11 +65,8 @@ const TaskAssignment = ({ onTaskUpdate }) => {
       }
 
       // Fetch support requests that don't have tasks yet
-      const requestsResponse = await apiService.getSupportRequests({ status: 'open' })
-      if (requestsResponse?.data) {
-        const requests = Array.isArray(requestsResponse.data) ? requestsResponse.data : requestsResponse.data.results || []
-        setSupportRequests(requests.filter(req => !req.has_tasks))
-      }
+      const requests = await apiService.getAllPages('/requests/support-requests/', { status: 'open' })
+      setSupportRequests(requests.filter(req => !req.has_tasks))
 
     } catch (error) {
       console.error('Error fetching assignment data:', error)
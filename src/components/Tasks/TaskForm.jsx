@@ -39,8 +39,7 @@ const TaskForm = ({ task, onSubmit, onClose }) => {
     // Load support requests for selection
     const fetchRequests = async () => {
       try {
-        const res = await apiService.getSupportRequests({ page_size: 100 })
-        const data = res.data.results || res.data
+        const data = await apiService.getAllPages("/requests/support-requests/")
         setRequests(Array.isArray(data) ? data : [])
       } catch (e) {
         console.error("Error fetching support requests:", e)
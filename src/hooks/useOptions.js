@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react'
-import { apiService } from '../services/api'
+import { apiService, collectPages, OPTION_PAGE_SIZE } from '../services/api'
 
 // Simple in-memory cache for option lists keyed by endpoint
 const optionsCache = new Map()
@@ -29,12 +29,14 @@ export default function useOptions(endpoint, mapFn = null, deps = [], opts = {})
           }
         }
 
-        const res = await apiService.get(endpoint)
+        const params = { page_size: OPTION_PAGE_SIZE }
+        const res = await apiService.get(endpoint, { params })
         let list = []
         if (res && res.data) {
           // try common shapes
           if (Array.isArray(res.data)) list = res.data
-          else if (Array.isArray(res.data.results)) list = res.data.results
+          // Paginated lists: an option list needs every page, not just the first
+          else if (Array.isArray(res.data.results)) list = await collectPages(endpoint, res.data, params)
           else if (Array.isArray(res.data.roles)) list = res.data.roles
           else if (Array.isArray(res.data.choices)) list = res.data.choices
           else if (Array.isArray(res.data.categories)) list = res.data.categories
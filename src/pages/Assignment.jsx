@@ -5,12 +5,13 @@ import { Label } from "../components/ui/label"
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "../components/ui/select"
 import { Alert, AlertDescription } from "../components/ui/alert"
 import { Separator } from "../components/ui/separator"
-import { apiService } from "../services/api"
+import { apiService, getNextCursor } from "../services/api"
 import StatusBadge from "../components/ui/status-badge"
 
 const Assignment = () => {
   const [requests, setRequests] = useState([])
   const [loadingRequests, setLoadingRequests] = useState(true)
+  const [nextCursor, setNextCursor] = useState(null)
   const [selectedRequestId, setSelectedRequestId] = useState("")
 
   const [assignableUsers, setAssignableUsers] = useState([])
@@ -20,13 +21,18 @@ const Assignment = () => {
   const [error, setError] = useState("")
   const [success, setSuccess] = useState("")
 
-  const fetchRequests = async () => {
+  // Without a cursor the tickets are reloaded from the first page; with one the next page is appended
+  const fetchRequests = async (cursor = null) => {
     try {
       setLoadingRequests(true)
-      const res = await apiService.getSupportRequests({ status: "pending" })
+      const params = { status: "pending" }
+      if (cursor) params.cursor = cursor
+      const res = await apiService.getSupportRequests(params)
       // API may be paginated; handle both list and paginated formats
       const list = res.data?.results || res.data || []
-      setRequests(Array.isArray(list) ? list : [])
+      const items = Array.isArray(list) ? list : []
+      setRequests((prev) => (cursor ? [...prev, ...items] : items))
+      setNextCursor(getNextCursor(res.data))
       // Auto-select first pending request for convenience
       if (!selectedRequestId && list.length) {
         setSelectedRequestId(String(list[0].id))
@@ -117,6 +123,11 @@ const Assignment = () => {
               <Button variant="secondary" onClick={() => fetchRequests()} disabled={loadingRequests}>
                 {loadingRequests ? "Refreshing..." : "Refresh Tickets"}
               </Button>
+              {nextCursor && (
+                <Button variant="outline" className="ml-2" onClick={() => fetchRequests(nextCursor)} disabled={loadingRequests}>
+                  Load more tickets
+                </Button>
+              )}
             </div>
           </div>
 
@@ -18,7 +18,7 @@ import {
   ArrowLeftIcon,
   XMarkIcon,
 } from "@heroicons/react/24/outline"
-import { apiService } from "../services/api"
+import { apiService, getNextCursor } from "../services/api"
 import EquipmentFilters from "../components/Inventory/EquipmentFilters"
 import EquipmentForm from "../components/Inventory/EquipmentForm"
 import EquipmentDetails from "../components/Inventory/EquipmentDetails"
@@ -29,6 +29,8 @@ import AssetCheckout from "../components/Inventory/AssetCheckout"
 const Inventory = () => {
   const [equipment, setEquipment] = useState([])
   const [loading, setLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [showForm, setShowForm] = useState(false)
   const [showDetails, setShowDetails] = useState(false)
   const [showFilters, setShowFilters] = useState(false)
@@ -101,21 +103,28 @@ const Inventory = () => {
     setSelectedEquipment(null)
   }, [location.pathname, equipmentId, equipment])
 
-  const fetchEquipment = async () => {
+  // Without a cursor the list is reloaded from the first page; with one the next page is appended
+  const fetchEquipment = async ({ cursor } = {}) => {
     try {
-      setLoading(true)
+      cursor ? setLoadingMore(true) : setLoading(true)
       const params = {
         ...filters,
       }
       if (searchTerm) params.search = searchTerm
+      if (cursor) params.cursor = cursor
       const res = await apiService.getEquipment(params)
       const data = res.data.results || res.data
-      setEquipment(Array.isArray(data) ? data : [])
+      const items = Array.isArray(data) ? data : []
+      setEquipment((prev) => (cursor ? [...prev, ...items] : items))
+      setNextCursor(getNextCursor(res.data))
     } catch (error) {
       console.error("Error fetching equipment:", error)
-      setEquipment([])
+      if (!cursor) {
+        setEquipment([])
+        setNextCursor(null)
+      }
     } finally {
-      setLoading(false)
+      cursor ? setLoadingMore(false) : setLoading(false)
     }
   }
 
@@ -264,7 +273,7 @@ const Inventory = () => {
         <CardHeader>
           <CardTitle className="flex items-center space-x-2">
             <ComputerDesktopIcon className="w-5 h-5 text-blue-600" />
-            <span className="text-gray-900">Equipment ({equipment.length})</span>
+            <span className="text-gray-900">Equipment ({equipment.length}{nextCursor ? "+" : ""})</span>
           </CardTitle>
         </CardHeader>
         <CardContent>
@@ -386,6 +395,13 @@ const Inventory = () => {
                   ))}
                 </tbody>
               </table>
+              {nextCursor && (
+                <div className="flex justify-center pt-4">
+                  <Button variant="outline" onClick={() => fetchEquipment({ cursor: nextCursor })} disabled={loadingMore}>
+                    {loadingMore ? "Loading..." : "Load more"}
+                  </Button>
+                </div>
+              )}
             </div>
           )}
         </CardContent>
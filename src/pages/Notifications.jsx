@@ -2,7 +2,7 @@ import { useState, useEffect } from 'react'
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card'
 import { Button } from '../components/ui/button'
 import { useAuth } from '../contexts/AuthContext';
-import { apiService } from '../services/api'
+import { apiService, getNextCursor } from '../services/api'
 import {
   BellIcon,
   CheckIcon,
@@ -24,6 +24,8 @@ const Notifications = () => {
   const { user, markNotificationRead, markAllNotificationsRead } = useAuth()
   const [notifications, setNotifications] = useState([])
   const [loading, setLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [error, setError] = useState('')
   const [selectedNotifications, setSelectedNotifications] = useState([])
   const [filters, setFilters] = useState({
@@ -48,14 +50,16 @@ const Notifications = () => {
     fetchNotificationSettings()
   }, [filters])
 
-  const fetchNotifications = async () => {
+  // Without a cursor the list is reloaded from the first page; with one the next page is appended
+  const fetchNotifications = async ({ cursor } = {}) => {
     try {
-      setLoading(true)
+      cursor ? setLoadingMore(true) : setLoading(true)
       setError('')
       const params = {
         ...filters,
         limit: 50
       }
+      if (cursor) params.cursor = cursor
       // Map UI filters to backend-supported params
       if (params.status === 'unread') {
         params.unread_only = true
@@ -75,13 +79,18 @@ const Notifications = () => {
 
       const response = await apiService.getNotifications(params)
       const list = response.data?.notifications || response.data?.results || response.data || []
-      setNotifications(Array.isArray(list) ? list : [])
+      const items = Array.isArray(list) ? list : []
+      setNotifications(prev => (cursor ? [...prev, ...items] : items))
+      setNextCursor(getNextCursor(response.data))
     } catch (error) {
       console.error('Error fetching notifications:', error)
-      setNotifications([])
+      if (!cursor) {
+        setNotifications([])
+        setNextCursor(null)
+      }
       setError('Failed to load notifications.')
     } finally {
-      setLoading(false)
+      cursor ? setLoadingMore(false) : setLoading(false)
     }
   }
 
@@ -535,6 +544,13 @@ const Notifications = () => {
               ))}
             </div>
           )}
+          {nextCursor && !loading && (
+            <div className="flex justify-center pt-4">
+              <Button variant="outline" onClick={() => fetchNotifications({ cursor: nextCursor })} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
     </div>
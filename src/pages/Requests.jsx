@@ -16,7 +16,7 @@ import {
   ClipboardDocumentListIcon,
   XCircleIcon
 } from "@heroicons/react/24/outline"
-import { apiService } from "../services/api";
+import { apiService, getNextCursor } from "../services/api";
 import DataTable from "../components/ui/data-table";
 import RequestDetailsSidebar from "../components/Requests/RequestDetailsSidebar";
 import AlertsPanel from "../components/Requests/AlertsPanel"
@@ -28,6 +28,8 @@ const Requests = () => {
   const [requests, setRequests] = useState([])
   const [alerts, setAlerts] = useState([])
   const [loading, setLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [showForm, setShowForm] = useState(false)
   const [showFilters, setShowFilters] = useState(false)
   const [showAlerts, setShowAlerts] = useState(false)
@@ -93,9 +95,10 @@ const Requests = () => {
     setSelectedRequest(null)
   }, [location.pathname, requestId, requests])
 
-  const fetchRequests = async () => {
+  // Without a cursor the list is reloaded from the first page; with one the next page is appended
+  const fetchRequests = async ({ cursor } = {}) => {
     try {
-      setLoading(true)
+      cursor ? setLoadingMore(true) : setLoading(true)
 
       const params = { ...filters }
       if (searchTerm) params.search = searchTerm
@@ -105,18 +108,23 @@ const Requests = () => {
 
       const wantsUnassigned = filters.assigned_to === "unassigned"
       if (wantsUnassigned) delete params.assigned_to
+      if (cursor) params.cursor = cursor
 
       const res = await apiService.getSupportRequests(params)
       let items = res.data?.results || res.data || []
       if (wantsUnassigned) {
         items = items.filter((r) => !r.assigned_to)
       }
-      setRequests(items)
+      setRequests((prev) => (cursor ? [...prev, ...items] : items))
+      setNextCursor(getNextCursor(res.data))
     } catch (error) {
       console.error("Error fetching requests:", error)
-      setRequests([])
+      if (!cursor) {
+        setRequests([])
+        setNextCursor(null)
+      }
     } finally {
-      setLoading(false)
+      cursor ? setLoadingMore(false) : setLoading(false)
     }
   }
 
@@ -351,6 +359,14 @@ const Requests = () => {
         emptyMessage="No support requests found. Try adjusting your filters or create a new request."
       />
 
+      {nextCursor && !loading && (
+        <div className="flex justify-center">
+          <Button variant="outline" onClick={() => fetchRequests({ cursor: nextCursor })} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more requests"}
+          </Button>
+        </div>
+      )}
+
       {/* Request Form Modal */}
       {showForm && (
         <RequestForm
@@ -3,7 +3,7 @@ import { useParams, useNavigate, useLocation } from "react-router-dom";
 import { Button } from "../components/ui/button";
 import { usePermissions } from "../contexts/PermissionsContext";
 import { PlusIcon, UserGroupIcon, EyeIcon, PencilIcon, CheckCircleIcon, TicketIcon } from "@heroicons/react/24/outline";
-import { apiService } from "../services/api";
+import { apiService, getNextCursor } from "../services/api";
 import TaskForm from "../components/Tasks/TaskForm";
 import PersonnelPanel from "../components/Tasks/PersonnelPanel";
 import TaskDetailsSidebar from "../components/Tasks/TaskDetailsSidebar";
@@ -15,6 +15,8 @@ const Tasks = () => {
   const [tasks, setTasks] = useState([]);
   const [personnel, setPersonnel] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [showTaskForm, setShowTaskForm] = useState(false);
   const [selectedTask, setSelectedTask] = useState(null);
   const [showPersonnelPanel, setShowPersonnelPanel] = useState(false);
@@ -72,18 +74,25 @@ const Tasks = () => {
     setSelectedTask(null);
   }, [location.pathname, taskId, tasks]);
 
-  const fetchTasks = async () => {
+  // Without a cursor the list is reloaded from the first page; with one the next page is appended
+  const fetchTasks = async ({ cursor } = {}) => {
     try {
-      setLoading(true);
+      cursor ? setLoadingMore(true) : setLoading(true);
       const params = { ...filters };
+      if (cursor) params.cursor = cursor;
       const res = await apiService.getTasks(params);
       const data = res.data.results || res.data;
-      setTasks(Array.isArray(data) ? data : []);
+      const items = Array.isArray(data) ? data : [];
+      setTasks((prev) => (cursor ? [...prev, ...items] : items));
+      setNextCursor(getNextCursor(res.data));
     } catch (error) {
       console.error("Error fetching tasks:", error);
-      setTasks([]);
+      if (!cursor) {
+        setTasks([]);
+        setNextCursor(null);
+      }
     } finally {
-      setLoading(false);
+      cursor ? setLoadingMore(false) : setLoading(false);
     }
   };
 
@@ -227,6 +236,14 @@ const Tasks = () => {
         emptyMessage="No tasks found. Try adjusting your filters or create a new task."
       />
 
+      {nextCursor && !loading && (
+        <div className="flex justify-center">
+          <Button variant="outline" onClick={() => fetchTasks({ cursor: nextCursor })} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more tasks"}
+          </Button>
+        </div>
+      )}
+
       {showTaskForm && (
         <TaskForm
           task={selectedTask}
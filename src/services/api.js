@@ -550,6 +550,10 @@ class ApiService {
     return this.get("/notifications/", { params })
   }
 
+  async getUnreadNotificationCount() {
+    return this.get("/notifications/unread-count/")
+  }
+
   async markNotificationRead(id) {
     return this.post(`/notifications/${id}/read/`)
   }
@@ -583,6 +587,12 @@ class ApiService {
     })
   }
 
+  // Thumbnail or text preview of a request attachment as a blob; 202 while it is generated.
+  // Previews need the Authorization header, so they cannot be loaded straight into <img src>.
+  async getAttachmentPreview(attachmentId) {
+    return this.get(`/files/attachments/${attachmentId}/preview/`, { responseType: 'blob' })
+  }
+
 
   // User profile methods
   async getCurrentUser() {
@@ -638,6 +648,41 @@ class ApiService {
   async downloadBackup(backupId) {
     return this.get(`/admin/backup/${backupId}/download/`, { responseType: 'blob' })
   }
+
+  // Every row of a list endpoint, for selects that need the whole list
+  async getAllPages(url, params = {}) {
+    params = { page_size: OPTION_PAGE_SIZE, ...params }
+    const res = await this.get(url, { params })
+    return Array.isArray(res.data) ? res.data : collectPages(url, res.data, params)
+  }
+}
+
+// Largest page the keyset-paginated endpoints serve
+export const OPTION_PAGE_SIZE = 200
+
+// Cursor of the next page of a keyset-paginated list, or null on the last page.
+// List endpoints return a `next` link; notifications return `next_cursor`.
+export function getNextCursor(data) {
+  if (!data || Array.isArray(data)) return null
+  if (data.next_cursor) return data.next_cursor
+  if (!data.next) return null
+  try {
+    return new URL(data.next, window.location.origin).searchParams.get("cursor")
+  } catch {
+    return null
+  }
+}
+
+// Rows of a list response followed by the rows of every later keyset page
+export async function collectPages(url, data, params = {}) {
+  const rows = [...(data?.results || [])]
+  let cursor = getNextCursor(data)
+  while (cursor) {
+    const res = await apiService.get(url, { params: { ...params, cursor } })
+    rows.push(...(res.data?.results || []))
+    cursor = getNextCursor(res.data)
+  }
+  return rows
 }
 
 export const apiService = new ApiService()
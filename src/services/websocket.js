@@ -145,6 +145,12 @@ class WebSocketService {
       case 'user_activity':
         this.emit('userActivity', payload)
         break
+      case 'unread_count':
+        this.emit('unreadCount', payload)
+        break
+      case 'heartbeat_ack':
+        this.lastHeartbeatAck = Date.now()
+        break
       default:
         console.debug('Unknown message type:', type, payload)
     }
@@ -215,6 +221,10 @@ class WebSocketService {
     return this.on('userActivity', callback)
   }
 
+  onUnreadCount(callback) {
+    return this.on('unreadCount', callback)
+  }
+
   // Send specific message types
   joinRoom(roomName) {
     this.send('join_room', { room: roomName })